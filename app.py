@@ -1,14 +1,26 @@
 # app.py
 import streamlit as st
-import json
-import datetime
 import os
+import time
+from dataclasses import replace
 
 # Yeni oluşturduğumuz modüllerden importlar
-from config import MAX_HEADLINE_CHARS, MAX_BODY_CHARS, HUGGING_FACE_MODEL_NAME
+from config import (
+    HISTORY_PAGE_SIZE, CAMPAIGN_CSV_PATH, IMAGE_JOB_POLL_SECONDS,
+    AD_PLATFORM_OPTIONS, TONE_OF_VOICE_OPTIONS, MATRIX_MAX_PARALLEL, TRACE_PANEL_REFRESH_SECONDS, METRICS_PORT
+)
 from utils.web_scraper import get_website_content, analyze_website_with_llm
-from utils.llm_helpers import get_ad_gen_chain
-from image_generator.hf_image_client import get_hf_inference_client, translate_to_english, generate_image_with_hf_client, load_image_from_url
+from utils.content_condenser import condense_for_analysis
+from utils.llm_helpers import get_ad_gen_chain, warm_up_models, build_output_data, get_ad_generation_cache
+from utils.ad_parser import StreamingAdParser, SECTION_KEYS, SECTION_CHAR_LIMITS
+from utils.ad_generation import generate_ad, generate_matrix
+from utils.history_store import get_history_store
+from utils.dedup_index import get_dedup_index, find_duplicates_within, INDEXED_SECTIONS
+from utils.tracing import get_tracer, start_metrics_server
+from utils.llm_gateway import get_llm_gateway, llm_queue_notice, LLMOverloadedError
+from utils.ollama_pool import get_ollama_pool
+from image_generator.hf_image_client import get_hf_inference_client, hf_image_generation_configured, translate_to_english, load_image_from_url, product_image_prompt
+from image_generator.image_jobs import get_image_job_queue, JOB_QUEUED, JOB_DONE
 
 # --- Streamlit Arayüzü Başlangıç Ayarları ---
 st.set_page_config(page_title="Yerel Reklam Metni Asistanı", page_icon="💡", layout="wide")
@@ -16,6 +28,54 @@ st.set_page_config(page_title="Yerel Reklam Metni Asistanı", page_icon="💡",
 st.title("💡 Yerel Reklam Metni Asistanı")
 st.subheader("Ürün/Hizmetleriniz İçin Yaratıcı Reklam Metinleri Oluşturun")
 
+# Modelleri süreç başına bir kez arka planda belleğe yükle (sonraki çalıştırmalarda önbellekten döner)
+warm_up_models()
+metrics_server = start_metrics_server()
+
+# --- Performans Paneli (kenar çubuğu) ---
+@st.fragment(run_every=TRACE_PANEL_REFRESH_SECONDS)
+def render_trace_panel():
+    """
+    Aşama bazlı süre/token özetini ve son span'leri kendi kendine yenilenen bir panelde gösterir.
+    """
+    tracer = get_tracer()
+    st.subheader("⏱️ Performans")
+    summary = tracer.stage_summary()
+    if not summary:
+        st.caption("Henüz ölçülen bir aşama yok.")
+        return
+    st.dataframe(summary, hide_index=True, use_container_width=True)
+    st.caption("Son aşamalar:")
+    for record in list(tracer.recent)[-8:][::-1]:
+        attributes = record["attributes"]
+        details = [f"{record['duration_seconds'] * 1000:.0f} ms"]
+        if attributes.get("tokens_per_second"):
+            details.append(f"{attributes['eval_tokens']} token, {attributes['tokens_per_second']} token/sn")
+        if attributes.get("cache_hit"):
+            details.append("önbellek")
+        if record["error"]:
+            details.append("hata")
+        st.text(f"{record['name']}: {', '.join(details)}")
+    gateway = get_llm_gateway()
+    if gateway is not None:
+        gateway_stats = gateway.stats()
+        for model, queue in gateway_stats["models"].items():
+            st.caption(f"{model}: {queue['active']}/{queue['slots']} çalışıyor, {queue['waiting']} sırada, {queue['shed']} reddedildi")
+        if gateway_stats["coalesced"]:
+            st.caption(f"Birleştirilen aynı istek: {gateway_stats['coalesced']}")
+    pool_stats = get_ollama_pool().stats()
+    if len(pool_stats["nodes"]) > 1:
+        for node in pool_stats["nodes"]:
+            status = "yanıt vermiyor" if not node["healthy"] else {"closed": "etkin", "open": "devre dışı", "half_open": "deneniyor"}[node["state"]]
+            st.caption(f"{node['url']}: {status}, {node['outstanding']} çalışıyor, {node['requests']} istek, {node['failures']} hata")
+        if pool_stats["hedges"]:
+            st.caption(f"Yedek istek: {pool_stats['hedges']} gönderildi, {pool_stats['hedge_wins']} önce yanıt verdi")
+    if metrics_server is not None:
+        st.caption(f"Prometheus: http://127.0.0.1:{METRICS_PORT}/metrics")
+
+with st.sidebar:
+    render_trace_panel()
+
 # --- Session state başlangıç ayarları ---
 if 'product_name' not in st.session_state:
     st.session_state.product_name = ""
@@ -41,14 +101,14 @@ col1, col2 = st.columns(2)
 with col1:
     ad_platform = st.selectbox(
         "Reklam Platformu:",
-        options=["Genel", "Google Ads", "Facebook/Instagram", "Twitter/X", "E-posta Pazarlaması"],
+        options=AD_PLATFORM_OPTIONS,
         key="ad_platform_select",
         help="Reklamın yayınlanacağı platformu seçin."
     )
 with col2:
     tone_of_voice = st.selectbox(
         "Marka Tonu:",
-        options=["Profesyonel", "Samimi", "Mizahi", "İkna Edici", "Bilgilendirici", "Yaratıcı"],
+        options=TONE_OF_VOICE_OPTIONS,
         key="tone_of_voice_select",
         help="Reklam metninin hangi tonda olmasını istersiniz?"
     )
@@ -65,9 +125,10 @@ analyze_url_button = st.button("URL'yi Analiz Et ve Bilgileri Çek", key="analyz
 if analyze_url_button:
     if website_url_input:
         with st.spinner("Web sitesi içeriği analiz ediliyor..."):
-            title, description, full_text = get_website_content(website_url_input)
+            title, description, full_text, structured_data = get_website_content(website_url_input)
             if full_text:
-                extracted_data = analyze_website_with_llm(full_text)
+                with llm_queue_notice():
+                    extracted_data = analyze_website_with_llm(condense_for_analysis(title, description, full_text), structured_data)
                 if extracted_data[0] or extracted_data[1] or extracted_data[2]:
                     st.session_state.product_name = extracted_data[0]
                     st.session_state.product_description = extracted_data[1]
@@ -116,19 +177,50 @@ with col_num3:
         help="Oluşturulacak Slogan sayısını belirleyin."
     )
 
-# LLM zincirini utils/llm_helpers.py'den çağır
-llm_chain = get_ad_gen_chain()
-
 # --- 3. Reklam Metni Üretme Butonu ---
 st.markdown("---")
+stream_output = st.checkbox("Metinleri üretilirken göster (akış modu)", value=True, key="stream_output_checkbox", help="Açıkken başlıklar, gövde metni, CTA'lar ve sloganlar model yazdıkça ekrana gelir.")
+auto_repair = st.checkbox("Limiti aşan başlık/gövde metnini otomatik düzelt", value=True, key="auto_repair_checkbox", help="Açıkken yalnızca karakter limitini aşan öğeler küçük bir istemle yeniden yazdırılır; tüm metin yeniden üretilmez.")
+filter_duplicates = st.checkbox("Yakın tekrarları sonuçtan çıkar", value=False, key="filter_duplicates_checkbox", help="Açıkken aynı yanıtta veya bu ürünün geçmişinde çok benzeri bulunan başlık, CTA ve sloganlar kaydedilmez.")
+bypass_cache = st.checkbox("Önbelleği atla (aynı girdiler için yeniden üret)", value=False, key="bypass_cache_checkbox", help="Kapalıyken aynı girdilerle daha önce üretilmiş metinler önbellekten getirilir.")
+ad_cache = get_ad_generation_cache()
+cache_stats = ad_cache.stats()
+st.caption(f"Önbellek: {cache_stats['hits']} isabet, {cache_stats['misses']} ıskalama, {cache_stats['entries']} kayıt ({cache_stats['size_bytes'] / 1024:.0f} KB)")
 generate_button = st.button("Reklam Metni Oluştur", type="primary")
 
+SECTION_TITLES = {
+    "headlines": "#### Reklam Başlıkları:",
+    "body_text": "#### Reklam Gövde Metni:",
+    "ctas": "#### Harekete Geçirici Mesaj (CTA) Önerileri:",
+    "slogans": "#### Slogan Önerileri:",
+}
+SECTION_EMPTY_MESSAGES = {
+    "headlines": "Başlık oluşturulamadı.",
+    "body_text": "Gövde metni oluşturulamadı.",
+    "ctas": "CTA oluşturulamadı.",
+    "slogans": "Slogan oluşturulamadı.",
+}
+
+def render_ad_item(container, section, text):
+    """
+    Tek bir üretilen maddeyi karakter sayısı ve varsa limit uyarısıyla gösterir.
+    """
+    char_count = len(text)
+    display_text = f"**{text}**({char_count} karakter)"
+    limit = SECTION_CHAR_LIMITS.get(section)
+    if limit is not None and char_count > limit:
+        container.warning(f"{display_text} - **UYARI: {limit} karakter limitini aşıyor!**")
+    else:
+        container.write(display_text)
+
 if generate_button:
     if not product_name_input or not product_description_input or not target_audience_input:
         st.warning("Lütfen Ürün/Hizmet Adı, Açıklaması ve Hedef Kitle alanlarını doldurun.")
     else:
         with st.spinner("Reklam metinleri oluşturuluyor..."):
             try:
+                # LLM zinciri (ve LangChain/Ollama modülleri) ilk üretimde oluşturulur, sonra süreç genelinde önbellekten gelir
+                llm_chain = get_ad_gen_chain()
                 inputs = {
                     "product_name": product_name_input,
                     "product_description": product_description_input,
@@ -141,120 +233,272 @@ if generate_button:
                     "num_slogans": num_slogans
                 }
 
-                response = llm_chain.invoke(inputs)
-
                 st.markdown("### Oluşturulan Reklam Metinleri")
-                
-                # --- Üretilen Metinleri Ayrıştırma ve Karakter Sayısıyla Gösterme ---
-                output_parts = response.split('**1. Reklam Başlıkları')
-                headlines_raw = ""
-                body_text_raw = ""
-                ctas_raw = ""
-                slogans_raw = ""
-
-                if len(output_parts) > 1:
-                    headlines_part = output_parts[1].split('**2. Reklam Gövde Metni')
-                    headlines_raw = headlines_part[0].strip() if len(headlines_part) > 0 else ""
-
-                    if len(headlines_part) > 1:
-                        body_text_part = headlines_part[1].split('**3. Harekete Geçirici Mesaj')
-                        body_text_raw = body_text_part[0].strip() if len(body_text_part) > 0 else ""
-
-                        if len(body_text_part) > 1:
-                            ctas_part = body_text_part[1].split('**4. Slogan Önerileri')
-                            ctas_raw = ctas_part[0].strip() if len(ctas_part) > 0 else ""
-
-                            if len(ctas_part) > 1:
-                                slogans_raw = ctas_part[1].strip()
-
-                st.markdown("#### Reklam Başlıkları:")
-                headlines_list = []
-                headlines = [h.strip('- ').strip() for h in headlines_raw.split('\n') if h.strip().startswith('-')]
-                for h in headlines:
-                    char_count = len(h)
-                    display_text = f"**{h}**({char_count} karakter)"
-                    if char_count > MAX_HEADLINE_CHARS:
-                        st.warning(f"{display_text} - **UYARI: {MAX_HEADLINE_CHARS} karakter limitini aşıyor!**")
-                    else:
-                        st.write(display_text)
-                    headlines_list.append({"text": h, "char_count": char_count})
-                if not headlines: st.info("Başlık oluşturulamadı.")
-
-                st.markdown("#### Reklam Gövde Metni:")
-                body_text = body_text_raw.replace(f" ({{num_headlines}} adet):", "").replace(f" ({{num_ctas}} adet):", "").replace(f" ({{num_slogans}} adet):", "").strip()
-                body_text = body_text.replace("Ürünün/hizmetin temel özelliklerini ve faydalarını vurgulayan, 90 karakteri geçmeyen tek bir reklam gövde metni oluştur.", "").replace("[Gövde Metni]", "").strip()
-                
-                if '\n' in body_text:
-                    temp_body_lines = [line.strip() for line in body_text.split('\n') if line.strip()]
-                    body_text = temp_body_lines[0] if temp_body_lines else ""
-
-                char_count_body = len(body_text)
-                if body_text:
-                    display_text_body = f"**{body_text}**({char_count_body} karakter)"
-                    if char_count_body > MAX_BODY_CHARS:
-                        st.warning(f"{display_text_body} - **UYARI: {MAX_BODY_CHARS} karakter limitini aşıyor!**")
-                    else:
-                        st.write(display_text_body)
-                else:
-                    st.info("Gövde metni oluşturulamadı.")
-
-                st.markdown("#### Harekete Geçirici Mesaj (CTA) Önerileri:")
-                ctas_list = []
-                ctas = [c.strip('- ').strip() for c in ctas_raw.split('\n') if c.strip().startswith('-')]
-                for c in ctas:
-                    char_count = len(c)
-                    st.write(f"**{c}**({char_count} karakter)")
-                    ctas_list.append({"text": c, "char_count": char_count})
-                if not ctas: st.info("CTA oluşturulamadı.")
-
-                st.markdown("#### Slogan Önerileri:")
-                slogans_list = []
-                slogans = [s.strip('- ').strip() for s in slogans_raw.split('\n') if s.strip().startswith('-')]
-                for s in slogans:
-                    char_count = len(s)
-                    st.write(f"**{s}**({char_count} karakter)")
-                    slogans_list.append({"text": s, "char_count": char_count})
-                if not slogans: st.info("Slogan oluşturulamadı.")
-
-
-                # --- Üretilen Metinleri ve Metadatayı JSON'a Kaydetme ---
-                output_data = {
-                    "request_parameters": {
-                        "product_name": product_name_input,
-                        "product_description": product_description_input,
-                        "target_audience": target_audience_input,
-                        "ad_platform": ad_platform,
-                        "tone_of_voice": tone_of_voice,
-                        "keywords": [k.strip() for k in keywords_input.split(',')] if keywords_input else [],
-                        "num_headlines": num_headlines,
-                        "num_ctas": num_ctas,
-                        "num_slogans": num_slogans
-                    },
-                    "generated_content": {
-                        "headlines": headlines_list,
-                        "body_text": {"text": body_text, "char_count": char_count_body},
-                        "ctas": ctas_list,
-                        "slogans": slogans_list
-                    },
-                    "raw_llm_response": response
-                }
-
-                timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-                output_folder = "json_outputs"
-                os.makedirs(output_folder, exist_ok=True)
 
-                file_name = os.path.join(output_folder, f"reklam_metni_{timestamp}.json")
-
-                with open(file_name, 'w', encoding='utf-8') as f:
-                    json.dump(output_data, f, ensure_ascii=False, indent=4)
-
-                st.success(f"Reklam metni ve bilgileri '{output_folder}/{os.path.basename(file_name)}' dosyasına kaydedildi!")
+                # Her bölüm için başlık ve maddelerin yazılacağı alan önceden oluşturulur
+                section_containers = {}
+                for section in SECTION_KEYS:
+                    st.markdown(SECTION_TITLES[section])
+                    section_containers[section] = st.container()
 
+                # --- Üretilen Metinleri Ayrıştırma ve Karakter Sayısıyla Gösterme ---
+                parser = StreamingAdParser()
+
+                def render_events(events):
+                    for event_type, section, text in events:
+                        if event_type == "item":
+                            render_ad_item(section_containers[section], section, text)
+
+                # Akış modunda maddeler, satırları tamamlandıkça ayrıştırılıp hemen gösterilir
+                on_token = (lambda chunk: render_events(parser.feed(chunk))) if stream_output else None
+                with llm_queue_notice():
+                    parsed, response, repair_report, from_cache = generate_ad(
+                        llm_chain, ad_cache, inputs, repair=auto_repair, on_token=on_token, bypass_cache=bypass_cache
+                    )
+                if from_cache:
+                    st.caption("Bu girdiler için daha önce üretilmiş metinler önbellekten getirildi.")
+                render_events(parser.close() if stream_output else parser.feed(response) + parser.close())
+
+                for section in parsed.missing_sections:
+                    section_containers[section].info(SECTION_EMPTY_MESSAGES[section])
+
+                # --- Limiti Aşan Öğelerin Hedefli Düzeltilmesi ---
+                if repair_report is not None:
+                    st.markdown("#### Düzeltilen Öğeler:")
+                    for replacement in repair_report["replacements"]:
+                        render_ad_item(st, replacement["section"], replacement["new"])
+                        st.caption(f"Önceki: {replacement['old']} ({len(replacement['old'])} karakter)")
+                    if repair_report["remaining"]:
+                        st.warning(f"{repair_report['remaining']} öğe {repair_report['attempts']} denemede limite uygun hale getirilemedi.")
+                    repair_summary = (
+                        f"Hedefli düzeltme: {repair_report['attempts']} küçük istem, {repair_report['repair_seconds']} sn, "
+                        f"~{repair_report['repair_tokens_estimate']} token."
+                    )
+                    if repair_report.get("from_cache"):
+                        repair_summary += " Düzeltmeler önbellekten getirildi."
+                    elif "tokens_saved_estimate" in repair_report:
+                        repair_summary += (
+                            f" Tam yeniden üretime göre yaklaşık {repair_report['tokens_saved_estimate']} token"
+                            f" ve {repair_report['seconds_saved_estimate']} sn tasarruf."
+                        )
+                    st.caption(repair_summary)
+
+                # --- Yakın Tekrar Kontrolü (yanıt içinde ve bu ürünün geçmişinde) ---
+                dedup_index = get_dedup_index()
+                generated_items = [(section, text) for section in INDEXED_SECTIONS for text in getattr(parsed, section)]
+                # Tekrarlar (bölüm, sıra) konumuyla işaretlenir; böylece aynı metnin ilk geçtiği yer korunur
+                duplicate_positions = set()
+                for position, earlier, duplicate, similarity in find_duplicates_within(generated_items):
+                    st.info(f"Yanıt içinde tekrar: **{duplicate}** ≈ {earlier} (%{similarity * 100:.0f} benzer)")
+                    duplicate_positions.add(position)
+
+                # Önbellekten gelen yanıt ilk üretildiğinde geçmişe ve indekse eklenmiştir; geçmişle karşılaştırılırsa
+                # her öğe kendisiyle eşleşir ve her tekrar çalıştırma aynı kaydı yeniden eklerdi
+                if from_cache:
+                    st.success("Bu metinler ilk üretildiklerinde geçmişe kaydedilmişti; yeni kayıt eklenmedi.")
+                else:
+                    for section in INDEXED_SECTIONS:
+                        for index, text in enumerate(getattr(parsed, section)):
+                            matches = dedup_index.find_similar(text, product_name=product_name_input, section=section, limit=1)
+                            if matches:
+                                st.info(f"Daha önce üretilmişe çok benziyor: **{text}** ≈ {matches[0][1]} (%{matches[0][0] * 100:.0f} benzer)")
+                                duplicate_positions.add((section, index))
+                    if filter_duplicates and duplicate_positions:
+                        parsed = replace(parsed, **{
+                            section: [text for index, text in enumerate(getattr(parsed, section)) if (section, index) not in duplicate_positions]
+                            for section in INDEXED_SECTIONS
+                        })
+                        st.caption(f"{len(duplicate_positions)} yakın tekrar kayıttan çıkarıldı.")
+
+                previous_items = dedup_index.previous_items(product_name_input, limit=30)
+                if previous_items:
+                    with st.expander(f"Bu ürün için daha önce üretilen öneriler ({len(previous_items)})"):
+                        for section, text in previous_items:
+                            st.write(f"{SECTION_TITLES[section].strip('#: ')}: {text}")
+
+                # --- Üretilen Metinleri ve Metadatayı Geçmişe Kaydetme ---
+                if not from_cache:
+                    output_data = build_output_data(inputs, parsed, response, repair_report)
+                    record_id = get_history_store().append(output_data)
+                    dedup_index.add_record(output_data, history_id=record_id)
+
+                    st.success(f"Reklam metni ve bilgileri geçmişe kaydedildi (kayıt #{record_id})!")
+
+            except LLMOverloadedError as e:
+                st.warning(str(e))
             except Exception as e:
                 st.error(f"Bir hata oluştu: {e}")
                 st.warning("Ollama sunucunuzun çalıştığından ve 'gemma3:4b' modelinin yüklü olduğundan emin olun (terminalde `ollama run gemma3:4b`).")
 
 
+# --- Matris Modu: Platform × Ton Kombinasyonları ---
+st.markdown("---")
+st.header("Matris Modu: Tüm Platform ve Tonlar")
+st.info("Yukarıdaki ürün bilgileriyle seçilen her platform × ton kombinasyonu için metin, Ollama'ya eşzamanlı isteklerle üretilir ve yan yana karşılaştırılır. Önbellek, otomatik düzeltme ve önbelleği atlama seçenekleri burada da geçerlidir.")
+
+col_matrix1, col_matrix2, col_matrix3 = st.columns([2, 2, 1])
+with col_matrix1:
+    matrix_platforms = st.multiselect("Platformlar:", options=AD_PLATFORM_OPTIONS, default=AD_PLATFORM_OPTIONS, key="matrix_platforms_select")
+with col_matrix2:
+    matrix_tones = st.multiselect("Tonlar:", options=TONE_OF_VOICE_OPTIONS, default=TONE_OF_VOICE_OPTIONS, key="matrix_tones_select")
+with col_matrix3:
+    matrix_parallel = st.number_input("Eşzamanlı İstek:", min_value=1, max_value=16, value=MATRIX_MAX_PARALLEL, step=1, key="matrix_parallel_input", help="Ollama sunucusunda OLLAMA_NUM_PARALLEL en az bu değer olmalıdır. LLM ağ geçidi model başına en fazla LLM_GATEWAY_MAX_CONCURRENCY isteği aynı anda gönderir; fazlası sırada bekler.")
+matrix_button = st.button(f"{len(matrix_platforms) * len(matrix_tones)} Kombinasyonu Oluştur", key="matrix_generate_button")
+
+def render_matrix_cell(placeholder, cell):
+    """
+    Bir kombinasyonun sonucunu karşılaştırma ızgarasındaki hücresine yazar.
+    """
+    box = placeholder.container(border=True)
+    source = "önbellek" if cell.from_cache else f"{cell.latency_seconds:.1f} sn"
+    box.markdown(f"**{cell.tone_of_voice}** ({source})")
+    if cell.error:
+        box.error(cell.error)
+        return
+    for section in SECTION_KEYS:
+        box.caption(SECTION_TITLES[section].strip("#: "))
+        items = getattr(cell.parsed, section)
+        for text in ([items] if section == "body_text" else items):
+            if text:
+                render_ad_item(box, section, text)
+
+if matrix_button:
+    if not product_name_input or not product_description_input or not target_audience_input:
+        st.warning("Lütfen Ürün/Hizmet Adı, Açıklaması ve Hedef Kitle alanlarını doldurun.")
+    elif not matrix_platforms or not matrix_tones:
+        st.warning("Lütfen en az bir platform ve bir ton seçin.")
+    else:
+        base_inputs = {
+            "product_name": product_name_input,
+            "product_description": product_description_input,
+            "target_audience": target_audience_input,
+            "keywords": keywords_input,
+            "num_headlines": num_headlines,
+            "num_ctas": num_ctas,
+            "num_slogans": num_slogans
+        }
+        total_cells = len(matrix_platforms) * len(matrix_tones)
+        progress = st.progress(0.0, text=f"0/{total_cells} kombinasyon tamamlandı")
+        summary_placeholder = st.empty()
+
+        # Karşılaştırma ızgarası: her platform bir satır, her ton bir sütun; hücreler tamamlandıkça dolar
+        cell_placeholders = {}
+        for platform in matrix_platforms:
+            st.markdown(f"#### {platform}")
+            for tone, column in zip(matrix_tones, st.columns(len(matrix_tones))):
+                cell_placeholders[(platform, tone)] = column.empty()
+                cell_placeholders[(platform, tone)].caption(f"{tone}: sırada...")
+
+        history_store = get_history_store()
+        dedup_index = get_dedup_index()
+        matrix_started = time.perf_counter()
+        finished_cells = []
+        for cell in generate_matrix(get_ad_gen_chain(), ad_cache, base_inputs, matrix_platforms, matrix_tones, max_parallel=matrix_parallel, repair=auto_repair, bypass_cache=bypass_cache):
+            finished_cells.append(cell)
+            render_matrix_cell(cell_placeholders[(cell.ad_platform, cell.tone_of_voice)], cell)
+            progress.progress(len(finished_cells) / total_cells, text=f"{len(finished_cells)}/{total_cells} kombinasyon tamamlandı")
+            # Önbellekten gelen hücreler ilk üretildiklerinde kaydedilmiştir
+            if cell.error is None and not cell.from_cache:
+                output_data = build_output_data(cell.inputs, cell.parsed, cell.response, cell.repair_report)
+                dedup_index.add_record(output_data, history_id=history_store.append(output_data))
+
+        wall_seconds = time.perf_counter() - matrix_started
+        latency_sum = sum(cell.latency_seconds for cell in finished_cells)
+        failed_cells = sum(1 for cell in finished_cells if cell.error)
+        cached_cells = sum(1 for cell in finished_cells if cell.error is None and cell.from_cache)
+        with summary_placeholder.container():
+            col_summary1, col_summary2, col_summary3 = st.columns(3)
+            col_summary1.metric("Toplam Süre (duvar saati)", f"{wall_seconds:.1f} sn")
+            col_summary2.metric("Çağrı Sürelerinin Toplamı", f"{latency_sum:.1f} sn")
+            col_summary3.metric("Hızlanma", f"{latency_sum / wall_seconds:.1f}x" if wall_seconds > 0 else "-")
+            if failed_cells:
+                st.warning(f"{failed_cells} kombinasyon üretilemedi. Ollama sunucunuzun çalıştığından ve 'gemma3:4b' modelinin yüklü olduğundan emin olun.")
+            saved_message = f"{total_cells - failed_cells - cached_cells} kombinasyon geçmişe kaydedildi."
+            if cached_cells:
+                saved_message += f" {cached_cells} kombinasyon önbellekten getirildi (daha önce kaydedilmişti)."
+            st.success(saved_message)
+
+
+# --- Geçmiş Üretimler ---
+st.markdown("---")
+st.header("Geçmiş Üretimler")
+
+history_store = get_history_store()
+ALL_OPTION = "Tümü"
+col_hist1, col_hist2, col_hist3 = st.columns(3)
+with col_hist1:
+    history_product = st.selectbox("Ürün:", options=[ALL_OPTION] + history_store.distinct_values("product_name"), key="history_product_select")
+with col_hist2:
+    history_platform = st.selectbox("Platform:", options=[ALL_OPTION] + history_store.distinct_values("ad_platform"), key="history_platform_select")
+with col_hist3:
+    history_tone = st.selectbox("Ton:", options=[ALL_OPTION] + history_store.distinct_values("tone_of_voice"), key="history_tone_select")
+
+history_page = st.number_input("Sayfa:", min_value=1, value=1, step=1, key="history_page_input")
+history_records, history_total = history_store.query(
+    product_name=None if history_product == ALL_OPTION else history_product,
+    ad_platform=None if history_platform == ALL_OPTION else history_platform,
+    tone_of_voice=None if history_tone == ALL_OPTION else history_tone,
+    page=history_page,
+    page_size=HISTORY_PAGE_SIZE,
+)
+st.caption(f"Toplam {history_total} kayıt, sayfa {history_page}/{max(1, -(-history_total // HISTORY_PAGE_SIZE))}")
+for record in history_records:
+    parameters = record["request_parameters"]
+    content = record["generated_content"]
+    with st.expander(f"#{record['id']} - {parameters['product_name']} ({parameters['ad_platform']}, {parameters['tone_of_voice']}) - {record['created_at'][:19]}"):
+        st.markdown("**Başlıklar:** " + " | ".join(h["text"] for h in content["headlines"]))
+        st.markdown(f"**Gövde Metni:** {content['body_text']['text']}")
+        st.markdown("**CTA'lar:** " + " | ".join(c["text"] for c in content["ctas"]))
+        st.markdown("**Sloganlar:** " + " | ".join(s["text"] for s in content["slogans"]))
+
+if st.button("json_outputs klasöründeki eski JSON kayıtlarını içe aktar", key="import_history_button"):
+    imported_count = history_store.import_json_outputs("json_outputs")
+    get_dedup_index().index_history(history_store)
+    st.success(f"{imported_count} yeni kayıt geçmişe aktarıldı.")
+    st.rerun()
+
+
+# --- Kampanya Analitiği ---
+st.markdown("---")
+st.header("Kampanya Analitiği")
+st.info("json_outputs/adresgezgini_csv.py ile üretilen kampanya CSV'si için CTR, CPC, CPM ve ağırlıklı frekans raporları. Dosya ilk açılışta sütunsal önbelleğe dönüştürülür; sonraki sorgular bu önbellekten çalışır.")
+campaign_csv_path = st.text_input("Kampanya CSV Dosya Yolu:", value=CAMPAIGN_CSV_PATH, key="campaign_csv_path_input")
+
+if os.path.exists(campaign_csv_path):
+    # pandas/NumPy yalnızca kampanya verisi varken yüklenir (ilk çizimde ~0.5 sn)
+    from utils.campaign_analytics import get_campaign_dataset, GROUP_BY_COLUMNS
+    try:
+        with st.spinner("Kampanya verisi hazırlanıyor..."):
+            campaign_dataset = get_campaign_dataset(campaign_csv_path)
+    except (ValueError, KeyError) as e:
+        st.error(f"Kampanya CSV'si okunamadı: {e}")
+        campaign_dataset = None
+
+    if campaign_dataset is not None and campaign_dataset.rows:
+        first_day, last_day = campaign_dataset.date_range()
+        col_campaign1, col_campaign2 = st.columns(2)
+        with col_campaign1:
+            campaign_platforms = st.multiselect("Platform:", options=campaign_dataset.values("Platform"), key="campaign_platform_select")
+        with col_campaign2:
+            campaign_dates = st.date_input("Tarih Aralığı:", value=(first_day, last_day), min_value=first_day, max_value=last_day, key="campaign_date_input")
+        campaign_filters = {"Platform": campaign_platforms} if campaign_platforms else None
+        campaign_start, campaign_end = (campaign_dates[0], campaign_dates[-1]) if campaign_dates else (None, None)
+
+        tab_rollup, tab_trend = st.tabs(["Gruplu Rapor", "Günlük Trend"])
+        with tab_rollup:
+            campaign_group_by = st.multiselect("Gruplama:", options=GROUP_BY_COLUMNS, default=["Platform", "Kampanya Adı"], key="campaign_group_by_select")
+            query_start = time.time()
+            rollup_frame = campaign_dataset.rollup(campaign_group_by, filters=campaign_filters, start_date=campaign_start, end_date=campaign_end)
+            st.dataframe(rollup_frame, use_container_width=True, hide_index=True)
+            st.caption(f"{campaign_dataset.rows:,} satır {time.time() - query_start:.2f} saniyede toplandı.")
+        with tab_trend:
+            trend_frame = campaign_dataset.rollup(["Tarih"], filters=campaign_filters, start_date=campaign_start, end_date=campaign_end).set_index("Tarih")
+            st.line_chart(trend_frame[["Harcama"]])
+            st.line_chart(trend_frame[["CTR (%)", "CPC"]])
+else:
+    st.caption(f"'{campaign_csv_path}' bulunamadı. Örnek veri için: python json_outputs/adresgezgini_csv.py")
+
+
 # --- 4. Görsel Oluşturma Bölümü ---
 st.markdown("---")
 st.header("Reklam Görseli Oluştur")
@@ -281,7 +525,8 @@ if load_image_from_url_button:
 # Seçenek 2: Metin ile Görsel Oluşturma (Hugging Face)
 st.subheader("2. Metin ile Görsel Oluştur (Hugging Face)")
 
-hf_client = get_hf_inference_client()
+hf_configured = hf_image_generation_configured()
+image_job_queue = get_image_job_queue()
 
 generate_image_button_hf = st.button("Metin ile Reklam Görseli Oluştur", key="generate_image_huggingface_button")
 
@@ -289,30 +534,55 @@ if generate_image_button_hf:
     if not product_name_input:
         st.warning("Görsel oluşturmak için lütfen 'Ürün veya Hizmet Adı' alanını doldurun.")
     else:
-        if hf_client:
-            with st.spinner(f"'{product_name_input}' için görsel oluşturuluyor... (Model: {HUGGING_FACE_MODEL_NAME})"):
-                try:
-                    translated_product_name = translate_to_english(product_name_input)
-                    if not translated_product_name:
-                        st.error("Ürün adı çevrilemedi veya boş döndü. Lütfen geçerli bir ürün adı girin ve 'llama3' çeviri modelini kontrol edin.")
-                        translated_product_name = product_name_input
-
-                    image_prompt = f"high-quality, realistic advertising image for {translated_product_name}, emphasizing its best features, an engaging and professional composition, product photography style"
-
-                    generated_pil_image = generate_image_with_hf_client(image_prompt) # Artık model adı fonksiyonda
-
-                    if generated_pil_image:
-                        st.markdown("#### Oluşturulan Reklam Görseli")
-                        st.image(generated_pil_image, caption=f"'{product_name_input}' için Oluşturulan Görsel", use_container_width=False)
-                    else:
-                        st.error("Görsel oluşturulamadı. Lütfen yukarıdaki hata mesajlarını kontrol edin.")
-
-                except Exception as e:
-                    st.error(f"Görsel oluşturma sırasında beklenmedik bir hata oluştu: {e}")
-                    st.warning("Lütfen internet bağlantınızı ve Hugging Face API erişiminizi kontrol edin.")
+        if hf_configured and get_hf_inference_client():
+            with llm_queue_notice():
+                translated_product_name = translate_to_english(product_name_input)
+            if not translated_product_name:
+                st.error("Ürün adı çevrilemedi veya boş döndü. Lütfen geçerli bir ürün adı girin ve 'llama3' çeviri modelini kontrol edin.")
+                translated_product_name = product_name_input
+
+            image_prompt = product_image_prompt(translated_product_name)
+
+            # Görsel arka planda üretilir; iş kimliği yeniden çalıştırmalar arasında oturumda tutulur
+            st.session_state.image_job_id = image_job_queue.submit(image_prompt)
+            st.session_state.image_job_product = product_name_input
         else:
             st.error("Hugging Face istemcisi başlatılamadığı için görsel oluşturulamıyor. Lütfen HF_TOKEN ortam değişkeninizi kontrol edin.")
 
 
+@st.fragment(run_every=IMAGE_JOB_POLL_SECONDS)
+def poll_image_job(job_id):
+    """
+    İş bitene kadar yalnızca bu parçayı yeniler; bitince sonucu göstermek için sayfayı yeniden çalıştırır.
+    """
+    job = image_job_queue.get(job_id)
+    if job is None or job.finished:
+        st.rerun()
+    state = "sırada bekliyor" if job.status == JOB_QUEUED else "oluşturuluyor"
+    st.info(f"'{st.session_state.image_job_product}' için görsel {state}... ({job.elapsed_seconds:.0f} sn, Model: {job.model})")
+
+
+image_job = image_job_queue.get(st.session_state.image_job_id) if st.session_state.get("image_job_id") else None
+if image_job is not None:
+    if not image_job.finished:
+        poll_image_job(image_job.job_id)
+    elif image_job.status == JOB_DONE:
+        generated_pil_image = image_job_queue.load_image(image_job)
+        if generated_pil_image:
+            st.markdown("#### Oluşturulan Reklam Görseli")
+            source = "önbellekten" if image_job.from_cache else f"{image_job.finished_at - image_job.created_at:.1f} saniyede oluşturuldu"
+            st.image(generated_pil_image, caption=f"'{st.session_state.image_job_product}' için Oluşturulan Görsel ({source})", use_container_width=False)
+        else:
+            st.error("Görsel önbellekten silinmiş. Lütfen görseli yeniden oluşturun.")
+    else:
+        st.error(f"Görsel API çağrısında hata oluştu: {image_job.error}")
+        st.warning(
+            f"'{image_job.model}' modeliyle görsel oluşturulamadı. Olası nedenler:\n"
+            "- Hugging Face API token'ınız (HF_TOKEN) doğru ayarlanmadı veya geçersiz.\n"
+            "- Model çok büyük ve genel Inference API'sinde veya belirtilen boyutta çalışmıyor.\n"
+            "- Hız limitine ulaşıldı veya modelin yüklenmesi uzun sürüyor.\n"
+            "- İnternet bağlantınız yok."
+        )
+
 st.markdown("---")
 st.caption("Powered by Ollama, Gemma, LangChain, Streamlit ve Hugging Face")
\ No newline at end of file
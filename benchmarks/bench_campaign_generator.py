@@ -0,0 +1,87 @@
+# benchmarks/bench_campaign_generator.py
+# Vektörleştirilmiş kampanya verisi üreticisini (json_outputs/adresgezgini_csv.py) eski satır satır
+# Faker/random döngüsüyle satır/sn cinsinden karşılaştırır.
+#
+# Kullanım (depo kök dizininden):
+#   python -m benchmarks.bench_campaign_generator --rows 200000
+import argparse
+import csv
+import importlib.util
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+_GENERATOR_PATH = os.path.join("json_outputs", "adresgezgini_csv.py")
+
+
+def load_generator():
+    spec = importlib.util.spec_from_file_location("adresgezgini_csv", _GENERATOR_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def legacy_write_csv(gen, csv_path, num_rows):
+    # Yeniden yazımdan önceki üretici döngüsü (Faker ile tarih, satır başına random.choices)
+    from faker import Faker # type: ignore
+
+    fake = Faker()
+    data = []
+    for _ in range(num_rows):
+        platform = random.choice(gen.platforms)
+        start_date = datetime.now() - timedelta(days=90)
+        end_date = datetime.now()
+        date = fake.date_between(start_date=start_date, end_date=end_date).strftime("%Y-%m-%d")
+        campaign = random.choices(gen.campaign_names, weights=gen.campaign_weights, k=1)[0]
+        gender = random.choices(gen.genders, weights=gen.gender_weights, k=1)[0]
+        device = random.choices(gen.impression_devices, weights=gen.device_weights, k=1)[0]
+        region = random.choices(gen.regions, weights=gen.region_weights, k=1)[0]
+        base_impressions = random.randint(500, 15000)
+        if gender == "Erkek":
+            impressions = base_impressions * random.uniform(1.8, 2.5)
+        else:
+            impressions = base_impressions * random.uniform(0.8, 1.2)
+        impressions = int(impressions)
+        clicks_all = int(impressions * random.uniform(0.005, 0.03))
+        amount_spent = round(clicks_all * random.uniform(0.1, 1.5) + random.uniform(0, 50), 2)
+        reach = min(int(impressions * random.uniform(0.7, 0.98)), impressions)
+        frequency = round(impressions / reach if reach > 0 else random.uniform(1.0, 2.5), 2)
+        if frequency < 1.0:
+            frequency = round(random.uniform(1.0, 1.5), 2)
+        data.append([platform, date, campaign, gender, device, region, impressions, clicks_all, amount_spent, reach, frequency])
+    with open(csv_path, mode="w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(gen.header)
+        writer.writerows(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kampanya verisi üreticisi kıyaslaması")
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--legacy-rows", type=int, default=50_000, help="Eski döngü için satır sayısı (yavaştır)")
+    args = parser.parse_args()
+
+    gen = load_generator()
+    with tempfile.TemporaryDirectory() as folder:
+        results = []
+        try:
+            started = time.perf_counter()
+            legacy_write_csv(gen, os.path.join(folder, "eski.csv"), args.legacy_rows)
+            results.append(("eski döngü", args.legacy_rows, time.perf_counter() - started))
+        except ImportError:
+            print("Faker kurulu değil; eski döngü ölçülemedi.")
+
+        started = time.perf_counter()
+        gen.write_csv(os.path.join(folder, "yeni.csv"), args.rows, seed=0)
+        results.append(("vektörel", args.rows, time.perf_counter() - started))
+
+    baseline = results[0][1] / results[0][2]
+    for name, rows, elapsed in results:
+        rate = rows / elapsed
+        print(f"{name:<12}{rows:>12,} satır{elapsed:>9.2f} sn{rate:>14,.0f} satır/sn{rate / baseline:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
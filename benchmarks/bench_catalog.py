@@ -0,0 +1,163 @@
+# benchmarks/bench_catalog.py
+# Sitemap tabanlı katalog taramasını (utils/catalog.py) yerel fikstür sitesine karşı ölçer ve doğrular.
+# Sahte Ollama ve benchmarks/fixtures.catalog_site() sayfalarını sunan yerel web sunucusu başlatılır; üç tur çalışır:
+#   1. ilk tarama: tüm ürün sayfaları çekilir ve analiz edilir,
+#   2. değişiklik olmadan yeniden tarama: hiçbir ürün sayfası istenmemelidir,
+#   3. bazı ürünlerin lastmod'u değiştirilerek yeniden tarama: yalnızca o sayfalar çekilmelidir,
+#   4. sitemap index'ine 404 dönen ve bozuk XML içeren alt sitemap'ler eklenerek yeniden tarama: bunlar atlanıp
+#      sayılmalı, diğer sitemap'lerdeki URL'ler yine bulunmalıdır.
+# Her turda robots.txt ile engellenen yolların hiç istenmediği, tüm isteklerin tarayıcının kendi User-Agent'ıyla
+# gönderildiği, sunucu başına eşzamanlılık ve istek hızı sınırlarının aşılmadığı ve kataloğun toplu üretim
+# girdisi olarak okunabildiği kontrol edilir.
+# Bir kontrol başarısız olursa çıkış kodu 1 olur.
+#
+# Kullanım (depo kök dizininden):
+#   python -m benchmarks.bench_catalog
+#   python -m benchmarks.bench_catalog --products 200 --per-host 4 --rps 50 --output /tmp/katalog.json
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.fake_servers import FakeOllamaServer, FakeWebServer
+from benchmarks.fixtures import catalog_site
+
+DISALLOWED_PREFIX = "/hesabim/"
+
+
+def crawl_round(name, crawler, web, sitemap_url, per_host, rps):
+    """
+    Bir tarama turunu çalıştırır; istatistikleri, sunucunun gördüğü istekleri ve kontrol hatalarını döndürür.
+    """
+    web.paths.clear()
+    web.user_agents.clear()
+    web.max_in_flight = 0
+    stats = crawler.run(sitemap_url)
+    product_requests = sum(count for path, count in web.paths.items() if path.startswith("/urun/"))
+    limited_requests = sum(count for path, count in web.paths.items() if path != "/robots.txt")
+    failures = []
+    if any(path.startswith(DISALLOWED_PREFIX) for path in web.paths):
+        failures.append(f"{name}: robots.txt ile engellenen yol istendi")
+    if set(web.user_agents) != {crawler.user_agent}:
+        failures.append(f"{name}: istekler farklı User-Agent ile gönderildi: {dict(web.user_agents)}")
+    if web.max_in_flight > per_host:
+        failures.append(f"{name}: sunucuya aynı anda {web.max_in_flight} istek gitti (sınır {per_host})")
+    # n istek başlangıcı arasında en az (n - 1) / rps saniye geçmelidir (küçük zamanlama toleransıyla)
+    if rps > 0 and limited_requests > 1 and stats["elapsed_seconds"] < (limited_requests - 1) / rps * 0.95:
+        failures.append(f"{name}: istek hızı sınırı aşıldı ({limited_requests} istek, {stats['elapsed_seconds']:.2f} sn)")
+    return {
+        "stats": stats,
+        "product_requests": product_requests,
+        "requests": sum(web.paths.values()),
+        "max_in_flight": web.max_in_flight,
+        "pages_per_second": round(stats["crawled"] / stats["elapsed_seconds"], 2) if stats["elapsed_seconds"] else 0.0,
+    }, failures
+
+
+def run_benchmark(args):
+    from bulk_generate import read_catalog_products
+
+    disallowed = args.products // 10
+    expected_products = args.products - disallowed
+    changed = [number for number in range(0, args.products, args.change_every) if number % 10 != 9]
+    pages = catalog_site(args.products)
+
+    with FakeOllamaServer(tokens_per_second=args.tokens_per_second) as ollama, FakeWebServer(pages) as web, \
+            tempfile.TemporaryDirectory(prefix="bench_catalog_") as workdir:
+        os.environ["OLLAMA_HOST"] = ollama.url
+        previous_cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            from utils.catalog import CatalogStore, CatalogCrawler
+
+            store = CatalogStore(os.path.join(workdir, "katalog.sqlite3"))
+            crawler = CatalogCrawler(store, args.concurrency, args.per_host, args.rps)
+            rounds, failures = {}, []
+
+            rounds["ilk tarama"], problems = crawl_round("ilk tarama", crawler, web, web.url, args.per_host, args.rps)
+            failures += problems
+            if rounds["ilk tarama"]["stats"]["crawled"] != expected_products:
+                failures.append(f"ilk tarama: {rounds['ilk tarama']['stats']['crawled']} ürün tarandı, {expected_products} bekleniyordu")
+
+            rounds["değişiklik yok"], problems = crawl_round("değişiklik yok", crawler, web, web.url, args.per_host, args.rps)
+            failures += problems
+            if rounds["değişiklik yok"]["product_requests"]:
+                failures.append(f"değişiklik yok: {rounds['değişiklik yok']['product_requests']} ürün sayfası gereksiz yere istendi")
+
+            web.pages.update(catalog_site(args.products, lastmods={number: "2026-02-01" for number in changed}))
+            rounds["lastmod değişti"], problems = crawl_round("lastmod değişti", crawler, web, web.url, args.per_host, args.rps)
+            failures += problems
+            if rounds["lastmod değişti"]["product_requests"] != len(changed):
+                failures.append(f"lastmod değişti: {rounds['lastmod değişti']['product_requests']} ürün sayfası istendi, "
+                                f"{len(changed)} bekleniyordu")
+
+            web.pages["/sitemaps/bozuk.xml"] = b"<urlset><url><loc>/urun/bozuk.html</loc>"
+            web.pages["/sitemap_index.xml"] = web.pages["/sitemap_index.xml"].replace(
+                b"</sitemapindex>", b"<sitemap><loc>/sitemaps/eksik.xml</loc></sitemap>"
+                                    b"<sitemap><loc>/sitemaps/bozuk.xml</loc></sitemap></sitemapindex>")
+            rounds["bozuk sitemap"], problems = crawl_round("bozuk sitemap", crawler, web, web.url, args.per_host, args.rps)
+            failures += problems
+            broken_stats = rounds["bozuk sitemap"]["stats"]
+            if broken_stats["sitemap_failed"] != 2:
+                failures.append(f"bozuk sitemap: {broken_stats['sitemap_failed']} sitemap okunamadı olarak sayıldı, 2 bekleniyordu")
+            if broken_stats["discovered"] != rounds["ilk tarama"]["stats"]["discovered"]:
+                failures.append(f"bozuk sitemap: {broken_stats['discovered']} URL bulundu, "
+                                f"{rounds['ilk tarama']['stats']['discovered']} bekleniyordu")
+
+            catalog_rows = sum(1 for _ in read_catalog_products(store.path, target_audience="test"))
+            if catalog_rows != expected_products:
+                failures.append(f"katalog: toplu üretime {catalog_rows} ürün verildi, {expected_products} bekleniyordu")
+        finally:
+            os.chdir(previous_cwd)
+        ollama_requests = ollama.requests
+
+    return {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "settings": {"products": args.products, "changed": len(changed), "concurrency": args.concurrency,
+                     "per_host": args.per_host, "rps": args.rps, "tokens_per_second": args.tokens_per_second},
+        "rounds": rounds,
+        "ollama_requests": ollama_requests,
+        "catalog_rows": catalog_rows,
+        "failures": failures,
+    }
+
+
+def print_report(result):
+    settings = result["settings"]
+    print(f"{settings['products']} URL, sunucu başına {settings['per_host']} eşzamanlı istek / {settings['rps']:g} istek/sn")
+    print(f"{'tur':<18}{'süre (sn)':>10}{'tarandı':>9}{'LLM yok':>8}{'aynı':>6}{'lastmod':>9}{'engelli':>9}"
+          f"{'ürün isteği':>13}{'en çok eşz.':>13}{'sayfa/sn':>10}")
+    for name, info in result["rounds"].items():
+        stats = info["stats"]
+        print(f"{name:<18}{stats['elapsed_seconds']:>10.2f}{stats['crawled']:>9}{stats['llm_skipped']:>8}{stats['unchanged']:>6}"
+              f"{stats['skipped']:>9}{stats['disallowed']:>9}{info['product_requests']:>13}{info['max_in_flight']:>13}"
+              f"{info['pages_per_second']:>10.2f}")
+    print(f"Ollama isteği: {result['ollama_requests']}, katalogdaki ürün: {result['catalog_rows']}")
+    for failure in result["failures"]:
+        print(f"HATA: {failure}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sitemap tabanlı katalog taraması kıyaslaması ve doğrulaması")
+    parser.add_argument("--products", type=int, default=60, help="Fikstür sitesindeki URL sayısı")
+    parser.add_argument("--change-every", type=int, default=7, help="Üçüncü turda her kaçıncı ürünün lastmod'u değişsin")
+    parser.add_argument("--concurrency", type=int, default=8, help="Aynı anda işlenen en fazla sayfa")
+    parser.add_argument("--per-host", type=int, default=2, help="Sunucu başına eşzamanlı istek sınırı")
+    parser.add_argument("--rps", type=float, default=40.0, help="Sunucu başına istek hızı sınırı")
+    parser.add_argument("--tokens-per-second", type=float, default=400.0, help="Sahte Ollama'nın üretim hızı")
+    parser.add_argument("--output", help="Sonucun yazılacağı JSON dosyası")
+    args = parser.parse_args()
+
+    result = run_benchmark(args)
+    print_report(result)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"\nSonuç kaydedildi: {args.output}")
+    sys.exit(1 if result["failures"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+# benchmarks/bench_condenser.py
+# İçerik özetleyicinin (utils/content_condenser.py) analiz istemine etkisini fikstür sayfaları üzerinde ölçer.
+# Her sayfa için eski yol (sayfa metninin ilk MAX_TEXT_LENGTH_FOR_ANALYSIS karakteri) ile özetlenmiş metin
+# karşılaştırılır:
+#   - yaklaşık token sayısı ve sahte Ollama'nın saydığı gerçek istem token sayısı,
+#   - analiz aşamasının süresi (sahte Ollama istem tokenlerini --prompt-tokens-per-second hızında işler),
+#   - bilgi kapsamı: benchmarks/html/ sayfalarında bilinen ürün bilgilerinden istemde bulunanların oranı,
+#   - gürültü: istemdeki 1-2 kelimelik satırların (menü öğeleri, düğmeler) oranı,
+#   - özetleyicinin sayfa başına süresi.
+# Özetlenmiş istemin bilgi kapsamı eski yolunkinden düşükse betik 1 koduyla çıkar.
+#
+# Kullanım (depo kök dizininden):
+#   python -m benchmarks.bench_condenser
+#   python -m benchmarks.bench_condenser --budget 300 --prompt-tokens-per-second 150 --output /tmp/ozet.json
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+from benchmarks.fake_servers import FakeOllamaServer
+from benchmarks.fixtures import fixture_pages
+
+# benchmarks/html/ sayfalarında analizin bulması beklenen bilgiler (küçük harfle, istem metninde aranır)
+EXPECTED_FACTS = {
+    "urun_sayfasi": ["deri laptop sırt çantası", "hakiki deri", "15.6 inç", "su itici", "usb şarj", "gizli", "seyahat"],
+    "hizmet_sayfasi": ["kurumsal web", "seo", "google ads", "e-ticaret", "reklam yönetimi", "raporlama"],
+}
+
+
+def noise_share(text):
+    lines = [line for line in text.splitlines() if line.strip()]
+    return sum(1 for line in lines if len(line.split()) <= 2) / len(lines) if lines else 0.0
+
+
+def fact_recall(name, text):
+    facts = EXPECTED_FACTS.get(name)
+    if not facts:
+        return None
+    lowered = text.casefold()
+    return sum(1 for fact in facts if fact in lowered) / len(facts)
+
+
+def analyze_once(text):
+    """
+    Metni yapılandırılmış veri olmadan (LLM'in çağrılması için) analiz eder; (süre sn, istem tokenleri) döndürür.
+    """
+    from utils.tracing import get_tracer
+    from utils.web_scraper import analyze_website_with_llm
+
+    started = time.perf_counter()
+    analyze_website_with_llm(text, None)
+    elapsed = time.perf_counter() - started
+    record = next((r for r in reversed(get_tracer().recent) if r["name"] == "analyze"), None)
+    return elapsed, (record or {}).get("attributes", {}).get("prompt_tokens")
+
+
+def run_benchmark(args):
+    from config import MAX_TEXT_LENGTH_FOR_ANALYSIS, SCRAPER_MAX_TEXT_CHARS, SCRAPER_MAX_DOWNLOAD_BYTES
+    from utils.token_estimate import estimate_tokens
+    from utils.content_condenser import condense_text
+    from utils.html_extractor import extract_from_chunks
+
+    pages = fixture_pages()
+    results = {}
+    with FakeOllamaServer(tokens_per_second=args.tokens_per_second, prompt_tokens_per_second=args.prompt_tokens_per_second) as ollama, \
+            tempfile.TemporaryDirectory(prefix="bench_condenser_") as workdir:
+        os.environ["OLLAMA_HOST"] = ollama.url
+        previous_cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            analyze_once("ısınma") # İlk çağrı içe aktarma ve zincir kurulumunu içerir; ölçüme katılmaz
+            for name, data in pages:
+                title, description, text, _ = extract_from_chunks([data], SCRAPER_MAX_TEXT_CHARS, SCRAPER_MAX_DOWNLOAD_BYTES)
+                baseline = text if len(text) <= MAX_TEXT_LENGTH_FOR_ANALYSIS else text[:MAX_TEXT_LENGTH_FOR_ANALYSIS] + "..."
+                header = "\n".join(part for part in (title, description) if part)
+                started = time.perf_counter()
+                for _ in range(args.repeat):
+                    body, report = condense_text(text, title, description, args.budget - estimate_tokens(header))
+                condense_ms = (time.perf_counter() - started) / args.repeat * 1000
+                condensed = f"{header}\n{body}".strip()
+
+                row = {"condense_ms": round(condense_ms, 2), "report": report}
+                for label, prompt_text in (("baseline", baseline), ("condensed", condensed)):
+                    analyze_seconds, prompt_tokens = analyze_once(f"{prompt_text}\n#{label}")
+                    row[label] = {
+                        "chars": len(prompt_text),
+                        "tokens_estimate": estimate_tokens(prompt_text),
+                        "prompt_tokens": prompt_tokens,
+                        "analyze_seconds": round(analyze_seconds, 3),
+                        "fact_recall": fact_recall(name, prompt_text),
+                        "noise_share": round(noise_share(prompt_text), 3),
+                    }
+                results[name] = row
+        finally:
+            os.chdir(previous_cwd)
+
+    totals = {label: sum(row[label]["prompt_tokens"] or 0 for row in results.values()) for label in ("baseline", "condensed")}
+    failures = [
+        f"{name}: özetlenmiş istemin bilgi kapsamı {row['condensed']['fact_recall']:.0%}, eski yolda {row['baseline']['fact_recall']:.0%}"
+        for name, row in results.items()
+        if row["baseline"]["fact_recall"] is not None and row["condensed"]["fact_recall"] < row["baseline"]["fact_recall"]
+    ]
+    return {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "settings": {"budget": args.budget, "prompt_tokens_per_second": args.prompt_tokens_per_second,
+                     "tokens_per_second": args.tokens_per_second},
+        "pages": results,
+        "prompt_token_reduction": round(1 - totals["condensed"] / totals["baseline"], 3) if totals["baseline"] else None,
+        "analyze_seconds": {label: round(sum(row[label]["analyze_seconds"] for row in results.values()), 3)
+                            for label in ("baseline", "condensed")},
+        "failures": failures,
+    }
+
+
+def print_report(result):
+    print(f"token bütçesi {result['settings']['budget']}, sahte Ollama istem hızı {result['settings']['prompt_tokens_per_second']:g} token/sn")
+    print(f"{'sayfa':<16}{'yol':<11}{'istem token':>12}{'analiz sn':>11}{'kapsam':>9}{'gürültü':>9}{'özet ms':>9}")
+    for name, row in result["pages"].items():
+        for label, title in (("baseline", "ilk 3000"), ("condensed", "özet")):
+            info = row[label]
+            recall = f"{info['fact_recall']:.0%}" if info["fact_recall"] is not None else "-"
+            condense_ms = f"{row['condense_ms']:.2f}" if label == "condensed" else ""
+            print(f"{name:<16}{title:<11}{info['prompt_tokens'] or 0:>12}{info['analyze_seconds']:>11.3f}{recall:>9}"
+                  f"{info['noise_share']:>9.0%}{condense_ms:>9}")
+    analyze = result["analyze_seconds"]
+    print(f"\nistem token azalması: {result['prompt_token_reduction']:.0%}; "
+          f"toplam analiz süresi {analyze['baseline']:.2f} sn -> {analyze['condensed']:.2f} sn")
+    for failure in result["failures"]:
+        print(f"HATA: {failure}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="İçerik özetleyicinin analiz istemine etkisi (token, süre, kapsam)")
+    parser.add_argument("--budget", type=int, default=None, help="Token bütçesi (varsayılan: ANALYSIS_TOKEN_BUDGET)")
+    parser.add_argument("--prompt-tokens-per-second", type=float, default=300.0, help="Sahte Ollama'nın istem işleme hızı")
+    parser.add_argument("--tokens-per-second", type=float, default=400.0, help="Sahte Ollama'nın üretim hızı")
+    parser.add_argument("--repeat", type=int, default=20, help="Özetleyici süresi için tekrar sayısı")
+    parser.add_argument("--output", help="Sonucun yazılacağı JSON dosyası")
+    args = parser.parse_args()
+    if args.budget is None:
+        from config import ANALYSIS_TOKEN_BUDGET
+        args.budget = ANALYSIS_TOKEN_BUDGET
+
+    result = run_benchmark(args)
+    print_report(result)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"\nSonuç kaydedildi: {args.output}")
+    sys.exit(1 if result["failures"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+# benchmarks/bench_dedup.py
+# Yakın-tekrar indeksinin büyük kayıt sayılarında ekleme ve sorgu sürelerini ölçer.
+#
+# Kullanım (depo kök dizininden):
+#   python -m benchmarks.bench_dedup --items 300000
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+
+from utils.dedup_index import NearDuplicateIndex
+
+WORDS = ["çanta", "deri", "şık", "yeni", "sezon", "indirim", "kaliteli", "hemen", "keşfet", "tarz", "doğal",
+         "organik", "reçel", "lezzet", "cilt", "bakım", "sağlıklı", "güçlü", "hafif", "kampanya", "fırsat"]
+
+
+def synthetic_items(count, products, seed=0):
+    rng = random.Random(seed)
+    for i in range(count):
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(2, 5))).capitalize() + f" {i}"
+        yield rng.choice(("headlines", "ctas", "slogans")), text, f"Ürün {i % products}"
+
+
+def percentile(values, q):
+    return statistics.quantiles(values, n=100)[q - 1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Yakın-tekrar indeksi ölçeklenme kıyaslaması")
+    parser.add_argument("--items", type=int, default=100000)
+    parser.add_argument("--products", type=int, default=2000)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        index = NearDuplicateIndex(os.path.join(folder, "bench.sqlite3"))
+        started = time.perf_counter()
+        # Uygulamadaki gibi her kayıt (ürün başına ~10 öğe) tek işlemde eklenir
+        record_items, record_product = [], None
+        for section, text, product in synthetic_items(args.items, args.products):
+            record_items.append((section, text))
+            record_product = product
+            if len(record_items) == 10:
+                index.add_items(record_items, record_product)
+                record_items = []
+        if record_items:
+            index.add_items(record_items, record_product)
+        insert_seconds = time.perf_counter() - started
+        print(f"{args.items} öğe eklendi: {insert_seconds:.1f} sn ({args.items / insert_seconds:.0f} öğe/sn)")
+
+        rng = random.Random(1)
+        similar_times, previous_times = [], []
+        for _ in range(args.queries):
+            section, text, product = next(synthetic_items(1, args.products, seed=rng.randrange(1 << 30)))
+            started = time.perf_counter()
+            index.find_similar(text, product_name=product, section=section)
+            similar_times.append((time.perf_counter() - started) * 1000)
+            started = time.perf_counter()
+            index.previous_items(product, limit=20)
+            previous_times.append((time.perf_counter() - started) * 1000)
+
+        for name, values in (("find_similar", similar_times), ("previous_items", previous_times)):
+            print(f"{name:<15} p50={percentile(values, 50):.3f} ms  p95={percentile(values, 95):.3f} ms  p99={percentile(values, 99):.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
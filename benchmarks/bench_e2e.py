@@ -0,0 +1,332 @@
+# benchmarks/bench_e2e.py
+# Ağ ve GPU gerektirmeyen uçtan uca kıyaslama.
+# Sahte Ollama (kayıtlı yanıtları ayarlanan token/sn hızında akıtır), sahte Hugging Face görsel uç noktası
+# ve fikstür HTML sayfalarını sunan yerel web sunucusu başlatılır; ardından uygulamanın akışı
+# (sayfa çekme -> analiz -> reklam üretimi -> ayrıştırma -> çeviri -> görsel) gerçek modüllerle çalıştırılır.
+# Yinelemeler benchmarks/html/ sayfaları arasında döner; yapılandırılmış verisi olan ürün sayfalarında
+# analiz LLM'siz tamamlanır, olmayan sayfada LLM çağrılır. Yapılandırılmış verinin akış ve BeautifulSoup
+# yollarında aynı ve doğru ürün adını verdiği de kontrol edilir (ör. microdata'da iç içe Brand öğesinin adı ürün adı sayılmamalı).
+# Aşama süreleri utils/tracing span'lerinden toplanır; uçtan uca ve aşama bazlı p50/p95/p99,
+# ayrıştırıcı ve HTML çıkarıcı verimi JSON olarak kaydedilir ve iki sonuç dosyası karşılaştırılabilir.
+#
+# Kullanım (depo kök dizininden):
+#   python -m benchmarks.bench_e2e                                 # benchmarks/results/<commit>.json yazar
+#   python -m benchmarks.bench_e2e --iterations 40 --concurrency 4 --tokens-per-second 30
+#   python -m benchmarks.bench_e2e --compare benchmarks/results/eski.json
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from benchmarks.fake_servers import FakeOllamaServer, FakeImageServer, FakeWebServer, load_recorded_responses
+from benchmarks.fixtures import saved_pages, fixture_pages
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(REPO_ROOT, "benchmarks", "results")
+# Yapılandırılmış veriden çıkarılması beklenen ürün adları
+EXPECTED_PRODUCT_NAMES = {
+    "urun_sayfasi": "Deri Laptop Sırt Çantası 15.6\" - Kahverengi",
+    "microdata_urun": "Süper Blender 3000 Pro",
+}
+STAGES = ("e2e", "scrape", "condense", "analyze", "generate", "parse", "translate", "image")
+PERCENTILES = (50, 95, 99)
+
+
+def git_revision():
+    """
+    (kısa commit özeti, çalışma ağacında değişiklik var mı) döndürür; git yoksa ("bilinmiyor", False).
+    """
+    try:
+        revision = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                                  capture_output=True, text=True, check=True).stdout.strip()
+        status = subprocess.run(["git", "status", "--porcelain", "--untracked-files=no"], cwd=REPO_ROOT,
+                                capture_output=True, text=True, check=True).stdout.strip()
+        return revision, bool(status)
+    except (OSError, subprocess.CalledProcessError):
+        return "bilinmiyor", False
+
+
+def run_pipeline(iteration, page_url, warmup=False):
+    """
+    Uygulamanın tek bir ürün için izlediği yolu çalıştırır. Önbellek isabetlerini önlemek için
+    her yineleme farklı URL ve metin kullanır.
+    """
+    from image_generator.hf_image_client import translate_to_english, render_image
+    from utils.ad_generation import generate_ad
+    from utils.llm_helpers import get_ad_gen_chain
+    from utils.tracing import span
+    from utils.content_condenser import condense_for_analysis
+    from utils.web_scraper import get_website_content, analyze_website_with_llm
+    from config import AD_PLATFORM_OPTIONS, TONE_OF_VOICE_OPTIONS, IMAGE_SIZE
+
+    with span("e2e", iteration=iteration, warmup=warmup):
+        title, description, text, structured = get_website_content(f"{page_url}?i={iteration}")
+        if text is None:
+            raise RuntimeError("Fikstür sayfası çekilemedi.")
+        product_name, product_description, keywords = analyze_website_with_llm(condense_for_analysis(title, description, text), structured)
+        if not product_name:
+            raise RuntimeError("Web sitesi analizi sonuç döndürmedi.")
+        inputs = {
+            "product_name": f"{product_name} #{iteration}",
+            "product_description": product_description,
+            "target_audience": "Şehirde yaşayan, teknolojiyle iç içe genç profesyoneller",
+            "ad_platform": AD_PLATFORM_OPTIONS[iteration % len(AD_PLATFORM_OPTIONS)],
+            "tone_of_voice": TONE_OF_VOICE_OPTIONS[iteration % len(TONE_OF_VOICE_OPTIONS)],
+            "keywords": keywords,
+            "num_headlines": 3,
+            "num_ctas": 3,
+            "num_slogans": 3,
+        }
+        parsed, _, _, _ = generate_ad(get_ad_gen_chain(), None, inputs, repair=False)
+        prompt = translate_to_english(f"{inputs['product_name']}: {product_description}")
+        render_image(prompt or parsed.headlines[0], IMAGE_SIZE, IMAGE_SIZE)
+
+
+def percentile_summary(durations):
+    values = np.asarray(durations, dtype=float)
+    summary = {"count": int(values.size)}
+    if values.size:
+        summary["mean"] = round(float(values.mean()), 4)
+        for q in PERCENTILES:
+            summary[f"p{q}"] = round(float(np.percentile(values, q)), 4)
+    return summary
+
+
+def summarize_traces(trace_path):
+    """
+    JSONL izlerinden ısınma dışındaki yinelemelere ait span'leri aşama bazında özetler.
+    """
+    with open(trace_path, encoding="utf-8") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    measured = {r["trace_id"] for r in records if r["name"] == "e2e" and not r["attributes"].get("warmup")}
+    records = [r for r in records if r["trace_id"] in measured]
+
+    stages = {}
+    for name in STAGES:
+        stage_records = [r for r in records if r["name"] == name]
+        summary = percentile_summary([r["duration_seconds"] for r in stage_records])
+        summary["errors"] = sum(1 for r in stage_records if r["error"])
+        if any("llm_skipped" in r["attributes"] for r in stage_records):
+            summary["llm_skipped_share"] = round(sum(1 for r in stage_records if r["attributes"].get("llm_skipped")) / len(stage_records), 3)
+        prompt_tokens = [r["attributes"]["prompt_tokens"] for r in stage_records if r["attributes"].get("prompt_tokens")]
+        if prompt_tokens:
+            summary["prompt_tokens_mean"] = round(float(np.mean(prompt_tokens)), 1)
+        eval_tokens = sum(r["attributes"].get("eval_tokens") or 0 for r in stage_records)
+        eval_seconds = sum(r["attributes"].get("eval_seconds") or 0 for r in stage_records)
+        if eval_seconds:
+            summary["tokens_per_second"] = round(eval_tokens / eval_seconds, 1)
+            first_token = [r["attributes"]["time_to_first_token_seconds"] for r in stage_records
+                           if r["attributes"].get("time_to_first_token_seconds") is not None]
+            if first_token:
+                summary["time_to_first_token_p50"] = round(float(np.percentile(first_token, 50)), 4)
+        stages[name] = summary
+    return stages
+
+
+def parser_throughput(responses, min_seconds):
+    from benchmarks.bench_parser import measure_throughput
+    from utils.ad_parser import parse_ad_response
+
+    per_second, mb_per_second = measure_throughput(parse_ad_response, responses, min_seconds)
+    return {"responses_per_second": round(per_second, 1), "mb_per_second": round(mb_per_second, 3)}
+
+
+def scraper_throughput(min_seconds):
+    from benchmarks.bench_scraper import iter_chunks
+    from config import SCRAPER_MAX_TEXT_CHARS, SCRAPER_MAX_DOWNLOAD_BYTES
+    from utils.html_extractor import extract_from_chunks
+
+    results = {}
+    for name, data in fixture_pages():
+        runs = 0
+        started = time.perf_counter()
+        while True:
+            _, _, _, read_bytes = extract_from_chunks(iter_chunks(data), SCRAPER_MAX_TEXT_CHARS, SCRAPER_MAX_DOWNLOAD_BYTES)
+            runs += 1
+            elapsed = time.perf_counter() - started
+            if elapsed >= min_seconds:
+                break
+        results[name] = {
+            "pages_per_second": round(runs / elapsed, 1),
+            "ms_per_page": round(elapsed / runs * 1000, 3),
+            "page_bytes": len(data),
+            "read_bytes": read_bytes,
+        }
+    return results
+
+
+def check_structured_fields():
+    """
+    Fikstür sayfalarında yapılandırılmış verinin iki ayrıştırma yolunda da beklenen ürün adını verdiğini doğrular.
+    """
+    from bs4 import BeautifulSoup
+    from benchmarks.bench_scraper import iter_chunks
+    from config import SCRAPER_MAX_TEXT_CHARS, SCRAPER_MAX_DOWNLOAD_BYTES
+    from utils.html_extractor import extract_from_chunks, preferred_bs4_parser
+    from utils.structured_data import StructuredDataCollector, collect_from_soup
+
+    failures = []
+    for name, data in saved_pages():
+        expected = EXPECTED_PRODUCT_NAMES.get(name)
+        if expected is None:
+            continue
+        collector = StructuredDataCollector()
+        extract_from_chunks(iter_chunks(data), SCRAPER_MAX_TEXT_CHARS, SCRAPER_MAX_DOWNLOAD_BYTES, structured=collector)
+        found = {
+            "akış": collector.fields().get("product_name"),
+            "BeautifulSoup": collect_from_soup(BeautifulSoup(data, preferred_bs4_parser())).get("product_name"),
+        }
+        for path, product_name in found.items():
+            if product_name != expected:
+                failures.append(f"{name} ({path}): ürün adı {product_name!r}, beklenen {expected!r}")
+    return failures
+
+
+def run_benchmark(args):
+    # Ayrıştırıcı derlemi ve fikstür sayfaları çalışma dizini değişmeden önce yüklenir
+    responses = [response for _, response in load_recorded_responses()]
+    pages = {f"/{name}.html": data for name, data in saved_pages()}
+    page_paths = list(pages)
+
+    with FakeOllamaServer(tokens_per_second=args.tokens_per_second) as ollama, \
+            FakeImageServer(latency_seconds=args.image_latency) as image_server, \
+            FakeWebServer(pages) as web, \
+            tempfile.TemporaryDirectory(prefix="bench_e2e_") as workdir:
+        # Uygulama modülleri sahte sunuculara yönlendirilir; önbellekler ve izler geçici dizine yazılır
+        os.environ["OLLAMA_HOST"] = ollama.url
+        os.environ["HF_INFERENCE_ENDPOINT"] = image_server.url
+        previous_cwd = os.getcwd()
+        os.chdir(workdir)
+        try:
+            from utils.tracing import get_tracer
+
+            trace_path = os.path.abspath(get_tracer().path)
+            for iteration in range(args.warmup):
+                run_pipeline(-1 - iteration, web.url + page_paths[iteration % len(page_paths)], warmup=True)
+
+            failures = []
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+                futures = [executor.submit(run_pipeline, i, web.url + page_paths[i % len(page_paths)]) for i in range(args.iterations)]
+                for future in futures:
+                    try:
+                        future.result()
+                    except Exception as e:
+                        failures.append(f"{e.__class__.__name__}: {e}")
+            wall_seconds = time.perf_counter() - started
+            stages = summarize_traces(trace_path)
+        finally:
+            os.chdir(previous_cwd)
+        request_counts = {"ollama": ollama.requests, "image": image_server.requests, "web": web.requests}
+
+    failures.extend(check_structured_fields())
+    revision, dirty = git_revision()
+    return {
+        "commit": revision,
+        "dirty": dirty,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "settings": {
+            "iterations": args.iterations,
+            "warmup": args.warmup,
+            "concurrency": args.concurrency,
+            "tokens_per_second": args.tokens_per_second,
+            "image_latency_seconds": args.image_latency,
+        },
+        "wall_seconds": round(wall_seconds, 3),
+        "pipelines_per_minute": round(args.iterations / wall_seconds * 60, 2) if wall_seconds else None,
+        "failures": failures,
+        "requests": request_counts,
+        "stages": stages,
+        "parser": parser_throughput(responses, args.min_seconds),
+        "scraper": scraper_throughput(args.min_seconds),
+    }
+
+
+def print_report(result):
+    print(f"commit {result['commit']}{' (değişiklikli)' if result['dirty'] else ''} | "
+          f"{result['settings']['iterations']} yineleme, eşzamanlılık {result['settings']['concurrency']}, "
+          f"{result['settings']['tokens_per_second']:g} token/sn | duvar süresi {result['wall_seconds']} sn")
+    if result["failures"]:
+        print(f"Başarısız yineleme: {len(result['failures'])} (ilk: {result['failures'][0]})")
+    print(f"\n{'aşama':<11}{'sayı':>6}{'hata':>6}{'ort. sn':>10}{'p50 sn':>10}{'p95 sn':>10}{'p99 sn':>10}{'token/sn':>10}{'LLM atlandı':>13}")
+    for name, stage in result["stages"].items():
+        if not stage["count"]:
+            continue
+        print(f"{name:<11}{stage['count']:>6}{stage['errors']:>6}{stage['mean']:>10.3f}{stage['p50']:>10.3f}"
+              f"{stage['p95']:>10.3f}{stage['p99']:>10.3f}{stage.get('tokens_per_second') or '':>10}"
+              f"{format(stage['llm_skipped_share'], '.0%') if 'llm_skipped_share' in stage else '':>13}")
+    parser = result["parser"]
+    print(f"\nayrıştırıcı: {parser['responses_per_second']:.0f} yanıt/sn, {parser['mb_per_second']:.2f} MB/sn")
+    print(f"{'sayfa':<16}{'boyut':>10}{'okunan':>10}{'ms/sayfa':>10}{'sayfa/sn':>10}")
+    for name, page in result["scraper"].items():
+        print(f"{name:<16}{page['page_bytes']:>10}{page['read_bytes']:>10}{page['ms_per_page']:>10.2f}{page['pages_per_second']:>10.1f}")
+
+
+def _delta(old, new, lower_is_better=True):
+    if not old or new is None:
+        return f"{'':>9}"
+    change = (new - old) / old * 100
+    better = change < 0 if lower_is_better else change > 0
+    return f"{change:>+8.1f}%{'' if abs(change) < 5 else (' ↑' if better else ' ↓')}"
+
+
+def print_comparison(old, new):
+    """
+    Aynı ayarlarla alınmış iki sonucu karşılaştırır; ↑ iyileşmeyi, ↓ gerilemeyi (±%5 üstü) gösterir.
+    """
+    print(f"\nkarşılaştırma: {old['commit']} -> {new['commit']}")
+    if old.get("settings") != new.get("settings"):
+        print(f"Uyarı: ayarlar farklı ({old.get('settings')} / {new.get('settings')})")
+    print(f"{'aşama':<11}" + "".join(f"{f'p{q} sn':>12}{'değişim':>12}" for q in PERCENTILES))
+    for name, stage in new["stages"].items():
+        previous = old["stages"].get(name) or {}
+        if not stage["count"]:
+            continue
+        print(f"{name:<11}" + "".join(
+            f"{stage[f'p{q}']:>12.3f}{_delta(previous.get(f'p{q}'), stage[f'p{q}']):>12}" for q in PERCENTILES
+        ))
+    print(f"{'ayrıştırıcı yanıt/sn':<24}{new['parser']['responses_per_second']:>12.0f}"
+          f"{_delta(old['parser']['responses_per_second'], new['parser']['responses_per_second'], lower_is_better=False):>12}")
+    for name, page in new["scraper"].items():
+        previous = old["scraper"].get(name) or {}
+        print(f"{f'kazıyıcı {name} ms':<24}{page['ms_per_page']:>12.2f}{_delta(previous.get('ms_per_page'), page['ms_per_page']):>12}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sahte Ollama/HF sunucularıyla uçtan uca kıyaslama")
+    parser.add_argument("--iterations", type=int, default=20, help="Ölçülen uçtan uca yineleme sayısı")
+    parser.add_argument("--warmup", type=int, default=1, help="Ölçüme dahil edilmeyen ısınma yinelemesi")
+    parser.add_argument("--concurrency", type=int, default=1, help="Aynı anda çalışan yineleme sayısı")
+    parser.add_argument("--tokens-per-second", type=float, default=200.0, help="Sahte Ollama'nın üretim hızı")
+    parser.add_argument("--image-latency", type=float, default=0.2, help="Sahte görsel uç noktasının gecikmesi (saniye)")
+    parser.add_argument("--min-seconds", type=float, default=1.0, help="Verim ölçümlerinin en kısa süresi")
+    parser.add_argument("--output", help="Sonuç JSON dosyası (varsayılan: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", help="Karşılaştırılacak önceki sonuç JSON dosyası")
+    args = parser.parse_args()
+
+    result = run_benchmark(args)
+    print_report(result)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{result['commit']}{'-dirty' if result['dirty'] else ''}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"\nSonuç kaydedildi: {output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            print_comparison(json.load(f), result)
+    sys.exit(1 if result["failures"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+# benchmarks/bench_gateway.py
+# LLM ağ geçidinin (utils/llm_gateway.py) eşzamanlı oturumlar altındaki etkisini sahte Ollama'ya karşı ölçer.
+# Sahte Ollama üretim hızını eşzamanlı istekler arasında paylaştırır (GPU'suz tek sunucu gibi). İş yükü:
+#   - bir "yoğun" oturum (matris modu gibi) aynı anda --heavy-requests farklı istek gönderir,
+#   - kısa süre sonra --light-sessions kadar oturum birer istek gönderir; her iki oturum aynı istemi gönderir
+#     (aynı ürün için aynı anda tıklayan kullanıcılar).
+# Üç senaryo çalışır:
+#   1. doğrudan: ağ geçidi yok, tüm istekler aynı anda Ollama'ya gider,
+#   2. ağ geçidi: tek uçuş birleştirme, model başına --slots eşzamanlılık ve oturumlar arası adil kuyruk,
+#   3. yük atma: aynı iş yükü kısa bir bekleme eşiğiyle (--shed-wait); eşiği aşan istekler reddedilmelidir.
+# Ayrıca paylaşılan llama3 istemcisiyle (get_llama3_llm) aynı anda gönderilen iki özdeş çevirinin tek
+# Ollama isteğine dönüştüğü doğrulanır. Bir kontrol başarısız olursa çıkış kodu 1 olur.
+#
+# Kullanım (depo kök dizininden):
+#   python -m benchmarks.bench_gateway
+#   python -m benchmarks.bench_gateway --heavy-requests 24 --light-sessions 10 --slots 2 --output /tmp/kuyruk.json
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+
+from benchmarks.fake_servers import FakeOllamaServer
+
+MODEL = "gemma3:4b"
+
+
+def generate(llm, gateway, prompt):
+    """
+    İstemi (varsa ağ geçidinden geçirerek) Ollama'ya gönderir ve yanıt metnini döndürür.
+    """
+    params = llm._generate_params(prompt)
+    produce = lambda: llm._client.generate(**params)
+    chunks = gateway.stream(params["model"], params, produce) if gateway is not None else produce()
+    return "".join(chunk.get("response", "") for chunk in chunks)
+
+
+def run_scenario(ollama, llm, gateway, args):
+    """
+    İş yükünü çalıştırır; istek sonuçlarını (oturum, tür, gecikme, hata) ve sunucu sayaçlarını döndürür.
+    """
+    from utils.llm_gateway import session_scope
+
+    ollama.requests = 0
+    ollama.max_in_flight = 0
+    results, lock = [], threading.Lock()
+    started = time.perf_counter()
+
+    def request(session_id, kind, prompt, delay):
+        time.sleep(delay)
+        request_started = time.perf_counter()
+        error = None
+        try:
+            with session_scope(session_id):
+                generate(llm, gateway, prompt)
+        except Exception as e:
+            error = e
+        with lock:
+            results.append({
+                "session": session_id, "kind": kind,
+                "latency_seconds": time.perf_counter() - request_started,
+                "finished_at": time.perf_counter() - started,
+                "error": f"{error.__class__.__name__}: {error}" if error else None,
+                "error_type": error.__class__.__name__ if error else None,
+            })
+
+    threads = [
+        threading.Thread(target=request, args=("yogun", "heavy", f"Reklam metni üret: yoğun oturum ürün {number}", 0.0))
+        for number in range(args.heavy_requests)
+    ] + [
+        threading.Thread(target=request, args=(f"oturum-{number}", "light", f"Reklam metni üret: kısa istek {number // 2}", args.light_delay))
+        for number in range(args.light_sessions)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    def latencies(kind):
+        return [result["latency_seconds"] for result in results if result["kind"] == kind and not result["error"]]
+
+    light, heavy = latencies("light"), latencies("heavy")
+    gateway_stats = gateway.stats() if gateway is not None else None
+    return {
+        "wall_seconds": round(time.perf_counter() - started, 3),
+        "ollama_requests": ollama.requests,
+        "max_in_flight": ollama.max_in_flight,
+        "light_mean_seconds": round(statistics.mean(light), 3) if light else None,
+        "light_max_seconds": round(max(light), 3) if light else None,
+        "heavy_finished_seconds": round(max((r["finished_at"] for r in results if r["kind"] == "heavy" and not r["error"]), default=0.0), 3),
+        "heavy_mean_seconds": round(statistics.mean(heavy), 3) if heavy else None,
+        "errors": [result["error"] for result in results if result["error"]],
+        "error_types": sorted({result["error_type"] for result in results if result["error_type"]}),
+        "coalesced": gateway_stats["coalesced"] if gateway_stats else 0,
+        "shed": sum(model["shed"] for model in gateway_stats["models"].values()) if gateway_stats else 0,
+    }
+
+
+def check_shared_client(ollama):
+    """
+    get_llama3_llm() ile aynı anda gönderilen iki özdeş çevirinin tek Ollama isteği olduğunu doğrular.
+    """
+    from utils.llm_helpers import get_llama3_llm
+
+    ollama.requests = 0
+    prompt = "Please translate the following Turkish text to English, provide only the translated text and nothing else:\nTurkish: deri çanta\nEnglish:"
+    answers = []
+    threads = [threading.Thread(target=lambda: answers.append(get_llama3_llm().invoke(prompt))) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return ollama.requests, answers
+
+
+def run_benchmark(args):
+    from langchain_ollama import OllamaLLM
+    from utils.llm_gateway import LLMGateway
+
+    distinct_prompts = args.heavy_requests + (args.light_sessions + 1) // 2
+    failures = []
+    with FakeOllamaServer(tokens_per_second=args.tokens_per_second, shared_throughput=True) as ollama:
+        os.environ["OLLAMA_HOST"] = ollama.url
+        llm = OllamaLLM(model=MODEL, base_url=ollama.url)
+        scenarios = {
+            "doğrudan": run_scenario(ollama, llm, None, args),
+            "ağ geçidi": run_scenario(ollama, llm, LLMGateway(args.slots, {}, args.max_wait), args),
+            "yük atma": run_scenario(ollama, llm, LLMGateway(args.slots, {}, args.shed_wait), args),
+        }
+        shared_requests, shared_answers = check_shared_client(ollama)
+
+    direct, gated, shedding = scenarios["doğrudan"], scenarios["ağ geçidi"], scenarios["yük atma"]
+    if direct["errors"] or gated["errors"]:
+        failures.append(f"beklenmeyen hatalar: {(direct['errors'] + gated['errors'])[:3]}")
+    if gated["max_in_flight"] > args.slots:
+        failures.append(f"ağ geçidi: Ollama'ya aynı anda {gated['max_in_flight']} istek gitti (sınır {args.slots})")
+    if gated["ollama_requests"] != distinct_prompts:
+        failures.append(f"ağ geçidi: {gated['ollama_requests']} Ollama isteği, {distinct_prompts} farklı istem bekleniyordu")
+    if gated["light_max_seconds"] is not None and gated["light_max_seconds"] >= gated["heavy_finished_seconds"] - args.light_delay:
+        failures.append("ağ geçidi: tek istekli oturumlar yoğun oturumun tüm isteklerinin arkasında bekledi")
+    if not shedding["shed"]:
+        failures.append("yük atma: hiçbir istek reddedilmedi")
+    if shedding["error_types"] not in ([], ["LLMOverloadedError"]):
+        failures.append(f"yük atma: beklenmeyen hata türleri {shedding['error_types']}")
+    if shared_requests != 1 or len(set(shared_answers)) != 1:
+        failures.append(f"paylaşılan istemci: iki özdeş çeviri {shared_requests} Ollama isteği gönderdi")
+
+    return {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "settings": {"heavy_requests": args.heavy_requests, "light_sessions": args.light_sessions, "slots": args.slots,
+                     "max_wait": args.max_wait, "shed_wait": args.shed_wait, "tokens_per_second": args.tokens_per_second},
+        "scenarios": scenarios,
+        "shared_client_requests": shared_requests,
+        "failures": failures,
+    }
+
+
+def print_report(result):
+    settings = result["settings"]
+    print(f"yoğun oturum {settings['heavy_requests']} istek, {settings['light_sessions']} tek istekli oturum, "
+          f"model başına {settings['slots']} yer, sahte Ollama toplam {settings['tokens_per_second']:g} token/sn")
+    print(f"{'senaryo':<12}{'süre (sn)':>10}{'Ollama isteği':>15}{'en çok eşz.':>13}{'tekil ort.':>12}{'tekil en çok':>14}"
+          f"{'yoğun bitiş':>13}{'birleşen':>10}{'reddedilen':>12}")
+    for name, info in result["scenarios"].items():
+        light_mean = f"{info['light_mean_seconds']:.2f}" if info["light_mean_seconds"] is not None else "-"
+        light_max = f"{info['light_max_seconds']:.2f}" if info["light_max_seconds"] is not None else "-"
+        print(f"{name:<12}{info['wall_seconds']:>10.2f}{info['ollama_requests']:>15}{info['max_in_flight']:>13}{light_mean:>12}"
+              f"{light_max:>14}{info['heavy_finished_seconds']:>13.2f}{info['coalesced']:>10}{info['shed']:>12}")
+    shed_errors = result["scenarios"]["yük atma"]["errors"]
+    if shed_errors:
+        print(f"\nreddedilen istek mesajı: {shed_errors[0]}")
+    print(f"paylaşılan llama3 istemcisiyle iki özdeş çeviri: {result['shared_client_requests']} Ollama isteği")
+    for failure in result["failures"]:
+        print(f"HATA: {failure}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="LLM ağ geçidi (birleştirme, adil kuyruk, yük atma) kıyaslaması")
+    parser.add_argument("--heavy-requests", type=int, default=12, help="Yoğun oturumun aynı anda gönderdiği istek sayısı")
+    parser.add_argument("--light-sessions", type=int, default=6, help="Birer istek gönderen oturum sayısı")
+    parser.add_argument("--light-delay", type=float, default=0.2, help="Tek istekli oturumların yoğun oturumdan ne kadar sonra başladığı")
+    parser.add_argument("--slots", type=int, default=2, help="Model başına eşzamanlılık sınırı")
+    parser.add_argument("--max-wait", type=float, default=120.0, help="Ağ geçidi senaryosunda kuyruk bekleme eşiği (sn)")
+    parser.add_argument("--shed-wait", type=float, default=2.0, help="Yük atma senaryosunda kuyruk bekleme eşiği (sn)")
+    parser.add_argument("--tokens-per-second", type=float, default=300.0, help="Sahte Ollama'nın tüm isteklerce paylaşılan üretim hızı")
+    parser.add_argument("--output", help="Sonucun yazılacağı JSON dosyası")
+    args = parser.parse_args()
+
+    result = run_benchmark(args)
+    print_report(result)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"\nSonuç kaydedildi: {args.output}")
+    sys.exit(1 if result["failures"] else 0)
+
+
+if __name__ == "__main__":
+    main()
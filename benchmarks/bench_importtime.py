@@ -0,0 +1,154 @@
+# benchmarks/bench_importtime.py
+# app.py'nin soğuk başlangıç maliyetini `python -X importtime` çıktısını ayrıştırarak ölçer.
+# app.py'deki üst düzey import satırları ayrı bir süreçte çalıştırılır; Streamlit'in kendi içe aktarımı
+# (her Streamlit sürecinde zaten yüklü) taban çizgisi olarak ayrıca ölçülür. Rapor, paket bazında
+# toplam süreyi, en yavaş modülleri ve ilk kullanıma ertelenen ağır bağımlılıkların (LLM, kazıyıcı,
+# görsel, kampanya analitiği) o özellik ilk kullanıldığında eklediği süreyi gösterir.
+# Ertelenmesi gereken bir paket app.py içe aktarılırken yükleniyorsa çıkış kodu 1 olur.
+#
+# Kullanım (depo kök dizininden):
+#   python -m benchmarks.bench_importtime
+#   python -m benchmarks.bench_importtime --top 30 --output /tmp/importtime.json
+import argparse
+import ast
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from collections import Counter
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(REPO_ROOT, "app.py")
+BASELINE_CODE = "import streamlit"
+
+# Özellik -> ilk kullanımda çalışan import ifadeleri. Bu paketlerin hiçbiri app.py içe aktarılırken
+# yüklenmemelidir. (huggingface_hub gibi bazı paketler alt modüllerini kendileri tembel yükler; bu yüzden
+# paket adı değil, uygulamadaki import ifadesinin kendisi ölçülür.)
+DEFERRED_FEATURES = {
+    "reklam üretimi (LLM)": ("from ollama import Client", "from langchain_ollama import OllamaLLM",
+                             "from langchain_core.prompts import PromptTemplate"),
+    "web sitesi kazıma": ("import requests", "from bs4 import BeautifulSoup"),
+    "görsel": ("from huggingface_hub import InferenceClient", "from PIL import Image"),
+    "kampanya analitiği": ("import numpy", "import pandas"),
+}
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|(\s*)(\S+)$")
+
+
+def app_import_code(path=APP_PATH):
+    """
+    app.py'deki üst düzey import ifadelerini tek bir kod parçası olarak döndürür.
+    """
+    with open(path, encoding="utf-8") as f:
+        source = f.read()
+    statements = [ast.get_source_segment(source, node) for node in ast.parse(source).body
+                  if isinstance(node, (ast.Import, ast.ImportFrom))]
+    return "\n".join(statements)
+
+
+def profile_imports(code, repeat=3):
+    """
+    Kodu `-X importtime` ile ayrı süreçlerde çalıştırır. En hızlı çalıştırmanın
+    (modül -> (öz süre sn, kümülatif süre sn)) sözlüğünü ve süreç duvar süresini döndürür.
+    """
+    best_wall, best_modules = None, None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        completed = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=REPO_ROOT,
+                                   capture_output=True, text=True)
+        wall = time.perf_counter() - started
+        if completed.returncode != 0:
+            raise RuntimeError(f"İçe aktarma başarısız oldu:\n{completed.stderr[-2000:]}")
+        if best_wall is None or wall < best_wall:
+            best_wall = wall
+            best_modules = {}
+            for line in completed.stderr.splitlines():
+                match = _IMPORTTIME_LINE.match(line)
+                if match:
+                    best_modules[match[4]] = (int(match[1]) / 1e6, int(match[2]) / 1e6)
+    return best_modules, best_wall
+
+
+def package_totals(modules):
+    totals = Counter()
+    for name, (self_seconds, _) in modules.items():
+        totals[name.split(".")[0]] += self_seconds
+    return totals
+
+
+def run(repeat, top):
+    app_code = app_import_code()
+    baseline_modules, baseline_wall = profile_imports(BASELINE_CODE, repeat)
+    app_modules, app_wall = profile_imports(app_code, repeat)
+    app_only = {name: times for name, times in app_modules.items() if name not in baseline_modules}
+
+    features = {}
+    for feature, statements in DEFERRED_FEATURES.items():
+        packages = [statement.split()[1].split(".")[0] for statement in statements]
+        modules, _ = profile_imports(app_code + "\n" + "\n".join(statements), repeat)
+        added = [times[0] for name, times in modules.items() if name not in app_modules]
+        features[feature] = {
+            "packages": list(packages),
+            "eager": sorted(p for p in packages if p in app_modules),
+            "first_use_seconds": round(sum(added), 4),
+            "modules": len(added),
+        }
+
+    return {
+        "python": sys.version.split()[0],
+        "baseline": {"code": BASELINE_CODE, "wall_seconds": round(baseline_wall, 4),
+                     "import_seconds": round(sum(t[0] for t in baseline_modules.values()), 4),
+                     "modules": len(baseline_modules)},
+        "app": {"wall_seconds": round(app_wall, 4),
+                "import_seconds": round(sum(t[0] for t in app_modules.values()), 4),
+                "modules": len(app_modules),
+                "beyond_baseline_seconds": round(sum(t[0] for t in app_only.values()), 4),
+                "beyond_baseline_modules": len(app_only)},
+        "packages": {name: round(seconds, 4) for name, seconds in package_totals(app_only).most_common(top)},
+        "slowest_modules": {name: round(times[1], 4) for name, times in
+                            sorted(app_only.items(), key=lambda item: item[1][1], reverse=True)[:top]},
+        "deferred_features": features,
+    }
+
+
+def print_report(result):
+    baseline, app = result["baseline"], result["app"]
+    print(f"Python {result['python']}")
+    print(f"{'senaryo':<28}{'süreç (ms)':>12}{'içe aktarma (ms)':>18}{'modül':>8}")
+    print(f"{'import streamlit':<28}{baseline['wall_seconds'] * 1000:>12.0f}{baseline['import_seconds'] * 1000:>18.0f}{baseline['modules']:>8}")
+    print(f"{'app.py importları':<28}{app['wall_seconds'] * 1000:>12.0f}{app['import_seconds'] * 1000:>18.0f}{app['modules']:>8}")
+    print(f"Streamlit dışında eklenen: {app['beyond_baseline_seconds'] * 1000:.0f} ms, {app['beyond_baseline_modules']} modül")
+
+    print(f"\n{'paket (öz süre)':<32}{'ms':>8}")
+    for name, seconds in result["packages"].items():
+        print(f"{name:<32}{seconds * 1000:>8.1f}")
+    print(f"\n{'modül (kümülatif)':<48}{'ms':>8}")
+    for name, seconds in result["slowest_modules"].items():
+        print(f"{name:<48}{seconds * 1000:>8.1f}")
+
+    print(f"\n{'ertelenen özellik':<26}{'ilk kullanım (ms)':>18}{'modül':>8}  durum")
+    for feature, info in result["deferred_features"].items():
+        state = f"HEMEN YÜKLENİYOR: {', '.join(info['eager'])}" if info["eager"] else "ertelendi"
+        print(f"{feature:<26}{info['first_use_seconds'] * 1000:>18.0f}{info['modules']:>8}  {state}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="app.py soğuk başlangıç içe aktarma profili (-X importtime)")
+    parser.add_argument("--repeat", type=int, default=3, help="Her senaryo için çalıştırma sayısı (en hızlısı raporlanır)")
+    parser.add_argument("--top", type=int, default=15, help="Listelenecek paket/modül sayısı")
+    parser.add_argument("--output", help="Sonucun yazılacağı JSON dosyası")
+    args = parser.parse_args()
+
+    result = run(args.repeat, args.top)
+    print_report(result)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"\nSonuç kaydedildi: {args.output}")
+    sys.exit(1 if any(info["eager"] for info in result["deferred_features"].values()) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+# benchmarks/bench_ollama_pool.py
+# Ollama sunucu havuzunu (utils/ollama_pool.py) gecikme ve hata enjekte eden birden çok sahte Ollama'ya karşı sınar.
+#   1. dağıtım: --nodes sunucuya aynı anda --concurrent reklam istemi gönderilir; istekler sunuculara eşit
+#      dağılmalı ve tek sunucuya göre toplam süre kısalmalıdır (sahte sunucular üretim hızını paylaşır),
+#   2. yedek istek: her sunucuda her --slow-every. istek --slow-seconds gecikir; --requests kısa çeviri istemi
+#      yedek istek kapalı ve açıkken ardışık gönderilir, p50/p95/p99 karşılaştırılır,
+#   3. süre sınırı: ilk parçayı --stall-seconds geciktiren tek sunucuya kısa süre sınırıyla istek gönderilir;
+#      çağrı süre dolunca LLMUnavailableError ile bitmelidir,
+#   4. devre kesici: bir sunucu hata vermeye başlar; istekler diğerlerine aktarılmalı, sunucu art arda
+#      hatadan sonra devreden çıkmalı ve düzelip bekleme süresi dolunca yeniden istek almalıdır,
+#   5. sağlık kontrolü: bir sunucu tamamen kapanır; sağlık kontrolünden sonra ona istek gönderilmemelidir,
+#   6. uygulama yolu: OLLAMA_HOSTS ile iki sunucu verilip paylaşılan llama3 istemcisiyle (get_llama3_llm)
+#      aynı anda iki farklı istem gönderilir; her sunucu birini almalıdır.
+# Bir kontrol başarısız olursa çıkış kodu 1 olur.
+#
+# Kullanım (depo kök dizininden):
+#   python -m benchmarks.bench_ollama_pool
+#   python -m benchmarks.bench_ollama_pool --nodes 4 --requests 400 --slow-every 25 --output /tmp/havuz.json
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import ExitStack
+
+from benchmarks.fake_servers import FakeOllamaServer
+
+MODEL = "llama3"
+AD_PROMPT = "Sen bir reklam metni yazarı asistanısın. Ürün/Hizmet Adı: Deri Çanta {number}"
+TRANSLATE_PROMPT = "Please translate the following Turkish text to English, provide only the translated text and nothing else:\nTurkish: deri çanta {number}\nEnglish:"
+
+
+def percentile(values, share):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(share * len(ordered)))]
+
+
+def params(prompt):
+    return {"model": MODEL, "prompt": prompt, "stream": True, "options": {}}
+
+
+def generate(pool, prompt):
+    return "".join(chunk.get("response", "") for chunk in pool.generate(params(prompt)))
+
+
+def start_servers(stack, count, **kwargs):
+    return [stack.enter_context(FakeOllamaServer(**kwargs)) for _ in range(count)]
+
+
+def check_distribution(args, failures):
+    from utils.ollama_pool import OllamaPool
+
+    result = {}
+    for count in (1, args.nodes):
+        with ExitStack() as stack:
+            servers = start_servers(stack, count, tokens_per_second=args.tokens_per_second, shared_throughput=True)
+            pool = OllamaPool([server.url for server in servers], hedge_enabled=False)
+            started = time.perf_counter()
+            threads = [threading.Thread(target=generate, args=(pool, AD_PROMPT.format(number=number))) for number in range(args.concurrent)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            result[count] = {"wall_seconds": round(time.perf_counter() - started, 3),
+                             "requests": [server.requests for server in servers],
+                             "max_in_flight": [server.max_in_flight for server in servers]}
+    spread = result[args.nodes]["requests"]
+    if max(spread) - min(spread) > 1:
+        failures.append(f"dağıtım: istekler sunuculara dengesiz dağıldı {spread}")
+    if result[args.nodes]["wall_seconds"] >= result[1]["wall_seconds"]:
+        failures.append("dağıtım: birden çok sunucu toplam süreyi kısaltmadı")
+    return {str(count): info for count, info in result.items()}
+
+
+def check_hedging(args, failures):
+    from utils.ollama_pool import OllamaPool
+
+    result = {}
+    for name, hedge in (("kapalı", False), ("açık", True)):
+        with ExitStack() as stack:
+            servers = start_servers(stack, args.nodes, tokens_per_second=1000.0, prompt_tokens_per_second=4000.0,
+                                    slow_every=args.slow_every, slow_seconds=args.slow_seconds)
+            pool = OllamaPool([server.url for server in servers], hedge_enabled=hedge, hedge_delay_seconds=args.hedge_delay)
+            latencies = []
+            for number in range(args.requests):
+                started = time.perf_counter()
+                generate(pool, TRANSLATE_PROMPT.format(number=number))
+                latencies.append(time.perf_counter() - started)
+            measured = latencies[args.warmup:] # İlk istekler p95 tahmini için ölçüm toplar
+            stats = pool.stats()
+            result[name] = {
+                "p50_seconds": round(percentile(measured, 0.5), 4),
+                "p95_seconds": round(percentile(measured, 0.95), 4),
+                "p99_seconds": round(percentile(measured, 0.99), 4),
+                "max_seconds": round(max(measured), 4),
+                "ollama_requests": sum(server.requests for server in servers),
+                "hedges": stats["hedges"],
+                "hedge_wins": stats["hedge_wins"],
+                "hedge_delay_seconds": round(pool.hedge_delay(MODEL), 4),
+            }
+    off, on = result["kapalı"], result["açık"]
+    if on["p99_seconds"] >= off["p99_seconds"] / 2:
+        failures.append(f"yedek istek: p99 yeterince düşmedi ({off['p99_seconds']} -> {on['p99_seconds']} sn)")
+    if on["ollama_requests"] > args.requests * 1.25:
+        failures.append(f"yedek istek: {on['ollama_requests']} Ollama isteği; yedekler fazla sık gönderiliyor")
+    return result
+
+
+def check_deadline(args, failures):
+    from utils.ollama_pool import OllamaPool, LLMUnavailableError, llm_deadline
+
+    with FakeOllamaServer(latency_seconds=args.stall_seconds) as server:
+        pool = OllamaPool([server.url])
+        started = time.perf_counter()
+        error = None
+        try:
+            with llm_deadline(args.deadline):
+                generate(pool, TRANSLATE_PROMPT.format(number=0))
+        except LLMUnavailableError as e:
+            error = e
+        elapsed = time.perf_counter() - started
+    if error is None:
+        failures.append("süre sınırı: çağrı hata vermeden tamamlandı")
+    elif elapsed > args.deadline + 0.5:
+        failures.append(f"süre sınırı: çağrı {elapsed:.2f} sn sürdü (sınır {args.deadline} sn)")
+    return {"deadline_seconds": args.deadline, "elapsed_seconds": round(elapsed, 3), "error": str(error) if error else None}
+
+
+def check_breaker(args, failures):
+    from utils.ollama_pool import OllamaPool
+
+    with ExitStack() as stack:
+        servers = start_servers(stack, args.nodes, tokens_per_second=1000.0)
+        broken = servers[-1]
+        # Bozukluk süresince bekleme uzun tutulur; böylece sunucunun 3 hatadan sonra hiç istek almadığı görülür
+        pool = OllamaPool([server.url for server in servers], hedge_enabled=False, breaker_failures=3, breaker_cooldown_seconds=60)
+        broken.failing = True
+        errors = 0
+        for number in range(30):
+            try:
+                generate(pool, TRANSLATE_PROMPT.format(number=number))
+            except Exception:
+                errors += 1
+        requests_while_broken = broken.requests
+        state_while_broken = pool.stats()["nodes"][-1]["state"]
+
+        broken.failing = False
+        pool.breaker_cooldown_seconds = args.cooldown
+        time.sleep(args.cooldown)
+        for number in range(3 * args.nodes):
+            generate(pool, TRANSLATE_PROMPT.format(number=100 + number))
+        recovered = pool.stats()["nodes"][-1]
+    if errors:
+        failures.append(f"devre kesici: {errors} istek hata verdi (diğer sunuculara aktarılmalıydı)")
+    if state_while_broken != "open" or requests_while_broken != 3:
+        failures.append(f"devre kesici: bozuk sunucu {requests_while_broken} istek aldı, durum {state_while_broken} (3 istek ve 'open' bekleniyordu)")
+    if recovered["state"] != "closed" or broken.requests <= requests_while_broken:
+        failures.append(f"devre kesici: düzelen sunucu yeniden devreye girmedi ({recovered})")
+    return {"errors": errors, "requests_while_broken": requests_while_broken, "state_while_broken": state_while_broken,
+            "requests_after_recovery": broken.requests - requests_while_broken, "state_after_recovery": recovered["state"]}
+
+
+def check_health(args, failures):
+    from utils.ollama_pool import OllamaPool
+
+    with ExitStack() as stack:
+        servers = start_servers(stack, args.nodes, tokens_per_second=1000.0)
+        down = servers[0]
+        pool = OllamaPool([server.url for server in servers], hedge_enabled=False)
+        pool.start_health_checks(interval_seconds=0.2)
+        down.stop()
+        time.sleep(0.6)
+        errors = 0
+        for number in range(3 * args.nodes):
+            try:
+                generate(pool, TRANSLATE_PROMPT.format(number=number))
+            except Exception:
+                errors += 1
+        node = pool.stats()["nodes"][0]
+    if node["healthy"] or node["requests"] or errors:
+        failures.append(f"sağlık kontrolü: kapalı sunucu {node} ({errors} hata)")
+    return {"down_node": node, "errors": errors}
+
+
+def check_app_path(failures):
+    """
+    OLLAMA_HOSTS ile iki sahte sunucu verildiğinde paylaşılan llama3 istemcisinin iki farklı istemi iki sunucuya dağıttığını doğrular.
+    """
+    with ExitStack() as stack:
+        servers = start_servers(stack, 2, tokens_per_second=200.0)
+        os.environ["OLLAMA_HOSTS"] = ",".join(server.url for server in servers)
+        from utils.llm_helpers import get_llama3_llm
+
+        answers = []
+        threads = [threading.Thread(target=lambda number=number: answers.append(get_llama3_llm().invoke(AD_PROMPT.format(number=number))))
+                   for number in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        requests = [server.requests for server in servers]
+    if requests != [1, 1] or len(answers) != 2:
+        failures.append(f"uygulama yolu: istekler sunuculara {requests} dağıldı, {len(answers)} yanıt")
+    return {"requests": requests}
+
+
+def run_benchmark(args):
+    failures = []
+    result = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "settings": {key: value for key, value in vars(args).items() if key != "output"},
+        "distribution": check_distribution(args, failures),
+        "hedging": check_hedging(args, failures),
+        "deadline": check_deadline(args, failures),
+        "breaker": check_breaker(args, failures),
+        "health": check_health(args, failures),
+        "app_path": check_app_path(failures),
+    }
+    result["failures"] = failures
+    return result
+
+
+def print_report(result):
+    settings = result["settings"]
+    distribution = result["distribution"]
+    print(f"dağıtım ({settings['concurrent']} eşzamanlı reklam istemi):")
+    for count, info in distribution.items():
+        print(f"  {count} sunucu: {info['wall_seconds']:.2f} sn, sunucu başına istek {info['requests']}")
+
+    print(f"\nyedek istek ({settings['requests']} ardışık çeviri, her {settings['slow_every']}. istek +{settings['slow_seconds']:g} sn):")
+    print(f"  {'yedek':<8}{'p50 (sn)':>10}{'p95 (sn)':>10}{'p99 (sn)':>10}{'en çok':>10}{'Ollama isteği':>15}{'yedek':>8}{'kazanan':>9}{'bekleme':>9}")
+    for name, info in result["hedging"].items():
+        print(f"  {name:<8}{info['p50_seconds']:>10.3f}{info['p95_seconds']:>10.3f}{info['p99_seconds']:>10.3f}{info['max_seconds']:>10.3f}"
+              f"{info['ollama_requests']:>15}{info['hedges']:>8}{info['hedge_wins']:>9}{info['hedge_delay_seconds']:>9.3f}")
+
+    deadline = result["deadline"]
+    print(f"\nsüre sınırı: {deadline['deadline_seconds']:g} sn sınırlı çağrı {deadline['elapsed_seconds']:.2f} sn'de bitti: {deadline['error']}")
+    breaker = result["breaker"]
+    print(f"devre kesici: bozukken {breaker['requests_while_broken']} istek aldı ({breaker['state_while_broken']}), {breaker['errors']} hata; "
+          f"düzelince {breaker['requests_after_recovery']} istek ({breaker['state_after_recovery']})")
+    health = result["health"]
+    print(f"sağlık kontrolü: kapalı sunucu sağlıklı={health['down_node']['healthy']}, {health['down_node']['requests']} istek, {health['errors']} hata")
+    print(f"uygulama yolu: iki eşzamanlı istem sunuculara {result['app_path']['requests']} dağıldı")
+    for failure in result["failures"]:
+        print(f"HATA: {failure}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ollama sunucu havuzu (yönlendirme, yedek istek, süre sınırı, devre kesici) kıyaslaması")
+    parser.add_argument("--nodes", type=int, default=3, help="Sahte Ollama sunucusu sayısı")
+    parser.add_argument("--concurrent", type=int, default=12, help="Dağıtım senaryosunda aynı anda gönderilen istek")
+    parser.add_argument("--tokens-per-second", type=float, default=400.0, help="Dağıtım senaryosunda sunucu başına paylaşılan üretim hızı")
+    parser.add_argument("--requests", type=int, default=300, help="Yedek istek senaryosundaki ardışık istek sayısı")
+    parser.add_argument("--warmup", type=int, default=50, help="Gecikme ölçümüne katılmayan ilk istek sayısı")
+    parser.add_argument("--slow-every", type=int, default=25, help="Her sunucuda kaçıncı isteğin gecikeceği")
+    parser.add_argument("--slow-seconds", type=float, default=1.0, help="Geciken isteğe eklenen süre")
+    parser.add_argument("--hedge-delay", type=float, default=0.2, help="Ölçüm birikene kadar yedek istekten önceki bekleme (sn)")
+    parser.add_argument("--stall-seconds", type=float, default=3.0, help="Süre sınırı senaryosunda sunucunun ilk parça gecikmesi")
+    parser.add_argument("--deadline", type=float, default=0.5, help="Süre sınırı senaryosundaki çağrı sınırı (sn)")
+    parser.add_argument("--cooldown", type=float, default=0.5, help="Devre kesici senaryosundaki bekleme süresi (sn)")
+    parser.add_argument("--output", help="Sonucun yazılacağı JSON dosyası")
+    args = parser.parse_args()
+
+    result = run_benchmark(args)
+    print_report(result)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"\nSonuç kaydedildi: {args.output}")
+    sys.exit(1 if result["failures"] else 0)
+
+
+if __name__ == "__main__":
+    main()
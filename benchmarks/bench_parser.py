@@ -0,0 +1,133 @@
+# benchmarks/bench_parser.py
+# utils/ad_parser ayrıştırıcısını json_outputs/*.json dosyalarındaki gerçek "raw_llm_response"
+# alanlarından oluşan derlem üzerinde sınar ve eski iç içe split() yöntemiyle hızını karşılaştırır.
+#
+# Kullanım (depo kök dizininden):
+#   python -m benchmarks.bench_parser            # regresyon kontrolü + verim ölçümü
+#   python -m benchmarks.bench_parser --update   # beklenen çıktıları yeniden yaz
+import argparse
+import dataclasses
+import glob
+import json
+import os
+import sys
+import time
+
+from utils.ad_parser import parse_ad_response, SECTION_KEYS
+
+CORPUS_GLOB = os.path.join("json_outputs", "*.json")
+EXPECTED_PATH = os.path.join("benchmarks", "parser_corpus_expected.json")
+
+# Derlemdeki başlıkların, modelin ürettiği bilinen varyantlara dönüştürülmüş halleri
+HEADER_VARIANTS = [
+    ("**1. Reklam Başlıkları", "## 1) Reklam Başlıkları"),
+    ("**2. Reklam Gövde Metni", "### Gövde Metni"),
+    ("**3. Harekete Geçirici Mesaj", "**CTA"),
+    ("**4. Slogan Önerileri", "Sloganlar:\n**"),
+]
+
+
+def load_corpus():
+    corpus = {}
+    for path in sorted(glob.glob(CORPUS_GLOB)):
+        with open(path, encoding="utf-8") as f:
+            corpus[os.path.basename(path)] = json.load(f)["raw_llm_response"]
+    return corpus
+
+
+def legacy_parse(response):
+    # app.py'deki eski iç içe split() ayrıştırması (karşılaştırma için)
+    output_parts = response.split('**1. Reklam Başlıkları')
+    headlines_raw = body_text_raw = ctas_raw = slogans_raw = ""
+    if len(output_parts) > 1:
+        headlines_part = output_parts[1].split('**2. Reklam Gövde Metni')
+        headlines_raw = headlines_part[0].strip()
+        if len(headlines_part) > 1:
+            body_text_part = headlines_part[1].split('**3. Harekete Geçirici Mesaj')
+            body_text_raw = body_text_part[0].strip()
+            if len(body_text_part) > 1:
+                ctas_part = body_text_part[1].split('**4. Slogan Önerileri')
+                ctas_raw = ctas_part[0].strip()
+                if len(ctas_part) > 1:
+                    slogans_raw = ctas_part[1].strip()
+    headlines = [h.strip('- ').strip() for h in headlines_raw.split('\n') if h.strip().startswith('-')]
+    body_text = body_text_raw.replace("[Gövde Metni]", "").strip()
+    if '\n' in body_text:
+        temp_body_lines = [line.strip() for line in body_text.split('\n') if line.strip()]
+        body_text = temp_body_lines[0] if temp_body_lines else ""
+    ctas = [c.strip('- ').strip() for c in ctas_raw.split('\n') if c.strip().startswith('-')]
+    slogans = [s.strip('- ').strip() for s in slogans_raw.split('\n') if s.strip().startswith('-')]
+    return {"headlines": headlines, "body_text": body_text, "ctas": ctas, "slogans": slogans}
+
+
+def check_regressions(corpus, update):
+    actual = {name: dataclasses.asdict(parse_ad_response(response)) for name, response in corpus.items()}
+    if update or not os.path.exists(EXPECTED_PATH):
+        with open(EXPECTED_PATH, "w", encoding="utf-8") as f:
+            json.dump(actual, f, ensure_ascii=False, indent=4)
+        print(f"{len(actual)} beklenen çıktı '{EXPECTED_PATH}' dosyasına yazıldı.")
+        return True
+
+    with open(EXPECTED_PATH, encoding="utf-8") as f:
+        expected = json.load(f)
+    failures = [name for name in expected if name in actual and actual[name] != expected[name]]
+    for name in failures:
+        print(f"REGRESYON: {name}")
+        for key in SECTION_KEYS:
+            if actual[name][key] != expected[name][key]:
+                print(f"  {key}: beklenen={expected[name][key]!r} bulunan={actual[name][key]!r}")
+    print(f"Regresyon derlemi: {len(expected) - len(failures)}/{len(expected)} yanıt beklenen çıktıyla aynı.")
+    return not failures
+
+
+def count_complete(parse, responses):
+    complete = 0
+    for response in responses:
+        result = parse(response)
+        if not isinstance(result, dict):
+            result = dataclasses.asdict(result)
+        complete += all(result[key] for key in SECTION_KEYS)
+    return complete
+
+
+def measure_throughput(parse, responses, min_seconds=1.0):
+    total_bytes = sum(len(r.encode("utf-8")) for r in responses)
+    runs = 0
+    started = time.perf_counter()
+    while True:
+        for response in responses:
+            parse(response)
+        runs += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_seconds:
+            break
+    return runs * len(responses) / elapsed, runs * total_bytes / elapsed / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reklam metni ayrıştırıcısı regresyon ve verim kıyaslaması")
+    parser.add_argument("--update", action="store_true", help="Beklenen çıktı dosyasını güncelle")
+    args = parser.parse_args()
+
+    corpus = load_corpus()
+    ok = check_regressions(corpus, args.update)
+
+    responses = list(corpus.values())
+    variants = []
+    for response in responses:
+        for old, new in HEADER_VARIANTS:
+            response = response.replace(old, new)
+        variants.append(response)
+
+    print(f"\n{'yöntem':<14}{'yanıt/sn':>12}{'MB/sn':>10}{'tam (derlem)':>16}{'tam (varyant)':>16}")
+    for name, parse in (("eski split", legacy_parse), ("ad_parser", parse_ad_response)):
+        per_second, mb_per_second = measure_throughput(parse, responses)
+        print(f"{name:<14}{per_second:>12.0f}{mb_per_second:>10.2f}"
+              f"{count_complete(parse, responses):>11}/{len(responses)}"
+              f"{count_complete(parse, variants):>11}/{len(variants)}")
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# benchmarks/bench_scraper.py
+# Tam ayrıştırma yolunu (tüm gövdeyi indir + BeautifulSoup) akış halindeki, bayt sınırlı
+# artımlı ayrıştırıcıyla fikstür sayfaları üzerinde karşılaştırır.
+#
+# Kullanım (depo kök dizininden):
+#   python -m benchmarks.bench_scraper
+import time
+
+from bs4 import BeautifulSoup # type: ignore
+
+from config import SCRAPER_MAX_TEXT_CHARS, SCRAPER_MAX_DOWNLOAD_BYTES, SCRAPER_CHUNK_BYTES
+from utils.html_extractor import extract_from_chunks, preferred_bs4_parser, soup_text_blocks
+from benchmarks.fixtures import fixture_pages
+
+
+def full_parse(html, parser_name):
+    # utils/web_scraper.extract_page_content ile aynı adımlar, ayrıştırıcı seçilebilir şekilde
+    soup = BeautifulSoup(html, parser_name)
+    title = soup.find('title').get_text() if soup.find('title') else ""
+    meta_description = soup.find('meta', attrs={'name': 'description'})
+    description = meta_description['content'] if meta_description and 'content' in meta_description.attrs else ""
+    for script_or_style in soup(['script', 'style']):
+        script_or_style.extract()
+    return title, description, soup_text_blocks(soup)[:SCRAPER_MAX_TEXT_CHARS]
+
+
+def iter_chunks(data):
+    for start in range(0, len(data), SCRAPER_CHUNK_BYTES):
+        yield data[start:start + SCRAPER_CHUNK_BYTES]
+
+
+def timed(func, repeat):
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main(repeat=5):
+    parsers = ["html.parser"]
+    if preferred_bs4_parser() != "html.parser":
+        parsers.append(preferred_bs4_parser())
+
+    print(f"{'sayfa':<16}{'boyut':>10}  {'yöntem':<22}{'süre (ms)':>10}{'okunan':>12}{'hızlanma':>10}")
+    for name, data in fixture_pages():
+        html = data.decode("utf-8")
+        baseline, _ = timed(lambda: full_parse(html, "html.parser"), repeat)
+        rows = [(f"tam/{parser}", *timed(lambda p=parser: full_parse(html, p), repeat), len(data)) for parser in parsers]
+        stream_time, stream_result = timed(
+            lambda: extract_from_chunks(iter_chunks(data), SCRAPER_MAX_TEXT_CHARS, SCRAPER_MAX_DOWNLOAD_BYTES), repeat
+        )
+        rows.append(("akış/artımlı", stream_time, stream_result, stream_result[3]))
+        for method, elapsed, _, read_bytes in rows:
+            print(f"{name:<16}{len(data) / 1024:>8.0f}KB  {method:<22}{elapsed * 1000:>10.1f}"
+                  f"{read_bytes / 1024:>10.0f}KB{baseline / elapsed:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
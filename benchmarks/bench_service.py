@@ -0,0 +1,337 @@
+# benchmarks/bench_service.py
+# HTTP servisinin (http_service.py) uç noktalarını doğrular ve yük testi yapar.
+# Sahte Ollama, sahte görsel uç noktası ve fikstür sayfalarını sunan yerel web sunucusu başlatılır; servis
+# bunlara yönlendirilmiş ayrı bir süreç olarak geçici bir klasörde çalıştırılır.
+#   1. işlev kontrolleri: her uç nokta bir kez çağrılır (akışlı üretimde ilk parçanın son satırdan önce
+#      geldiği, istemci akışı yarıda bıraktığında Ollama üretiminin durdurulduğu, hatalı isteklerin
+#      yapılandırılmış 400/502 yanıtı aldığı da kontrol edilir),
+#   2. yük testi: eşzamanlı istemci sayısı adım adım artırılır (kapalı döngü; her istemci yanıtı alınca
+#      yenisini gönderir). Her adımda istek/sn, p50/p95 gecikme ve hata sayısı ölçülür; aynı anda /health
+#      yoklanarak olay döngüsünün engellenmediği doğrulanır. Sonuç: p95 hedefi aşılmadan ulaşılan en yüksek istek/sn.
+# İstekler önbelleğe takılmasın diye her biri farklı girdiyle gönderilir. Bir kontrol başarısız olursa çıkış kodu 1 olur.
+#
+# Kullanım (depo kök dizininden):
+#   python -m benchmarks.bench_service
+#   python -m benchmarks.bench_service --levels 1,4,16,64 --duration 10 --p95-target 1.5 --output /tmp/servis.json
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.fake_servers import FakeOllamaServer, FakeImageServer, FakeWebServer
+from benchmarks.fixtures import saved_pages
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PRODUCT = {"product_name": "Deri Laptop Çantası", "product_description": "Hakiki deri, 15.6 inç laptop bölmeli sırt çantası",
+           "target_audience": "Genç profesyoneller"}
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(values, share):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(share * len(ordered)))]
+
+
+def start_service(port, env, workdir, workers):
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(REPO_ROOT, "http_service.py"), "--port", str(port), "--workers", str(workers)],
+        cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE,
+    )
+    return process
+
+
+async def wait_until_ready(session, base_url, process, timeout=60):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"servis başlatılamadı: {process.stderr.read().decode('utf-8', 'replace')[-2000:]}")
+        try:
+            async with session.get(f"{base_url}/health") as response:
+                if response.status == 200:
+                    return
+        except OSError:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("servis zamanında hazır olmadı")
+
+
+async def check_endpoints(session, base_url, page_url, unreachable_url, ollama):
+    """
+    Her uç noktayı bir kez çağırır; (sonuçlar, hatalar) döndürür.
+    """
+    results, failures = {}, []
+
+    async def post(path, payload, expect=200):
+        started = time.perf_counter()
+        async with session.post(f"{base_url}{path}", json=payload) as response:
+            body = await response.read()
+            elapsed = time.perf_counter() - started
+            if response.status != expect:
+                failures.append(f"{path}: durum {response.status}, {expect} bekleniyordu ({body[:300]!r})")
+            return response, body, elapsed
+
+    _, body, elapsed = await post("/scrape", {"url": page_url})
+    results["scrape"] = {"seconds": round(elapsed, 3), "text_chars": len(json.loads(body).get("text") or "")}
+
+    _, body, elapsed = await post("/analyze", {"url": page_url})
+    analysis = json.loads(body)
+    results["analyze"] = {"seconds": round(elapsed, 3), "product_name": analysis.get("product_name")}
+    if not analysis.get("product_name"):
+        failures.append("/analyze: ürün adı boş döndü")
+
+    _, body, elapsed = await post("/generate", dict(PRODUCT, use_cache=False))
+    record = json.loads(body)
+    results["generate"] = {"seconds": round(elapsed, 3), "headlines": len(record.get("generated_content", {}).get("headlines", []))}
+
+    # Akışlı üretim: ilk parça, üretimin sonundan belirgin biçimde önce gelmelidir
+    started = time.perf_counter()
+    first_token_seconds, tokens, final = None, 0, None
+    async with session.post(f"{base_url}/generate", json=dict(PRODUCT, product_name="Kanvas Sırt Çantası", use_cache=False, stream=True)) as response:
+        async for line in response.content:
+            message = json.loads(line)
+            if "token" in message:
+                tokens += 1
+                if first_token_seconds is None:
+                    first_token_seconds = time.perf_counter() - started
+            else:
+                final = message
+    total_seconds = time.perf_counter() - started
+    results["generate_stream"] = {"first_token_seconds": round(first_token_seconds or 0, 3), "seconds": round(total_seconds, 3), "tokens": tokens}
+    if not final or not final.get("done") or "record" not in final:
+        failures.append(f"/generate akış: son satır beklenen biçimde değil ({final})")
+    if tokens < 2 or first_token_seconds is None or first_token_seconds > total_seconds / 2:
+        failures.append(f"/generate akış: {tokens} parça, ilk parça {first_token_seconds} sn / toplam {total_seconds:.2f} sn")
+
+    # İstemci akışı yarıda bırakırsa servis üretimi durdurmalıdır: yavaşlatılmış sahte Ollama'daki istek
+    # tam yanıtın süresinden çok önce kapanmalıdır
+    tokens_per_second, ollama.tokens_per_second = ollama.tokens_per_second, 20.0
+    try:
+        async with session.post(f"{base_url}/generate", json=dict(PRODUCT, product_name="Yarıda Bırakılan Çanta", use_cache=False, stream=True)) as response:
+            await response.content.readline()
+            await response.content.readline()
+        disconnected = time.perf_counter()
+        while ollama.in_flight and time.perf_counter() - disconnected < 3:
+            await asyncio.sleep(0.05)
+        results["generate_disconnect"] = {"stop_seconds": round(time.perf_counter() - disconnected, 3), "ollama_in_flight": ollama.in_flight}
+        if ollama.in_flight:
+            failures.append("/generate akış: istemci ayrıldıktan 3 sn sonra Ollama üretimi hâlâ sürüyor")
+    finally:
+        ollama.tokens_per_second = tokens_per_second
+
+    _, body, elapsed = await post("/translate", {"text": "deri çanta"})
+    results["translate"] = {"seconds": round(elapsed, 3), "translation": json.loads(body).get("translation")}
+
+    response, body, elapsed = await post("/image", {"product_name": "deri çanta"})
+    results["image"] = {"seconds": round(elapsed, 3), "bytes": len(body), "content_type": response.content_type}
+    if response.content_type != "image/png" or not body.startswith(b"\x89PNG"):
+        failures.append("/image: PNG döndürülmedi")
+
+    # Hatalı istekler yapılandırılmış hata yanıtı almalıdır
+    _, body, _ = await post("/generate", {"product_name": "eksik"}, expect=400)
+    results["invalid_request"] = json.loads(body)
+    _, body, _ = await post("/generate", dict(PRODUCT, use_cache="false"), expect=400)
+    results["invalid_flag"] = json.loads(body)
+    _, body, _ = await post("/scrape", {"url": unreachable_url}, expect=502)
+    error = json.loads(body).get("error", {})
+    results["unreachable_page"] = error
+    if not error.get("notices"):
+        failures.append("/scrape: ulaşılamayan sayfa için bildirim (notices) dönmedi")
+    return results, failures
+
+
+def request_factory(mix):
+    """
+    Karışımdaki uç noktalar arasında ağırlıklı seçim yapan ve her seferinde farklı girdi üreten fonksiyon döndürür.
+    """
+    counter = itertools.count()
+    names = [name for name, weight in mix for _ in range(weight)]
+    rng = random.Random(0)
+
+    def next_request():
+        number = next(counter)
+        name = rng.choice(names)
+        if name == "generate":
+            return name, "/generate", dict(PRODUCT, product_name=f"Deri Çanta Model {number}", use_cache=False, repair=False)
+        if name == "translate":
+            return name, "/translate", {"text": f"deri çanta model {number}"}
+        return name, "/analyze", {"title": f"Deri Çanta Model {number}", "text": f"Deri Çanta Model {number}\nHakiki deri, laptop bölmeli, su itici sırt çantası. Ürün kodu {number}."}
+
+    return next_request
+
+
+async def load_level(session, base_url, concurrency, duration, next_request):
+    """
+    `concurrency` istemciyle `duration` saniye boyunca istek gönderir ve ölçümleri döndürür.
+    """
+    latencies, by_endpoint, statuses, health_latencies = [], {}, {}, []
+    deadline = time.perf_counter() + duration
+
+    async def client(index):
+        # Her sanal istemci LLM kuyruğunda ayrı bir oturum sayılır
+        headers = {"X-Session-Id": f"yuk-istemcisi-{index}"}
+        while time.perf_counter() < deadline:
+            name, path, payload = next_request()
+            started = time.perf_counter()
+            try:
+                async with session.post(f"{base_url}{path}", json=payload, headers=headers) as response:
+                    await response.read()
+                    status = response.status
+            except OSError:
+                status = "bağlantı"
+            elapsed = time.perf_counter() - started
+            statuses[status] = statuses.get(status, 0) + 1
+            if status == 200:
+                latencies.append(elapsed)
+                by_endpoint.setdefault(name, []).append(elapsed)
+
+    async def probe_health():
+        # Engelleyen çağrılar olay döngüsünde çalışsaydı /health de yük altında yavaşlardı
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            async with session.get(f"{base_url}/health") as response:
+                await response.read()
+            health_latencies.append(time.perf_counter() - started)
+            await asyncio.sleep(0.1)
+
+    started = time.perf_counter()
+    await asyncio.gather(probe_health(), *(client(index) for index in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    return {
+        "concurrency": concurrency,
+        "completed": len(latencies),
+        "requests_per_second": round(len(latencies) / elapsed, 2),
+        "p50_seconds": round(percentile(latencies, 0.5), 3) if latencies else None,
+        "p95_seconds": round(percentile(latencies, 0.95), 3) if latencies else None,
+        "endpoint_p95_seconds": {name: round(percentile(values, 0.95), 3) for name, values in sorted(by_endpoint.items())},
+        "statuses": {str(status): count for status, count in statuses.items()},
+        "health_p95_seconds": round(percentile(health_latencies, 0.95), 4) if health_latencies else None,
+    }
+
+
+async def run_async(args, base_url, page_url, unreachable_url, process, ollama):
+    import aiohttp
+
+    timeout = aiohttp.ClientTimeout(total=300)
+    async with aiohttp.ClientSession(timeout=timeout, connector=aiohttp.TCPConnector(limit=0)) as session:
+        await wait_until_ready(session, base_url, process)
+        checks, failures = await check_endpoints(session, base_url, page_url, unreachable_url, ollama)
+        next_request = request_factory(args.mix)
+        levels = []
+        for concurrency in args.levels:
+            levels.append(await load_level(session, base_url, concurrency, args.duration, next_request))
+    return checks, levels, failures
+
+
+def parse_mix(text):
+    mix = []
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ("generate", "translate", "analyze"):
+            raise argparse.ArgumentTypeError(f"bilinmeyen uç nokta: {name}")
+        mix.append((name, int(weight or 1)))
+    return mix
+
+
+def run_benchmark(args):
+    pages = {f"/{name}": data for name, data in saved_pages()}
+    page_name = next(iter(pages))
+    with FakeOllamaServer(tokens_per_second=args.tokens_per_second) as ollama, FakeImageServer(latency_seconds=args.image_latency) as image, \
+            FakeWebServer(pages) as web, tempfile.TemporaryDirectory(prefix="bench_service_") as workdir:
+        port = free_port()
+        env = dict(os.environ, OLLAMA_HOST=ollama.url, HF_INFERENCE_ENDPOINT=image.url,
+                   PYTHONPATH=os.pathsep.join(filter(None, [REPO_ROOT, os.environ.get("PYTHONPATH")])))
+        process = start_service(port, env, workdir, args.workers)
+        try:
+            checks, levels, failures = asyncio.run(run_async(
+                args, f"http://127.0.0.1:{port}", f"{web.url}{page_name}", f"http://127.0.0.1:{free_port()}/yok", process, ollama))
+        finally:
+            process.terminate()
+            process.wait(timeout=10)
+        ollama_requests = ollama.requests
+
+    within_target = [level for level in levels if level["p95_seconds"] is not None and level["p95_seconds"] <= args.p95_target]
+    best = max(within_target, key=lambda level: level["requests_per_second"], default=None)
+    for level in levels:
+        server_errors = sum(count for status, count in level["statuses"].items() if status not in ("200", "503"))
+        if server_errors:
+            failures.append(f"{level['concurrency']} istemci: {server_errors} beklenmeyen hata yanıtı ({level['statuses']})")
+        if level["health_p95_seconds"] is not None and level["health_p95_seconds"] > args.health_target:
+            failures.append(f"{level['concurrency']} istemci: /health p95 {level['health_p95_seconds']} sn (olay döngüsü engelleniyor olabilir)")
+    if best is None:
+        failures.append(f"hiçbir adımda p95 <= {args.p95_target} sn sağlanamadı")
+
+    return {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "settings": {"levels": args.levels, "duration": args.duration, "p95_target": args.p95_target, "mix": dict(args.mix),
+                     "tokens_per_second": args.tokens_per_second, "workers": args.workers},
+        "checks": checks,
+        "levels": levels,
+        "best": {"concurrency": best["concurrency"], "requests_per_second": best["requests_per_second"],
+                 "p95_seconds": best["p95_seconds"]} if best else None,
+        "ollama_requests": ollama_requests,
+        "failures": failures,
+    }
+
+
+def print_report(result):
+    settings = result["settings"]
+    checks = result["checks"]
+    stream = checks["generate_stream"]
+    print(f"işlev kontrolleri: scrape {checks['scrape']['seconds']:.2f} sn, analyze {checks['analyze']['seconds']:.2f} sn, "
+          f"generate {checks['generate']['seconds']:.2f} sn, akış ilk parça {stream['first_token_seconds']:.2f} / {stream['seconds']:.2f} sn "
+          f"({stream['tokens']} parça), akış yarıda bırakıldıktan {checks['generate_disconnect']['stop_seconds']:.2f} sn sonra durdu, translate {checks['translate']['seconds']:.2f} sn, image {checks['image']['seconds']:.2f} sn")
+    print(f"\nkarışım {settings['mix']}, adım başına {settings['duration']:g} sn, sahte Ollama {settings['tokens_per_second']:g} token/sn")
+    print(f"{'istemci':>8}{'istek/sn':>10}{'p50 (sn)':>10}{'p95 (sn)':>10}{'/health p95':>13}  uç nokta p95 / durumlar")
+    for level in result["levels"]:
+        p50 = f"{level['p50_seconds']:.3f}" if level["p50_seconds"] is not None else "-"
+        p95 = f"{level['p95_seconds']:.3f}" if level["p95_seconds"] is not None else "-"
+        endpoints = " ".join(f"{name}={value:.2f}" for name, value in level["endpoint_p95_seconds"].items())
+        print(f"{level['concurrency']:>8}{level['requests_per_second']:>10.2f}{p50:>10}{p95:>10}{level['health_p95_seconds'] or 0:>13.4f}  "
+              f"{endpoints} {level['statuses']}")
+    if result["best"]:
+        best = result["best"]
+        print(f"\np95 <= {settings['p95_target']:g} sn hedefinde en yüksek verim: {best['requests_per_second']:.2f} istek/sn "
+              f"({best['concurrency']} istemci, p95 {best['p95_seconds']:.3f} sn)")
+    for failure in result["failures"]:
+        print(f"HATA: {failure}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP servisi işlev kontrolü ve yük testi")
+    parser.add_argument("--levels", type=lambda text: [int(part) for part in text.split(",")], default=[1, 2, 4, 8, 16, 32],
+                        help="Denenecek eşzamanlı istemci sayıları (virgülle)")
+    parser.add_argument("--duration", type=float, default=5.0, help="Her adımın süresi (sn)")
+    parser.add_argument("--p95-target", type=float, default=2.0, help="Verimin raporlanacağı p95 gecikme hedefi (sn)")
+    parser.add_argument("--health-target", type=float, default=0.25, help="Yük altında /health için kabul edilen p95 (sn)")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("generate=5,translate=3,analyze=2"), help="Uç nokta ağırlıkları")
+    parser.add_argument("--workers", type=int, default=32, help="Servisin iş parçacığı sayısı")
+    parser.add_argument("--tokens-per-second", type=float, default=400.0, help="Sahte Ollama'nın istek başına üretim hızı")
+    parser.add_argument("--image-latency", type=float, default=0.2, help="Sahte görsel uç noktasının gecikmesi (sn)")
+    parser.add_argument("--output", help="Sonucun yazılacağı JSON dosyası")
+    args = parser.parse_args()
+
+    result = run_benchmark(args)
+    print_report(result)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"\nSonuç kaydedildi: {args.output}")
+    sys.exit(1 if result["failures"] else 0)
+
+
+if __name__ == "__main__":
+    main()
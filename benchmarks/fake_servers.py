@@ -0,0 +1,380 @@
+# benchmarks/fake_servers.py
+# Ağ bağımlılığı olmadan kıyaslama ve deneme yapmak için yerel sahte sunucular.
+#
+# - FakeOllamaServer: Ollama'nın /api/generate uç noktasını taklit eder. json_outputs/*.json
+#   dosyalarındaki kayıtlı model yanıtlarını NDJSON akışı olarak, ayarlanan token/sn hızında oynatır;
+#   son satırda gerçek Ollama gibi token sayıları ve süreleri döndürür. Ek gecikme ve hata enjekte edilebilir.
+# - FakeImageServer: Hugging Face text-to-image isteğini ({"inputs": ..., "parameters": {...}}) kabul
+#   eder, ayarlanan gecikme kadar bekler ve istenen boyutta bir PNG döndürür.
+# - FakeWebServer: benchmarks/fixtures.py'deki HTML sayfalarını (ve sitemap/robots.txt dosyalarını) ETag ile sunar.
+#
+# Uygulamayı sahte sunuculara yönlendirmek için:
+#   python -m benchmarks.fake_servers --ollama-port 11435 --image-port 8808
+#   OLLAMA_HOST=http://127.0.0.1:11435 HF_INFERENCE_ENDPOINT=http://127.0.0.1:8808 streamlit run app.py
+# Birden çok sahte Ollama (sunucu havuzu) için:
+#   python -m benchmarks.fake_servers --ollama-count 3 --slow-every 10 --slow-seconds 3
+#   OLLAMA_HOSTS=http://127.0.0.1:11435,http://127.0.0.1:11436,http://127.0.0.1:11437 streamlit run app.py
+import argparse
+import glob
+import hashlib
+import io
+import json
+import mimetypes
+import os
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from PIL import Image
+
+RECORDED_RESPONSES_GLOB = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "json_outputs", "reklam_metni_*.json")
+# Yaklaşık token bölütleme: baştaki boşlukla birlikte kelimeler ve noktalama işaretleri
+_TOKEN_PATTERN = re.compile(r"\s*[\w']+|\s*[^\w\s]|\s+")
+
+
+class _BackgroundServer:
+    """
+    ThreadingHTTPServer'ı arka plan iş parçacığında çalıştıran ortak temel; `with` ile kullanılabilir.
+    """
+
+    def __init__(self, handler_class, host="127.0.0.1", port=0):
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), handler_class)
+        self._server.daemon_threads = True
+        self.url = f"http://{host}:{self._server.server_port}"
+
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+
+def load_recorded_responses():
+    """
+    json_outputs klasöründeki kayıtlı üretimlerden (istek parametreleri, ham yanıt) listesi döndürür.
+    """
+    records = []
+    for path in sorted(glob.glob(RECORDED_RESPONSES_GLOB)):
+        with open(path, encoding="utf-8") as f:
+            record = json.load(f)
+        records.append((record["request_parameters"], record["raw_llm_response"]))
+    return records
+
+
+class FakeOllamaServer(_BackgroundServer):
+    """
+    Kayıtlı yanıtları `tokens_per_second` hızında akış halinde döndüren sahte Ollama sunucusu.
+    İstem türü içerikten anlaşılır: web sitesi analizi JSON, çeviri İngilizce satır(lar), diğerleri
+    kayıtlı reklam metni yanıtı alır. Yanıt seçimi istemin özetine göre yapılır (deterministik).
+    `shared_throughput` açıkken hızlar tüm eşzamanlı istekler arasında paylaşılır (GPU'suz tek sunucu gibi:
+    aynı anda n istek varsa her biri n kat yavaş ilerler).
+    Gecikme enjeksiyonu: her yanıt ilk parçadan önce `latency_seconds` bekler; `slow_every` verilirse her
+    `slow_every`. istek ayrıca `slow_seconds` bekler (kuyruk gecikmesi). `failing` True yapılırsa tüm istekler
+    (sağlık kontrolü dahil) 500 döner.
+    """
+
+    def __init__(self, tokens_per_second=60.0, prompt_tokens_per_second=800.0, load_seconds=0.0, shared_throughput=False,
+                 latency_seconds=0.0, slow_every=0, slow_seconds=0.0, host="127.0.0.1", port=0):
+        self.tokens_per_second = tokens_per_second
+        self.prompt_tokens_per_second = prompt_tokens_per_second
+        self.load_seconds = load_seconds
+        self.shared_throughput = shared_throughput
+        self.latency_seconds = latency_seconds
+        self.slow_every = slow_every
+        self.slow_seconds = slow_seconds
+        self.failing = False
+        self.recorded = load_recorded_responses()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        super().__init__(self._handler_class(), host, port)
+
+    def track(self, delta):
+        with self._lock:
+            self.in_flight += delta
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def injected_latency(self):
+        with self._lock:
+            slow = self.slow_every and self.requests % self.slow_every == 0
+        return self.latency_seconds + (self.slow_seconds if slow else 0.0)
+
+    def slowdown(self):
+        return max(1, self.in_flight) if self.shared_throughput else 1
+
+    def response_for(self, prompt):
+        digest = int(hashlib.sha256(prompt.encode("utf-8")).hexdigest(), 16)
+        parameters, response = self.recorded[digest % len(self.recorded)]
+        if "JSON Çıktısı Formatı" in prompt:
+            return json.dumps({
+                "product_name": parameters["product_name"],
+                "product_description": parameters["product_description"],
+                "keywords": ", ".join(parameters["keywords"]),
+            }, ensure_ascii=False)
+        if "translate" in prompt:
+            numbered = re.findall(r"^\[(\d+)\]", prompt, re.MULTILINE)
+            if numbered:
+                return "\n".join(f"[{number}] advertising text number {number}" for number in numbered)
+            return "high quality product for everyday use"
+        return response
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Gerçek Ollama gibi parçalar beklemeden gönderilir; Nagle açıkken küçük NDJSON satırları ~40 ms takılabilir
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                if server.failing:
+                    self._send_error()
+                    return
+                body = json.dumps({"models": [], "version": "0.0.0-fake"}).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self):
+                request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                server.count_request()
+                if server.failing:
+                    self._send_error()
+                    return
+                server.track(1)
+                try:
+                    self._generate(request)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass # İstemci akışı yarıda kapattı (ör. süre sınırı veya kaybeden yedek istek)
+                finally:
+                    server.track(-1)
+
+            def _generate(self, request):
+                prompt = request.get("prompt", "")
+                started = time.perf_counter()
+                model = request.get("model", "fake")
+                prompt_tokens = len(_TOKEN_PATTERN.findall(prompt))
+                # Boş istem modeli yalnızca belleğe yükler (ısınma isteği)
+                tokens = _TOKEN_PATTERN.findall(server.response_for(prompt)) if prompt else []
+                prompt_seconds = prompt_tokens / server.prompt_tokens_per_second if prompt else 0.0
+                time.sleep(server.load_seconds + server.injected_latency() + prompt_seconds * server.slowdown())
+
+                final = {
+                    "model": model, "response": "", "done": True, "done_reason": "stop",
+                    "load_duration": int(server.load_seconds * 1e9),
+                    "prompt_eval_count": prompt_tokens, "prompt_eval_duration": int(prompt_seconds * 1e9),
+                    "eval_count": len(tokens),
+                }
+                if request.get("stream") is False:
+                    eval_seconds = len(tokens) / server.tokens_per_second * server.slowdown()
+                    time.sleep(eval_seconds)
+                    final.update(response="".join(tokens), eval_duration=int(eval_seconds * 1e9),
+                                 total_duration=int((time.perf_counter() - started) * 1e9))
+                    self._send_json(final)
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-ndjson")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                eval_started = time.perf_counter()
+                due = eval_started
+                for token in tokens:
+                    # Uyku süresi birikmiş zamana göre hesaplanır; böylece hız token sayısından bağımsız tutarlıdır
+                    due += server.slowdown() / server.tokens_per_second
+                    delay = due - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                    self._write_chunk({"model": model, "response": token, "done": False})
+                final.update(eval_duration=int((time.perf_counter() - eval_started) * 1e9),
+                             total_duration=int((time.perf_counter() - started) * 1e9))
+                self._write_chunk(final)
+                self.wfile.write(b"0\r\n\r\n")
+
+            def _send_error(self):
+                body = json.dumps({"error": "fake server failure"}).encode("utf-8")
+                self.send_response(500)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _send_json(self, payload):
+                body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _write_chunk(self, payload):
+                data = (json.dumps(payload, ensure_ascii=False) + "\n").encode("utf-8")
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+                self.wfile.flush()
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+class FakeWebServer(_BackgroundServer):
+    """
+    {yol: html_baytları} sözlüğündeki sayfaları ETag ile sunan sahte web sunucusu.
+    Sorgu dizgisi yok sayılır; böylece aynı sayfa farklı URL'lerle (önbelleği atlayarak) istenebilir.
+    İstenen yollar (`paths`), gönderilen User-Agent başlıkları (`user_agents`) ve aynı anda işlenen en fazla
+    istek sayısı (`max_in_flight`) kaydedilir.
+    """
+
+    def __init__(self, pages, host="127.0.0.1", port=0):
+        self.pages = pages
+        self.paths = Counter()
+        self.user_agents = Counter()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        super().__init__(self._handler_class(), host, port)
+
+    def track(self, path, delta, user_agent=None):
+        with self._lock:
+            if delta > 0:
+                self.paths[path] += 1
+                self.user_agents[user_agent] += 1
+            self.in_flight += delta
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server.count_request()
+                path = self.path.split("?")[0]
+                server.track(path, 1, self.headers.get("User-Agent"))
+                try:
+                    self._serve(path)
+                finally:
+                    server.track(path, -1)
+
+            def _serve(self, path):
+                body = server.pages.get(path)
+                if body is None:
+                    self.send_error(404)
+                    return
+                etag = '"%s"' % hashlib.sha256(body).hexdigest()[:16]
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                content_type = mimetypes.guess_type(path)[0] if not path.endswith(".gz") else "application/gzip"
+                self.send_header("Content-Type", f"{content_type or 'text/html'}; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", etag)
+                self.end_headers()
+                try:
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    pass # Akış halindeki kazıyıcı yeterli metni bulunca bağlantıyı erken kapatır
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+class FakeImageServer(_BackgroundServer):
+    """
+    Sahte text-to-image sunucusu; `url` özniteliği HF_INFERENCE_ENDPOINT olarak verilebilir.
+    """
+
+    def __init__(self, latency_seconds=0.5, host="127.0.0.1", port=0):
+        self.latency_seconds = latency_seconds
+        super().__init__(self._handler_class(), host, port)
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                server.count_request()
+                time.sleep(server.latency_seconds)
+                parameters = body.get("parameters") or {}
+                png = render_placeholder(body.get("inputs", ""), parameters.get("width") or 512, parameters.get("height") or 512)
+                self.send_response(200)
+                self.send_header("Content-Type", "image/png")
+                self.send_header("Content-Length", str(len(png)))
+                self.end_headers()
+                self.wfile.write(png)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def render_placeholder(prompt, width, height):
+    """
+    İstemden türetilen tek renkli bir PNG (bayt) üretir; aynı istem aynı görseli verir.
+    """
+    color = tuple(hashlib.sha256(prompt.encode("utf-8")).digest()[:3])
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), color).save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sahte Ollama ve Hugging Face görsel uç noktalarını başlatır.")
+    parser.add_argument("--ollama-port", type=int, default=11435)
+    parser.add_argument("--ollama-count", type=int, default=1, help="Ardışık portlarda başlatılacak sahte Ollama sayısı (sunucu havuzu denemeleri için)")
+    parser.add_argument("--tokens-per-second", type=float, default=60.0, help="Sahte Ollama'nın üretim hızı")
+    parser.add_argument("--shared-throughput", action="store_true", help="Üretim hızını eşzamanlı istekler arasında paylaştır (tek CPU'lu sunucu gibi)")
+    parser.add_argument("--latency", type=float, default=0.0, help="Her Ollama yanıtının ilk parçasından önce eklenen gecikme (saniye)")
+    parser.add_argument("--slow-every", type=int, default=0, help="Her n. Ollama isteğine --slow-seconds kadar ek gecikme ekle")
+    parser.add_argument("--slow-seconds", type=float, default=0.0)
+    parser.add_argument("--image-port", type=int, default=8808)
+    parser.add_argument("--image-latency", type=float, default=2.0, help="Görsel isteği başına yapay gecikme (saniye)")
+    args = parser.parse_args()
+    ollamas = [
+        FakeOllamaServer(tokens_per_second=args.tokens_per_second, shared_throughput=args.shared_throughput, latency_seconds=args.latency,
+                         slow_every=args.slow_every, slow_seconds=args.slow_seconds, port=args.ollama_port + number).start()
+        for number in range(args.ollama_count)
+    ]
+    image = FakeImageServer(latency_seconds=args.image_latency, port=args.image_port)
+    for ollama in ollamas:
+        print(f"Sahte Ollama: {ollama.url}  ({args.tokens_per_second:g} token/sn, {len(ollama.recorded)} kayıtlı yanıt)")
+    if len(ollamas) > 1:
+        print(f"OLLAMA_HOSTS={','.join(ollama.url for ollama in ollamas)}")
+    print(f"Sahte görsel uç noktası: {image.url}")
+    try:
+        image.serve_forever()
+    except KeyboardInterrupt:
+        image.stop()
+        for ollama in ollamas:
+            ollama.stop()
+
+
+if __name__ == "__main__":
+    main()
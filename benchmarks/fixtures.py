@@ -0,0 +1,108 @@
+# benchmarks/fixtures.py
+# Kıyaslama testlerinde kullanılan sentetik HTML sayfaları.
+# Sayfalar gerçek e-ticaret sitelerinin yapısını taklit eder: büyük satır içi betikler ve stiller,
+# uzun gezinme menüleri, çok sayıda ürün kartı ve kalabalık bir alt bilgi.
+# benchmarks/html/ klasöründeki kaydedilmiş sayfalar (ör. OpenGraph ve JSON-LD içeren tek ürün sayfası)
+# da fikstürlere eklenir.
+import glob
+import os
+import random
+
+SAVED_PAGES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "html")
+
+
+def ecommerce_page(num_products=400, script_kb=300, seed=0):
+    """
+    Belirtilen büyüklükte bir e-ticaret ürün listeleme sayfası üretir (str).
+    """
+    rng = random.Random(seed)
+    words = ["çanta", "deri", "sırt", "laptop", "kalem", "defter", "outdoor", "indirim", "kargo", "bedava",
+             "yeni", "sezon", "koleksiyon", "kampanya", "su geçirmez", "hafif", "dayanıklı", "şık"]
+
+    def sentence(n):
+        return " ".join(rng.choice(words) for _ in range(n)).capitalize() + "."
+
+    script = "var d=" + "[" + ",".join(str(rng.random()) for _ in range(script_kb * 50)) + "];"
+    style = "".join(f".c{i}{{margin:{i % 7}px;color:#{i % 999:03d}}}" for i in range(script_kb * 20))
+    nav = "".join(f'<li><a href="/kategori/{i}">{rng.choice(words).title()}</a></li>' for i in range(150))
+    products = "".join(
+        f'<div class="urun"><h2>{sentence(3)}</h2><p>{sentence(18)}</p>'
+        f'<span class="fiyat">{rng.randint(50, 5000)} TL</span><button>Sepete Ekle</button></div>'
+        for _ in range(num_products)
+    )
+    footer = "".join(f'<a href="/sayfa/{i}">{sentence(2)}</a>' for i in range(200))
+    return (
+        "<!DOCTYPE html><html lang=\"tr\"><head><meta charset=\"utf-8\">"
+        "<title>Çanta Mağazası - Deri ve Sırt Çantaları</title>"
+        "<meta name=\"description\" content=\"Deri, sırt ve laptop çantalarında yeni sezon koleksiyonu.\">"
+        f"<style>{style}</style><script>{script}</script></head><body>"
+        f"<header><nav><ul>{nav}</ul></nav></header>"
+        f"<main><h1>Yeni Sezon Çantalar</h1><p>{sentence(40)}</p>{products}</main>"
+        f"<footer>{footer}</footer><script>{script}</script></body></html>"
+    )
+
+
+def saved_pages():
+    """
+    benchmarks/html/*.html dosyalarını (ad, html_baytları) çiftleri olarak döndürür.
+    """
+    pages = []
+    for path in sorted(glob.glob(os.path.join(SAVED_PAGES_DIR, "*.html"))):
+        with open(path, "rb") as f:
+            pages.append((os.path.splitext(os.path.basename(path))[0], f.read()))
+    return pages
+
+
+def fixture_pages():
+    """
+    Kıyaslamalarda kullanılan (ad, html_baytları) çiftlerini döndürür.
+    """
+    return saved_pages() + [
+        ("kucuk_sayfa", ecommerce_page(num_products=20, script_kb=20, seed=1).encode("utf-8")),
+        ("orta_sayfa", ecommerce_page(num_products=200, script_kb=150, seed=2).encode("utf-8")),
+        ("agir_e_ticaret", ecommerce_page(num_products=1500, script_kb=600, seed=3).encode("utf-8")),
+    ]
+
+
+def catalog_site(num_products=60, per_sitemap=25, lastmods=None, disallowed_every=10):
+    """
+    Sitemap tabanlı katalog taraması için sahte bir site üretir ve {yol: baytlar} döndürür:
+    robots.txt (Sitemap satırı, /hesabim/ için Disallow ve Crawl-delay), sitemap index'i, .xml ve .xml.gz
+    alt sitemap'ler ile ürün sayfaları. Her `disallowed_every`. URL robots.txt ile engelli bir yola işaret eder.
+    Çift numaralı ürünler tüm alanları JSON-LD ile yayımlar (LLM gerekmez), tek numaralılar yalnızca ürün adını.
+    `lastmods` {ürün_no: lastmod} ile belirli ürünlerin lastmod değeri değiştirilebilir.
+    """
+    import gzip
+    import json
+    lastmods = lastmods or {}
+    pages = {"/robots.txt": b"User-agent: *\nDisallow: /hesabim/\nCrawl-delay: 0\nSitemap: /sitemap_index.xml\n"}
+    entries = []
+    for number in range(num_products):
+        path = f"/hesabim/urun-{number}.html" if disallowed_every and number % disallowed_every == disallowed_every - 1 \
+            else f"/urun/urun-{number}.html"
+        entries.append((path, lastmods.get(number, "2026-01-01")))
+        product = {"@context": "https://schema.org", "@type": "Product", "name": f"Deri Sırt Çantası Model {number}"}
+        if number % 2 == 0:
+            product.update(description=f"Model {number}: su geçirmez, hafif ve 15.6 inç laptop bölmeli deri sırt çantası.",
+                           keywords=["deri çanta", "sırt çantası", f"model {number}"])
+        pages[path] = (
+            "<!DOCTYPE html><html lang=\"tr\"><head><meta charset=\"utf-8\">"
+            f"<title>Model {number} - Çanta Mağazası</title><meta property=\"og:type\" content=\"product\">"
+            f"<script type=\"application/ld+json\">{json.dumps(product, ensure_ascii=False)}</script></head><body>"
+            f"<h1>Deri Sırt Çantası Model {number}</h1>"
+            f"<p>Model {number} ({lastmods.get(number, '2026-01-01')}) günlük kullanım ve seyahat için tasarlandı. "
+            "Dayanıklı deri yüzeyi, ayarlanabilir askıları ve gizli cebiyle öne çıkar.</p></body></html>"
+        ).encode("utf-8")
+    index = []
+    for part, start in enumerate(range(0, len(entries), per_sitemap), start=1):
+        urls = "".join(f"<url><loc>{path}</loc><lastmod>{lastmod}</lastmod></url>" for path, lastmod in entries[start:start + per_sitemap])
+        body = f'<?xml version="1.0" encoding="UTF-8"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{urls}</urlset>'.encode("utf-8")
+        # Alt sitemap'lerin biri sıkıştırılmış olarak sunulur
+        path = f"/sitemaps/urunler-{part}.xml" + (".gz" if part % 2 == 0 else "")
+        pages[path] = gzip.compress(body) if path.endswith(".gz") else body
+        index.append(f"<sitemap><loc>{path}</loc></sitemap>")
+    pages["/sitemap_index.xml"] = (
+        '<?xml version="1.0" encoding="UTF-8"?><sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+        f"{''.join(index)}</sitemapindex>"
+    ).encode("utf-8")
+    return pages
@@ -0,0 +1,164 @@
+# bulk_generate.py
+# Streamlit arayüzü olmadan, CSV veya JSONL dosyasındaki ürünler için toplu reklam metni üretir.
+#
+# Kullanım:
+#   python bulk_generate.py urunler.csv -o sonuclar.jsonl --concurrency 4
+#   python bulk_generate.py --catalog --target-audience "25-40 yaş kadınlar"
+#
+# Girdi satırlarında en az "product_name", "product_description" ve "target_audience" alanları bulunmalıdır.
+# Diğer alanlar (ad_platform, tone_of_voice, keywords, num_headlines, num_ctas, num_slogans, id) isteğe bağlıdır.
+# --catalog ile ürünler sitemap taramasıyla doldurulan katalogdan (utils/catalog.py) okunur; kimlik olarak
+# sayfa URL'si kullanılır ve katalogda bulunmayan hedef kitle --target-audience ile verilir.
+# Çıktı dosyası aynı zamanda kontrol noktasıdır: komut yeniden çalıştırıldığında başarıyla
+# üretilmiş kayıtlar atlanır ve kalan ürünlerden devam edilir. Bölümlerinden biri ayrıştırılamayan yanıtlar
+# "error" ile kaydedilir; yeniden çalıştırmada bunlar LLM'e sorulmadan önbellekteki ham yanıttan yeniden ayrıştırılır.
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from config import CATALOG_DB_PATH
+from utils.ad_generation import build_inputs, generate_ad
+from utils.llm_helpers import get_ad_gen_chain, build_output_data, get_ad_generation_cache
+
+
+def read_products(path):
+    """
+    CSV veya JSONL dosyasındaki ürünleri sırayla döndürür. Her ürüne bir kimlik atanır
+    ("id" alanı yoksa satır numarası kullanılır).
+    """
+    if path.endswith(".jsonl"):
+        with open(path, encoding="utf-8") as f:
+            for line_no, line in enumerate(f, start=1):
+                if line.strip():
+                    row = json.loads(line)
+                    yield str(row.get("id", line_no)), row
+    else:
+        with open(path, newline="", encoding="utf-8") as f:
+            for row_no, row in enumerate(csv.DictReader(f), start=1):
+                yield str(row.get("id") or row_no), row
+
+
+def read_catalog_products(db_path, host=None, target_audience=""):
+    """
+    Ürün kataloğundaki başarıyla çıkarılmış ürünleri (URL, satır) olarak döndürür.
+    """
+    from utils.catalog import CatalogStore
+    for product in CatalogStore(db_path).iter_products(host):
+        yield product["url"], dict(product, target_audience=target_audience)
+
+
+def load_completed_ids(output_path):
+    """
+    Önceki çalıştırmalarda başarıyla üretilmiş kayıtların kimliklerini döndürür.
+    """
+    completed = set()
+    if not os.path.exists(output_path):
+        return completed
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue # Yarım yazılmış son satır
+            if "error" not in record:
+                completed.add(record["id"])
+    return completed
+
+
+def generate_one(llm_chain, ad_cache, repair, item_id, row):
+    started = time.perf_counter()
+    try:
+        inputs = build_inputs(row)
+        parsed, response, repair_report, _ = generate_ad(llm_chain, ad_cache, inputs, repair)
+        record = build_output_data(inputs, parsed, response, repair_report)
+        if not parsed.is_complete:
+            # Eksik ayrıştırılan ürün hata sayılır ama LLM'e yeniden sorulmaz; ham yanıt önbellekte kaldığından
+            # komut yeniden çalıştırıldığında yalnızca yeniden ayrıştırılır
+            record["error"] = f"Yanıtta eksik bölümler: {', '.join(parsed.missing_sections)}"
+    except Exception as e:
+        record = {"error": str(e)}
+    record["id"] = item_id
+    record["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+    return record
+
+
+def print_throughput(done, failed, started):
+    elapsed = time.perf_counter() - started
+    items_per_min = done / elapsed * 60 if elapsed > 0 else 0.0
+    print(f"{done} ürün işlendi ({failed} hata) - {elapsed:.1f} sn, {items_per_min:.1f} ürün/dk", file=sys.stderr)
+
+
+def run(products, output_path, concurrency, report_every, use_cache=True, repair=True):
+    llm_chain = get_ad_gen_chain()
+    ad_cache = get_ad_generation_cache() if use_cache else None
+    completed = load_completed_ids(output_path)
+    if completed:
+        print(f"{len(completed)} ürün önceki çalıştırmada tamamlanmış, atlanıyor.", file=sys.stderr)
+
+    pending_items = ((item_id, row) for item_id, row in products if item_id not in completed)
+    done = failed = 0
+    started = time.perf_counter()
+
+    with open(output_path, "a", encoding="utf-8") as out, ThreadPoolExecutor(max_workers=concurrency) as executor:
+        in_flight = set()
+
+        def submit_next():
+            item = next(pending_items, None)
+            if item is not None:
+                in_flight.add(executor.submit(generate_one, llm_chain, ad_cache, repair, *item))
+
+        # Aynı anda en fazla `concurrency` istek Ollama'ya gönderilir; bellekte bekleyen iş birikmez
+        for _ in range(concurrency):
+            submit_next()
+
+        while in_flight:
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                in_flight.discard(future)
+                record = future.result()
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush() # Her kayıt kontrol noktasıdır
+                done += 1
+                if "error" in record:
+                    failed += 1
+                    print(f"[{record['id']}] hata: {record['error']}", file=sys.stderr)
+                if report_every and done % report_every == 0:
+                    print_throughput(done, failed, started)
+                submit_next()
+
+    if not report_every or done % report_every:
+        print_throughput(done, failed, started)
+    return done, failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CSV/JSONL ürün listesinden toplu reklam metni üretir.")
+    parser.add_argument("input", nargs="?", help="Ürünleri içeren .csv veya .jsonl dosyası")
+    parser.add_argument("--catalog", nargs="?", const=CATALOG_DB_PATH, help="Ürünleri dosya yerine ürün kataloğundan oku (varsayılan: %(const)s)")
+    parser.add_argument("--host", help="Katalogdan yalnızca bu sunucunun ürünlerini al (ör. ornek.com)")
+    parser.add_argument("--target-audience", default="", help="Katalog ürünleri için hedef kitle (--catalog ile zorunlu)")
+    parser.add_argument("-o", "--output", default="json_outputs/toplu_reklam_metinleri.jsonl", help="Sonuçların ekleneceği JSONL dosyası (kontrol noktası)")
+    parser.add_argument("-c", "--concurrency", type=int, default=2, help="Aynı anda Ollama'ya gönderilecek istek sayısı")
+    parser.add_argument("--report-every", type=int, default=10, help="Kaç üründe bir verim raporu yazdırılacağı (0: yalnızca sonda)")
+    parser.add_argument("--no-cache", action="store_true", help="Önbelleği kullanmadan her ürünü yeniden üret")
+    parser.add_argument("--no-repair", action="store_true", help="Karakter limitini aşan öğeleri düzeltmeden bırak")
+    args = parser.parse_args()
+    if bool(args.input) == bool(args.catalog):
+        parser.error("bir girdi dosyası veya --catalog verilmelidir (ikisi birden değil)")
+    # Hedef kitle zorunlu bir üretim alanıdır ve katalogda bulunmaz; verilmezse her ürün "Eksik alanlar" hatası alırdı
+    if args.catalog and not args.target_audience.strip():
+        parser.error("--catalog ile --target-audience verilmelidir")
+
+    output_folder = os.path.dirname(args.output)
+    if output_folder:
+        os.makedirs(output_folder, exist_ok=True)
+    products = read_catalog_products(args.catalog, args.host, args.target_audience) if args.catalog else read_products(args.input)
+    run(products, args.output, max(1, args.concurrency), args.report_every, use_cache=not args.no_cache, repair=not args.no_repair)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,11 +3,120 @@
 # Karakter Limiti Sabitleri
 MAX_HEADLINE_CHARS = 30
 MAX_BODY_CHARS = 90
-MAX_TEXT_LENGTH_FOR_ANALYSIS = 3000 # Web içeriği analizinde kullanılacak
+MAX_TEXT_LENGTH_FOR_ANALYSIS = 3000 # Özetleyici kapalıyken web içeriği analizinde kullanılacak ilk karakterler
+AD_REPAIR_MAX_RETRIES = 2 # Limiti aşan öğeler için en fazla kaç kez yeniden istem gönderileceği
+
+# Reklam Seçenekleri
+AD_PLATFORM_OPTIONS = ["Genel", "Google Ads", "Facebook/Instagram", "Twitter/X", "E-posta Pazarlaması"]
+TONE_OF_VOICE_OPTIONS = ["Profesyonel", "Samimi", "Mizahi", "İkna Edici", "Bilgilendirici", "Yaratıcı"]
+
+# Matris Modu Ayarları
+MATRIX_MAX_PARALLEL = 4 # Aynı anda Ollama'ya gönderilecek en fazla istek (sunucuda OLLAMA_NUM_PARALLEL de en az bu kadar olmalıdır)
 
 # LLM Model İsimleri
 GEMMA_MODEL_NAME = "gemma3:4b"
 LLAMA3_MODEL_NAME = "llama3"
 
+# Ollama Ayarları
+OLLAMA_KEEP_ALIVE = "30m" # Modellerin istekler arasında bellekte tutulacağı süre
+
+# LLM Ağ Geçidi Ayarları (tüm oturumların Ollama çağrıları tek kuyruktan geçer)
+LLM_GATEWAY_ENABLED = True # Kapalıysa her çağrı doğrudan Ollama'ya gider (birleştirme, kuyruk ve yük atma olmaz)
+LLM_GATEWAY_MAX_CONCURRENCY = 4 # Model başına Ollama'da aynı anda çalışan en fazla istek (havuzdaki tüm sunucular toplamı)
+LLM_GATEWAY_MODEL_CONCURRENCY = {} # Model bazında farklı sınır (ör. {"llama3": 2}); olmayan modeller yukarıdakini kullanır
+LLM_GATEWAY_MAX_QUEUE_WAIT_SECONDS = 90 # Tahmini veya gerçekleşen kuyruk beklemesi bunu aşarsa istek reddedilir
+
+# Ollama Sunucu Havuzu Ayarları (utils/ollama_pool.py)
+OLLAMA_HOSTS = [] # Birden çok Ollama sunucusu (ör. ["http://10.0.0.5:11434", "http://10.0.0.6:11434"]); boşsa OLLAMA_HOST ortam değişkeni veya yerel sunucu kullanılır. OLLAMA_HOSTS ortam değişkeni (virgülle ayrılmış) önceliklidir
+OLLAMA_HEALTH_CHECK_SECONDS = 10 # Birden çok sunucu varsa her biri bu aralıkla /api/tags ile yoklanır
+OLLAMA_CONNECT_TIMEOUT_SECONDS = 3
+OLLAMA_DEADLINE_SECONDS = 180 # Bir LLM çağrısının sunucuya gönderildiği andan yanıtın sonuna kadar en uzun süresi (kuyruk beklemesi hariç)
+OLLAMA_MODEL_DEADLINE_SECONDS = {} # Model bazında farklı süre (ör. {"llama3": 60})
+OLLAMA_TRANSLATE_DEADLINE_SECONDS = 30 # Tekli çeviri çağrılarının süresi
+OLLAMA_HEDGE_ENABLED = True # Kısa istemin ilk parçası gecikirse aynı istek başka bir sunucuya da gönderilir; önce yanıt veren kullanılır
+OLLAMA_HEDGE_MAX_PROMPT_CHARS = 600 # Bu uzunluğa kadar olan istemler (ör. çeviri) yedek istekle gönderilebilir
+OLLAMA_HEDGE_DELAY_SECONDS = 1.0 # Yeterli ölçüm yokken yedek istekten önce beklenen süre; sonra modelin ilk parça süresinin p95'i kullanılır
+OLLAMA_BREAKER_FAILURES = 3 # Art arda bu kadar hata veren (veya süre sınırını aşan) sunucu devreden çıkarılır
+OLLAMA_BREAKER_COOLDOWN_SECONDS = 30 # Devreden çıkan sunucuya bu süreden sonra tek bir deneme isteği gönderilir
+
 # Hugging Face Ayarları
-HUGGING_FACE_MODEL_NAME = "stabilityai/stable-diffusion-3.5-large"
\ No newline at end of file
+HUGGING_FACE_MODEL_NAME = "stabilityai/stable-diffusion-3.5-large"
+HF_INFERENCE_ENDPOINT = None # Model yerine doğrudan bu adrese istek gönderilir (ör. yerel test sunucusu); HF_INFERENCE_ENDPOINT ortam değişkeni önceliklidir
+IMAGE_SIZE = 512 # Üretilen görsellerin genişliği ve yüksekliği
+
+# Görsel İş Kuyruğu Ayarları
+IMAGE_JOB_WORKERS = 2 # Aynı anda çalışan görsel üretim işi sayısı
+IMAGE_JOB_POLL_SECONDS = 1.0 # Arayüzün iş durumunu yoklama aralığı
+IMAGE_CACHE_DIR = ".cache/images" # Üretilen PNG'lerin tutulduğu klasör
+IMAGE_CACHE_MAX_ENTRIES = 200
+IMAGE_CACHE_MAX_BYTES = 500 * 1024 * 1024 # 500 MB
+
+# URL'den Görsel Yükleme Ayarları
+IMAGE_URL_MAX_BYTES = 20 * 1024 * 1024 # İndirilecek en büyük görsel dosyası (20 MB)
+IMAGE_URL_MAX_PIXELS = 50_000_000 # Küçültülerek açılamayan (JPEG dışı) biçimler için piksel sınırı
+IMAGE_DISPLAY_MAX_SIDE = 1280 # Görsel bu boyuta küçültülerek açılır ve önbelleğe yazılır
+IMAGE_THUMBNAIL_CACHE_DIR = ".cache/thumbnails"
+IMAGE_THUMBNAIL_CACHE_MAX_ENTRIES = 500
+IMAGE_THUMBNAIL_CACHE_MAX_BYTES = 200 * 1024 * 1024 # 200 MB
+
+# Geçmiş Ayarları
+HISTORY_DB_PATH = "json_outputs/reklam_gecmisi.sqlite3" # Üretilen tüm reklam metinlerinin tutulduğu veritabanı
+HISTORY_PAGE_SIZE = 10
+
+# Yakın-Tekrar Tespiti Ayarları (MinHash/LSH)
+DEDUP_NUM_PERM = 64 # MinHash imza uzunluğu
+DEDUP_BANDS = 16 # LSH bant sayısı (DEDUP_NUM_PERM'i tam bölmelidir)
+DEDUP_SHINGLE_SIZE = 3 # Karakter n-gram uzunluğu
+DEDUP_SIMILARITY_THRESHOLD = 0.6 # Bu Jaccard benzerliğinin üzerindeki öğeler yakın tekrar sayılır
+
+# İzleme (Tracing) Ayarları
+TRACE_JSONL_PATH = "logs/traces.jsonl" # Biten her aşama (span) bu dosyaya bir JSON satırı olarak eklenir
+TRACE_JSONL_MAX_BYTES = 20 * 1024 * 1024 # Bu boyutu aşan dosya traces.jsonl.1 olarak saklanıp yenisine geçilir
+TRACE_RECENT_SPANS = 500 # Kenar çubuğu paneli ve yüzdelikler için bellekte tutulan son span sayısı
+TRACE_PANEL_REFRESH_SECONDS = 2.0
+METRICS_PORT = 9464 # Prometheus metin uç noktası (http://127.0.0.1:9464/metrics); None ile kapatılır
+
+# Önbellek Ayarları
+CACHE_DB_PATH = ".cache/reklam_asistani.sqlite3" # Tüm kalıcı önbelleklerin tutulduğu SQLite dosyası
+AD_CACHE_MAX_ENTRIES = 2000
+AD_CACHE_MAX_BYTES = 50 * 1024 * 1024 # 50 MB
+AD_CACHE_TTL_SECONDS = 7 * 24 * 60 * 60 # 7 gün
+TRANSLATION_CACHE_MAX_ENTRIES = 10000
+TRANSLATION_CACHE_TTL_SECONDS = 30 * 24 * 60 * 60 # 30 gün
+WEB_CACHE_MAX_ENTRIES = 500
+WEB_CACHE_TTL_SECONDS = 24 * 60 * 60 # 1 gün; süre dolana kadar sayfalar ETag/Last-Modified ile doğrulanır
+CACHE_STATS_FLUSH_SECONDS = 30 # Okumalarda biriken isabet sayaçları ve erişim zamanları en fazla bu aralıkla diske yazılır
+
+# Web Kazıyıcı Ayarları
+HTTP_TIMEOUT_SECONDS = 10
+HTTP_POOL_CONNECTIONS = 10 # Bağlantı havuzu tutulacak farklı sunucu sayısı
+HTTP_POOL_MAXSIZE = 20 # Sunucu başına açık tutulacak en fazla bağlantı
+SCRAPER_STREAMING = True # Sayfayı akış halinde ayrıştır ve yeterli metin toplanınca indirmeyi durdur
+SCRAPER_MAX_DOWNLOAD_BYTES = 2 * 1024 * 1024 # Akış modunda bir sayfadan indirilecek en fazla bayt (2 MB)
+SCRAPER_CHUNK_BYTES = 16 * 1024
+SCRAPER_MAX_TEXT_CHARS = 20000 # Sayfadan toplanacak en fazla görünür metin; özetleyici analiz metnini bunun içinden seçer
+
+# İçerik Özetleyici Ayarları (sayfa metni -> analiz istemi)
+CONDENSER_ENABLED = True # Kapalıysa analiz istemine sayfa metninin ilk MAX_TEXT_LENGTH_FOR_ANALYSIS karakteri konur
+ANALYSIS_TOKEN_BUDGET = 400 # Analiz istemine konacak sayfa metninin yaklaşık token bütçesi
+
+# Kampanya Analitiği Ayarları
+CAMPAIGN_CSV_PATH = "adresgezgini_meta_veri_raporu_turkce.csv" # json_outputs/adresgezgini_csv.py'nin varsayılan çıktısı
+CAMPAIGN_CACHE_DIR = ".cache/campaign_columns" # CSV'den türetilen sütunsal (memmap) önbellek klasörü
+CAMPAIGN_CSV_CHUNK_ROWS = 500_000 # CSV okunurken belleğe alınacak en fazla satır
+CAMPAIGN_BLOCK_ROWS = 4_000_000 # Toplama sırasında bir seferde işlenecek satır sayısı
+
+# Ürün kataloğu (sitemap taraması) ayarları
+CATALOG_DB_PATH = "json_outputs/urun_katalogu.sqlite3" # Taranan ürün sayfalarının tutulduğu veritabanı
+CATALOG_CONCURRENCY = 8 # Aynı anda işlenen en fazla sayfa (tüm sunucular toplamı)
+CATALOG_PER_HOST_CONCURRENCY = 2 # Bir sunucuya aynı anda gönderilecek en fazla istek
+CATALOG_REQUESTS_PER_SECOND = 2.0 # Sunucu başına istek hızı; robots.txt Crawl-delay daha yavaşsa o uygulanır
+CATALOG_MAX_SITEMAP_DEPTH = 3 # İç içe sitemap index'lerinde inilecek en fazla seviye
+CATALOG_ROBOTS_USER_AGENT = "ReklamMetniAsistani" # robots.txt kuralları bu ada (yoksa "*") göre uygulanır
+
+# HTTP Servisi Ayarları (http_service.py)
+SERVICE_HOST = "127.0.0.1"
+SERVICE_PORT = 8080
+SERVICE_EXECUTOR_WORKERS = 32 # Engelleyen çağrıların (sayfa çekme, LLM, görsel) çalıştığı iş parçacığı sayısı
+SERVICE_MAX_BODY_BYTES = 1024 * 1024 # İstek gövdesinin en büyük boyutu (1 MB)
+SERVICE_RETRY_AFTER_SECONDS = 10 # LLM kuyruğu dolu (503) yanıtlarında istemciye önerilen bekleme
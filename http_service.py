@@ -0,0 +1,321 @@
+# http_service.py
+# Streamlit arayüzü olmadan sayfa çekme, analiz, reklam metni üretimi, çeviri ve görsel üretimini HTTP
+# üzerinden sunan asyncio (aiohttp) servisi. Diğer iç sistemler bu yetenekleri buradan çağırabilir.
+# Engelleyen çağrılar (requests, Ollama, Hugging Face) olay döngüsünü bekletmesin diye iş parçacığı havuzunda
+# çalışır; LLM çağrıları arayüzle aynı LLM ağ geçidinden (utils/llm_gateway.py) geçer. Yardımcıların
+# arayüzde st.error/st.warning ile gösterdiği mesajlar (utils/notify.py) toplanıp yapılandırılmış hata
+# yanıtına dönüştürülür.
+#
+# Kullanım:
+#   python http_service.py --port 8080
+#   curl -X POST localhost:8080/scrape -d '{"url": "https://ornek.com/urun"}'
+#   curl -N -X POST localhost:8080/generate -d '{"product_name": "...", "product_description": "...", "target_audience": "...", "stream": true}'
+#
+# Uç noktalar (istek ve yanıt gövdeleri JSON):
+#   GET  /health     -> {"status": "ok", "llm_gateway": {...}, "ollama_pool": {...}}
+#   POST /scrape     {"url"} -> {"title", "description", "text", "structured"}
+#   POST /analyze    {"url"} veya {"text", "title", "description", "structured"} -> {"product_name", "product_description", "keywords"}
+#   POST /generate   bulk_generate.py satırlarıyla aynı alanlar (utils/ad_generation.build_inputs); isteğe bağlı
+#                    "stream", "use_cache", "repair" bayrakları (JSON true/false).
+#                    stream=false: geçmiş kaydıyla aynı biçimde tek JSON (build_output_data).
+#                    stream=true: NDJSON; model yazdıkça {"token": ...} satırları, sonda {"done": true, "record": {...}}.
+#   POST /translate  {"text"} -> {"translation"}; {"texts": [...]} -> {"translations": [...]}
+#   POST /image      {"prompt"} veya {"product_name"} (Türkçe; önce çevrilir) -> image/png
+# Hatalar {"error": {"type", "message", "notices"}} biçimindedir: 400 geçersiz istek, 502 sayfa/model/görsel
+# servisi hatası, 503 LLM kuyruğu dolu veya Ollama sunucuları süre sınırında yanıt vermedi (Retry-After başlığıyla).
+# İstemci "X-Session-Id" başlığı gönderirse LLM kuyruğundaki adil pay bu kimliğe göre ayrılır (yoksa istemci adresi).
+import argparse
+import asyncio
+import functools
+import io
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from aiohttp import web
+
+from config import (
+    SERVICE_HOST, SERVICE_PORT, SERVICE_EXECUTOR_WORKERS, SERVICE_MAX_BODY_BYTES, SERVICE_RETRY_AFTER_SECONDS
+)
+from image_generator.hf_image_client import (
+    translate_to_english, translate_many_to_english, generate_image_with_hf_client, product_image_prompt
+)
+from utils.ad_generation import build_inputs, generate_ad
+from utils.content_condenser import condense_for_analysis
+from utils.llm_gateway import LLMOverloadedError, get_llm_gateway, session_scope
+from utils.llm_helpers import get_ad_gen_chain, get_ad_generation_cache, build_output_data
+from utils.notify import collect_notices
+from utils.ollama_pool import LLMUnavailableError, get_ollama_pool
+from utils.structured_data import ANALYSIS_FIELDS
+from utils.web_scraper import get_website_content, analyze_website_with_llm
+
+EXECUTOR_KEY = web.AppKey("executor", ThreadPoolExecutor)
+
+_dumps = functools.partial(json.dumps, ensure_ascii=False)
+
+
+class ServiceError(Exception):
+    """
+    İstemciye yapılandırılmış hata yanıtı olarak dönecek hata.
+    """
+
+    def __init__(self, status, error_type, message, notices=()):
+        super().__init__(message)
+        self.status = status
+        self.error_type = error_type
+        self.notices = list(notices)
+
+    def payload(self):
+        return {"error": {"type": self.error_type, "message": str(self), "notices": self.notices}}
+
+
+class ClientDisconnected(Exception):
+    """
+    Akışlı üretimde istemci bağlantıyı kapattığında üretimi durdurmak için on_token içinden yükseltilir.
+    """
+
+
+def _overloaded(message, notices=()):
+    return ServiceError(503, "overloaded", message, notices)
+
+
+def raise_for_notices(notices, error_type, message):
+    """
+    Yardımcının topladığı bildirimlerden hata yanıtı üretir: LLM kuyruğu doluysa veya Ollama sunucuları süre
+    sınırında yanıt vermediyse 503, diğer durumlarda 502.
+    """
+    for notice in notices:
+        if notice.get("exception") in (LLMOverloadedError.__name__, LLMUnavailableError.__name__):
+            raise _overloaded(notice["message"], notices)
+    raise ServiceError(502, error_type, message, notices)
+
+
+def _failed(notices):
+    return any(notice["level"] == "error" or "exception" in notice for notice in notices)
+
+
+async def offload(request, func, *args):
+    """
+    Engelleyen `func(*args)` çağrısını iş parçacığı havuzunda çalıştırır; (sonuç, bildirimler) döndürür.
+    Çağrı istemcinin LLM kuyruğu oturumunda çalışır; yükselen hatalar ServiceError'a dönüştürülür.
+    """
+    session_id = f"http:{request.headers.get('X-Session-Id') or request.remote}"
+
+    def call():
+        with session_scope(session_id), collect_notices() as notices:
+            try:
+                return func(*args), notices
+            except LLMOverloadedError as e:
+                raise _overloaded(str(e), notices)
+            except (ServiceError, ClientDisconnected):
+                raise
+            except Exception as e:
+                raise ServiceError(502, "upstream_error", f"{e.__class__.__name__}: {e}", notices)
+
+    return await asyncio.get_running_loop().run_in_executor(request.app[EXECUTOR_KEY], call)
+
+
+async def read_json(request, *required):
+    try:
+        body = await request.json()
+    except (json.JSONDecodeError, UnicodeDecodeError) as e:
+        raise ServiceError(400, "invalid_json", f"İstek gövdesi geçerli bir JSON değil: {e}")
+    if not isinstance(body, dict):
+        raise ServiceError(400, "invalid_json", "İstek gövdesi bir JSON nesnesi olmalıdır.")
+    missing = [field for field in required if not body.get(field)]
+    if missing:
+        raise ServiceError(400, "missing_fields", f"Eksik alanlar: {', '.join(missing)}")
+    return body
+
+
+def read_flag(body, name, default):
+    """
+    İsteğe bağlı bir bayrağı okur; yalnızca JSON true/false kabul edilir ("false" gibi dizgiler 400 döner).
+    """
+    value = body.get(name, default)
+    if not isinstance(value, bool):
+        raise ServiceError(400, "invalid_field", f"\"{name}\" alanı true veya false olmalıdır.")
+    return value
+
+
+@web.middleware
+async def error_middleware(request, handler):
+    try:
+        return await handler(request)
+    except ServiceError as e:
+        headers = {"Retry-After": str(SERVICE_RETRY_AFTER_SECONDS)} if e.status == 503 else None
+        return web.json_response(e.payload(), status=e.status, headers=headers, dumps=_dumps)
+
+
+async def health(request):
+    gateway = get_llm_gateway()
+    return web.json_response({
+        "status": "ok",
+        "llm_gateway": gateway.stats() if gateway is not None else None,
+        "ollama_pool": get_ollama_pool().stats(),
+    }, dumps=_dumps)
+
+
+async def scrape_page(request, url):
+    (title, description, text, structured), notices = await offload(request, get_website_content, url)
+    if not text:
+        raise_for_notices(notices, "scrape_failed", "Web sitesi içeriği çekilemedi.")
+    return title, description, text, structured
+
+
+async def scrape(request):
+    body = await read_json(request, "url")
+    title, description, text, structured = await scrape_page(request, body["url"])
+    return web.json_response({"title": title, "description": description, "text": text, "structured": structured}, dumps=_dumps)
+
+
+def _analyze(title, description, text, structured):
+    return analyze_website_with_llm(condense_for_analysis(title, description, text), structured)
+
+
+async def analyze(request):
+    body = await read_json(request)
+    if body.get("url"):
+        title, description, text, structured = await scrape_page(request, body["url"])
+    elif body.get("text"):
+        title, description, text = str(body.get("title") or ""), str(body.get("description") or ""), str(body["text"])
+        structured = body["structured"] if isinstance(body.get("structured"), dict) else None
+    else:
+        raise ServiceError(400, "missing_fields", "\"url\" veya \"text\" alanı verilmelidir.")
+    result, notices = await offload(request, _analyze, title, description, text, structured)
+    if _failed(notices) or not any(result):
+        raise_for_notices(notices, "analyze_failed", "Sayfa içeriği analiz edilemedi.")
+    return web.json_response(dict(zip(ANALYSIS_FIELDS, result)), dumps=_dumps)
+
+
+def _generate_record(inputs, use_cache, repair, on_token=None):
+    ad_cache = get_ad_generation_cache() if use_cache else None
+    parsed, response, repair_report, from_cache = generate_ad(get_ad_gen_chain(), ad_cache, inputs, repair, on_token)
+    return dict(build_output_data(inputs, parsed, response, repair_report), from_cache=from_cache)
+
+
+def _stop_generation(disconnected, task):
+    disconnected.set()
+    # Sonuç artık kimseye dönmeyecek; görevin hatası (ClientDisconnected) burada alınır
+    task.add_done_callback(lambda done: done.cancelled() or done.exception())
+
+
+async def generate(request):
+    body = await read_json(request)
+    try:
+        inputs = build_inputs(body)
+    except (ValueError, TypeError) as e:
+        raise ServiceError(400, "invalid_inputs", str(e))
+    use_cache, repair, stream = read_flag(body, "use_cache", True), read_flag(body, "repair", True), read_flag(body, "stream", False)
+    if not stream:
+        record, _ = await offload(request, _generate_record, inputs, use_cache, repair)
+        return web.json_response(record, dumps=_dumps)
+
+    # Parçalar üretim iş parçacığından olay döngüsündeki kuyruğa aktarılır; üretim bitince None gelir
+    loop = asyncio.get_running_loop()
+    tokens = asyncio.Queue()
+    disconnected = threading.Event()
+
+    def on_token(chunk):
+        # İstemci gittiyse akış yarıda kesilir; Ollama bağlantısı kapanır ve üretim durur
+        if disconnected.is_set():
+            raise ClientDisconnected()
+        loop.call_soon_threadsafe(tokens.put_nowait, chunk)
+
+    task = asyncio.ensure_future(offload(request, _generate_record, inputs, use_cache, repair, on_token))
+    task.add_done_callback(lambda _: tokens.put_nowait(None))
+
+    chunk = await tokens.get()
+    if chunk is None:
+        await task # İlk parçadan önce oluşan hata (ör. kuyruk dolu) normal hata yanıtı olarak döner
+    response = web.StreamResponse(headers={"Content-Type": "application/x-ndjson; charset=utf-8"})
+    await response.prepare(request)
+    try:
+        while chunk is not None:
+            await response.write((_dumps({"token": chunk}) + "\n").encode("utf-8"))
+            chunk = await tokens.get()
+    except ConnectionResetError:
+        _stop_generation(disconnected, task)
+        return response
+    except asyncio.CancelledError:
+        _stop_generation(disconnected, task)
+        raise
+    try:
+        record, _ = await task
+        final = {"done": True, "record": record}
+    except ServiceError as e:
+        final = dict(e.payload(), done=True) # Başlıklar gönderildiğinden hata son satırda bildirilir
+    await response.write((_dumps(final) + "\n").encode("utf-8"))
+    await response.write_eof()
+    return response
+
+
+async def translate(request):
+    body = await read_json(request)
+    if isinstance(body.get("texts"), list):
+        translations, notices = await offload(request, translate_many_to_english, [str(text) for text in body["texts"]])
+        if _failed(notices) and not any(translations):
+            raise_for_notices(notices, "translate_failed", "Metinler çevrilemedi.")
+        return web.json_response({"translations": translations, "notices": notices}, dumps=_dumps)
+    if not body.get("text"):
+        raise ServiceError(400, "missing_fields", "\"text\" veya \"texts\" alanı verilmelidir.")
+    translation, notices = await offload(request, translate_to_english, str(body["text"]))
+    if _failed(notices):
+        # translate_to_english hata durumunda metni çevirmeden döndürür; servis bunu hata olarak bildirir
+        raise_for_notices(notices, "translate_failed", "Metin çevrilemedi.")
+    return web.json_response({"translation": translation}, dumps=_dumps)
+
+
+def _render_png(prompt):
+    image = generate_image_with_hf_client(prompt)
+    if image is None:
+        return None
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+async def image(request):
+    body = await read_json(request)
+    prompt = body.get("prompt")
+    if not prompt and body.get("product_name"):
+        translation, notices = await offload(request, translate_to_english, str(body["product_name"]))
+        if _failed(notices):
+            raise_for_notices(notices, "translate_failed", "Ürün adı çevrilemedi.")
+        prompt = product_image_prompt(translation)
+    if not prompt:
+        raise ServiceError(400, "missing_fields", "\"prompt\" veya \"product_name\" alanı verilmelidir.")
+    png, notices = await offload(request, _render_png, str(prompt))
+    if png is None:
+        raise_for_notices(notices, "image_failed", "Görsel oluşturulamadı.")
+    return web.Response(body=png, content_type="image/png")
+
+
+def create_app(executor_workers=SERVICE_EXECUTOR_WORKERS):
+    app = web.Application(middlewares=[error_middleware], client_max_size=SERVICE_MAX_BODY_BYTES)
+    app[EXECUTOR_KEY] = ThreadPoolExecutor(max_workers=executor_workers, thread_name_prefix="http_service")
+
+    async def shutdown_executor(app):
+        app[EXECUTOR_KEY].shutdown(wait=False, cancel_futures=True)
+
+    app.on_cleanup.append(shutdown_executor)
+    app.router.add_get("/health", health)
+    app.router.add_post("/scrape", scrape)
+    app.router.add_post("/analyze", analyze)
+    app.router.add_post("/generate", generate)
+    app.router.add_post("/translate", translate)
+    app.router.add_post("/image", image)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sayfa çekme, analiz, reklam metni, çeviri ve görsel üretimini HTTP ile sunar.")
+    parser.add_argument("--host", default=SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=SERVICE_PORT)
+    parser.add_argument("--workers", type=int, default=SERVICE_EXECUTOR_WORKERS, help="Engelleyen çağrılar için iş parçacığı sayısı")
+    args = parser.parse_args()
+    web.run_app(create_app(max(1, args.workers)), host=args.host, port=args.port, access_log=None)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,21 +1,67 @@
 # image_generator/hf_image_client.py
-import requests
 import streamlit as st
+import hashlib
 import os
-from huggingface_hub import InferenceClient # type: ignore
-from PIL import Image
+import re
 from io import BytesIO
-from langchain_ollama import OllamaLLM
+# huggingface_hub, PIL ve requests görsel özellikleri ilk kullanıldığında içe aktarılır
 
 # config.py'den sabitleri import edin
-from config import LLAMA3_MODEL_NAME, HUGGING_FACE_MODEL_NAME
+from config import (
+    LLAMA3_MODEL_NAME, HUGGING_FACE_MODEL_NAME, HF_INFERENCE_ENDPOINT, IMAGE_SIZE,
+    CACHE_DB_PATH, TRANSLATION_CACHE_MAX_ENTRIES, TRANSLATION_CACHE_TTL_SECONDS,
+    HTTP_TIMEOUT_SECONDS, SCRAPER_CHUNK_BYTES, IMAGE_URL_MAX_BYTES, IMAGE_URL_MAX_PIXELS, IMAGE_DISPLAY_MAX_SIDE,
+    IMAGE_THUMBNAIL_CACHE_DIR, IMAGE_THUMBNAIL_CACHE_MAX_ENTRIES, IMAGE_THUMBNAIL_CACHE_MAX_BYTES,
+    OLLAMA_TRANSLATE_DEADLINE_SECONDS
+)
+from utils.llm_helpers import get_llama3_llm
+from utils.llm_gateway import LLMOverloadedError
+from utils.ollama_pool import llm_deadline
+from utils.notify import show_error, show_warning
+from utils.disk_cache import SQLiteCache, evict_lru_files
+from utils.web_scraper import get_http_session
+from utils.tracing import span
 
+# Toplu çeviri çıktısındaki "[n] çeviri" satırları
+_BATCH_LINE_PATTERN = re.compile(r"^\s*\[(\d+)\]\s*(.*)$")
+
+def inference_endpoint():
+    """
+    Yapılandırılmış özel çıkarım uç noktasını döndürür; yoksa None (Hugging Face modeli kullanılır).
+    """
+    return os.getenv("HF_INFERENCE_ENDPOINT") or HF_INFERENCE_ENDPOINT
+
+def image_model_id():
+    """
+    Görselleri üreten modeli tanımlayan metin (önbellek anahtarları ve arayüz için).
+    """
+    return inference_endpoint() or HUGGING_FACE_MODEL_NAME
+
+HF_TOKEN_MISSING_WARNING = "Hugging Face görsel oluşturma için bir API token'ına ihtiyacınız var. Hugging Face web sitesinden alıp terminalinizde `export HF_TOKEN='hf_...'` komutuyla ayarlayabilirsiniz."
+
+def hf_image_generation_configured():
+    """
+    HF_TOKEN veya özel uç nokta ayarlıysa True döndürür, değilse uyarı gösterir.
+    İstemciyi oluşturmaz; huggingface_hub yalnızca ilk görsel isteğinde yüklenir.
+    """
+    if inference_endpoint() or os.getenv("HF_TOKEN"):
+        return True
+    show_warning(HF_TOKEN_MISSING_WARNING)
+    return False
+
+@st.cache_resource(show_spinner=False)
 def get_hf_inference_client():
     """
     Hugging Face InferenceClient'ı başlatır ve döndürür.
+    İstemci süreç genelinde tek kez oluşturulur ve tüm oturumlarda paylaşılır.
     """
+    from huggingface_hub import InferenceClient # type: ignore
     hf_token = os.getenv("HF_TOKEN")
+    endpoint = inference_endpoint()
 
+    if endpoint:
+        # Özel uç nokta (ör. yerel test sunucusu) için token zorunlu değildir
+        return InferenceClient(base_url=endpoint, token=hf_token)
     if hf_token:
         try:
             hf_client = InferenceClient(
@@ -24,55 +70,152 @@ def get_hf_inference_client():
             )
             return hf_client
         except Exception as e:
-            st.error(f"Hugging Face istemcisi başlatılamadı: {e}. HF_TOKEN ortam değişkeninizi kontrol edin.")
+            show_error(f"Hugging Face istemcisi başlatılamadı: {e}. HF_TOKEN ortam değişkeninizi kontrol edin.", e)
             return None
     else:
-        st.warning("Hugging Face görsel oluşturma için bir API token'ına ihtiyacınız var. Hugging Face web sitesinden alıp terminalinizde `export HF_TOKEN='hf_...'` komutuyla ayarlayabilirsiniz.")
+        show_warning(HF_TOKEN_MISSING_WARNING)
         return None
 
+@st.cache_resource(show_spinner=False)
+def get_translation_memory():
+    """
+    Türkçe kaynak metin -> İngilizce çeviri eşlemelerini tutan kalıcı çeviri belleğini döndürür.
+    """
+    return SQLiteCache(
+        CACHE_DB_PATH, "translation",
+        max_entries=TRANSLATION_CACHE_MAX_ENTRIES, ttl_seconds=TRANSLATION_CACHE_TTL_SECONDS
+    )
+
+def _translation_key(text):
+    # Aynı metnin boşluk farklılıkları aynı kayda düşer; model değişirse eski çeviriler kullanılmaz
+    return f"{LLAMA3_MODEL_NAME}:{' '.join(text.split())}"
+
+def _clean_translation(translated_text):
+    translated_text = translated_text.strip()
+    if "\n" in translated_text:
+        translated_text = translated_text.split('\n')[0].strip()
+
+    if translated_text.startswith("English:"):
+        translated_text = translated_text[len("English:"):].strip()
+    return translated_text
+
 def translate_to_english(text_to_translate):
     """
     Verilen Türkçe metni İngilizceye çevirir (Ollama llama3 modeli ile).
+    Daha önce çevrilmiş metinler çeviri belleğinden döndürülür.
     """
     if not text_to_translate:
         return ""
+    memory = get_translation_memory()
+    cached = memory.get(_translation_key(text_to_translate))
+    if cached is not None:
+        with span("translate", cache_hit=True, input_chars=len(text_to_translate)):
+            return cached
     try:
-        llm_translator = OllamaLLM(model=LLAMA3_MODEL_NAME) # config'den model adı kullanıldı
+        llm_translator = get_llama3_llm() # Paylaşılan llama3 istemcisi
         translation_prompt = f"Please translate the following Turkish text to English, provide only the translated text and nothing else:\nTurkish: {text_to_translate}\nEnglish:"
-        translated_text = llm_translator.invoke(translation_prompt).strip()
-
-        if "\n" in translated_text:
-            translated_text = translated_text.split('\n')[0].strip()
-        
-        if translated_text.startswith("English:"):
-            translated_text = translated_text[len("English:"):].strip()
+        # Kısa istem: süre sınırı düşüktür ve havuzda birden çok sunucu varsa yedek istekle gönderilebilir
+        with span("translate", cache_hit=False, input_chars=len(text_to_translate)) as translate_span, llm_deadline(OLLAMA_TRANSLATE_DEADLINE_SECONDS):
+            translated_text = _clean_translation(llm_translator.invoke(translation_prompt, config={"callbacks": translate_span.callbacks()}))
 
+        if translated_text:
+            memory.set(_translation_key(text_to_translate), translated_text)
         return translated_text
+    except LLMOverloadedError as e:
+        show_warning(f"{e} Metin çevrilmeden kullanılacak.", e)
+        return text_to_translate
     except Exception as e:
-        st.warning(f"Çeviri sırasında bir hata oluştu: {e}. '{LLAMA3_MODEL_NAME}' modelinin yüklü olduğundan emin olun.")
+        show_warning(f"Çeviri sırasında bir hata oluştu: {e}. '{LLAMA3_MODEL_NAME}' modelinin yüklü olduğundan emin olun.", e)
         return text_to_translate
 
+def translate_many_to_english(texts):
+    """
+    Birden fazla Türkçe metni tek bir LLM çağrısıyla İngilizceye çevirir ve aynı sırada döndürür.
+    Çeviri belleğinde bulunanlar istemden çıkarılır; yanıtta eksik veya bozuk satırı olan metinler
+    tek tek çevrilir.
+    """
+    memory = get_translation_memory()
+    results = [""] * len(texts)
+    pending = {} # kaynak metin -> sonuçtaki konumları
+    for index, text in enumerate(texts):
+        if not text:
+            continue
+        cached = memory.get(_translation_key(text))
+        if cached is not None:
+            results[index] = cached
+        else:
+            pending.setdefault(text, []).append(index)
 
-def generate_image_with_hf_client(prompt_text):
+    if not pending:
+        return results
+
+    sources = list(pending)
+    translations = {}
+    if len(sources) > 1:
+        numbered = "\n".join(f"[{number}] {' '.join(text.split())}" for number, text in enumerate(sources, start=1))
+        batch_prompt = (
+            "Please translate each of the following numbered Turkish lines to English.\n"
+            "Answer with exactly one line per item in the form \"[number] translation\" and nothing else.\n"
+            f"{numbered}\nEnglish:"
+        )
+        try:
+            with span("translate_batch", items=len(sources)) as batch_span:
+                response = get_llama3_llm().invoke(batch_prompt, config={"callbacks": batch_span.callbacks()})
+            for line in response.splitlines():
+                match = _BATCH_LINE_PATTERN.match(line)
+                if match and 1 <= int(match.group(1)) <= len(sources):
+                    translated_text = _clean_translation(match.group(2))
+                    if translated_text:
+                        translations[sources[int(match.group(1)) - 1]] = translated_text
+        except Exception as e:
+            show_warning(f"Toplu çeviri sırasında bir hata oluştu: {e}. Metinler tek tek çevrilecek.", e)
+
+    for text in sources:
+        if text in translations:
+            memory.set(_translation_key(text), translations[text])
+        else:
+            translations[text] = translate_to_english(text) # Eksik satırlar için tekli çeviri
+        for index in pending[text]:
+            results[index] = translations[text]
+    return results
+
+
+def render_image(prompt_text, width=IMAGE_SIZE, height=IMAGE_SIZE):
     """
-    Hugging Face InferenceClient kullanarak metinden görsel oluşturur.
+    Metinden görsel üretir ve PIL görseli döndürür. Hataları yükseltir; arka plan işlerinde kullanılır.
     """
     hf_client = get_hf_inference_client()
     if hf_client is None:
+        raise RuntimeError("Hugging Face istemcisi başlatılamadı. HF_TOKEN ortam değişkeninizi kontrol edin.")
+    with span("image", model=image_model_id(), width=width, height=height):
+        return hf_client.text_to_image(
+            prompt_text,
+            model=None if inference_endpoint() else HUGGING_FACE_MODEL_NAME, # Özel uç noktada model adresin kendisidir
+            width=width,
+            height=height,
+        )
+
+
+def product_image_prompt(product_name_english):
+    """
+    İngilizce ürün adından reklam görseli istemini oluşturur.
+    """
+    return f"high-quality, realistic advertising image for {product_name_english}, emphasizing its best features, an engaging and professional composition, product photography style"
+
+
+def generate_image_with_hf_client(prompt_text):
+    """
+    Hugging Face InferenceClient kullanarak metinden görsel oluşturur.
+    """
+    if get_hf_inference_client() is None:
         return None
 
     try:
-        image = hf_client.text_to_image(
-            prompt_text,
-            model=HUGGING_FACE_MODEL_NAME, # config'den model adı kullanıldı
-            width=512,
-            height=512,
-        )
-        return image
+        return render_image(prompt_text)
 
     except Exception as e:
-        st.error(f"Görsel API çağrısında hata oluştu: {e}")
-        st.warning(
+        show_error(f"Görsel API çağrısında hata oluştu: {e}", e)
+        show_warning(
             f"'{HUGGING_FACE_MODEL_NAME}' modeliyle görsel oluşturulamadı. Olası nedenler:\n"
             "- Hugging Face API token'ınız (HF_TOKEN) doğru ayarlanmadı veya geçersiz.\n"
             "- Model çok büyük ve genel Inference API'sinde veya belirtilen boyutta çalışmıyor.\n"
@@ -81,18 +224,129 @@ def generate_image_with_hf_client(prompt_text):
         )
         return None
 
+@st.cache_resource(show_spinner=False)
+def get_image_validators():
+    """
+    URL -> (ETag, Last-Modified, küçük görsel dosyası) eşlemesini tutan kalıcı önbelleği döndürür.
+    """
+    os.makedirs(IMAGE_THUMBNAIL_CACHE_DIR, exist_ok=True)
+    return SQLiteCache(CACHE_DB_PATH, "image_validators", max_entries=IMAGE_THUMBNAIL_CACHE_MAX_ENTRIES)
+
+def _open_thumbnail(file_name):
+    if not file_name:
+        return None
+    from PIL import Image
+    path = os.path.join(IMAGE_THUMBNAIL_CACHE_DIR, file_name)
+    try:
+        image = Image.open(path)
+        image.load()
+    except OSError:
+        return None
+    os.utime(path) # LRU sırası için son kullanım zamanı güncellenir
+    return image
+
+def _read_limited(response, max_bytes):
+    """
+    Yanıt gövdesini en fazla `max_bytes` bayt okur; sınır aşılırsa ValueError yükseltir.
+    """
+    buffer = BytesIO()
+    for chunk in response.iter_content(chunk_size=SCRAPER_CHUNK_BYTES):
+        buffer.write(chunk)
+        if buffer.tell() > max_bytes:
+            raise ValueError(f"Görsel dosyası {max_bytes // (1024 * 1024)} MB sınırını aşıyor.")
+    buffer.seek(0)
+    return buffer
+
+def decode_thumbnail(data, max_side=IMAGE_DISPLAY_MAX_SIDE):
+    """
+    Görseli gösterim boyutuna küçülterek açar. JPEG'ler draft() ile doğrudan küçük ölçekte çözülür;
+    thumbnail() önce reduce() ile tam sayı katlarıyla küçültüp kalanını yeniden örnekler.
+    """
+    from PIL import Image
+    image = Image.open(data)
+    if image.format != "JPEG" and image.width * image.height > IMAGE_URL_MAX_PIXELS:
+        raise ValueError(f"Görsel çok büyük ({image.width}x{image.height}); en fazla {IMAGE_URL_MAX_PIXELS:,} piksel desteklenir.")
+    scale = min(1.0, max_side / max(image.size))
+    target_size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+    if image.format == "JPEG":
+        # JPEG, hedef boyuttan küçük olmayan en küçük 1/2, 1/4 veya 1/8 ölçekte çözülür
+        image.draft("RGB" if image.mode != "L" else "L", target_size)
+    else:
+        image = _to_displayable_mode(image) # Paletli görseller yeniden örneklemeden önce dönüştürülmelidir
+    image.thumbnail(target_size, reducing_gap=2.0)
+    return _to_displayable_mode(image)
+
+def _to_displayable_mode(image):
+    if image.mode in ("RGB", "RGBA", "L"):
+        return image
+    return image.convert("RGBA" if "transparency" in image.info or image.mode in ("LA", "PA") else "RGB")
+
+def _save_thumbnail(image, key):
+    # Saydamlık varsa PNG, yoksa daha küçük olan JPEG olarak saklanır
+    file_name = f"{key}.png" if image.mode == "RGBA" else f"{key}.jpg"
+    path = os.path.join(IMAGE_THUMBNAIL_CACHE_DIR, file_name)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    image.save(temp_path, format="PNG" if file_name.endswith(".png") else "JPEG", quality=90)
+    os.replace(temp_path, path)
+    evict_lru_files(IMAGE_THUMBNAIL_CACHE_DIR, (".png", ".jpg"), IMAGE_THUMBNAIL_CACHE_MAX_ENTRIES, IMAGE_THUMBNAIL_CACHE_MAX_BYTES)
+    return file_name
+
 def load_image_from_url(url):
     """
     Verilen URL'den bir görseli yükler.
+    İndirme zaman aşımı ve bayt sınırıyla akış halinde yapılır; görsel gösterim boyutuna küçültülerek
+    açılır ve URL + ETag ile diskte önbelleğe alınır. Değişmemiş görseller 304 yanıtıyla önbellekten döner.
     """
+    import requests
+    validators = get_image_validators()
+    known = validators.get(url) or {}
+    if not os.path.isfile(os.path.join(IMAGE_THUMBNAIL_CACHE_DIR, known.get("thumbnail") or "")):
+        known = {} # Küçük görsel silinmişse koşulsuz olarak yeniden indirilir
+    conditional_headers = {}
+    if known.get("etag"):
+        conditional_headers["If-None-Match"] = known["etag"]
+    if known.get("last_modified"):
+        conditional_headers["If-Modified-Since"] = known["last_modified"]
     try:
-        response = requests.get(url, stream=True)
-        response.raise_for_status()
-        image = Image.open(BytesIO(response.content))
-        return image
+        with get_http_session().get(url, stream=True, timeout=HTTP_TIMEOUT_SECONDS, headers=conditional_headers) as response:
+            if response.status_code == 304:
+                cached_image = _open_thumbnail(known["thumbnail"])
+                if cached_image is None:
+                    raise ValueError("Önbellekteki küçük görsel okunamadı; lütfen tekrar deneyin.")
+                return cached_image
+            return _download_image(url, response, validators)
     except requests.exceptions.RequestException as e:
-        st.error(f"URL'ye erişilemedi veya görsel indirilemedi: {e}. URL'nin doğru olduğundan ve internet bağlantınızın olduğundan emin olun.")
+        show_error(f"URL'ye erişilemedi veya görsel indirilemedi: {e}. URL'nin doğru olduğundan ve internet bağlantınızın olduğundan emin olun.", e)
         return None
     except Exception as e:
-        st.error(f"Görsel dosyası açılamadı veya geçerli bir görsel formatı değil: {e}.")
-        return None
\ No newline at end of file
+        show_error(f"Görsel dosyası açılamadı veya geçerli bir görsel formatı değil: {e}.", e)
+        return None
+
+def _download_image(url, response, validators):
+    response.raise_for_status()
+    content_type = response.headers.get("Content-Type", "")
+    if content_type and not content_type.lower().startswith("image/"):
+        raise ValueError(f"URL bir görsel döndürmüyor (Content-Type: {content_type})")
+    content_length = response.headers.get("Content-Length")
+    if content_length and content_length.isdigit() and int(content_length) > IMAGE_URL_MAX_BYTES:
+        raise ValueError(f"Görsel dosyası {IMAGE_URL_MAX_BYTES // (1024 * 1024)} MB sınırını aşıyor ({int(content_length) // (1024 * 1024)} MB).")
+
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if etag or last_modified:
+        key = hashlib.sha256(f"{url}\n{etag}\n{last_modified}".encode("utf-8")).hexdigest()
+        # Sunucu koşullu isteği desteklemese de aynı sürümün küçük görseli varsa gövde okunmaz
+        for file_name in (f"{key}.jpg", f"{key}.png"):
+            cached_image = _open_thumbnail(file_name) if os.path.exists(os.path.join(IMAGE_THUMBNAIL_CACHE_DIR, file_name)) else None
+            if cached_image is not None:
+                validators.set(url, {"etag": etag, "last_modified": last_modified, "thumbnail": file_name})
+                return cached_image
+        data = _read_limited(response, IMAGE_URL_MAX_BYTES)
+    else:
+        data = _read_limited(response, IMAGE_URL_MAX_BYTES)
+        key = hashlib.sha256(url.encode("utf-8") + b"\n" + hashlib.sha256(data.getbuffer()).digest()).hexdigest()
+
+    image = decode_thumbnail(data)
+    file_name = _save_thumbnail(image, key)
+    validators.set(url, {"etag": etag, "last_modified": last_modified, "thumbnail": file_name})
+    return image
@@ -0,0 +1,179 @@
+# image_generator/image_jobs.py
+# Arka planda çalışan görsel üretim kuyruğu.
+# submit() hemen bir iş kimliği döndürür; görsel, iş parçacığı havuzunda üretilir ve PNG olarak disk
+# önbelleğine (istem + model + boyut özetiyle adlandırılır) yazılır. Aynı anahtarla devam eden bir iş
+# varsa yeni iş açılmaz, mevcut işin kimliği döner; önbellekte bulunan görseller hiç üretilmez.
+# Önbellek, dosya sayısı veya toplam boyut sınırı aşıldığında en uzun süredir kullanılmayanları siler.
+import hashlib
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+import streamlit as st
+
+from config import IMAGE_SIZE, IMAGE_JOB_WORKERS, IMAGE_CACHE_DIR, IMAGE_CACHE_MAX_ENTRIES, IMAGE_CACHE_MAX_BYTES
+from image_generator.hf_image_client import render_image, image_model_id
+from utils.disk_cache import evict_lru_files
+
+# Bellekte tutulan en fazla bitmiş iş kaydı (dosyalar diskte kalmaya devam eder)
+_MAX_FINISHED_JOBS = 500
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+
+
+def image_cache_key(prompt, model, width, height):
+    normalized_prompt = " ".join(prompt.split())
+    return hashlib.sha256(f"{model}\n{width}x{height}\n{normalized_prompt}".encode("utf-8")).hexdigest()
+
+
+@dataclass
+class ImageJob:
+    """
+    Bir görsel üretim işinin durumu.
+    """
+    job_id: str
+    key: str
+    prompt: str
+    model: str
+    width: int
+    height: int
+    status: str = JOB_QUEUED
+    image_path: str = None
+    error: str = None
+    from_cache: bool = False
+    created_at: float = field(default_factory=time.time)
+    started_at: float = None
+    finished_at: float = None
+
+    @property
+    def finished(self):
+        return self.status in (JOB_DONE, JOB_FAILED)
+
+    @property
+    def elapsed_seconds(self):
+        return (self.finished_at or time.time()) - self.created_at
+
+
+class ImageJobQueue:
+    """
+    Görsel üretim işlerini iş parçacığı havuzunda çalıştıran ve sonuçları PNG olarak önbelleğe yazan kuyruk.
+    `render` (istem, genişlik, yükseklik) -> PIL görseli döndüren bir çağrılabilirdir.
+    """
+
+    def __init__(self, cache_dir=IMAGE_CACHE_DIR, workers=IMAGE_JOB_WORKERS, max_entries=IMAGE_CACHE_MAX_ENTRIES,
+                 max_bytes=IMAGE_CACHE_MAX_BYTES, render=render_image, model=None):
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.render = render
+        self.model = model
+        os.makedirs(cache_dir, exist_ok=True)
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="image-job")
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()
+        self._in_flight = {} # önbellek anahtarı -> devam eden işin kimliği
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.png")
+
+    def submit(self, prompt, width=IMAGE_SIZE, height=IMAGE_SIZE):
+        """
+        İşi kuyruğa ekler ve kimliğini hemen döndürür.
+        """
+        model = self.model or image_model_id()
+        key = image_cache_key(prompt, model, width, height)
+        with self._lock:
+            if key in self._in_flight:
+                return self._in_flight[key]
+            job = ImageJob(uuid.uuid4().hex, key, prompt, model, width, height)
+            path = self._path(key)
+            if os.path.exists(path):
+                os.utime(path) # LRU sırası için son kullanım zamanı güncellenir
+                job.status, job.image_path, job.from_cache = JOB_DONE, path, True
+                job.started_at = job.finished_at = time.time()
+            else:
+                self._in_flight[key] = job.job_id
+            self._remember(job)
+        if not job.finished:
+            self._executor.submit(self._run, job)
+        return job.job_id
+
+    def _remember(self, job):
+        self._jobs[job.job_id] = job
+        while len(self._jobs) > _MAX_FINISHED_JOBS:
+            oldest_id, oldest = next(iter(self._jobs.items()))
+            if not oldest.finished:
+                break
+            del self._jobs[oldest_id]
+
+    def _run(self, job):
+        job.status, job.started_at = JOB_RUNNING, time.time()
+        try:
+            image = self.render(job.prompt, job.width, job.height)
+            path = self._path(job.key)
+            temp_path = f"{path}.{job.job_id}.tmp"
+            image.save(temp_path, format="PNG")
+            os.replace(temp_path, path) # Okuyucular yarım yazılmış dosya görmez
+            job.image_path = path
+            job.status = JOB_DONE
+        except Exception as e:
+            job.error = str(e) or e.__class__.__name__
+            job.status = JOB_FAILED
+        finally:
+            job.finished_at = time.time()
+            with self._lock:
+                self._in_flight.pop(job.key, None)
+        if job.status == JOB_DONE:
+            self._evict()
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def wait(self, job_id, timeout=None, poll_seconds=0.05):
+        """
+        İş bitene kadar (veya zaman aşımına kadar) bekler ve işi döndürür.
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        job = self.get(job_id)
+        while job is not None and not job.finished and (deadline is None or time.time() < deadline):
+            time.sleep(poll_seconds)
+        return job
+
+    def load_image(self, job):
+        """
+        Bitmiş işin görselini açar; dosya bu arada önbellekten silindiyse None döndürür.
+        """
+        from PIL import Image
+        try:
+            with Image.open(job.image_path) as image:
+                image.load()
+                return image
+        except (OSError, TypeError):
+            return None
+
+    def _evict(self):
+        evict_lru_files(self.cache_dir, (".png",), self.max_entries, self.max_bytes)
+
+    def stats(self):
+        with self._lock:
+            jobs = list(self._jobs.values())
+        counts = {status: 0 for status in (JOB_QUEUED, JOB_RUNNING, JOB_DONE, JOB_FAILED)}
+        for job in jobs:
+            counts[job.status] += 1
+        return counts
+
+
+@st.cache_resource(show_spinner=False)
+def get_image_job_queue():
+    """
+    Süreç genelinde paylaşılan görsel iş kuyruğunu döndürür; işler Streamlit yeniden çalıştırmalarından etkilenmez.
+    """
+    return ImageJobQueue()
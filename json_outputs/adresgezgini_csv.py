@@ -1,39 +1,55 @@
+# json_outputs/adresgezgini_csv.py
+# Looker Studio raporu için Meta (Instagram/Facebook) kampanya verisine benzeyen sentetik CSV üretir.
+#
+# Tüm sütunlar NumPy dizileri olarak parça parça (chunk) üretilir ve CSV'ye sabit boyutlu parçalar
+# halinde yazılır; bellek kullanımı satır sayısından bağımsızdır. Aynı tohum (seed) aynı veriyi üretir.
+#
+# Kullanım:
+#   python json_outputs/adresgezgini_csv.py                      # 2000 satır, varsayılan dosya
+#   python json_outputs/adresgezgini_csv.py --rows 10000000 --seed 42 --chunk-rows 500000
+#   python json_outputs/adresgezgini_csv.py --rows 1000000 --parquet rapor.parquet   # pyarrow gerekir
+import argparse
 import csv
-import random
-from datetime import datetime, timedelta
-from faker import Faker # type: ignore # Faker kütüphanesini kullanmak için pip install Faker yapmanız gerekebilir
+import datetime
+import time
 
-fake = Faker()
+import numpy as np
 
-# Kategorik sütunlar için olası değerleri tanımlayın
-platforms = ["Instagram", "Facebook"] # Sadece Instagram ve Facebook olarak güncellendi
-genders = ["Kadın", "Erkek"] # Zaten doğruydu, teyit edildi
-impression_devices = ["ipad", "iphone", "android", "desktop", "other"] # Belirtilen cihazlar olarak güncellendi
+# Kategorik sütunlar için olası değerleri ve ağırlıklarını tanımlayın
+platforms = ["Instagram", "Facebook"] # Sadece Instagram ve Facebook
+genders = ["Kadın", "Erkek"]
+# Cinsiyet dağılımı (pasta grafiğe göre erkek ~%70, kadın ~%30)
+gender_weights = [0.286, 0.714]
+impression_devices = ["ipad", "iphone", "android", "desktop", "other"]
+# Cihaz dağılımı (iPhone gösterimleri Android tabletten daha yüksek)
+device_weights = [0.15, 0.35, 0.25, 0.15, 0.10]
 campaign_names = [
     "TR-17.06-Web Sitesi",
     "-17.06-Web Sitesi",
     "-13.06-Bilinirlik",
     "TR-13.06-Arama",
     "TR-13.06-Dönüşüm",
-    "Global-Marka-Farkındalığı", 
+    "Global-Marka-Farkındalığı",
     "AB-Yeni-Ürün-Lansmanı",
     "TR-Yaz-Kampanyası",
     "US-Mobil-Uygulama"
 ]
+campaign_weights = [0.1, 0.1, 0.15, 0.15, 0.15, 0.1, 0.1, 0.075, 0.075]
 regions = [
     "Şamotokrzyski Voyvodalığı",
     "Ile-de-France",
     "Łódź Voyvodalığı",
-    "Bilinmiyor", 
+    "Bilinmiyor",
     "İzmir İli",
-    "İstanbul", 
+    "İstanbul",
     "Ankara",
     "Berlin",
     "Londra",
     "New York"
 ]
+region_weights = [0.08, 0.08, 0.15, 0.1, 0.15, 0.15, 0.1, 0.07, 0.07, 0.05]
 
-# Looker Studio alanlarına göre TÜRKÇE başlıkları tanımlayın
+# Looker Studio alanlarına göre TÜRKÇE başlıklar
 header = [
     "Platform",
     "Tarih",
@@ -48,79 +64,121 @@ header = [
     "Frekans"
 ]
 
-# Oluşturulacak satır sayısı (veri setinin büyüklüğü)
-num_rows = 2000 # 2000 satır, dashboard'daki özetleri oluşturmak için yeterli olmalı
-
-# Veri oluşturma
-data = []
-for _ in range(num_rows):
-    platform = random.choice(platforms)
-    
-    # Son 90 gün içinde rastgele tarihler
-    start_date = datetime.now() - timedelta(days=90)
-    end_date = datetime.now()
-    date = fake.date_between(start_date=start_date, end_date=end_date).strftime("%Y-%m-%d")
-
-    # Kampanya isimleri için ağırlıklı seçim
-    campaign = random.choices(campaign_names, weights=[0.1, 0.1, 0.15, 0.15, 0.15, 0.1, 0.1, 0.075, 0.075], k=1)[0]
-    
-    # Cinsiyet dağılımı (pasta grafiğe göre erkek ~%70, kadın ~%30)
-    gender = random.choices(genders, weights=[0.286, 0.714], k=1)[0] 
-    
-    # Cihaz dağılımı (iPhone gösterimleri Android tabletten daha yüksek, yeni listeye göre ağırlıklar ayarlandı)
-    # ipad, iphone, android, desktop, other
-    device = random.choices(impression_devices, weights=[0.15, 0.35, 0.25, 0.15, 0.10], k=1)[0] 
-    
-    # Bölge dağılımı
-    region = random.choices(regions, weights=[0.08, 0.08, 0.15, 0.1, 0.15, 0.15, 0.1, 0.07, 0.07, 0.05], k=1)[0]
-
-    # Gösterim (Impressions), Tıklama (Clicks), Harcama (Amount Spent), Erişim (Reach), Frekans (Frequency) simülasyonu
-    base_impressions = random.randint(500, 15000) # Temel gösterim aralığı
-    
-    # Cinsiyete göre gösterim ayarlaması
-    if gender == "Erkek": # Türkçe cinsiyet kullanıldı
-        impressions = base_impressions * random.uniform(1.8, 2.5) # Erkekler daha fazla gösterim alsın
-    else: # Kadın
-        impressions = base_impressions * random.uniform(0.8, 1.2) # Kadınlar daha az veya temel seviyede
-    
-    impressions = int(impressions) # Tam sayıya yuvarla
-
-    # Tıklamalar: Gösterimlerin yaklaşık %0.5 ila %3'ü
-    clicks_all = int(impressions * random.uniform(0.005, 0.03))
-    if clicks_all < 0: clicks_all = 0 # Negatif tıklama olmasın
-
-    # Harcama: Tıklamalara ve gösterimlere bağlı olarak değişsin
-    amount_spent = round(clicks_all * random.uniform(0.1, 1.5) + random.uniform(0, 50), 2)
-    if amount_spent < 0: amount_spent = 0 # Negatif harcama olmasın
-
-    # Erişim: Genellikle gösterimlerden biraz daha azdır
-    reach = int(impressions * random.uniform(0.7, 0.98))
-    if reach > impressions: reach = impressions # Erişim gösterimden fazla olamaz
-
-    # Frekans: Gösterim / Erişim (Erişim 0 ise rastgele bir değer)
-    frequency = round(impressions / reach if reach > 0 else random.uniform(1.0, 2.5), 2)
-    if frequency < 1.0: frequency = round(random.uniform(1.0, 1.5), 2) # Frekans 1'den küçük olamaz
-
-    data.append([
-        platform,
-        date,
-        campaign,
-        gender,
-        device,
-        region,
-        impressions,
-        clicks_all,
-        amount_spent,
-        reach,
-        frequency
-    ])
-
-# CSV dosyasına kaydet
-csv_path = "adresgezgini_meta_veri_raporu_turkce.csv" # Dosya adı güncellendi
-with open(csv_path, mode="w", newline="", encoding="utf-8") as file:
-    writer = csv.writer(file)
-    writer.writerow(header)
-    writer.writerows(data)
-
-print(f"'{csv_path}' dosyası başarıyla oluşturuldu.")
-print("Bu dosya, Looker Studio raporunuzdaki verilere benzer sentetik veriler içermektedir ve başlıkları Türkçedir.")
+DATE_RANGE_DAYS = 90 # Son 90 gün içinde rastgele tarihler
+
+
+def _choice(rng, values, weights, size):
+    probabilities = np.asarray(weights, dtype=float)
+    return np.asarray(values, dtype=object)[rng.choice(len(values), size=size, p=probabilities / probabilities.sum())]
+
+
+def generate_chunk(rng, size, end_date):
+    """
+    `size` satırlık bir parçayı sütun dizileri sözlüğü olarak üretir.
+    Gösterim, tıklama, harcama, erişim ve frekans arasındaki ilişkiler eski satır satır
+    üreticiyle aynıdır.
+    """
+    gender_codes = rng.choice(len(genders), size=size, p=np.asarray(gender_weights) / sum(gender_weights))
+    is_male = gender_codes == genders.index("Erkek")
+
+    # Tarih: [bitiş - 90 gün, bitiş] aralığında (iki uç dahil) tek tip
+    days_back = rng.integers(0, DATE_RANGE_DAYS + 1, size=size)
+    dates = np.datetime_as_string(np.datetime64(end_date, "D") - days_back, unit="D").astype(object)
+
+    # Gösterim: erkekler daha fazla gösterim alır
+    base_impressions = rng.integers(500, 15001, size=size)
+    multiplier = np.where(is_male, rng.uniform(1.8, 2.5, size=size), rng.uniform(0.8, 1.2, size=size))
+    impressions = (base_impressions * multiplier).astype(np.int64)
+
+    # Tıklamalar: gösterimlerin yaklaşık %0.5 ila %3'ü
+    clicks_all = np.maximum((impressions * rng.uniform(0.005, 0.03, size=size)).astype(np.int64), 0)
+
+    # Harcama: tıklamalara bağlı olarak değişir
+    amount_spent = np.maximum(np.round(clicks_all * rng.uniform(0.1, 1.5, size=size) + rng.uniform(0, 50, size=size), 2), 0)
+
+    # Erişim: gösterimlerden biraz azdır ve gösterimi aşamaz
+    reach = np.minimum((impressions * rng.uniform(0.7, 0.98, size=size)).astype(np.int64), impressions)
+
+    # Frekans: gösterim / erişim; 1'den küçükse 1 ile 1.5 arasında rastgele bir değer
+    safe_reach = np.where(reach > 0, reach, 1)
+    frequency = np.where(reach > 0, impressions / safe_reach, rng.uniform(1.0, 2.5, size=size))
+    frequency = np.round(frequency, 2)
+    frequency = np.where(frequency < 1.0, np.round(rng.uniform(1.0, 1.5, size=size), 2), frequency)
+
+    return {
+        "Platform": np.asarray(platforms, dtype=object)[rng.integers(0, len(platforms), size=size)],
+        "Tarih": dates,
+        "Kampanya Adı": _choice(rng, campaign_names, campaign_weights, size),
+        "Cinsiyet": np.asarray(genders, dtype=object)[gender_codes],
+        "Gösterim Cihazı": _choice(rng, impression_devices, device_weights, size),
+        "Bölge": _choice(rng, regions, region_weights, size),
+        "Gösterimler": impressions,
+        "Tüm Tıklamalar": clicks_all,
+        "Harcanan Tutar": amount_spent,
+        "Erişim": reach,
+        "Frekans": frequency,
+    }
+
+
+def iter_chunks(num_rows, seed=None, chunk_rows=250_000, end_date=None):
+    """
+    Toplam `num_rows` satırı en fazla `chunk_rows` satırlık parçalar halinde üretir.
+    """
+    rng = np.random.default_rng(seed)
+    end_date = end_date or datetime.date.today()
+    remaining = num_rows
+    while remaining > 0:
+        size = min(chunk_rows, remaining)
+        yield generate_chunk(rng, size, end_date)
+        remaining -= size
+
+
+def write_csv(csv_path, num_rows, seed=None, chunk_rows=250_000, parquet_path=None):
+    """
+    Veriyi CSV'ye (ve istenirse Parquet'e) parça parça yazar; yazılan satır sayısını döndürür.
+    """
+    parquet_writer = None
+    if parquet_path:
+        try:
+            import pyarrow as pa # type: ignore
+            import pyarrow.parquet as pq # type: ignore
+        except ImportError:
+            raise SystemExit("Parquet çıktısı için pyarrow gerekli: pip install pyarrow")
+
+    written = 0
+    with open(csv_path, mode="w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(header)
+        for chunk in iter_chunks(num_rows, seed=seed, chunk_rows=chunk_rows):
+            columns = [chunk[name].tolist() for name in header]
+            writer.writerows(zip(*columns))
+            if parquet_path:
+                table = pa.table({name: chunk[name] for name in header})
+                if parquet_writer is None:
+                    parquet_writer = pq.ParquetWriter(parquet_path, table.schema)
+                parquet_writer.write_table(table)
+            written += len(columns[0])
+    if parquet_writer is not None:
+        parquet_writer.close()
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sentetik Meta kampanya raporu CSV'si üretir.")
+    parser.add_argument("-o", "--output", default="adresgezgini_meta_veri_raporu_turkce.csv", help="CSV dosya yolu")
+    parser.add_argument("-n", "--rows", type=int, default=2000, help="Üretilecek satır sayısı")
+    parser.add_argument("--seed", type=int, default=None, help="Tekrarlanabilir çıktı için rastgelelik tohumu")
+    parser.add_argument("--chunk-rows", type=int, default=250_000, help="Belleğe alınacak en fazla satır sayısı")
+    parser.add_argument("--parquet", default=None, help="İsteğe bağlı Parquet çıktı yolu (pyarrow gerekir)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    written = write_csv(args.output, args.rows, seed=args.seed, chunk_rows=args.chunk_rows, parquet_path=args.parquet)
+    elapsed = time.perf_counter() - started
+
+    print(f"'{args.output}' dosyası başarıyla oluşturuldu ({written} satır, {elapsed:.1f} sn, {written / elapsed:,.0f} satır/sn).")
+    print("Bu dosya, Looker Studio raporunuzdaki verilere benzer sentetik veriler içermektedir ve başlıkları Türkçedir.")
+
+
+if __name__ == "__main__":
+    main()
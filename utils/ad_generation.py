@@ -0,0 +1,152 @@
+# utils/ad_generation.py
+# Arayüz, toplu üretim ve HTTP servisinin ortak reklam metni üretim akışı: girdi doğrulama,
+# önbellek kontrolü, LLM çağrısı, ayrıştırma ve isteğe bağlı limit düzeltmesi.
+#
+# Matris modu aynı ürün için seçilen her platform × ton kombinasyonunu sınırlı sayıda eşzamanlı
+# istekle üretir. İstem şablonunda platform ve ton en sondadır; böylece tüm kombinasyonlar ortak
+# bir önekle başlar ve Ollama önekin işlenmiş halini yeniden kullanabilir.
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import closing
+from dataclasses import asdict, dataclass
+
+from config import AD_PLATFORM_OPTIONS, TONE_OF_VOICE_OPTIONS, MATRIX_MAX_PARALLEL
+from utils.ad_parser import ParsedAd, parse_ad_response
+from utils.ad_repair import SAVINGS_ESTIMATE_KEYS, find_violations, repair_violations
+from utils.llm_helpers import ad_generation_cache_key
+from utils.llm_gateway import current_session_id, session_scope
+from utils.tracing import span
+
+# Toplu üretim satırlarında ve HTTP servisi isteklerinde verilmeyen isteğe bağlı alanların varsayılanları
+DEFAULT_INPUTS = {
+    "ad_platform": AD_PLATFORM_OPTIONS[0],
+    "tone_of_voice": TONE_OF_VOICE_OPTIONS[0],
+    "keywords": "",
+    "num_headlines": 3,
+    "num_ctas": 3,
+    "num_slogans": 3,
+}
+REQUIRED_FIELDS = ("product_name", "product_description", "target_audience")
+COUNT_FIELDS = ("num_headlines", "num_ctas", "num_slogans")
+
+
+def build_inputs(row):
+    """
+    Girdi satırını reklam zinciri girdilerine dönüştürür; eksik isteğe bağlı alanlar varsayılanla doldurulur.
+    """
+    missing = [field for field in REQUIRED_FIELDS if not row.get(field)]
+    if missing:
+        raise ValueError(f"Eksik alanlar: {', '.join(missing)}")
+
+    inputs = dict(DEFAULT_INPUTS)
+    for key in list(REQUIRED_FIELDS) + list(DEFAULT_INPUTS):
+        if row.get(key) not in (None, ""):
+            inputs[key] = row[key]
+    if isinstance(inputs["keywords"], list):
+        inputs["keywords"] = ", ".join(inputs["keywords"])
+    for key in COUNT_FIELDS:
+        inputs[key] = int(inputs[key])
+    return inputs
+
+
+def generate_ad(llm_chain, ad_cache, inputs, repair=True, on_token=None, bypass_cache=False):
+    """
+    Tek bir reklam metni üretir. (ayrıştırılmış, ham_yanıt, düzeltme_raporu, önbellekten_mi) döndürür;
+    `ad_cache` None ise önbellek kullanılmaz. `bypass_cache` True ise önbellekten okunmaz, yeni yanıt yine
+    önbelleğe yazılır. `on_token` verilirse yanıt akış halinde üretilir ve her parça geldiği anda bu
+    fonksiyona verilir (önbellekten gelen yanıt tek parça olarak verilir).
+    Limit düzeltmesi yapıldıysa düzeltilmiş bölümler ve rapor da yanıtla birlikte önbelleğe yazılır; önbellekten
+    gelen yanıtta düzeltme yeniden çalıştırılmaz ve rapora tasarruf tahmini eklenmez.
+    """
+    started = time.perf_counter()
+    cache_key = ad_generation_cache_key(inputs)
+    with span("generate", ad_platform=inputs["ad_platform"], tone_of_voice=inputs["tone_of_voice"], streaming=on_token is not None) as generate_span:
+        # Önbelleği atlama salt okunur değildir, yazarak geçer (write-through): eski kayıt okunmaz, yeni üretilen
+        # yanıt aşağıda aynı anahtarla önbelleğe yazılır ve sonraki istekler bu yeni yanıtı alır
+        cached = ad_cache.get(cache_key) if ad_cache is not None and not bypass_cache else None
+        generate_span.set(cache_hit=cached is not None)
+        if cached is not None:
+            response = cached["response"]
+            if on_token is not None:
+                on_token(response)
+        elif on_token is not None:
+            response = ""
+            # on_token hata yükseltirse (ör. istemci ayrıldı) akış hemen kapatılır; Ollama isteği de yarıda kesilir
+            with closing(llm_chain.stream(inputs, config={"callbacks": generate_span.callbacks()})) as stream:
+                for chunk in stream:
+                    response += chunk
+                    on_token(chunk)
+        else:
+            response = llm_chain.invoke(inputs, config={"callbacks": generate_span.callbacks()})
+    # Önbellekten gelen yanıtın üretim süresi bilinmez; tasarruf tahmini yalnızca yeni üretimde yapılır
+    generation_seconds = None if cached is not None else time.perf_counter() - started
+    with span("parse", response_chars=len(response)):
+        parsed = parse_ad_response(response)
+    repair_report = None
+    if repair and find_violations(parsed):
+        if cached is not None and "repaired" in cached:
+            parsed, repair_report = ParsedAd(**cached["repaired"]), dict(cached["repair_report"], from_cache=True)
+        else:
+            parsed, repair_report = repair_violations(parsed, inputs, response, generation_seconds)
+    if ad_cache is not None and (cached is None or (repair_report is not None and "repaired" not in cached)):
+        entry = {"response": response}
+        if repair_report is not None:
+            entry["repaired"] = asdict(parsed)
+            entry["repair_report"] = {key: value for key, value in repair_report.items() if key not in SAVINGS_ESTIMATE_KEYS}
+        ad_cache.set(cache_key, entry)
+    return parsed, response, repair_report, cached is not None
+
+
+@dataclass
+class MatrixCell:
+    """
+    Matris modunda tek bir platform × ton kombinasyonunun sonucu.
+    """
+    ad_platform: str
+    tone_of_voice: str
+    inputs: dict
+    parsed: ParsedAd = None
+    response: str = ""
+    repair_report: dict = None
+    from_cache: bool = False
+    latency_seconds: float = 0.0
+    error: str = None
+
+
+def matrix_inputs(base_inputs, platforms, tones):
+    """
+    Ortak ürün girdilerinden her platform × ton kombinasyonu için girdi sözlüğü üretir.
+    """
+    return [
+        (platform, tone, dict(base_inputs, ad_platform=platform, tone_of_voice=tone))
+        for platform in platforms for tone in tones
+    ]
+
+
+def _generate_cell(llm_chain, ad_cache, repair, bypass_cache, session_id, platform, tone, inputs):
+    cell = MatrixCell(platform, tone, inputs)
+    started = time.perf_counter()
+    try:
+        with session_scope(session_id):
+            cell.parsed, cell.response, cell.repair_report, cell.from_cache = generate_ad(llm_chain, ad_cache, inputs, repair, bypass_cache=bypass_cache)
+    except Exception as e:
+        cell.error = str(e)
+    cell.latency_seconds = time.perf_counter() - started
+    return cell
+
+
+def generate_matrix(llm_chain, ad_cache, base_inputs, platforms, tones, max_parallel=MATRIX_MAX_PARALLEL, repair=True, bypass_cache=False):
+    """
+    Tüm kombinasyonları en fazla `max_parallel` eşzamanlı istekle üretir ve her MatrixCell'i
+    tamamlandığı anda döndürür (tamamlanma sırasıyla). Çağıran iş parçacığı sonuçları işleyebilir.
+    İstekler LLM ağ geçidi kuyruğunda çağıran oturumun payından kullanılır.
+    """
+    combinations = matrix_inputs(base_inputs, platforms, tones)
+    session_id = current_session_id() # İşçi iş parçacıklarında Streamlit oturum bağlamı yoktur
+    with ThreadPoolExecutor(max_workers=max(1, max_parallel)) as executor:
+        futures = [
+            executor.submit(_generate_cell, llm_chain, ad_cache, repair, bypass_cache, session_id, platform, tone, inputs)
+            for platform, tone, inputs in combinations
+        ]
+        for future in as_completed(futures):
+            yield future.result()
@@ -0,0 +1,214 @@
+# utils/ad_parser.py
+# LLM'in ürettiği dört bölümlük reklam metni çıktısını ayrıştırır.
+# Ayrıştırıcı tek geçişli bir durum makinesidir: her satır önceden derlenmiş düzenli ifadelerle
+# bölüm başlığı veya madde olarak sınıflandırılır. Çıktı parça parça (akış halinde) de verilebilir;
+# her satır tamamlandığında ilgili bölüme ait madde hemen döndürülür.
+import re
+from dataclasses import dataclass, field
+
+from config import MAX_HEADLINE_CHARS, MAX_BODY_CHARS
+
+SECTION_KEYS = ["headlines", "body_text", "ctas", "slogans"]
+
+# Karakter limiti olan bölümler
+SECTION_CHAR_LIMITS = {
+    "headlines": MAX_HEADLINE_CHARS,
+    "body_text": MAX_BODY_CHARS,
+}
+
+# Başlık satırı: "**1. Reklam Başlıkları (3 adet):**", "## 2) Gövde Metni", "Sloganlar:" gibi varyantlar.
+# Markdown öneki (#, **, __) veya sondaki ':' işaretinden en az biri bulunmalıdır; aksi halde satır
+# sıradan metin sayılır (ör. içinde "başlık" geçen numaralı bir madde ya da "slogan" geçen bir gövde metni).
+_HEADER_MAX_LENGTH = 120
+# Başlık metnini bölüme eşleyen anahtar kelimeler (sıra önemlidir: CTA başlıkları "mesaj" içerir vb.)
+_SECTION_KEYWORDS = [
+    ("ctas", re.compile(r"harekete\s+geçirici|\bcta\b|call\s+to\s+action", re.IGNORECASE)),
+    ("slogans", re.compile(r"slogan", re.IGNORECASE)),
+    ("body_text", re.compile(r"gövde|body", re.IGNORECASE)),
+    ("headlines", re.compile(r"başlık|baslik|headline", re.IGNORECASE)),
+]
+# Madde satırı: "- metin", "* metin", "• metin", "1. metin", "2) metin"
+_ITEM_PATTERN = re.compile(r"^(?:[-*•–]|\d{1,2}[.)])\s+(?P<text>.+)$")
+# Maddeyi saran markdown vurgu işaretleri
+_EMPHASIS_PATTERN = re.compile(r"^(\*\*|__)(?P<text>.+?)\1$")
+
+# Modelin şablondan aynen kopyalayabildiği, gövde metni olmayan satırlar
+_BODY_TEMPLATE_ECHOES = (
+    "Ürünün/hizmetin temel özelliklerini ve faydalarını vurgulayan",
+    "[Gövde Metni]",
+)
+
+
+@dataclass
+class ParsedAd:
+    """
+    Ayrıştırılmış reklam metni bölümleri.
+    """
+    headlines: list = field(default_factory=list)
+    body_text: str = ""
+    ctas: list = field(default_factory=list)
+    slogans: list = field(default_factory=list)
+
+    @property
+    def missing_sections(self):
+        return [key for key in SECTION_KEYS if not getattr(self, key)]
+
+    @property
+    def is_complete(self):
+        return not self.missing_sections
+
+
+def match_section_header(line):
+    """
+    Satır bir bölüm başlığıysa bölüm anahtarını, değilse None döndürür. `line` boşluklardan arındırılmış olmalıdır.
+    """
+    if line[0] in "-•–":
+        return None
+    if line[0] in "#*_":
+        # "* madde" / "_ madde" markdown madde işaretidir, başlık değil
+        if line.startswith(("* ", "_ ")):
+            return None
+    elif not line.rstrip("*_ ").endswith(":"):
+        return None
+    if len(line) > _HEADER_MAX_LENGTH:
+        return None
+    for key, pattern in _SECTION_KEYWORDS:
+        if pattern.search(line):
+            return key
+    return None
+
+
+def _clean_item(text):
+    text = text.strip()
+    if text[:1] in ("*", "_"):
+        match = _EMPHASIS_PATTERN.match(text)
+        if match:
+            text = match.group("text").strip()
+    return text
+
+
+def _item_text(line):
+    # En yaygın durum ("- metin") düzenli ifade çalıştırılmadan ayrıştırılır
+    if line.startswith("- "):
+        return line[2:]
+    item = _ITEM_PATTERN.match(line)
+    return item.group("text") if item else None
+
+
+class StreamingAdParser:
+    """
+    Reklam metni çıktısını artımlı olarak ayrıştırır.
+
+    feed() ile gelen her metin parçası için, tamamlanan satırlardan çıkan olayları
+    döndürür. Olaylar (tür, bölüm, metin) üçlüleridir:
+    - ("item", bölüm, madde_metni): bir madde tamamlandı
+    - ("section_done", bölüm, None): bir bölüm kapandı (sonraki başlık geldi veya çıktı bitti)
+    """
+
+    def __init__(self):
+        self.section = None
+        self.sections = {key: [] for key in SECTION_KEYS}
+        self._buffer = ""
+
+    def feed(self, chunk):
+        self._buffer += chunk
+        if "\n" not in chunk:
+            return []
+        *lines, self._buffer = self._buffer.split("\n")
+        events = []
+        for line in lines:
+            events.extend(self._process_line(line))
+        return events
+
+    def close(self):
+        events = []
+        if self._buffer:
+            events.extend(self._process_line(self._buffer))
+            self._buffer = ""
+        if self.section is not None:
+            events.append(("section_done", self.section, None))
+            self.section = None
+        return events
+
+    def _process_line(self, line):
+        stripped = line.strip()
+        if not stripped:
+            return []
+
+        new_section = match_section_header(stripped)
+        if new_section is not None:
+            events = []
+            if self.section is not None:
+                events.append(("section_done", self.section, None))
+            self.section = new_section
+            return events
+
+        if self.section is None:
+            return []
+
+        item = _item_text(stripped)
+        if self.section == "body_text":
+            # Gövde metninde yalnızca ilk anlamlı satır alınır; madde işareti zorunlu değildir
+            if self.sections["body_text"]:
+                return []
+            if any(echo in stripped for echo in _BODY_TEMPLATE_ECHOES):
+                return []
+            text = _clean_item(item if item is not None else stripped)
+        else:
+            if item is None:
+                return []
+            text = _clean_item(item)
+
+        if not text:
+            return []
+        self.sections[self.section].append(text)
+        return [("item", self.section, text)]
+
+    def result(self):
+        """
+        Ayrıştırılan bölümleri ParsedAd olarak döndürür (gövde metni tek bir metindir).
+        """
+        return ParsedAd(
+            headlines=list(self.sections["headlines"]),
+            body_text=self.sections["body_text"][0] if self.sections["body_text"] else "",
+            ctas=list(self.sections["ctas"]),
+            slogans=list(self.sections["slogans"]),
+        )
+
+
+def parse_ad_response(response):
+    """
+    Tam LLM çıktısını tek geçişte ayrıştırır.
+    """
+    parser = StreamingAdParser()
+    for line in response.splitlines():
+        parser._process_line(line)
+    parser.close()
+    return parser.result()
+
+
+def parse_item_lines(text):
+    """
+    Bölüm başlığı içermeyen, madde işaretli bir LLM çıktısındaki maddeleri döndürür.
+    """
+    items = []
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            continue
+        item = _item_text(stripped)
+        if item is not None and _clean_item(item):
+            items.append(_clean_item(item))
+    return items
+
+
+def build_generated_content(parsed):
+    """
+    Ayrıştırılmış bölümleri, JSON çıktısında kullanılan karakter sayılı biçime dönüştürür.
+    """
+    return {
+        "headlines": [{"text": h, "char_count": len(h)} for h in parsed.headlines],
+        "body_text": {"text": parsed.body_text, "char_count": len(parsed.body_text)},
+        "ctas": [{"text": c, "char_count": len(c)} for c in parsed.ctas],
+        "slogans": [{"text": s, "char_count": len(s)} for s in parsed.slogans],
+    }
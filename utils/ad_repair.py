@@ -0,0 +1,138 @@
+# utils/ad_repair.py
+# Karakter limitini aşan başlıkları ve gövde metnini, dört bölümün tamamını yeniden üretmeden
+# düzeltir: yalnızca limiti aşan öğeler için, kabul edilen kardeş öğeler bağlam olarak verilerek
+# küçük bir istem gönderilir.
+import time
+from dataclasses import replace
+
+import streamlit as st
+
+from config import AD_REPAIR_MAX_RETRIES
+from utils.ad_parser import SECTION_CHAR_LIMITS, parse_item_lines
+from utils.llm_helpers import get_gemma_llm
+from utils.token_estimate import estimate_tokens
+
+# Tam yeniden üretime kıyasla tasarruf tahmini; yanıtın üretim süresi bilinmiyorsa (ör. önbellekten geldiyse) rapora eklenmez
+SAVINGS_ESTIMATE_KEYS = ("tokens_saved_estimate", "seconds_saved_estimate")
+
+SECTION_LABELS = {
+    "headlines": "reklam başlığı",
+    "body_text": "reklam gövde metni",
+}
+
+AD_REPAIR_PROMPT_TEMPLATE = """
+        Sen bir reklam metni yazarı asistanısın. Aşağıdaki ürün için {count} adet yeni {item_label} yaz.
+        Her biri **KESİNLİKLE {char_limit} karakteri geçmemelidir.**
+        Lütfen sadece istenen metinleri üret, başka açıklama ekleme. Her birini yeni bir satırda ve madde işareti (-) ile başlat.
+
+        Ürün/Hizmet Adı: {product_name}
+        Hedef Kitle: {target_audience}
+        Reklam Platformu: {ad_platform}
+        Marka Tonu: {tone_of_voice}
+        Anahtar Kelimeler: {keywords}
+
+        Kabul edilen diğer öğeler (bunları tekrarlama, aynı üslubu koru):
+        {accepted_items}
+
+        Limiti aştığı için reddedilen önceki öneriler (daha kısa yaz):
+        {rejected_items}
+        """
+
+
+@st.cache_resource(show_spinner=False)
+def get_ad_repair_chain():
+    """
+    Limiti aşan öğeleri yeniden yazdıran küçük LLM zincirini döndürür.
+    """
+    from langchain_core.prompts import PromptTemplate
+    prompt_template = PromptTemplate(
+        input_variables=[
+            "count", "item_label", "char_limit", "product_name", "target_audience",
+            "ad_platform", "tone_of_voice", "keywords", "accepted_items", "rejected_items"
+        ],
+        template=AD_REPAIR_PROMPT_TEMPLATE
+    )
+    return prompt_template | get_gemma_llm()
+
+
+def find_violations(parsed):
+    """
+    Karakter limitini aşan öğelerin bölüm -> sıra numaraları sözlüğünü döndürür.
+    """
+    violations = {}
+    headlines = [i for i, h in enumerate(parsed.headlines) if len(h) > SECTION_CHAR_LIMITS["headlines"]]
+    if headlines:
+        violations["headlines"] = headlines
+    if len(parsed.body_text) > SECTION_CHAR_LIMITS["body_text"]:
+        violations["body_text"] = [0]
+    return violations
+
+
+def _bullet_list(items):
+    return "\n        ".join(f"- {item}" for item in items) if items else "(yok)"
+
+
+def repair_violations(parsed, inputs, full_response, full_generation_seconds, max_retries=AD_REPAIR_MAX_RETRIES):
+    """
+    Limiti aşan öğeleri hedefli istemlerle yeniden ürettirir.
+    (düzeltilmiş ParsedAd, rapor sözlüğü) döndürür. `full_generation_seconds` verilmişse rapor, tam
+    yeniden üretime kıyasla tasarruf edilen yaklaşık token sayısını ve saniyeyi de içerir.
+    """
+    chain = get_ad_repair_chain()
+    repaired = replace(parsed, headlines=list(parsed.headlines))
+    report = {
+        "replaced": 0, "remaining": 0, "attempts": 0,
+        "repair_seconds": 0.0, "repair_tokens_estimate": 0, "replacements": [],
+    }
+
+    for section, indices in find_violations(parsed).items():
+        limit = SECTION_CHAR_LIMITS[section]
+        items = repaired.headlines if section == "headlines" else [repaired.body_text]
+        pending = list(indices)
+        rejected = [items[i] for i in pending]
+
+        for _ in range(max_retries):
+            if not pending:
+                break
+            accepted = [item for i, item in enumerate(items) if i not in pending]
+            started = time.perf_counter()
+            response = chain.invoke({
+                "count": len(pending),
+                "item_label": SECTION_LABELS[section],
+                "char_limit": limit,
+                "product_name": inputs["product_name"],
+                "target_audience": inputs["target_audience"],
+                "ad_platform": inputs["ad_platform"],
+                "tone_of_voice": inputs["tone_of_voice"],
+                "keywords": inputs["keywords"],
+                "accepted_items": _bullet_list(accepted),
+                "rejected_items": _bullet_list(rejected),
+            })
+            report["attempts"] += 1
+            report["repair_seconds"] += time.perf_counter() - started
+            report["repair_tokens_estimate"] += estimate_tokens(response)
+
+            # Madde işareti kullanılmadıysa (ör. tek gövde metni) ilk dolu satır aday kabul edilir
+            candidates = parse_item_lines(response) or [line.strip() for line in response.splitlines() if line.strip()][:1]
+            for candidate in candidates:
+                if not pending:
+                    break
+                if candidate and len(candidate) <= limit and candidate not in items:
+                    index = pending.pop(0)
+                    report["replacements"].append({"section": section, "old": items[index], "new": candidate})
+                    items[index] = candidate
+                else:
+                    rejected.append(candidate)
+
+        if section == "body_text":
+            repaired.body_text = items[0]
+        report["remaining"] += len(pending)
+
+    report["replaced"] = len(report["replacements"])
+    full_tokens = estimate_tokens(full_response)
+    report["repair_seconds"] = round(report["repair_seconds"], 2)
+    report["full_generation_tokens_estimate"] = full_tokens
+    if full_generation_seconds is not None:
+        report["tokens_saved_estimate"] = max(0, full_tokens - report["repair_tokens_estimate"])
+        report["seconds_saved_estimate"] = round(max(0.0, full_generation_seconds - report["repair_seconds"]), 2)
+    return repaired, report
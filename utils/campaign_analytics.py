@@ -0,0 +1,290 @@
+# utils/campaign_analytics.py
+# json_outputs/adresgezgini_csv.py'nin ürettiği kampanya CSV'leri için akış halinde toplama motoru.
+# CSV bir kez parça parça okunur ve sütunsal bir önbelleğe (her sütun için ham ikili dosya)
+# dönüştürülür: kategorik sütunlar tamsayı kodlarına, tarihler gün sayısına çevrilir. Sorgular bu
+# dosyaları np.memmap ile açar ve bloklar halinde np.bincount ile gruplar; böylece çok GB'lık
+# dosyalar da belleğe tamamen alınmadan tekrar tekrar sorgulanabilir.
+#
+# Komut satırından kullanım:
+#   python -m utils.campaign_analytics rapor.csv --group-by Platform Bölge
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from config import CAMPAIGN_CACHE_DIR, CAMPAIGN_CSV_CHUNK_ROWS, CAMPAIGN_BLOCK_ROWS
+
+CATEGORICAL_COLUMNS = ["Platform", "Kampanya Adı", "Cinsiyet", "Gösterim Cihazı", "Bölge"]
+DATE_COLUMN = "Tarih"
+NUMERIC_COLUMNS = {
+    "Gösterimler": np.int64,
+    "Tüm Tıklamalar": np.int64,
+    "Harcanan Tutar": np.float64,
+    "Erişim": np.int64,
+    "Frekans": np.float64,
+}
+# Gruplanabilecek sütunlar
+GROUP_BY_COLUMNS = CATEGORICAL_COLUMNS + [DATE_COLUMN]
+
+_CACHE_FORMAT_VERSION = 1
+_CODE_DTYPE = np.int32
+# Bu sayıdan fazla grup kombinasyonu olabilecekse yoğun bincount yerine np.unique kullanılır
+_DENSE_GROUP_LIMIT = 1 << 22
+
+
+def _cache_key(csv_path):
+    stat = os.stat(csv_path)
+    source = f"{os.path.abspath(csv_path)}|{stat.st_size}|{stat.st_mtime_ns}|{_CACHE_FORMAT_VERSION}"
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()[:16]
+
+
+def _encode(series, dictionary):
+    """
+    Bir parçadaki değerleri, parçalar arasında ortak olan sözlüğe göre tamsayı kodlarına çevirir.
+    """
+    codes, uniques = pd.factorize(series)
+    mapping = np.array([dictionary.setdefault(value, len(dictionary)) for value in uniques], dtype=_CODE_DTYPE)
+    return mapping[codes]
+
+
+def _parse_days(series):
+    # Aynı tarih çok kez tekrarlandığından yalnızca farklı değerler ayrıştırılır
+    codes, uniques = pd.factorize(series)
+    days = pd.to_datetime(pd.Index(uniques), format="%Y-%m-%d").values.astype("datetime64[D]").astype(_CODE_DTYPE)
+    return days[codes]
+
+
+def build_columnar_cache(csv_path, cache_root=CAMPAIGN_CACHE_DIR, chunk_rows=CAMPAIGN_CSV_CHUNK_ROWS):
+    """
+    CSV'yi parça parça okuyup sütunsal önbelleğe yazar ve önbellek klasörünü döndürür.
+    Dosya (yol, boyut, değişiklik zamanı) değişmediyse mevcut önbellek yeniden kullanılır.
+    """
+    cache_dir = os.path.join(cache_root, _cache_key(csv_path))
+    if os.path.exists(os.path.join(cache_dir, "meta.json")):
+        return cache_dir
+
+    build_dir = f"{cache_dir}.tmp-{os.getpid()}"
+    shutil.rmtree(build_dir, ignore_errors=True)
+    os.makedirs(build_dir)
+    dictionaries = {column: {} for column in CATEGORICAL_COLUMNS}
+    files = {
+        column: open(os.path.join(build_dir, f"{index}.bin"), "wb")
+        for index, column in enumerate(CATEGORICAL_COLUMNS + [DATE_COLUMN] + list(NUMERIC_COLUMNS))
+    }
+    rows = 0
+    try:
+        dtypes = {column: str for column in CATEGORICAL_COLUMNS + [DATE_COLUMN]}
+        reader = pd.read_csv(csv_path, usecols=list(files), dtype=dtypes, keep_default_na=False, chunksize=chunk_rows)
+        for chunk in reader:
+            for column in CATEGORICAL_COLUMNS:
+                _encode(chunk[column], dictionaries[column]).tofile(files[column])
+            _parse_days(chunk[DATE_COLUMN]).tofile(files[DATE_COLUMN])
+            for column, dtype in NUMERIC_COLUMNS.items():
+                np.asarray(pd.to_numeric(chunk[column], errors="coerce").fillna(0), dtype=dtype).tofile(files[column])
+            rows += len(chunk)
+    finally:
+        for f in files.values():
+            f.close()
+
+    meta = {
+        "source": os.path.abspath(csv_path),
+        "rows": rows,
+        "files": {column: os.path.basename(f.name) for column, f in files.items()},
+        "dtypes": {column: np.dtype(NUMERIC_COLUMNS.get(column, _CODE_DTYPE)).str for column in files},
+        "dictionaries": {column: list(values) for column, values in dictionaries.items()},
+    }
+    with open(os.path.join(build_dir, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+    try:
+        os.replace(build_dir, cache_dir)
+    except OSError:
+        # Başka bir süreç aynı önbelleği aynı anda oluşturduysa onunki kullanılır
+        shutil.rmtree(build_dir, ignore_errors=True)
+    _remove_stale_caches(cache_root, meta["source"], keep=cache_dir)
+    return cache_dir
+
+
+def _remove_stale_caches(cache_root, source, keep):
+    """
+    Aynı CSV'nin eski sürümlerinden kalan önbellek klasörlerini siler.
+    """
+    for name in os.listdir(cache_root):
+        folder = os.path.join(cache_root, name)
+        if folder == keep or ".tmp-" in name:
+            continue
+        try:
+            with open(os.path.join(folder, "meta.json"), encoding="utf-8") as f:
+                stale = json.load(f)["source"] == source
+        except (OSError, ValueError, KeyError):
+            continue
+        if stale:
+            shutil.rmtree(folder, ignore_errors=True)
+
+
+class CampaignDataset:
+    """
+    Sütunsal önbelleği np.memmap ile açar ve gruplu metrik sorgularını bloklar halinde çalıştırır.
+    """
+
+    def __init__(self, cache_dir, block_rows=CAMPAIGN_BLOCK_ROWS):
+        with open(os.path.join(cache_dir, "meta.json"), encoding="utf-8") as f:
+            meta = json.load(f)
+        self.rows = meta["rows"]
+        self.source = meta["source"]
+        self.block_rows = block_rows
+        self.dictionaries = meta["dictionaries"]
+        self.columns = {
+            column: np.memmap(os.path.join(cache_dir, file_name), dtype=np.dtype(meta["dtypes"][column]), mode="r", shape=(self.rows,))
+            if self.rows else np.empty(0, dtype=np.dtype(meta["dtypes"][column]))
+            for column, file_name in meta["files"].items()
+        }
+        days = self.columns[DATE_COLUMN]
+        self.min_day = int(days.min()) if self.rows else 0
+        self.max_day = int(days.max()) if self.rows else 0
+
+    def values(self, column):
+        """
+        Kategorik bir sütunun farklı değerlerini döndürür (filtre seçenekleri için).
+        """
+        return sorted(self.dictionaries[column])
+
+    def date_range(self):
+        to_date = lambda day: np.datetime64(day, "D").astype(object)
+        return to_date(self.min_day), to_date(self.max_day)
+
+    def _group_codes(self, column, start, end):
+        if column == DATE_COLUMN:
+            return self.columns[DATE_COLUMN][start:end] - self.min_day, self.max_day - self.min_day + 1
+        return self.columns[column][start:end], max(1, len(self.dictionaries[column]))
+
+    def _row_mask(self, start, end, filters, start_day, end_day):
+        mask = None
+        for column, allowed in (filters or {}).items():
+            dictionary = {value: code for code, value in enumerate(self.dictionaries[column])}
+            codes = [dictionary[value] for value in allowed if value in dictionary]
+            column_mask = np.isin(self.columns[column][start:end], codes)
+            mask = column_mask if mask is None else mask & column_mask
+        if start_day is not None or end_day is not None:
+            days = self.columns[DATE_COLUMN][start:end]
+            day_mask = (days >= (start_day if start_day is not None else self.min_day)) & (days <= (end_day if end_day is not None else self.max_day))
+            mask = day_mask if mask is None else mask & day_mask
+        return mask
+
+    def rollup(self, group_by, filters=None, start_date=None, end_date=None):
+        """
+        `group_by` sütunlarına göre gösterim, tıklama, harcama ve erişim toplamlarını; CTR, CPC, CPM
+        ve erişim ağırlıklı frekansı içeren bir DataFrame döndürür.
+        `filters` {sütun: [izin verilen değerler]} biçimindedir; tarihler datetime.date olabilir.
+        """
+        group_by = list(group_by)
+        start_day = int(np.datetime64(start_date, "D").astype(np.int64)) if start_date else None
+        end_day = int(np.datetime64(end_date, "D").astype(np.int64)) if end_date else None
+        dims = [self._group_codes(column, 0, 0)[1] for column in group_by]
+        group_count = int(np.prod(dims, dtype=np.int64)) if dims else 1
+        dense = group_count <= _DENSE_GROUP_LIMIT
+
+        # Toplanan değerler: satır, gösterim, tıklama, harcama, erişim, frekans×erişim
+        totals = np.zeros((6, group_count)) if dense else None
+        partials = []
+        for start in range(0, self.rows, self.block_rows):
+            end = min(start + self.block_rows, self.rows)
+            if group_by:
+                keys = np.ravel_multi_index([self._group_codes(column, start, end)[0] for column in group_by], dims)
+            else:
+                keys = np.zeros(end - start, dtype=np.int64)
+            impressions = self.columns["Gösterimler"][start:end]
+            clicks = self.columns["Tüm Tıklamalar"][start:end]
+            spend = self.columns["Harcanan Tutar"][start:end]
+            reach = self.columns["Erişim"][start:end]
+            frequency = self.columns["Frekans"][start:end]
+
+            mask = self._row_mask(start, end, filters, start_day, end_day)
+            if mask is not None:
+                keys, impressions, clicks, spend, reach, frequency = (
+                    a[mask] for a in (keys, impressions, clicks, spend, reach, frequency)
+                )
+            weights = (None, impressions, clicks, spend, reach, frequency * reach)
+            if dense:
+                for i, w in enumerate(weights):
+                    totals[i] += np.bincount(keys, weights=w, minlength=group_count)
+            else:
+                unique_keys, inverse = np.unique(keys, return_inverse=True)
+                partials.append(pd.DataFrame(
+                    np.column_stack([np.bincount(inverse, weights=w, minlength=len(unique_keys)) for w in weights]),
+                    index=unique_keys,
+                ))
+
+        if dense:
+            group_keys = np.flatnonzero(totals[0])
+            sums = totals[:, group_keys]
+        else:
+            combined = pd.concat(partials).groupby(level=0).sum() if partials else pd.DataFrame(np.zeros((0, 6)))
+            group_keys = combined.index.to_numpy(dtype=np.int64)
+            sums = combined.to_numpy().T
+        return self._to_frame(group_by, dims, group_keys, sums)
+
+    def _to_frame(self, group_by, dims, group_keys, sums):
+        rows, impressions, clicks, spend, reach, weighted_frequency = sums
+        frame = pd.DataFrame()
+        if group_by:
+            for column, codes in zip(group_by, np.unravel_index(group_keys, dims)):
+                if column == DATE_COLUMN:
+                    frame[column] = np.datetime_as_string((codes + self.min_day).astype("datetime64[D]"), unit="D")
+                else:
+                    frame[column] = np.asarray(self.dictionaries[column], dtype=object)[codes]
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            frame["Satır"] = rows.astype(np.int64)
+            frame["Gösterimler"] = impressions.astype(np.int64)
+            frame["Tıklamalar"] = clicks.astype(np.int64)
+            frame["Harcama"] = np.round(spend, 2)
+            frame["Erişim"] = reach.astype(np.int64)
+            frame["CTR (%)"] = np.round(np.where(impressions > 0, clicks / impressions * 100, np.nan), 3)
+            frame["CPC"] = np.round(np.where(clicks > 0, spend / clicks, np.nan), 3)
+            frame["CPM"] = np.round(np.where(impressions > 0, spend / impressions * 1000, np.nan), 3)
+            frame["Ağırlıklı Frekans"] = np.round(np.where(reach > 0, weighted_frequency / reach, np.nan), 3)
+
+        if DATE_COLUMN in group_by:
+            return frame.sort_values(group_by, ignore_index=True)
+        return frame.sort_values("Harcama", ascending=False, ignore_index=True)
+
+
+@st.cache_resource(show_spinner=False, max_entries=4)
+def _open_dataset(cache_dir):
+    return CampaignDataset(cache_dir)
+
+
+def get_campaign_dataset(csv_path):
+    """
+    CSV için (gerekirse oluşturulan) sütunsal önbelleği açar. Dosya değişmedikçe süreç genelinde
+    aynı CampaignDataset döner.
+    """
+    return _open_dataset(build_columnar_cache(csv_path))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Kampanya CSV'si için gruplu CTR/CPC/CPM/frekans raporu")
+    parser.add_argument("csv_path", help="adresgezgini_csv.py ile üretilmiş CSV dosyası")
+    parser.add_argument("--group-by", nargs="*", default=["Platform"], choices=GROUP_BY_COLUMNS)
+    parser.add_argument("--cache-dir", default=CAMPAIGN_CACHE_DIR)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    dataset = CampaignDataset(build_columnar_cache(args.csv_path, cache_root=args.cache_dir))
+    loaded = time.perf_counter()
+    frame = dataset.rollup(args.group_by)
+    finished = time.perf_counter()
+
+    with pd.option_context("display.max_rows", 200, "display.width", 200):
+        print(frame)
+    print(f"\n{dataset.rows:,} satır; önbellek hazırlama {loaded - started:.2f} sn, sorgu {finished - loaded:.3f} sn")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,431 @@
+# utils/catalog.py
+# Sitemap'ten beslenen yerel ürün kataloğu.
+# Bir sitenin sitemap.xml dosyası (iç içe sitemap index'leri ve .gz sitemap'ler dahil) okunur; listelenen
+# ürün URL'leri sunucu başına eşzamanlılık ve istek hızı sınırıyla, robots.txt kurallarına (Disallow ve
+# Crawl-delay) uyularak taranır. Her sayfa mevcut çıkarım hattından (fetch_page_content) ve
+# analyze_website_with_llm'den geçirilip SQLite kataloğuna yazılır. Yeniden taramada yalnızca sitemap'teki
+# `lastmod` değeri değişen (veya hiç olmayan) URL'ler çekilir; içeriği değişmeyen sayfalar yeniden analiz edilmez.
+# Katalog, toplu üretimin girdisi olarak kullanılabilir: python bulk_generate.py --catalog
+#
+# Kullanım (depo kök dizininden):
+#   python -m utils.catalog https://ornek.com/sitemap.xml
+#   python -m utils.catalog https://ornek.com --include "/urun/" --limit 200
+#   python -m utils.catalog --stats
+import argparse
+import datetime
+import gzip
+import hashlib
+import io
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+import xml.etree.ElementTree as ElementTree
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from contextlib import contextmanager
+from urllib.parse import urljoin, urlsplit
+from urllib.robotparser import RobotFileParser
+
+import streamlit as st
+
+from config import (
+    CATALOG_DB_PATH, CATALOG_CONCURRENCY, CATALOG_PER_HOST_CONCURRENCY, CATALOG_REQUESTS_PER_SECOND,
+    CATALOG_MAX_SITEMAP_DEPTH, CATALOG_ROBOTS_USER_AGENT, HTTP_TIMEOUT_SECONDS
+)
+from utils.content_condenser import condense_for_analysis
+from utils.sqlite_transaction import Transaction
+from utils.structured_data import ANALYSIS_FIELDS
+from utils.web_scraper import fetch_page_content, analyze_website_with_llm, get_http_session
+
+_MAX_SITEMAP_BYTES = 50 * 1024 * 1024 # sitemaps.org sınırı (sıkıştırılmamış)
+
+
+class CatalogStore:
+    """
+    Taranan ürün sayfalarını URL başına tek satır olarak saklayan SQLite deposu.
+    Durum "ok" (ürün bilgisi çıkarıldı) veya "failed" (son denemede hata) olur; başarısız satırların
+    `lastmod` değeri boş bırakılır, böylece bir sonraki taramada yeniden denenir.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS products (
+                    url TEXT PRIMARY KEY,
+                    host TEXT NOT NULL,
+                    lastmod TEXT,
+                    fingerprint TEXT,
+                    status TEXT NOT NULL,
+                    title TEXT,
+                    product_name TEXT,
+                    product_description TEXT,
+                    keywords TEXT,
+                    sources TEXT,
+                    error TEXT,
+                    crawled_at TEXT NOT NULL,
+                    updated_at TEXT
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_products_host ON products (host, status)")
+
+    def _connect(self, write=True):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return Transaction(conn, write)
+
+    def known_entries(self, host=None):
+        """
+        {url: (lastmod, durum, içerik özeti)} döndürür; taramada hangi URL'lerin atlanacağına karar vermek için.
+        """
+        query, params = "SELECT url, lastmod, status, fingerprint FROM products", []
+        if host:
+            query, params = query + " WHERE host = ?", [host]
+        with self._connect(write=False) as conn:
+            return {url: (lastmod, status, fingerprint) for url, lastmod, status, fingerprint in conn.execute(query, params)}
+
+    def save_product(self, url, lastmod, fingerprint, title, fields):
+        now = datetime.datetime.now().isoformat(timespec="seconds")
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO products (url, host, lastmod, fingerprint, status, title, product_name, product_description, "
+                "keywords, sources, error, crawled_at, updated_at) VALUES (?, ?, ?, ?, 'ok', ?, ?, ?, ?, ?, NULL, ?, ?) "
+                "ON CONFLICT(url) DO UPDATE SET lastmod = excluded.lastmod, fingerprint = excluded.fingerprint, status = 'ok', "
+                "title = excluded.title, product_name = excluded.product_name, product_description = excluded.product_description, "
+                "keywords = excluded.keywords, sources = excluded.sources, error = NULL, crawled_at = excluded.crawled_at, "
+                "updated_at = excluded.updated_at",
+                (url, urlsplit(url).netloc, lastmod, fingerprint, title, fields["product_name"], fields["product_description"],
+                 fields["keywords"], json.dumps(fields.get("sources", {}), ensure_ascii=False), now, now),
+            )
+
+    def mark_unchanged(self, url, lastmod):
+        """
+        İçeriği değişmemiş sayfanın yalnızca lastmod ve tarama zamanını günceller.
+        """
+        with self._connect() as conn:
+            conn.execute("UPDATE products SET lastmod = ?, crawled_at = ? WHERE url = ?",
+                         (lastmod, datetime.datetime.now().isoformat(timespec="seconds"), url))
+
+    def mark_failed(self, url, error):
+        """
+        Hatayı kaydeder. Daha önce çıkarılmış ürün bilgisi silinmez; lastmod boşaltılır ki sayfa yeniden denensin.
+        """
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO products (url, host, status, error, crawled_at) VALUES (?, ?, 'failed', ?, ?) "
+                "ON CONFLICT(url) DO UPDATE SET lastmod = NULL, status = 'failed', error = excluded.error, crawled_at = excluded.crawled_at",
+                (url, urlsplit(url).netloc, error, datetime.datetime.now().isoformat(timespec="seconds")),
+            )
+
+    def iter_products(self, host=None):
+        """
+        Başarıyla çıkarılmış ürünleri URL sırasıyla döndürür (toplu üretim girdisi).
+        """
+        query, params = ("SELECT url, title, product_name, product_description, keywords, updated_at FROM products "
+                         "WHERE status = 'ok'"), []
+        if host:
+            query, params = query + " AND host = ?", [host]
+        with self._connect(write=False) as conn:
+            rows = conn.execute(query + " ORDER BY url", params).fetchall()
+        for url, title, product_name, product_description, keywords, updated_at in rows:
+            yield {"url": url, "title": title, "product_name": product_name, "product_description": product_description,
+                   "keywords": keywords, "updated_at": updated_at}
+
+    def stats(self):
+        """
+        {sunucu: {durum: satır sayısı}} döndürür.
+        """
+        result = {}
+        with self._connect(write=False) as conn:
+            for host, status, count in conn.execute("SELECT host, status, COUNT(*) FROM products GROUP BY host, status ORDER BY host"):
+                result.setdefault(host, {})[status] = count
+        return result
+
+
+@st.cache_resource(show_spinner=False)
+def get_catalog_store():
+    """
+    Süreç genelinde paylaşılan ürün kataloğunu döndürür.
+    """
+    return CatalogStore(CATALOG_DB_PATH)
+
+
+def parse_sitemap(content):
+    """
+    Sitemap içeriğini (gerekirse gzip açılarak) ayrıştırır. ("index" veya "urlset", [(loc, lastmod), ...]) döndürür.
+    Etiketler ad alanından bağımsız eşleştirilir; sitemaps.org ad alanı kullanmayan siteler de desteklenir.
+    """
+    if content[:2] == b"\x1f\x8b":
+        # Sınırdan bir bayt fazlası okunur; çok büyük açılan (ör. gzip bombası) dosyalar bellekte açılmadan reddedilir
+        with gzip.GzipFile(fileobj=io.BytesIO(content)) as archive:
+            content = archive.read(_MAX_SITEMAP_BYTES + 1)
+    if len(content) > _MAX_SITEMAP_BYTES:
+        raise ValueError(f"Sitemap {_MAX_SITEMAP_BYTES} bayt sınırını aşıyor")
+    root = ElementTree.fromstring(content)
+    kind = "index" if root.tag.rsplit("}", 1)[-1] == "sitemapindex" else "urlset"
+    entries = []
+    for entry in root:
+        values = {child.tag.rsplit("}", 1)[-1]: (child.text or "").strip() for child in entry}
+        if values.get("loc"):
+            entries.append((values["loc"], values.get("lastmod") or None))
+    return kind, entries
+
+
+class HostLimiter:
+    """
+    Bir sunucuya aynı anda en fazla `max_concurrent` istek gönderilmesini ve ardışık istek
+    başlangıçları arasında en az `min_interval` saniye olmasını sağlar.
+    """
+
+    def __init__(self, max_concurrent, min_interval):
+        self.min_interval = min_interval
+        self._semaphore = threading.Semaphore(max_concurrent)
+        self._lock = threading.Lock()
+        self._next_start = 0.0
+
+    @contextmanager
+    def slot(self):
+        with self._semaphore:
+            with self._lock:
+                now = time.monotonic()
+                start = max(now, self._next_start)
+                self._next_start = start + self.min_interval
+            if start > now:
+                time.sleep(start - now)
+            yield
+
+
+class CatalogCrawler:
+    """
+    Sitemap'teki URL'leri tarayıp kataloğa yazar. robots.txt ve sunucu başına sınırlar her sunucu için
+    ilk istekte bir kez yüklenir.
+    """
+
+    def __init__(self, store, concurrency=CATALOG_CONCURRENCY, per_host_concurrency=CATALOG_PER_HOST_CONCURRENCY,
+                 requests_per_second=CATALOG_REQUESTS_PER_SECOND, user_agent=CATALOG_ROBOTS_USER_AGENT,
+                 include=None, limit=None, force=False):
+        self.store = store
+        self.concurrency = max(1, concurrency)
+        self.per_host_concurrency = max(1, per_host_concurrency)
+        self.min_interval = 1.0 / requests_per_second if requests_per_second > 0 else 0.0
+        self.user_agent = user_agent
+        # Sayfalar, robots.txt kurallarının uygulandığı adla istenir (oturumun tarayıcı User-Agent'ı yerine)
+        self.headers = {"User-Agent": user_agent}
+        self.include = re.compile(include) if include else None
+        self.limit = limit
+        self.force = force
+        self._hosts = {}
+        self._hosts_lock = threading.Lock()
+
+    def _host(self, url):
+        """
+        Sunucunun (robots.txt ayrıştırıcısı, sınırlayıcı) ikilisini döndürür; ilk çağrıda robots.txt çekilir.
+        """
+        parts = urlsplit(url)
+        origin = f"{parts.scheme}://{parts.netloc}"
+        with self._hosts_lock:
+            entry = self._hosts.get(origin)
+            if entry is None:
+                entry = self._hosts[origin] = {"lock": threading.Lock(), "robots": None, "limiter": None}
+        with entry["lock"]: # Aynı sunucu için robots.txt yalnızca bir kez çekilir
+            if entry["limiter"] is None:
+                robots = RobotFileParser(origin + "/robots.txt")
+                try:
+                    response = get_http_session().get(robots.url, headers=self.headers, timeout=HTTP_TIMEOUT_SECONDS)
+                    if response.status_code in (401, 403):
+                        robots.disallow_all = True
+                    elif response.status_code >= 500:
+                        robots.disallow_all = True # Geçici sunucu hatasında site taranmaz (RFC 9309)
+                    elif response.ok:
+                        robots.parse(response.text.splitlines())
+                    else:
+                        robots.allow_all = True # robots.txt yok
+                except Exception:
+                    robots.disallow_all = True
+                crawl_delay = robots.crawl_delay(self.user_agent) or 0
+                entry["robots"] = robots
+                entry["limiter"] = HostLimiter(self.per_host_concurrency, max(self.min_interval, float(crawl_delay)))
+        return entry["robots"], entry["limiter"]
+
+    def allowed(self, url):
+        robots, _ = self._host(url)
+        return robots.can_fetch(self.user_agent, url)
+
+    def sitemap_urls(self, site_or_sitemap):
+        """
+        Verilen adres bir site köküyse robots.txt'deki Sitemap satırlarını, yoksa /sitemap.xml'i döndürür.
+        """
+        if urlsplit(site_or_sitemap).path.strip("/"):
+            return [site_or_sitemap]
+        robots, _ = self._host(site_or_sitemap)
+        return [urljoin(site_or_sitemap, url) for url in robots.site_maps() or ["/sitemap.xml"]]
+
+    def fetch_sitemap(self, sitemap_url):
+        """
+        Sitemap'i sunucu sınırlarına uyarak çeker ve ayrıştırır. Gövde akış halinde okunur; _MAX_SITEMAP_BYTES
+        sınırını aşan yanıtlar tamamı indirilmeden reddedilir.
+        """
+        _, limiter = self._host(sitemap_url)
+        with limiter.slot(), get_http_session().get(sitemap_url, headers=self.headers, timeout=HTTP_TIMEOUT_SECONDS,
+                                                    stream=True) as response:
+            response.raise_for_status()
+            content = bytearray()
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                content += chunk
+                if len(content) > _MAX_SITEMAP_BYTES:
+                    raise ValueError(f"Sitemap {_MAX_SITEMAP_BYTES} bayt sınırını aşıyor")
+        return parse_sitemap(bytes(content))
+
+    def iter_entries(self, sitemap_url, depth=0, seen=None, stats=None):
+        """
+        Sitemap'teki (loc, lastmod) çiftlerini sırayla döndürür; index'lerdeki alt sitemap'lere iner.
+        Çekilemeyen veya ayrıştırılamayan sitemap'ler atlanır ve `stats["sitemap_failed"]` içinde sayılır;
+        böylece index'teki tek bir bozuk alt sitemap taramanın tamamını durdurmaz.
+        """
+        seen = set() if seen is None else seen
+        if sitemap_url in seen or depth > CATALOG_MAX_SITEMAP_DEPTH:
+            return
+        seen.add(sitemap_url)
+        try:
+            kind, entries = self.fetch_sitemap(sitemap_url)
+        except Exception:
+            if stats is not None:
+                stats["sitemap_failed"] += 1
+            return
+        for loc, lastmod in entries:
+            loc = urljoin(sitemap_url, loc)
+            if kind == "index":
+                yield from self.iter_entries(loc, depth + 1, seen, stats)
+            else:
+                yield loc, lastmod
+
+    def ingest_page(self, url, lastmod, known):
+        """
+        Tek bir sayfayı çeker, analiz eder ve kataloğa yazar. Sonucu ("crawled", "unchanged", "failed") döndürür.
+        """
+        try:
+            _, limiter = self._host(url)
+            with limiter.slot():
+                title, description, text, structured = fetch_page_content(url, headers=self.headers)
+            fingerprint = hashlib.sha256(json.dumps([title, description, text, structured], ensure_ascii=False,
+                                                    sort_keys=True).encode("utf-8")).hexdigest()
+            if known and known[1] == "ok" and known[2] == fingerprint and not self.force:
+                self.store.mark_unchanged(url, lastmod)
+                return "unchanged", False
+            llm_skipped = all(structured.get(field) for field in ANALYSIS_FIELDS)
+            product_name, product_description, keywords = analyze_website_with_llm(
+                condense_for_analysis(title, description, text or ""), structured)
+            if not product_name:
+                raise ValueError("Sayfadan ürün bilgisi çıkarılamadı")
+            self.store.save_product(url, lastmod, fingerprint, title, {
+                "product_name": product_name, "product_description": product_description, "keywords": keywords,
+                "sources": structured.get("sources", {}),
+            })
+            return "crawled", llm_skipped
+        except Exception as e:
+            self.store.mark_failed(url, str(e))
+            return "failed", False
+
+    def run(self, site_or_sitemap, progress=None):
+        """
+        Sitemap'i tarar ve istatistik sözlüğü döndürür. `progress(istatistikler)` her sayfadan sonra çağrılır.
+        """
+        stats = dict(discovered=0, skipped=0, disallowed=0, crawled=0, unchanged=0, llm_skipped=0, failed=0, sitemap_failed=0)
+        started = time.perf_counter()
+        known_entries = self.store.known_entries()
+
+        def pending_pages():
+            queued = 0
+            for sitemap_url in self.sitemap_urls(site_or_sitemap):
+                for url, lastmod in self.iter_entries(sitemap_url, stats=stats):
+                    if self.include and not self.include.search(url):
+                        continue
+                    stats["discovered"] += 1
+                    known = known_entries.get(url)
+                    # lastmod değişmediyse sayfa hiç istenmez; lastmod yayımlamayan sitelerde içerik özeti karşılaştırılır
+                    if known and lastmod and known[0] == lastmod and known[1] == "ok" and not self.force:
+                        stats["skipped"] += 1
+                        continue
+                    if not self.allowed(url):
+                        stats["disallowed"] += 1
+                        continue
+                    yield url, lastmod, known
+                    queued += 1
+                    if self.limit and queued >= self.limit:
+                        return
+
+        pages = pending_pages()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            in_flight = set()
+
+            def submit_next():
+                item = next(pages, None)
+                if item is not None:
+                    in_flight.add(executor.submit(self.ingest_page, *item))
+
+            # Sitemap akış halinde okunur; bellekte en fazla `concurrency` bekleyen sayfa tutulur
+            for _ in range(self.concurrency):
+                submit_next()
+            while in_flight:
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    in_flight.discard(future)
+                    outcome, llm_skipped = future.result()
+                    stats[outcome] += 1
+                    stats["llm_skipped"] += llm_skipped
+                    if progress:
+                        progress(stats)
+                    submit_next()
+
+        stats["elapsed_seconds"] = round(time.perf_counter() - started, 3)
+        return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sitemap'teki ürün sayfalarını tarayıp yerel ürün kataloğuna yazar.")
+    parser.add_argument("source", nargs="?", help="sitemap.xml adresi veya site kökü (robots.txt'deki Sitemap satırları kullanılır)")
+    parser.add_argument("--db", default=CATALOG_DB_PATH, help="Katalog veritabanı dosyası")
+    parser.add_argument("-c", "--concurrency", type=int, default=CATALOG_CONCURRENCY, help="Aynı anda işlenen en fazla sayfa")
+    parser.add_argument("--per-host", type=int, default=CATALOG_PER_HOST_CONCURRENCY, help="Sunucu başına eşzamanlı istek sınırı")
+    parser.add_argument("--rps", type=float, default=CATALOG_REQUESTS_PER_SECOND, help="Sunucu başına saniyedeki istek sınırı (0: sınırsız)")
+    parser.add_argument("--include", help="Yalnızca bu düzenli ifadeye uyan URL'ler taranır (ör. '/urun/')")
+    parser.add_argument("--limit", type=int, help="Bu çalıştırmada taranacak en fazla sayfa")
+    parser.add_argument("--force", action="store_true", help="lastmod ve içerik değişmemiş olsa da tüm sayfaları yeniden analiz et")
+    parser.add_argument("--stats", action="store_true", help="Yalnızca katalog özetini yazdır")
+    args = parser.parse_args()
+
+    store = CatalogStore(args.db)
+    if not args.stats:
+        if not args.source:
+            parser.error("sitemap adresi veya site kökü gerekli")
+
+        def progress(stats):
+            done = stats["crawled"] + stats["unchanged"] + stats["failed"]
+            if done % 25 == 0:
+                print(f"{done} sayfa işlendi ({stats['failed']} hata)", file=sys.stderr)
+
+        crawler = CatalogCrawler(store, args.concurrency, args.per_host, args.rps, include=args.include,
+                                 limit=args.limit, force=args.force)
+        stats = crawler.run(args.source, progress)
+        print(f"{stats['discovered']} URL bulundu: {stats['crawled']} tarandı ({stats['llm_skipped']} LLM'siz), "
+              f"{stats['unchanged']} içerik aynı, {stats['skipped']} lastmod aynı, {stats['disallowed']} robots.txt engelli, "
+              f"{stats['failed']} hata, {stats['sitemap_failed']} okunamayan sitemap - {stats['elapsed_seconds']:.1f} sn")
+    for host, counts in store.stats().items():
+        print(f"{host}: " + ", ".join(f"{status}={count}" for status, count in sorted(counts.items())))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+# utils/content_condenser.py
+# Sayfa metnini analiz istemine girmeden önce özetleyen (seçen) aşama.
+# Eskiden analiz istemine sayfa metninin ilk MAX_TEXT_LENGTH_FOR_ANALYSIS karakteri konuyordu; çoğu sitede bu
+# kısım gezinme menüsü, çerez bildirimi ve alt bilgi bağlantılarıdır. Özetleyici metni bloklara (satırlara)
+# böler, tekrar eden ve kalıp (çerez, üyelik, telif...) blokları atar, kalan blokları sayfa başlığı ve meta
+# açıklamasına göre TF-IDF benzerliği ve anahtar kelime yoğunluğuyla sıralar ve en iyi blokları (istemde henüz
+# geçmeyen terimleri taşıyanları öne alarak) sayfadaki sıralarıyla ANALYSIS_TOKEN_BUDGET bütçesine sığdırır.
+import math
+import re
+from collections import Counter
+
+from config import ANALYSIS_TOKEN_BUDGET, CONDENSER_ENABLED, MAX_TEXT_LENGTH_FOR_ANALYSIS
+from utils.token_estimate import CHARS_PER_TOKEN, estimate_tokens
+from utils.tracing import span
+
+_WORD_PATTERN = re.compile(r"[^\W\d_]+")
+# Türkçe ekler kelime sonuna eklendiğinden ("çanta", "çantası", "çantaları") terimler ilk 5 harfe indirgenir
+_STEM_CHARS = 5
+_STOPWORDS = frozenset(
+    "ve ile için bir bu şu da de ki mi en çok daha gibi her ya veya ama ancak olan olarak kadar sonra önce "
+    "siz sizin biz bizim tüm hem ise ne nasıl the and for with you your our are from this that"
+    .split()
+)
+# Ürün bilgisi taşımayan site kalıpları; bu ifadeleri içeren kısa bloklar atılır
+_BOILERPLATE_PATTERN = re.compile(
+    r"çerez|cookie|kvkk|gizlilik|kişisel veri|tüm hakları|all rights|©|abone ol|bülten|newsletter|"
+    r"giriş yap|üye ol|hesabım|sepet\s*\(|sepete ekle|favorilere|whatsapp|müşteri hizmetleri",
+    re.IGNORECASE,
+)
+_BOILERPLATE_MAX_WORDS = 25 # Bundan uzun bloklar kalıp ifade içerse de içerik sayılır
+_REPEATED_BLOCK_LIMIT = 3 # Sayfada bu kadar çok tekrar eden bloklar (ör. "Sepete Ekle") tümüyle atılır
+_MIN_TERMS = 3 # Bundan az terimli bloklar (menü öğeleri, "Sırt Çantası" gibi kategori bağlantıları) atılır
+_MIN_TRUNCATED_CHARS = 80 # Bütçeye kırpılan son blok bundan kısa kalacaksa eklenmez
+_PROXIMITY_BLOCKS = 8 # Ana içerik bitişik olduğundan en ilgili bloğa bu mesafedeki bloklar öne çıkarılır
+_MIN_TERMS_WITHOUT_QUERY = 4 # Başlık/açıklamayla ortak terimi olmayan bloklar için gereken en az terim
+_NOVELTY_FLOOR = 0.1 # Tüm terimleri istemde zaten geçen bir blok puanının bu kadarını korur
+
+
+def _terms(text):
+    return [word[:_STEM_CHARS] for word in _WORD_PATTERN.findall(text.casefold())
+            if len(word) > 1 and word not in _STOPWORDS]
+
+
+def _novelty(terms, covered):
+    """
+    Blok terimlerinden istemde henüz geçmeyenlerin oranı.
+    """
+    return len(terms.keys() - covered) / len(terms)
+
+
+def split_blocks(text):
+    """
+    Metni boş olmayan bloklara (satırlara) böler.
+    """
+    return [line.strip() for line in text.splitlines() if line.strip()]
+
+
+def condense_text(text, title="", description="", token_budget=ANALYSIS_TOKEN_BUDGET):
+    """
+    Metinden başlık ve açıklamayla en ilgili blokları seçip sayfa sırasıyla birleştirir.
+    (özet_metin, rapor) döndürür; rapor blok sayılarını ve yaklaşık token sayılarını içerir.
+    """
+    blocks = split_blocks(text)
+    counts = Counter(block.casefold() for block in blocks)
+    query = Counter(_terms(f"{title} {description}"))
+
+    candidates, seen = [], set()
+    dropped_repeated = dropped_boilerplate = 0
+    for position, block in enumerate(blocks):
+        key = block.casefold()
+        if counts[key] >= _REPEATED_BLOCK_LIMIT or key in seen:
+            dropped_repeated += 1
+            continue
+        seen.add(key)
+        if len(block.split()) <= _BOILERPLATE_MAX_WORDS and _BOILERPLATE_PATTERN.search(block):
+            dropped_boilerplate += 1
+            continue
+        terms = Counter(_terms(block))
+        if len(terms) < _MIN_TERMS or (len(terms) < _MIN_TERMS_WITHOUT_QUERY and not query.keys() & terms.keys()):
+            dropped_boilerplate += 1
+            continue
+        candidates.append((position, block, terms))
+
+    # IDF blokların kendisinden hesaplanır: sayfanın her yerinde geçen terimler (ör. mağaza adı) az ağırlık alır
+    document_frequency = Counter(term for _, _, terms in candidates for term in terms)
+    idf = {term: math.log((len(candidates) + 1) / (count + 1)) + 1 for term, count in document_frequency.items()}
+    query_weights = {term: count * idf.get(term, 1.0) for term, count in query.items()}
+    query_norm = math.sqrt(sum(weight * weight for weight in query_weights.values())) or 1.0
+
+    scored = []
+    for position, block, terms in candidates:
+        weights = {term: count * idf[term] for term, count in terms.items()}
+        norm = math.sqrt(sum(weight * weight for weight in weights.values())) or 1.0
+        similarity = sum(weight * query_weights.get(term, 0.0) for term, weight in weights.items()) / (norm * query_norm)
+        # Yoğunluk kısa bloklarda azaltılır; yoksa başlıkla aynı kelimeleri taşıyan "benzer ürün" kartları öne geçer
+        density = sum(count for term, count in terms.items() if term in query) / sum(terms.values()) * min(1, len(terms) / 10)
+        # Uzun, bilgi taşıyan paragraflar ve sayfanın üst kısmı hafifçe öne çıkarılır; başlık/açıklama yoksa sıralamayı bunlar belirler
+        richness = min(len(terms), 30) / 30
+        early = 1 - position / max(1, len(blocks))
+        scored.append([similarity + 0.5 * density + 0.2 * richness + 0.1 * early, position, block, terms])
+
+    # En ilgili blok (genellikle ürün başlığı) ana içeriğin yerini gösterir; uzaktaki benzer bloklar
+    # (ör. "benzer ürünler" kartları) yakındaki özellik satırlarının gerisine düşer
+    if scored and query:
+        anchor = max(scored)[1]
+        for entry in scored:
+            entry[0] += 0.3 * math.exp(-abs(entry[1] - anchor) / _PROXIMITY_BLOCKS)
+
+    # Başlık ve açıklama istemde zaten yer aldığından bloklar yeni bilgi oranlarıyla değerlendirilir: terimleri
+    # başlıkta veya önceden seçilen bloklarda geçen bloklar (başlığın tekrarı, "benzer ürün" kartları) geriye düşer,
+    # yeni terim taşıyan kısa özellik satırları (ör. "USB şarj çıkışı") öne geçer
+    covered = set(query)
+    selected, used_tokens = [], 0
+    while scored:
+        entry = max(scored, key=lambda e: e[0] * (_NOVELTY_FLOOR + (1 - _NOVELTY_FLOOR) * _novelty(e[3], covered)))
+        scored.remove(entry)
+        _, position, block, terms = entry
+        tokens = estimate_tokens(block)
+        if used_tokens + tokens > token_budget:
+            # Sığmayan blok kalan bütçeye kırpılır ve seçim biter; bütçeyi daha az ilgili kısa bloklarla
+            # doldurmak yerine en ilgili içeriğin devamı tercih edilir
+            remaining_chars = int((token_budget - used_tokens) * CHARS_PER_TOKEN)
+            if remaining_chars >= _MIN_TRUNCATED_CHARS:
+                selected.append((position, block[:remaining_chars].rsplit(" ", 1)[0] + "..."))
+            break
+        selected.append((position, block))
+        used_tokens += tokens
+        covered.update(terms)
+
+    condensed = "\n".join(block for _, block in sorted(selected))
+    return condensed, {
+        "blocks": len(blocks),
+        "dropped_repeated": dropped_repeated,
+        "dropped_boilerplate": dropped_boilerplate,
+        "kept_blocks": len(selected),
+        "input_tokens": estimate_tokens(text),
+        "output_tokens": estimate_tokens(condensed),
+    }
+
+
+def condense_for_analysis(title, description, text):
+    """
+    get_website_content çıktısını analyze_website_with_llm'e verilecek metne dönüştürür.
+    Başlık ve açıklama bütçeye dahil edilerek başa eklenir. CONDENSER_ENABLED kapalıysa eski davranış
+    (metnin ilk MAX_TEXT_LENGTH_FOR_ANALYSIS karakteri) uygulanır.
+    """
+    with span("condense", enabled=CONDENSER_ENABLED) as condense_span:
+        if not CONDENSER_ENABLED:
+            condensed = text if len(text) <= MAX_TEXT_LENGTH_FOR_ANALYSIS else text[:MAX_TEXT_LENGTH_FOR_ANALYSIS] + "..."
+            condense_span.set(input_tokens=estimate_tokens(text), output_tokens=estimate_tokens(condensed))
+            return condensed
+        header = "\n".join(part.strip() for part in (title or "", description or "") if part and part.strip())
+        body, report = condense_text(text, title or "", description or "", max(1, ANALYSIS_TOKEN_BUDGET - estimate_tokens(header)))
+        condensed = f"{header}\n{body}".strip()
+        condense_span.set(**dict(report, output_tokens=estimate_tokens(condensed)))
+    return condensed
@@ -0,0 +1,251 @@
+# utils/dedup_index.py
+# Üretilen başlık, CTA ve sloganlar için yakın-tekrar (near-duplicate) indeksi.
+# Her öğe karakter n-gram kümesine ayrılır, MinHash imzası çıkarılır ve imza bantlara bölünerek
+# LSH kovalarına yazılır. Sorgu sırasında yalnızca aynı kovaya düşen adaylar gerçek Jaccard
+# benzerliğiyle doğrulanır; böylece yüz binlerce kayıtta bile birkaç indeksli okuma yeterlidir.
+#
+# Geçmiş veritabanındaki henüz indekslenmemiş kayıtları eklemek için:
+#   python -m utils.dedup_index
+import hashlib
+import os
+import re
+import sqlite3
+import struct
+import threading
+
+import streamlit as st
+
+from config import (
+    HISTORY_DB_PATH, DEDUP_NUM_PERM, DEDUP_BANDS, DEDUP_SHINGLE_SIZE, DEDUP_SIMILARITY_THRESHOLD
+)
+
+# İndekslenen bölümler (gövde metni tek ve uzun olduğu için dahil edilmez)
+INDEXED_SECTIONS = ("headlines", "ctas", "slogans")
+
+_SIGNATURE_FORMAT = struct.Struct(f"<{DEDUP_NUM_PERM}I")
+_ROWS_PER_BAND = DEDUP_NUM_PERM // DEDUP_BANDS
+_NON_WORD_PATTERN = re.compile(r"[^\w\s]+")
+
+
+def normalize_text(text):
+    """
+    Büyük/küçük harf, noktalama ve boşluk farklarını giderir (Türkçe İ/I dönüşümü dahil).
+    """
+    text = text.replace("İ", "i").replace("I", "ı").lower()
+    return " ".join(_NON_WORD_PATTERN.sub(" ", text).split())
+
+
+def shingles(text):
+    """
+    Normalize edilmiş metnin karakter n-gram kümesini döndürür.
+    """
+    normalized = f" {normalize_text(text)} "
+    if len(normalized) <= DEDUP_SHINGLE_SIZE:
+        return {normalized}
+    return {normalized[i:i + DEDUP_SHINGLE_SIZE] for i in range(len(normalized) - DEDUP_SHINGLE_SIZE + 1)}
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+def minhash_signature(shingle_set):
+    """
+    Her n-gram için tek bir SHAKE-128 çıktısından DEDUP_NUM_PERM adet bağımsız 32 bitlik hash türetilir;
+    imza, her konumdaki en küçük değerdir. Döngülerin tamamı C tarafında (zip/map) çalışır.
+    """
+    digest_size = _SIGNATURE_FORMAT.size
+    hashes = [_SIGNATURE_FORMAT.unpack(hashlib.shake_128(s.encode("utf-8")).digest(digest_size)) for s in shingle_set]
+    return list(map(min, zip(*hashes)))
+
+
+def bucket_keys(signature):
+    """
+    İmzanın her bandı için 64 bitlik (SQLite INTEGER) kova anahtarlarını döndürür.
+    """
+    keys = []
+    for band in range(DEDUP_BANDS):
+        rows = signature[band * _ROWS_PER_BAND:(band + 1) * _ROWS_PER_BAND]
+        digest = hashlib.blake2b(struct.pack(f"<I{len(rows)}I", band, *rows), digest_size=8).digest()
+        keys.append(struct.unpack("<q", digest)[0])
+    return keys
+
+
+def product_key(product_name):
+    return normalize_text(product_name or "")
+
+
+class NearDuplicateIndex:
+    """
+    SQLite üzerinde kalıcı MinHash/LSH indeksi. Geçmiş veritabanıyla aynı dosyada tutulur.
+    """
+
+    def __init__(self, path, threshold=DEDUP_SIMILARITY_THRESHOLD):
+        self.path = path
+        self.threshold = threshold
+        self._local = threading.local()
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS dedup_items (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    history_id INTEGER,
+                    product_key TEXT NOT NULL,
+                    section TEXT NOT NULL,
+                    text TEXT NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_dedup_items_product ON dedup_items (product_key, section)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_dedup_items_history ON dedup_items (history_id)")
+            # Kova satırları ürün ve bölümü de taşır; ürüne özel sorgular birleşik indeksten okunur
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS dedup_buckets (
+                    bucket_key INTEGER NOT NULL,
+                    product_key TEXT NOT NULL,
+                    section TEXT NOT NULL,
+                    item_id INTEGER NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_dedup_buckets_key ON dedup_buckets (bucket_key)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_dedup_buckets_product ON dedup_buckets (product_key, section, bucket_key)")
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def add_items(self, items, product_name, history_id=None):
+        """
+        (bölüm, metin) çiftlerini indekse ekler.
+        """
+        key = product_key(product_name)
+        with self._connect() as conn:
+            for section, text in items:
+                cursor = conn.execute(
+                    "INSERT INTO dedup_items (history_id, product_key, section, text) VALUES (?, ?, ?, ?)",
+                    (history_id, key, section, text),
+                )
+                item_id = cursor.lastrowid
+                conn.executemany(
+                    "INSERT INTO dedup_buckets (bucket_key, product_key, section, item_id) VALUES (?, ?, ?, ?)",
+                    [(bucket, key, section, item_id) for bucket in bucket_keys(minhash_signature(shingles(text)))],
+                )
+
+    def add_record(self, record, history_id=None):
+        """
+        Bir üretim kaydındaki başlık, CTA ve sloganları indeksler.
+        """
+        content = record["generated_content"]
+        items = [(section, item["text"]) for section in INDEXED_SECTIONS for item in content.get(section, [])]
+        self.add_items(items, record["request_parameters"].get("product_name", ""), history_id)
+
+    def find_similar(self, text, product_name=None, section=None, limit=5):
+        """
+        Metne yakın daha önce üretilmiş öğeleri [(benzerlik, metin, ürün, bölüm), ...] olarak döndürür.
+        `product_name` verilirse yalnızca aynı ürün için üretilenler aranır.
+        """
+        query_shingles = shingles(text)
+        keys = bucket_keys(minhash_signature(query_shingles))
+        conditions = [f"b.bucket_key IN ({','.join('?' * len(keys))})"]
+        params = list(keys)
+        if product_name is not None:
+            conditions.append("b.product_key = ?")
+            params.append(product_key(product_name))
+        if section is not None:
+            conditions.append("b.section = ?")
+            params.append(section)
+        sql = (
+            "SELECT DISTINCT i.text, i.product_key, i.section FROM dedup_buckets b "
+            f"JOIN dedup_items i ON i.id = b.item_id WHERE {' AND '.join(conditions)}"
+        )
+        matches = []
+        for candidate, candidate_product, candidate_section in self._connect().execute(sql, params):
+            similarity = jaccard(query_shingles, shingles(candidate))
+            if similarity >= self.threshold:
+                matches.append((similarity, candidate, candidate_product, candidate_section))
+        matches.sort(reverse=True)
+        return matches[:limit]
+
+    def previous_items(self, product_name, section=None, limit=50):
+        """
+        Bu ürün için daha önce üretilmiş öğeleri en yeniden eskiye döndürür.
+        """
+        sql = "SELECT section, text FROM dedup_items WHERE product_key = ?"
+        params = [product_key(product_name)]
+        if section is not None:
+            sql += " AND section = ?"
+            params.append(section)
+        sql += " ORDER BY id DESC LIMIT ?"
+        params.append(limit)
+        return self._connect().execute(sql, params).fetchall()
+
+    def index_history(self, history_store):
+        """
+        Geçmiş veritabanında olup henüz indekslenmemiş kayıtları indeksler; eklenen kayıt sayısını döndürür.
+        """
+        indexed = {row[0] for row in self._connect().execute("SELECT DISTINCT history_id FROM dedup_items WHERE history_id IS NOT NULL")}
+        added = 0
+        last_id = 0
+        # Kimliğe göre artan sırada dolaşılır; dolaşma sırasında eklenen yeni kayıtlar sayfaları kaydırmaz
+        while True:
+            records = history_store.records_after(last_id, limit=500)
+            if not records:
+                break
+            for record in records:
+                if record["id"] not in indexed:
+                    self.add_record(record, history_id=record["id"])
+                    added += 1
+            last_id = records[-1]["id"]
+        return added
+
+
+def find_duplicates_within(items, threshold=DEDUP_SIMILARITY_THRESHOLD):
+    """
+    Aynı yanıt içindeki yakın-tekrarları bulur. (bölüm, metin) listesi alır; her yakın tekrar için
+    ((bölüm, bölüm_içindeki_sıra), önceki_metin, tekrar_metni, benzerlik) döndürür. Konum yalnızca sonraki
+    tekrarı gösterir; ilk geçtiği yer tekrar sayılmaz.
+    """
+    seen = []
+    duplicates = []
+    section_counts = {}
+    for section, text in items:
+        index = section_counts.get(section, 0)
+        section_counts[section] = index + 1
+        text_shingles = shingles(text)
+        for seen_section, seen_text, seen_shingles in seen:
+            similarity = jaccard(text_shingles, seen_shingles)
+            if seen_section == section and similarity >= threshold:
+                duplicates.append(((section, index), seen_text, text, similarity))
+                break
+        else:
+            seen.append((section, text, text_shingles))
+    return duplicates
+
+
+@st.cache_resource(show_spinner=False)
+def get_dedup_index():
+    """
+    Süreç genelinde paylaşılan yakın-tekrar indeksini döndürür.
+    """
+    return NearDuplicateIndex(HISTORY_DB_PATH)
+
+
+def main():
+    from utils.history_store import HistoryStore
+
+    index = NearDuplicateIndex(HISTORY_DB_PATH)
+    added = index.index_history(HistoryStore(HISTORY_DB_PATH))
+    print(f"{added} geçmiş kaydı yakın-tekrar indeksine eklendi.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+# utils/disk_cache.py
+# SQLite tabanlı, süreçler ve oturumlar arasında paylaşılan kalıcı anahtar-değer önbelleği.
+# Her önbellek bir "namespace" ile ayrılır; girdiler TTL (yaşam süresi) ile sona erer ve
+# kayıt sayısı/boyut sınırı aşıldığında en uzun süredir kullanılmayanlar (LRU) silinir.
+# Okumalar yazma kilidi almaz: isabet/ıskalama sayaçları ve son erişim zamanları bellekte biriktirilir,
+# set() çağrısında (LRU silmesinden önce) veya CACHE_STATS_FLUSH_SECONDS aralıkla diske yazılır.
+import atexit
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+from config import CACHE_STATS_FLUSH_SECONDS
+
+_BUSY_TIMEOUT_MS = 30000
+
+
+class SQLiteCache:
+    """
+    JSON olarak serileştirilebilen değerleri saklayan LRU/TTL önbelleği.
+    """
+
+    def __init__(self, path, namespace, max_entries=1000, max_bytes=None, ttl_seconds=None):
+        self.path = path
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self._local = threading.local()
+        self._pending_lock = threading.Lock()
+        self._pending_counts = Counter() # Henüz diske yazılmamış isabet/ıskalama sayıları
+        self._pending_access = {} # Henüz diske yazılmamış son erişim zamanları {anahtar: zaman}
+        self._last_flush = time.monotonic()
+
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS cache_entries (
+                    namespace TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    size_bytes INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    PRIMARY KEY (namespace, key)
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_lru ON cache_entries (namespace, last_access)")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS cache_stats (
+                    namespace TEXT PRIMARY KEY,
+                    hits INTEGER NOT NULL DEFAULT 0,
+                    misses INTEGER NOT NULL DEFAULT 0
+                )
+                """
+            )
+        atexit.register(self.flush_stats) # Süreç kapanırken biriken sayaçlar kaybolmasın
+
+    def _connect(self):
+        # Her iş parçacığı kendi bağlantısını kullanır; WAL kipi eşzamanlı okuma/yazmaya izin verir
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=_BUSY_TIMEOUT_MS / 1000)
+            conn.execute("PRAGMA journal_mode=WAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        """
+        Anahtara karşılık gelen değeri döndürür; yoksa veya süresi dolmuşsa None döner.
+        Süresi dolmuş girdiler burada değil, sonraki set() çağrısındaki temizlikte silinir.
+        """
+        now = time.time()
+        row = self._connect().execute(
+            "SELECT value, created_at FROM cache_entries WHERE namespace = ? AND key = ?",
+            (self.namespace, key),
+        ).fetchone()
+        if row is not None and self.ttl_seconds is not None and now - row[1] > self.ttl_seconds:
+            row = None
+        with self._pending_lock:
+            if row is None:
+                self._pending_counts["misses"] += 1
+            else:
+                self._pending_counts["hits"] += 1
+                self._pending_access[key] = now
+            flush_due = time.monotonic() - self._last_flush >= CACHE_STATS_FLUSH_SECONDS
+        if flush_due:
+            self.flush_stats()
+        return None if row is None else json.loads(row[0])
+
+    def _take_pending(self):
+        with self._pending_lock:
+            counts, access = self._pending_counts, self._pending_access
+            self._pending_counts, self._pending_access = Counter(), {}
+            self._last_flush = time.monotonic()
+        return counts, access
+
+    def _restore_pending(self, counts, access):
+        with self._pending_lock:
+            self._pending_counts.update(counts)
+            for key, accessed_at in access.items():
+                self._pending_access[key] = max(accessed_at, self._pending_access.get(key, 0))
+
+    def _write_pending(self, conn, counts, access):
+        if counts:
+            conn.execute(
+                "INSERT INTO cache_stats (namespace, hits, misses) VALUES (?, ?, ?) "
+                "ON CONFLICT(namespace) DO UPDATE SET hits = hits + excluded.hits, misses = misses + excluded.misses",
+                (self.namespace, counts["hits"], counts["misses"]),
+            )
+        if access:
+            conn.executemany(
+                "UPDATE cache_entries SET last_access = MAX(last_access, ?) WHERE namespace = ? AND key = ?",
+                [(accessed_at, self.namespace, key) for key, accessed_at in access.items()],
+            )
+
+    def flush_stats(self):
+        """
+        Bellekte biriken sayaçları ve erişim zamanlarını diske yazar. Yazma kilidi başka bir bağlantıdaysa
+        beklemeden vazgeçer ve değerleri sonraki denemeye bırakır; böylece okumalar kilit için beklemez.
+        """
+        counts, access = self._take_pending()
+        if not counts and not access:
+            return
+        conn = self._connect()
+        try:
+            conn.execute("PRAGMA busy_timeout = 0")
+            with conn:
+                self._write_pending(conn, counts, access)
+        except sqlite3.OperationalError:
+            self._restore_pending(counts, access)
+        finally:
+            conn.execute(f"PRAGMA busy_timeout = {_BUSY_TIMEOUT_MS}")
+
+    def set(self, key, value):
+        """
+        Değeri önbelleğe yazar ve gerekirse eski girdileri siler.
+        """
+        now = time.time()
+        serialized = json.dumps(value, ensure_ascii=False)
+        counts, access = self._take_pending()
+        try:
+            with self._connect() as conn:
+                # Biriken erişim zamanları LRU silmesinden önce yazılır; sık okunan girdiler silinmez
+                self._write_pending(conn, counts, access)
+                conn.execute(
+                    "INSERT OR REPLACE INTO cache_entries (namespace, key, value, size_bytes, created_at, last_access) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (self.namespace, key, serialized, len(serialized.encode("utf-8")), now, now),
+                )
+                self._evict(conn, now)
+        except Exception:
+            self._restore_pending(counts, access)
+            raise
+
+    def _evict(self, conn, now):
+        if self.ttl_seconds is not None:
+            conn.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND created_at < ?",
+                (self.namespace, now - self.ttl_seconds),
+            )
+        if self.max_entries is not None:
+            conn.execute(
+                "DELETE FROM cache_entries WHERE namespace = ? AND key IN ("
+                "SELECT key FROM cache_entries WHERE namespace = ? ORDER BY last_access DESC LIMIT -1 OFFSET ?)",
+                (self.namespace, self.namespace, self.max_entries),
+            )
+        if self.max_bytes is not None:
+            total = conn.execute(
+                "SELECT COALESCE(SUM(size_bytes), 0) FROM cache_entries WHERE namespace = ?", (self.namespace,)
+            ).fetchone()[0]
+            if total > self.max_bytes:
+                rows = conn.execute(
+                    "SELECT key, size_bytes FROM cache_entries WHERE namespace = ? ORDER BY last_access ASC",
+                    (self.namespace,),
+                ).fetchall()
+                victims = []
+                for key, size_bytes in rows:
+                    if total <= self.max_bytes:
+                        break
+                    victims.append((self.namespace, key))
+                    total -= size_bytes
+                conn.executemany("DELETE FROM cache_entries WHERE namespace = ? AND key = ?", victims)
+
+    def stats(self):
+        """
+        İsabet/ıskalama sayaçlarını (henüz diske yazılmamış olanlar dahil), kayıt sayısını ve toplam boyutu döndürür.
+        """
+        with self._connect() as conn:
+            counters = conn.execute(
+                "SELECT hits, misses FROM cache_stats WHERE namespace = ?", (self.namespace,)
+            ).fetchone() or (0, 0)
+            entries, size_bytes = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM cache_entries WHERE namespace = ?",
+                (self.namespace,),
+            ).fetchone()
+        with self._pending_lock:
+            pending = dict(self._pending_counts)
+        return {"hits": counters[0] + pending.get("hits", 0), "misses": counters[1] + pending.get("misses", 0),
+                "entries": entries, "size_bytes": size_bytes}
+
+    def clear(self):
+        with self._pending_lock:
+            self._pending_access.clear()
+        with self._connect() as conn:
+            conn.execute("DELETE FROM cache_entries WHERE namespace = ?", (self.namespace,))
+
+
+def evict_lru_files(folder, suffixes, max_entries=None, max_bytes=None):
+    """
+    Klasördeki `suffixes` uzantılı dosyalardan, sayı veya toplam boyut sınırı aşıldığı sürece
+    en uzun süredir kullanılmayanları (en eski mtime) siler. Okuyucular isabette os.utime çağırmalıdır.
+    """
+    entries = []
+    for entry in os.scandir(folder):
+        if entry.name.endswith(suffixes):
+            stat = entry.stat()
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+    entries.sort()
+    total_bytes = sum(size for _, size, _ in entries)
+    while entries and ((max_entries is not None and len(entries) > max_entries) or (max_bytes is not None and total_bytes > max_bytes)):
+        _, size, path = entries.pop(0)
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        total_bytes -= size
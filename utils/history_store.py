@@ -0,0 +1,176 @@
+# utils/history_store.py
+# Üretilen reklam metinlerinin kalıcı geçmişi.
+# Her üretim, tam kaydı JSON sütununda tutan tek bir SQLite satırı olarak eklenir; ürün, platform,
+# ton ve zaman sütunları indekslidir. WAL kipi ve IMMEDIATE işlemler sayesinde birden çok süreç
+# (Streamlit oturumları, toplu üretim) aynı dosyaya güvenle ekleme yapabilir.
+#
+# Eski json_outputs/reklam_metni_*.json dosyalarını içe aktarmak için:
+#   python -m utils.history_store json_outputs
+import argparse
+import datetime
+import glob
+import json
+import os
+import sqlite3
+import threading
+
+import streamlit as st
+
+from config import HISTORY_DB_PATH
+from utils.sqlite_transaction import Transaction
+
+_FILE_TIMESTAMP_FORMAT = "reklam_metni_%Y%m%d_%H%M%S.json"
+
+
+class HistoryStore:
+    """
+    Reklam metni üretim kayıtlarını saklayan ve sorgulayan SQLite deposu.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS generations (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    created_at TEXT NOT NULL,
+                    product_name TEXT NOT NULL,
+                    ad_platform TEXT NOT NULL,
+                    tone_of_voice TEXT NOT NULL,
+                    record TEXT NOT NULL,
+                    source_file TEXT UNIQUE
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_generations_product ON generations (product_name, created_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_generations_platform ON generations (ad_platform, created_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_generations_tone ON generations (tone_of_voice, created_at)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_generations_created ON generations (created_at)")
+
+    def _connect(self, write=True):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # isolation_level=None: işlemler aşağıda açıkça BEGIN IMMEDIATE (yazma) veya BEGIN (okuma) ile başlatılır
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return Transaction(conn, write)
+
+    def append(self, record, created_at=None, source_file=None):
+        """
+        Kaydı atomik olarak ekler ve kimliğini döndürür. `source_file` verilmişse ve daha önce
+        içe aktarılmışsa kayıt tekrar eklenmez, None döner.
+        """
+        created_at = created_at or datetime.datetime.now()
+        parameters = record.get("request_parameters", {})
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO generations (created_at, product_name, ad_platform, tone_of_voice, record, source_file) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    created_at.isoformat(timespec="microseconds"),
+                    parameters.get("product_name", ""),
+                    parameters.get("ad_platform", ""),
+                    parameters.get("tone_of_voice", ""),
+                    json.dumps(record, ensure_ascii=False),
+                    source_file,
+                ),
+            )
+            return cursor.lastrowid if cursor.rowcount else None
+
+    def query(self, product_name=None, ad_platform=None, tone_of_voice=None, since=None, until=None, page=1, page_size=20):
+        """
+        Filtrelere uyan kayıtları en yeniden eskiye sayfalı olarak döndürür.
+        (kayıtlar, toplam_kayıt_sayısı) döndürür; her kayıt "id" ve "created_at" alanlarını da içerir.
+        """
+        conditions = []
+        params = []
+        for column, value in (("product_name", product_name), ("ad_platform", ad_platform), ("tone_of_voice", tone_of_voice)):
+            if value:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+        if since:
+            conditions.append("created_at >= ?")
+            params.append(since.isoformat())
+        if until:
+            conditions.append("created_at < ?")
+            params.append(until.isoformat())
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        with self._connect(write=False) as conn:
+            total = conn.execute(f"SELECT COUNT(*) FROM generations {where}", params).fetchone()[0]
+            rows = conn.execute(
+                f"SELECT id, created_at, record FROM generations {where} ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?",
+                params + [page_size, (max(1, page) - 1) * page_size],
+            ).fetchall()
+        return [dict(json.loads(record), id=row_id, created_at=created_at) for row_id, created_at, record in rows], total
+
+    def records_after(self, after_id=0, limit=500):
+        """
+        Kimliği `after_id`'den büyük en fazla `limit` kaydı kimlik sırasıyla döndürür. Tüm geçmişi dolaşırken
+        son kaydın kimliği bir sonraki çağrıya verilir (OFFSET gibi atlanan satırları yeniden taramaz).
+        """
+        with self._connect(write=False) as conn:
+            rows = conn.execute(
+                "SELECT id, created_at, record FROM generations WHERE id > ? ORDER BY id LIMIT ?", (after_id, limit)
+            ).fetchall()
+        return [dict(json.loads(record), id=row_id, created_at=created_at) for row_id, created_at, record in rows]
+
+    def get(self, record_id):
+        with self._connect(write=False) as conn:
+            row = conn.execute("SELECT created_at, record FROM generations WHERE id = ?", (record_id,)).fetchone()
+        return dict(json.loads(row[1]), id=record_id, created_at=row[0]) if row else None
+
+    def distinct_values(self, column):
+        """
+        Filtre seçenekleri için bir indeksli sütunun farklı değerlerini döndürür.
+        """
+        if column not in ("product_name", "ad_platform", "tone_of_voice"):
+            raise ValueError(f"Geçersiz sütun: {column}")
+        with self._connect(write=False) as conn:
+            return [row[0] for row in conn.execute(f"SELECT DISTINCT {column} FROM generations ORDER BY {column}")]
+
+    def import_json_outputs(self, folder):
+        """
+        json_outputs klasöründeki reklam_metni_*.json dosyalarını içe aktarır.
+        Daha önce aktarılmış dosyalar atlanır; içe aktarılan yeni kayıt sayısını döndürür.
+        """
+        imported = 0
+        for path in sorted(glob.glob(os.path.join(folder, "reklam_metni_*.json"))):
+            file_name = os.path.basename(path)
+            try:
+                created_at = datetime.datetime.strptime(file_name, _FILE_TIMESTAMP_FORMAT)
+            except ValueError:
+                created_at = datetime.datetime.fromtimestamp(os.path.getmtime(path))
+            with open(path, encoding="utf-8") as f:
+                record = json.load(f)
+            if self.append(record, created_at=created_at, source_file=file_name) is not None:
+                imported += 1
+        return imported
+
+
+@st.cache_resource(show_spinner=False)
+def get_history_store():
+    """
+    Süreç genelinde paylaşılan geçmiş deposunu döndürür.
+    """
+    return HistoryStore(HISTORY_DB_PATH)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="json_outputs klasöründeki eski JSON çıktılarını geçmiş veritabanına aktarır.")
+    parser.add_argument("folder", nargs="?", default="json_outputs", help="reklam_metni_*.json dosyalarının bulunduğu klasör")
+    parser.add_argument("--db", default=HISTORY_DB_PATH, help="Geçmiş veritabanı dosyası")
+    args = parser.parse_args()
+    imported = HistoryStore(args.db).import_json_outputs(args.folder)
+    print(f"{imported} kayıt '{args.db}' veritabanına aktarıldı.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+# utils/html_extractor.py
+# Web sayfalarından başlık, meta açıklama ve görünür metni akış halinde çıkaran artımlı ayrıştırıcı.
+# Tüm belgeyi indirip ağaç kurmak yerine gelen parçaları işler ve gerekli bilgiler
+# toplandığında durur; böylece büyük e-ticaret sayfalarının çoğu hiç indirilmez.
+# İsteğe bağlı bir StructuredDataCollector verilirse JSON-LD blokları, meta etiketleri ve ürün
+# microdata'sı da aynı geçişte toplanır.
+# Metin blok düzeyinde satırlara bölünür: her paragraf, başlık, liste öğesi vb. tek satırdır; satır içi
+# etiketler (a, span, strong...) satırı bölmez. İçerik özetleyici (utils/content_condenser.py) bu satırları blok olarak kullanır.
+import codecs
+from html.parser import HTMLParser
+
+from utils.structured_data import MICRODATA_PROPERTIES, is_product_type
+
+# İçeriği görünür metne dahil edilmeyen etiketler
+_SKIPPED_TAGS = {"script", "style", "noscript", "template", "svg"}
+# Metin bloğunu bölmeyen satır içi etiketler; diğer tüm etiketler blok sınırı sayılır
+INLINE_TAGS = {
+    "a", "abbr", "b", "bdi", "bdo", "cite", "code", "data", "dfn", "em", "font", "i", "img", "kbd", "label",
+    "mark", "q", "s", "samp", "small", "span", "strong", "sub", "sup", "time", "u", "var", "wbr",
+}
+# Kapanış etiketi olmayan öğeler; bunlar itemscope açamaz
+_VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+_BLOCK_BREAK = "\u2029" # BeautifulSoup yolunda blok sınırlarını işaretlemek için (Unicode paragraf ayırıcı)
+
+
+def soup_text_blocks(soup):
+    """
+    BeautifulSoup ağacının görünür metnini akış yoluyla aynı biçimde (blok başına bir satır) döndürür.
+    Betikler ve stiller önceden çıkarılmış olmalıdır.
+    """
+    for element in soup.find_all(True):
+        if element.name not in INLINE_TAGS:
+            element.insert_before(_BLOCK_BREAK)
+            element.insert_after(_BLOCK_BREAK)
+    blocks = (" ".join(block.split()) for block in soup.get_text().split(_BLOCK_BREAK))
+    return "\n".join(block for block in blocks if block)
+
+
+def preferred_bs4_parser():
+    """
+    Kuruluysa daha hızlı olan lxml ayrıştırıcısını, değilse yerleşik html.parser'ı döndürür.
+    """
+    try:
+        import lxml # type: ignore # noqa: F401
+        return "lxml"
+    except ImportError:
+        return "html.parser"
+
+
+class IncrementalPageExtractor(HTMLParser):
+    """
+    feed() ile verilen HTML parçalarını işler; `done` True olduğunda yeterli bilgi toplanmıştır.
+    """
+
+    def __init__(self, max_text_chars, structured=None):
+        super().__init__(convert_charrefs=True)
+        self.max_text_chars = max_text_chars
+        self.structured = structured
+        self.title = ""
+        self.description = ""
+        self.chunks = []
+        self.text_length = 0
+        self._in_title = False
+        self._title_done = False
+        self._in_body = False
+        self._skip_depth = 0
+        self._pending = []
+        self._json_ld = None # Okunmakta olan JSON-LD betiğinin parçaları
+        self._scopes = [] # Açık itemscope öğeleri: [etiket, iç içe derinlik, Product mu]
+        self._microdata = None # [itemprop, etiket, iç içe derinlik, metin parçaları]
+
+    @property
+    def done(self):
+        head_done = self._in_body or (self._title_done and bool(self.description))
+        return head_done and self.text_length >= self.max_text_chars
+
+    def handle_starttag(self, tag, attrs):
+        if tag not in INLINE_TAGS:
+            self._flush()
+        if self.structured is not None:
+            self._collect_structured(tag, dict(attrs))
+        if tag in _SKIPPED_TAGS:
+            self._skip_depth += 1
+        elif tag == "title" and not self._title_done:
+            self._in_title = True
+        elif tag == "body":
+            self._in_body = True
+        elif tag == "meta" and not self.description:
+            attributes = dict(attrs)
+            if (attributes.get("name") or "").lower() == "description":
+                self.description = attributes.get("content") or ""
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag in _SKIPPED_TAGS:
+            self._skip_depth -= 1
+        if tag == "script":
+            self._json_ld = None
+        if self._microdata and self._microdata[1] == tag:
+            self._close_microdata(tag)
+        if self.structured is not None:
+            self._close_scopes(tag)
+
+    def _collect_structured(self, tag, attributes):
+        if tag == "script" and (attributes.get("type") or "").lower() == "application/ld+json":
+            self._json_ld = []
+        elif tag == "meta":
+            self.structured.add_meta(attributes)
+        for scope in self._scopes:
+            if scope[0] == tag:
+                scope[1] += 1
+        prop = attributes.get("itemprop")
+        # Yalnızca en yakın itemscope'u Product olan özellikler ürüne aittir; iç içe öğelerinki
+        # (ör. Brand içindeki "name") toplanmaz
+        in_product_scope = bool(self._scopes) and self._scopes[-1][2]
+        if self._microdata is not None:
+            if tag == self._microdata[1]:
+                self._microdata[2] += 1
+        elif in_product_scope and prop in MICRODATA_PROPERTIES and "itemscope" not in attributes:
+            if attributes.get("content") is not None:
+                self.structured.add_microdata(prop, attributes["content"])
+            else:
+                self._microdata = [prop, tag, 1, []]
+        if "itemscope" in attributes and tag not in _VOID_TAGS:
+            is_product = bool(attributes.get("itemtype")) and is_product_type(attributes["itemtype"])
+            if is_product:
+                self.structured.start_product_scope()
+            self._scopes.append([tag, 1, is_product])
+
+    def _close_scopes(self, tag):
+        for scope in self._scopes:
+            if scope[0] == tag:
+                scope[1] -= 1
+        while self._scopes and self._scopes[-1][1] <= 0:
+            self._scopes.pop()
+
+    def _close_microdata(self, tag):
+        self._microdata[2] -= 1
+        if self._microdata[2] == 0:
+            self.structured.add_microdata(self._microdata[0], "".join(self._microdata[3]))
+            self._microdata = None
+
+    def handle_endtag(self, tag):
+        if tag not in INLINE_TAGS:
+            self._flush()
+        if self._json_ld is not None and tag == "script":
+            self.structured.add_json_ld("".join(self._json_ld))
+            self._json_ld = None
+        if self._microdata and self._microdata[1] == tag:
+            self._close_microdata(tag)
+        if self.structured is not None:
+            self._close_scopes(tag)
+        if tag in _SKIPPED_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag == "title" and self._in_title:
+            self._in_title = False
+            self._title_done = True
+
+    def handle_data(self, data):
+        if self._json_ld is not None:
+            self._json_ld.append(data)
+            return
+        if self._microdata:
+            self._microdata[3].append(data)
+        if self._skip_depth:
+            return
+        if self._in_title:
+            self.title += data
+        else:
+            # Bir blok birden çok metin düğümüne ve feed() çağrısına bölünebilir; blok sınırına kadar biriktirilir
+            self._pending.append(data)
+
+    def _flush(self):
+        if not self._pending:
+            return
+        text = "".join(self._pending)
+        self._pending = []
+        if self.text_length >= self.max_text_chars:
+            return
+        block = " ".join(text.split())
+        if block:
+            self.chunks.append(block)
+            self.text_length += len(block) + 1
+
+    def result(self):
+        """
+        (başlık, açıklama, metin) üçlüsünü get_website_content ile aynı biçimde döndürür.
+        """
+        self._flush()
+        text = "\n".join(self.chunks)
+        if len(text) > self.max_text_chars:
+            text = text[:self.max_text_chars] + "..."
+        return self.title.strip(), self.description, text
+
+
+def extract_from_chunks(chunks, max_text_chars, max_bytes, encoding="utf-8", structured=None):
+    """
+    Bayt parçalarını (ör. response.iter_content) sırayla işler; yeterli bilgi toplandığında
+    veya `max_bytes` sınırına ulaşıldığında durur. `structured` verilirse yapılandırılmış veri de toplanır.
+    (başlık, açıklama, metin, okunan_bayt) döndürür.
+    """
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    extractor = IncrementalPageExtractor(max_text_chars, structured)
+    downloaded = 0
+    for chunk in chunks:
+        if downloaded + len(chunk) > max_bytes:
+            chunk = chunk[:max_bytes - downloaded]
+        downloaded += len(chunk)
+        extractor.feed(decoder.decode(chunk))
+        if extractor.done or downloaded >= max_bytes:
+            break
+    title, description, text = extractor.result()
+    return title, description, text, downloaded
@@ -0,0 +1,379 @@
+# utils/llm_gateway.py
+# Süreç genelinde tüm Ollama çağrılarının geçtiği LLM ağ geçidi.
+# Her Streamlit oturumu (ve toplu üretim, katalog taraması gibi arka plan işleri) Ollama'yı doğrudan
+# çağırdığında aynı anda tıklayan kullanıcılar tek Ollama sunucusunu boğar ve tüm istekler yavaşlar.
+# Ağ geçidi üç şey yapar:
+#   - Tek uçuş (single-flight): aynı model ve parametrelerle devam eden bir istek varsa yenisi Ollama'ya
+#     gönderilmez; ilk isteğin akışı (parçalar geldikçe) bekleyen tüm çağıranlara iletilir.
+#   - Model başına eşzamanlılık sınırı: Ollama'da aynı anda en fazla LLM_GATEWAY_MAX_CONCURRENCY istek çalışır;
+#     fazlası kuyrukta bekler. Kuyruk oturumlar arasında sırayla (round-robin) boşaltılır; böylece matris modu
+#     ile 24 istek gönderen bir oturum, tek istek gönderen diğer oturumları arkasında bekletmez.
+#   - Yük atma: kuyruktaki sıraya ve ortalama istek süresine göre tahmini bekleme veya gerçekleşen bekleme
+#     LLM_GATEWAY_MAX_QUEUE_WAIT_SECONDS'ı aşarsa istek LLMOverloadedError ile reddedilir.
+# Arayüz, llm_queue_notice() bloğu içinde kuyruktaki sırasını gösterir.
+import contextvars
+import hashlib
+import json
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+import streamlit as st
+
+from config import (
+    LLM_GATEWAY_ENABLED, LLM_GATEWAY_MAX_CONCURRENCY, LLM_GATEWAY_MODEL_CONCURRENCY, LLM_GATEWAY_MAX_QUEUE_WAIT_SECONDS
+)
+from utils.tracing import annotate
+
+# Streamlit bağlamı olmayan çağrılar (toplu üretim, katalog taraması, kıyaslamalar) bu oturuma sayılır
+DEFAULT_SESSION_ID = "__process__"
+# Kuyrukta bekleyenin sırası bu aralıkla yeniden hesaplanıp arayüze bildirilir
+_POSITION_REFRESH_SECONDS = 0.5
+_SERVICE_TIME_SMOOTHING = 0.3 # Ortalama istek süresi (üstel hareketli ortalama) için yeni ölçümün ağırlığı
+
+_session_id = contextvars.ContextVar("llm_gateway_session_id", default=None)
+_queue_listener = contextvars.ContextVar("llm_gateway_queue_listener", default=None)
+
+
+class LLMOverloadedError(RuntimeError):
+    """
+    Kuyruk beklemesi eşiği aştığı için reddedilen LLM isteği. Mesajı kullanıcıya olduğu gibi gösterilebilir.
+    """
+
+
+def current_session_id():
+    """
+    Çağrının ait olduğu oturumu döndürür: session_scope() ile verilen kimlik, yoksa Streamlit oturum
+    kimliği, o da yoksa süreç geneli varsayılan oturum.
+    """
+    session_id = _session_id.get()
+    if session_id is not None:
+        return session_id
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return ctx.session_id if ctx is not None else DEFAULT_SESSION_ID
+
+
+@contextmanager
+def session_scope(session_id):
+    """
+    Blok içindeki LLM çağrılarını verilen oturuma sayar. İş parçacığı havuzunda çalışan işler (matris modu)
+    kendilerini başlatan oturumun kuyruk payını kullansın diye kullanılır.
+    """
+    token = _session_id.set(session_id)
+    try:
+        yield
+    finally:
+        _session_id.reset(token)
+
+
+@contextmanager
+def llm_queue_notice():
+    """
+    Blok içindeki LLM çağrısı kuyrukta beklerken sırasını ve tahmini bekleme süresini arayüzde gösterir;
+    istek Ollama'ya gönderildiğinde bildirim kaldırılır.
+    """
+    placeholder = st.empty()
+
+    def show(position, estimated_seconds):
+        if position is None:
+            placeholder.empty()
+        elif estimated_seconds is None:
+            placeholder.info(f"Yoğunluk nedeniyle sıradasınız: {position}. sıra")
+        else:
+            placeholder.info(f"Yoğunluk nedeniyle sıradasınız: {position}. sıra (tahmini bekleme ~{estimated_seconds:.0f} sn)")
+
+    token = _queue_listener.set(show)
+    try:
+        yield
+    finally:
+        _queue_listener.reset(token)
+        placeholder.empty()
+
+
+def request_key(params):
+    """
+    Ollama generate parametrelerinden (model, istem, seçenekler...) tek uçuş anahtarı üretir.
+    """
+    payload = json.dumps(params, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class _Flight:
+    """
+    Ollama'ya gönderilmiş tek bir isteğin akışı. Lider gelen parçaları ekler; takipçiler baştan okur.
+    """
+
+    def __init__(self):
+        self.chunks = []
+        self.done = False
+        self.error = None
+        self.followers = 0
+        self._condition = threading.Condition()
+
+    def publish(self, chunk):
+        with self._condition:
+            self.chunks.append(chunk)
+            self._condition.notify_all()
+
+    def finish(self, error=None):
+        with self._condition:
+            self.done = True
+            self.error = error
+            self._condition.notify_all()
+
+    def follow(self):
+        index = 0
+        while True:
+            with self._condition:
+                while index >= len(self.chunks) and not self.done:
+                    self._condition.wait()
+                pending = self.chunks[index:]
+                index += len(pending)
+                done, error = self.done, self.error
+            yield from pending
+            if done:
+                if error is not None:
+                    raise error
+                return
+
+
+class _Waiter:
+    def __init__(self, session_id):
+        self.session_id = session_id
+        self.granted = False
+        self.event = threading.Event()
+
+
+class _ModelQueue:
+    """
+    Tek bir modelin eşzamanlılık sınırı ve oturumlar arası adil kuyruğu.
+    `sessions` sırası bir sonraki hizmet sırasıdır: baştaki oturumun ilk bekleyeni alınır ve oturumun
+    bekleyeni kaldıysa sona taşınır.
+    """
+
+    def __init__(self, slots):
+        self.slots = slots
+        self.active = 0
+        self.sessions = OrderedDict() # oturum kimliği -> bekleyenler (deque)
+        self.service_seconds = None # Ortalama istek süresi; ilk istek bitene kadar bilinmez
+        self.admitted = 0
+        self.shed = 0
+
+    @property
+    def waiting(self):
+        return sum(len(waiters) for waiters in self.sessions.values())
+
+    def position(self, waiter):
+        """
+        Bekleyenin round-robin sırasındaki yeri (1: ilk boşalan yeri alır).
+        """
+        order = list(self.sessions)
+        own_rank = order.index(waiter.session_id)
+        own_index = self.sessions[waiter.session_id].index(waiter)
+        ahead = 0
+        for rank, session_id in enumerate(order):
+            if session_id != waiter.session_id:
+                # Oturumdan önce sıradaki oturumlar her turda bir istek önde olur
+                ahead += min(len(self.sessions[session_id]), own_index + (1 if rank < own_rank else 0))
+        return ahead + own_index + 1
+
+    def estimated_wait(self, position):
+        if self.service_seconds is None:
+            return None
+        return math.ceil(position / self.slots) * self.service_seconds
+
+    def dispatch(self):
+        while self.active < self.slots and self.sessions:
+            session_id, waiters = next(iter(self.sessions.items()))
+            waiter = waiters.popleft()
+            if waiters:
+                self.sessions.move_to_end(session_id)
+            else:
+                del self.sessions[session_id]
+            waiter.granted = True
+            self.active += 1
+            self.admitted += 1
+            waiter.event.set()
+
+    def remove(self, waiter):
+        waiters = self.sessions.get(waiter.session_id)
+        if waiters is not None and waiter in waiters:
+            waiters.remove(waiter)
+            if not waiters:
+                del self.sessions[waiter.session_id]
+
+
+class LLMGateway:
+    """
+    Tek uçuş birleştirme, model başına eşzamanlılık sınırı, oturumlar arası adil kuyruk ve yük atma.
+    """
+
+    def __init__(self, max_concurrency=LLM_GATEWAY_MAX_CONCURRENCY, model_concurrency=None,
+                 max_queue_wait_seconds=LLM_GATEWAY_MAX_QUEUE_WAIT_SECONDS):
+        self.max_concurrency = max(1, max_concurrency)
+        self.model_concurrency = dict(LLM_GATEWAY_MODEL_CONCURRENCY if model_concurrency is None else model_concurrency)
+        self.max_queue_wait_seconds = max_queue_wait_seconds
+        self._lock = threading.Lock()
+        self._queues = {}
+        self._flights = {}
+        self.coalesced = 0
+
+    def _queue(self, model):
+        queue = self._queues.get(model)
+        if queue is None:
+            queue = self._queues[model] = _ModelQueue(max(1, self.model_concurrency.get(model, self.max_concurrency)))
+        return queue
+
+    def _overloaded(self, model, estimated_seconds=None, waited_seconds=None):
+        if waited_seconds is None:
+            reason = f"tahmini bekleme ~{estimated_seconds:.0f} sn"
+        else:
+            reason = f"{waited_seconds:.0f} sn beklendi"
+        return LLMOverloadedError(
+            f"Şu anda çok sayıda istek var: '{model}' modeli için {reason}, sınır {self.max_queue_wait_seconds:.0f} sn. "
+            "Lütfen biraz sonra tekrar deneyin."
+        )
+
+    def acquire(self, model, session_id=None):
+        """
+        Model için bir çalışma yeri alır ve kuyrukta geçen süreyi döndürür. Yer hemen boş değilse oturumun
+        kuyruğunda beklenir; bekleme eşiği aşılırsa (veya aşılacağı tahmin edilirse) LLMOverloadedError yükselir.
+        Her başarılı acquire'dan sonra release çağrılmalıdır.
+        """
+        session_id = session_id or current_session_id()
+        listener = _queue_listener.get()
+        started = time.perf_counter()
+        with self._lock:
+            queue = self._queue(model)
+            if queue.active < queue.slots and not queue.sessions:
+                queue.active += 1
+                queue.admitted += 1
+                return 0.0
+            waiter = _Waiter(session_id)
+            queue.sessions.setdefault(session_id, deque()).append(waiter)
+            position = queue.position(waiter)
+            estimated = queue.estimated_wait(position)
+            if estimated is not None and estimated > self.max_queue_wait_seconds:
+                queue.remove(waiter)
+                queue.shed += 1
+                raise self._overloaded(model, estimated_seconds=estimated)
+
+        last_position = None
+        try:
+            while not waiter.event.wait(_POSITION_REFRESH_SECONDS if listener else self.max_queue_wait_seconds):
+                waited = time.perf_counter() - started
+                with self._lock:
+                    if waiter.granted:
+                        break
+                    if waited > self.max_queue_wait_seconds:
+                        queue.remove(waiter)
+                        queue.shed += 1
+                        raise self._overloaded(model, waited_seconds=waited)
+                    position = queue.position(waiter)
+                    estimated = queue.estimated_wait(position)
+                if listener and position != last_position:
+                    listener(position, estimated)
+                    last_position = position
+            return time.perf_counter() - started
+        except BaseException:
+            # Bekleme sırasında kesilen (ör. Streamlit yeniden çalıştırması) istek kuyruktan çıkar; yer
+            # verilmişse geri bırakılır
+            with self._lock:
+                if waiter.granted:
+                    queue.active -= 1
+                    queue.dispatch()
+                else:
+                    queue.remove(waiter)
+            raise
+        finally:
+            if listener and last_position is not None:
+                listener(None, None)
+
+    def release(self, model, service_seconds=None):
+        with self._lock:
+            queue = self._queue(model)
+            queue.active -= 1
+            if service_seconds is not None:
+                if queue.service_seconds is None:
+                    queue.service_seconds = service_seconds
+                else:
+                    queue.service_seconds += _SERVICE_TIME_SMOOTHING * (service_seconds - queue.service_seconds)
+            queue.dispatch()
+
+    def stream(self, model, params, produce):
+        """
+        `produce()` (Ollama'nın ham yanıt parçalarını üreten çağrı) sonucunu döndüren üreteç.
+        Aynı `params` ile devam eden bir istek varsa ona katılınır; yoksa kuyruktan yer alınıp istek gönderilir.
+        """
+        key = request_key(params)
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                flight.followers += 1
+                self.coalesced += 1
+        if not leader:
+            annotate(coalesced=True)
+            yield from flight.follow()
+            return
+
+        error = None
+        try:
+            try:
+                waited = self.acquire(model)
+            except BaseException as e:
+                error = e
+                raise
+            annotate(coalesced=False, queue_wait_seconds=round(waited, 4))
+            started = time.perf_counter()
+            try:
+                for chunk in produce():
+                    flight.publish(chunk)
+                    yield chunk
+            except BaseException as e:
+                error = e
+                raise
+            finally:
+                self.release(model, time.perf_counter() - started if error is None else None)
+        finally:
+            with self._lock:
+                del self._flights[key]
+            if isinstance(error, GeneratorExit):
+                # Lider akışı yarıda bıraktıysa takipçiler eksik yanıt yerine hata alır
+                error = RuntimeError("Paylaşılan LLM isteği yarıda kesildi.")
+            flight.finish(error)
+
+    def stats(self):
+        """
+        Model başına çalışan/bekleyen istek sayıları ve sayaçlar.
+        """
+        with self._lock:
+            return {
+                "coalesced": self.coalesced,
+                "in_flight": len(self._flights),
+                "models": {
+                    model: {
+                        "slots": queue.slots,
+                        "active": queue.active,
+                        "waiting": queue.waiting,
+                        "sessions_waiting": len(queue.sessions),
+                        "admitted": queue.admitted,
+                        "shed": queue.shed,
+                        "service_seconds": round(queue.service_seconds, 3) if queue.service_seconds is not None else None,
+                    }
+                    for model, queue in self._queues.items()
+                },
+            }
+
+
+@st.cache_resource(show_spinner=False)
+def get_llm_gateway():
+    """
+    Süreç genelinde paylaşılan LLM ağ geçidini döndürür (LLM_GATEWAY_ENABLED kapalıysa None).
+    """
+    return LLMGateway() if LLM_GATEWAY_ENABLED else None
@@ -1,23 +1,120 @@
 # utils/llm_helpers.py
-from langchain_ollama import OllamaLLM
-from langchain_core.prompts import PromptTemplate
+import functools
+import hashlib
+import json
+import threading
+import streamlit as st
+
+# ollama, langchain_ollama ve langchain_core içe aktarımı ~0.5 sn sürer; Streamlit'in ilk çizimini
+# geciktirmemek için bu modüller ilk kullanıldıkları fonksiyonun içinde içe aktarılır.
 
 # config.py'den sabitleri import edin
-from config import GEMMA_MODEL_NAME, MAX_HEADLINE_CHARS, MAX_BODY_CHARS
+from utils.ad_parser import build_generated_content
+from utils.disk_cache import SQLiteCache
+from utils.llm_gateway import get_llm_gateway
+from utils.ollama_pool import get_ollama_pool
+from config import (
+    GEMMA_MODEL_NAME, LLAMA3_MODEL_NAME, MAX_HEADLINE_CHARS, MAX_BODY_CHARS, OLLAMA_KEEP_ALIVE,
+    CACHE_DB_PATH, AD_CACHE_MAX_ENTRIES, AD_CACHE_MAX_BYTES, AD_CACHE_TTL_SECONDS
+)
 
-def get_ad_gen_chain():
+@functools.cache
+def gateway_ollama_llm_class():
     """
-    Reklam metni oluşturma LLM zincirini döndürür.
+    Ollama isteklerini LLM ağ geçidinden (utils/llm_gateway.py) ve sunucu havuzundan (utils/ollama_pool.py)
+    geçiren OllamaLLM alt sınıfını döndürür. Sınıf, langchain_ollama ilk LLM çağrısında yüklensin diye bu
+    fonksiyonun içinde tanımlanır.
     """
-    llm_gemma = OllamaLLM(model=GEMMA_MODEL_NAME)
+    from langchain_ollama import OllamaLLM
 
-    prompt_template = PromptTemplate(
-        input_variables=[
-            "product_name", "product_description", "target_audience",
-            "ad_platform", "tone_of_voice", "keywords",
-            "num_headlines", "num_ctas", "num_slogans"
-        ],
-        template=f"""
+    class GatewayOllamaLLM(OllamaLLM):
+        """
+        invoke/stream'in ortak kullandığı _create_generate_stream'i (ve ainvoke/astream'inkini) ağ geçidine yönlendirir; aynı istem
+        ve seçeneklerle devam eden istek varsa ona katılır, yoksa model kuyruğunda sırasını bekler. Sırası
+        gelen istek havuzdaki sunuculardan birine süre sınırıyla gönderilir.
+        """
+
+        def _create_generate_stream(self, prompt, stop=None, **kwargs):
+            params = self._generate_params(prompt, stop=stop, **kwargs)
+            pool = get_ollama_pool()
+            gateway = get_llm_gateway()
+            if gateway is None:
+                return pool.generate(params)
+            return gateway.stream(params["model"], params, lambda: pool.generate(params))
+
+        async def _acreate_generate_stream(self, prompt, stop=None, **kwargs):
+            # ainvoke/astream da aynı yoldan geçer; yoksa langchain'in eşzamansız istemcisi kuyruğu, havuzu,
+            # süre sınırlarını ve devre kesiciyi atlardı. Ağ geçidi bloklayan çağrılarla çalıştığından parçalar tek
+            # iş parçacıklı bir yürütücüde üretilir: iptalde kapatma, sürmekte olan next() bitince aynı sırada çalışır.
+            import asyncio
+            import contextvars
+            from concurrent.futures import ThreadPoolExecutor
+
+            stream = self._create_generate_stream(prompt, stop=stop, **kwargs)
+            context = contextvars.copy_context() # Oturum kimliği ve etkin span ağ geçidine taşınır
+            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ollama-astream")
+            loop = asyncio.get_running_loop()
+            finished = object()
+            try:
+                while True:
+                    part = await loop.run_in_executor(executor, context.run, next, stream, finished)
+                    if part is finished:
+                        break
+                    yield part
+            finally:
+                executor.submit(context.run, stream.close)
+                executor.shutdown(wait=False)
+
+    return GatewayOllamaLLM
+
+# st.cache_resource ile işaretlenen nesneler süreç genelinde tek kez oluşturulur
+# ve tüm oturumlar/yeniden çalıştırmalar arasında paylaşılır.
+
+@st.cache_resource(show_spinner=False)
+def get_gemma_llm():
+    """
+    Reklam metni üretiminde kullanılan paylaşılan gemma istemcisini döndürür.
+    """
+    return gateway_ollama_llm_class()(model=GEMMA_MODEL_NAME, keep_alive=OLLAMA_KEEP_ALIVE)
+
+@st.cache_resource(show_spinner=False)
+def get_llama3_llm():
+    """
+    Web sitesi analizi ve çeviri için paylaşılan llama3 istemcisini döndürür.
+    """
+    return gateway_ollama_llm_class()(model=LLAMA3_MODEL_NAME, keep_alive=OLLAMA_KEEP_ALIVE)
+
+def _warm_up_model(model_name):
+    try:
+        # Havuz (ve ollama istemcisi) arka plan iş parçacığında yüklenir; model her sunucuda belleğe alınır
+        get_ollama_pool().warm_up(model_name, OLLAMA_KEEP_ALIVE)
+    except Exception as e:
+        print(f"'{model_name}' modeli önceden yüklenemedi: {e}")
+
+@st.cache_resource(show_spinner=False)
+def warm_up_models():
+    """
+    gemma ve llama3 modellerini arka planda belleğe yükler; ilk tıklama model yükleme süresini beklemez.
+    Süreç başına yalnızca bir kez çalışır.
+    """
+    threads = [
+        threading.Thread(target=_warm_up_model, args=(model_name,), daemon=True)
+        for model_name in (GEMMA_MODEL_NAME, LLAMA3_MODEL_NAME)
+    ]
+    for thread in threads:
+        thread.start()
+    return threads
+
+AD_GEN_INPUT_VARIABLES = [
+    "product_name", "product_description", "target_audience",
+    "ad_platform", "tone_of_voice", "keywords",
+    "num_headlines", "num_ctas", "num_slogans"
+]
+
+# Reklam metni istem şablonu (önbellek anahtarının da bir parçasıdır; değişmesi eski kayıtları geçersiz kılar).
+# Platform ve ton en sona konur: aynı ürün için farklı platform/ton istekleri ortak bir önekle başlar ve
+# Ollama bu önekin işlenmiş halini (KV önbelleği) yeniden kullanabilir.
+AD_GEN_PROMPT_TEMPLATE = f"""
         Sen bir reklam metni yazarı asistanısın. Aşağıdaki bilgilere dayanarak yaratıcı ve etkili reklam metinleri oluştur.
         Lütfen tüm sayısal (adet) ve karakter (uzunluk) sınırlamalarına **KESİNLİKLE** uyun.
         Lütfen sadece reklam metinlerini ve ilgili başlıkları/sloganları üret, başka açıklama veya giriş/çıkış cümlesi ekleme.
@@ -26,12 +123,10 @@ def get_ad_gen_chain():
         Ürün/Hizmet Adı: {{product_name}}
         Ürün/Hizmet Açıklaması: {{product_description}}
         Hedef Kitle: {{target_audience}}
-        Reklam Platformu: {{ad_platform}}
-        Marka Tonu: {{tone_of_voice}}
         Anahtar Kelimeler: {{keywords}}
 
         ---
-        Görev: Yukarıdaki bilgilere göre, aşağıdaki formatta reklam metinleri oluştur:
+        Görev: Yukarıdaki bilgilere ve en alttaki platform/ton seçimine göre, aşağıdaki formatta reklam metinleri oluştur:
 
         **1. Reklam Başlıkları ({{num_headlines}} adet):**
         Kesinlikle ve yalnızca {{num_headlines}} adet farklı ve ilgi çekici reklam başlığı oluştur. Her başlık **KESİNLİKLE {MAX_HEADLINE_CHARS} karakteri geçmemelidir.**
@@ -57,6 +152,77 @@ def get_ad_gen_chain():
         - [Slogan 2]
         ...
         - [Slogan {{num_slogans}}]
+
+        ---
+        Reklam Platformu: {{ad_platform}}
+        Marka Tonu: {{tone_of_voice}}
         """
+
+@st.cache_resource(show_spinner=False)
+def get_ad_gen_chain():
+    """
+    Reklam metni oluşturma LLM zincirini döndürür.
+    """
+    from langchain_core.prompts import PromptTemplate
+    llm_gemma = get_gemma_llm()
+
+    prompt_template = PromptTemplate(
+        input_variables=AD_GEN_INPUT_VARIABLES,
+        template=AD_GEN_PROMPT_TEMPLATE
     )
-    return prompt_template | llm_gemma
\ No newline at end of file
+    return prompt_template | llm_gemma
+
+@st.cache_resource(show_spinner=False)
+def get_ad_generation_cache():
+    """
+    Üretilen reklam metinlerinin kalıcı önbelleğini döndürür.
+    """
+    return SQLiteCache(
+        CACHE_DB_PATH, "ad_generation",
+        max_entries=AD_CACHE_MAX_ENTRIES, max_bytes=AD_CACHE_MAX_BYTES, ttl_seconds=AD_CACHE_TTL_SECONDS
+    )
+
+def _normalize_text(value):
+    return " ".join(str(value).split())
+
+def ad_generation_cache_key(inputs):
+    """
+    Normalize edilmiş girdiler, model adı ve istem şablonundan içerik adresli bir önbellek anahtarı üretir.
+    Model veya şablon değiştiğinde anahtar da değişir, böylece eski kayıtlar kendiliğinden geçersiz olur.
+    """
+    normalized = {key: _normalize_text(inputs.get(key, "")) for key in AD_GEN_INPUT_VARIABLES}
+    normalized["keywords"] = [k for k in (_normalize_text(k) for k in str(inputs.get("keywords", "")).split(',')) if k]
+    for key in ("num_headlines", "num_ctas", "num_slogans"):
+        normalized[key] = int(inputs[key])
+    payload = json.dumps(
+        {"inputs": normalized, "model": GEMMA_MODEL_NAME, "template": AD_GEN_PROMPT_TEMPLATE},
+        ensure_ascii=False, sort_keys=True
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+def build_output_data(inputs, parsed, response, repair_report=None):
+    """
+    Üretim girdilerini, ayrıştırılmış bölümleri ve ham LLM yanıtını kayıt biçiminde birleştirir.
+    Limit düzeltmesi yapıldıysa raporu, yanıtta bulunamayan bölümler varsa bunların listesi de eklenir.
+    """
+    keywords = inputs.get("keywords", "")
+    output_data = {
+        "request_parameters": {
+            "product_name": inputs["product_name"],
+            "product_description": inputs["product_description"],
+            "target_audience": inputs["target_audience"],
+            "ad_platform": inputs["ad_platform"],
+            "tone_of_voice": inputs["tone_of_voice"],
+            "keywords": [k.strip() for k in keywords.split(',')] if keywords else [],
+            "num_headlines": inputs["num_headlines"],
+            "num_ctas": inputs["num_ctas"],
+            "num_slogans": inputs["num_slogans"]
+        },
+        "generated_content": build_generated_content(parsed),
+        "raw_llm_response": response
+    }
+    if repair_report is not None:
+        output_data["repair_report"] = repair_report
+    if not parsed.is_complete:
+        output_data["missing_sections"] = parsed.missing_sections
+    return output_data
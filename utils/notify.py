@@ -0,0 +1,51 @@
+# utils/notify.py
+# Yardımcı fonksiyonların (sayfa çekme, analiz, çeviri, görsel) kullanıcıya bildirdiği hata ve uyarılar.
+# Streamlit arayüzünde mesajlar doğrudan st.error/st.warning/st.code ile gösterilir. Arayüz dışındaki
+# çağıranlar (ör. http_service.py) yardımcıyı collect_notices() bloğu içinde çağırır; mesajlar o zaman
+# gösterilmez, listeye toplanır ve yapılandırılmış hata yanıtına dönüştürülebilir.
+import contextvars
+from contextlib import contextmanager
+
+import streamlit as st
+
+_collector = contextvars.ContextVar("notice_collector", default=None)
+
+
+@contextmanager
+def collect_notices():
+    """
+    Blok içindeki bildirimleri gösterilmek yerine toplanan listeyi verir. Her bildirim
+    {"level": "error" | "warning" | "detail", "message": ..., "exception": sınıf adı (varsa)} biçimindedir.
+    """
+    notices = []
+    token = _collector.set(notices)
+    try:
+        yield notices
+    finally:
+        _collector.reset(token)
+
+
+def _notice(level, message, exception=None, **extra):
+    notices = _collector.get()
+    if notices is None:
+        return False
+    notice = {"level": level, "message": message, **extra}
+    if exception is not None:
+        notice["exception"] = exception.__class__.__name__
+    notices.append(notice)
+    return True
+
+
+def show_error(message, exception=None):
+    if not _notice("error", message, exception):
+        st.error(message)
+
+
+def show_warning(message, exception=None):
+    if not _notice("warning", message, exception):
+        st.warning(message)
+
+
+def show_code(body, language=None):
+    if not _notice("detail", body, language=language):
+        st.code(body, language=language)
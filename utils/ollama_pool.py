@@ -0,0 +1,425 @@
+# utils/ollama_pool.py
+# Birden çok Ollama sunucusuna yük dağıtan istemci havuzu. LLM ağ geçidi (utils/llm_gateway.py) bir isteği
+# kuyruktan geçirdikten sonra istek buradan bir sunucuya gönderilir:
+#   - Yönlendirme: istek, o model için en az bekleyen (devam eden) isteği olan sunucuya gider; eşitlikte sıra döner.
+#   - Süre sınırı: her çağrının bir son tarihi vardır (OLLAMA_DEADLINE_SECONDS, model bazında veya llm_deadline() ile
+#     çağrı bazında değiştirilebilir). Süre dolarsa çağrı LLMUnavailableError ile biter; kullanıcı süresiz beklemez.
+#   - Yedek istek (hedging): kısa istemlerde (ör. çeviri) ilk parça modelin olağan ilk parça süresinin (p95) ötesinde
+#     gecikirse aynı istek ikinci bir sunucuya da gönderilir; önce yanıt vermeye başlayan kullanılır, diğeri kapatılır.
+#   - Devre kesici: art arda OLLAMA_BREAKER_FAILURES kez hata veren sunucu OLLAMA_BREAKER_COOLDOWN_SECONDS boyunca istek
+#     almaz; süre dolunca tek bir deneme isteği gönderilir, başarılı olursa sunucu yeniden devreye girer. Yanıt
+#     vermeye başlamadan hata veren istek başka bir sunucuda yeniden denenir.
+#   - Sağlık kontrolü: birden çok sunucu varsa arka planda /api/tags yoklanır; yanıt vermeyen sunucu seçilmez.
+# Tek sunucuyla (varsayılan) yalnızca süre sınırı ve devre kesici etkilidir.
+import contextvars
+import os
+import queue
+import threading
+import time
+from collections import Counter, deque
+from contextlib import contextmanager
+
+import streamlit as st
+
+from config import (
+    OLLAMA_HOSTS, OLLAMA_HEALTH_CHECK_SECONDS, OLLAMA_CONNECT_TIMEOUT_SECONDS, OLLAMA_DEADLINE_SECONDS,
+    OLLAMA_MODEL_DEADLINE_SECONDS, OLLAMA_HEDGE_ENABLED, OLLAMA_HEDGE_MAX_PROMPT_CHARS, OLLAMA_HEDGE_DELAY_SECONDS,
+    OLLAMA_BREAKER_FAILURES, OLLAMA_BREAKER_COOLDOWN_SECONDS
+)
+from utils.llm_gateway import LLMOverloadedError
+from utils.tracing import annotate
+
+DEFAULT_OLLAMA_HOST = "http://127.0.0.1:11434"
+# Yedek istek beklemesi, modelin son bu kadar ilk parça süresinden hesaplanır
+_FIRST_CHUNK_SAMPLES = 200
+_MIN_FIRST_CHUNK_SAMPLES = 20
+_HEDGE_PERCENTILE = 0.95
+
+_deadline_seconds = contextvars.ContextVar("ollama_deadline_seconds", default=None)
+
+
+class LLMUnavailableError(LLMOverloadedError):
+    """
+    Süre sınırı içinde yanıt alınamayan veya kullanılabilir sunucusu olmayan LLM isteği. Arayüz ve HTTP
+    servisi bunu kuyruk doluluğu gibi "biraz sonra tekrar deneyin" durumu olarak ele alır.
+    """
+
+
+def configured_hosts():
+    """
+    Havuzdaki Ollama sunucuları: OLLAMA_HOSTS ortam değişkeni, config.OLLAMA_HOSTS, OLLAMA_HOST ortam değişkeni
+    veya yerel sunucu (bu öncelik sırasıyla).
+    """
+    hosts = os.getenv("OLLAMA_HOSTS")
+    if hosts:
+        return [host.strip() for host in hosts.split(",") if host.strip()]
+    if OLLAMA_HOSTS:
+        return list(OLLAMA_HOSTS)
+    return [os.getenv("OLLAMA_HOST") or DEFAULT_OLLAMA_HOST]
+
+
+@contextmanager
+def llm_deadline(seconds):
+    """
+    Blok içindeki LLM çağrılarının süre sınırını değiştirir (ör. kısa tutulması gereken çeviriler).
+    """
+    token = _deadline_seconds.set(seconds)
+    try:
+        yield
+    finally:
+        _deadline_seconds.reset(token)
+
+
+def _is_node_failure(error):
+    """
+    Hatanın sunucudan kaynaklandığını (başka sunucuda yeniden denenebileceğini) belirtir. Geçersiz istek
+    gibi 4xx yanıtlar her sunucuda aynı sonucu vereceğinden sayılmaz.
+    """
+    from ollama import ResponseError
+    if isinstance(error, ResponseError):
+        return error.status_code == -1 or error.status_code >= 500
+    import httpx
+    return isinstance(error, (ConnectionError, OSError, httpx.TransportError))
+
+
+def _has_model(models, model):
+    if models is None:
+        return True
+    return model in models or (":" not in model and f"{model}:latest" in models)
+
+
+class _Node:
+    """
+    Havuzdaki tek bir Ollama sunucusu; durumu OllamaPool kilidiyle korunur.
+    `state`: "closed" (istek alır), "open" (devre dışı), "half_open" (deneme isteği bekleniyor).
+    """
+
+    def __init__(self, url, client, health_client):
+        self.url = url
+        self.client = client
+        self.health_client = health_client
+        self.healthy = True
+        self.models = None # Sağlık kontrolünün bildirdiği modeller; bilinmiyorsa None
+        self.outstanding = Counter() # model -> devam eden istek
+        self.state = "closed"
+        self.opened_at = None
+        self.trial_in_flight = False
+        self.consecutive_failures = 0
+        self.requests = 0
+        self.failures = 0
+        self.trips = 0
+
+
+class _Attempt:
+    """
+    İsteğin bir sunucuya gönderilen kopyası. Ayrı iş parçacığında çalışır ve parçaları olay kuyruğuna yazar;
+    böylece çağıran süre sınırını ve yedek isteği bekleme sırasında da uygulayabilir.
+    """
+
+    def __init__(self, pool, node, params, events, hedged):
+        self.pool = pool
+        self.node = node
+        self.params = params
+        self.events = events
+        self.hedged = hedged
+        self.received = False
+        self.finished = False
+        self.cancelled = threading.Event()
+
+    def start(self):
+        threading.Thread(target=self._run, name=f"ollama-{self.node.url}", daemon=True).start()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def _run(self):
+        model = self.params["model"]
+        started = time.perf_counter()
+        stream = None
+        try:
+            response = self.node.client.generate(**self.params)
+            stream = response if self.params.get("stream") else iter([response])
+            for chunk in stream:
+                if self.cancelled.is_set():
+                    return
+                if not self.received:
+                    self.received = True
+                    self.pool._record_first_chunk(model, time.perf_counter() - started)
+                self.events.put((self, "chunk", chunk))
+            self.pool._record(self.node, ok=True)
+            self.events.put((self, "done", None))
+        except Exception as e:
+            if not self.cancelled.is_set() and _is_node_failure(e):
+                self.pool._record(self.node, ok=False)
+            self.events.put((self, "error", e))
+        finally:
+            if stream is not None and hasattr(stream, "close"):
+                stream.close() # Yarıda bırakılan akışın bağlantısı kapanır; Ollama üretimi durdurur
+            self.pool._release(self.node, model)
+
+
+class OllamaPool:
+    """
+    En az bekleyen isteğe göre yönlendirme, süre sınırı, yedek istek, devre kesici ve sağlık kontrolü.
+    """
+
+    def __init__(self, hosts, deadline_seconds=OLLAMA_DEADLINE_SECONDS, model_deadline_seconds=None,
+                 hedge_enabled=OLLAMA_HEDGE_ENABLED, hedge_max_prompt_chars=OLLAMA_HEDGE_MAX_PROMPT_CHARS,
+                 hedge_delay_seconds=OLLAMA_HEDGE_DELAY_SECONDS, breaker_failures=OLLAMA_BREAKER_FAILURES,
+                 breaker_cooldown_seconds=OLLAMA_BREAKER_COOLDOWN_SECONDS, connect_timeout_seconds=OLLAMA_CONNECT_TIMEOUT_SECONDS):
+        import httpx
+        from ollama import Client
+
+        self.deadline_seconds = deadline_seconds
+        self.model_deadline_seconds = dict(OLLAMA_MODEL_DEADLINE_SECONDS if model_deadline_seconds is None else model_deadline_seconds)
+        self.hedge_enabled = hedge_enabled
+        self.hedge_max_prompt_chars = hedge_max_prompt_chars
+        self.hedge_delay_seconds = hedge_delay_seconds
+        self.breaker_failures = max(1, breaker_failures)
+        self.breaker_cooldown_seconds = breaker_cooldown_seconds
+        # Okuma zaman aşımı yalnızca yedek güvencedir; çağrının süre sınırını bekleyen çağıran uygular
+        read_timeout = max([deadline_seconds, *self.model_deadline_seconds.values()])
+        timeout = httpx.Timeout(read_timeout, connect=connect_timeout_seconds)
+        self.nodes = [_Node(host, Client(host=host, timeout=timeout), Client(host=host, timeout=connect_timeout_seconds)) for host in hosts]
+        self._lock = threading.Lock()
+        self._turn = 0
+        self._first_chunk_seconds = {} # model -> son ilk parça süreleri
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.deadline_exceeded = 0
+        self._health_thread = None
+
+    def deadline_for(self, model):
+        seconds = _deadline_seconds.get()
+        return seconds if seconds is not None else self.model_deadline_seconds.get(model, self.deadline_seconds)
+
+    def hedge_delay(self, model):
+        """
+        Yedek istekten önce beklenecek süre: modelin ilk parça süresinin p95'i (yeterli ölçüm yoksa ayar değeri).
+        """
+        with self._lock:
+            samples = sorted(self._first_chunk_seconds.get(model, ()))
+        if len(samples) < _MIN_FIRST_CHUNK_SAMPLES:
+            return self.hedge_delay_seconds
+        return samples[min(len(samples) - 1, int(_HEDGE_PERCENTILE * len(samples)))]
+
+    def _available(self, node, now):
+        if not node.healthy:
+            return False
+        if node.state == "closed":
+            return True
+        if node.state == "open" and now - node.opened_at < self.breaker_cooldown_seconds:
+            return False
+        return not node.trial_in_flight # Bekleme süresi dolmuş sunucuya tek deneme isteği gider
+
+    def _pick(self, model, exclude):
+        """
+        Model için en az bekleyen isteği olan kullanılabilir sunucuyu seçer ve isteği ona sayar (yoksa None).
+        """
+        now = time.monotonic()
+        with self._lock:
+            candidates = [node for node in self.nodes if node not in exclude and self._available(node, now)]
+            with_model = [node for node in candidates if _has_model(node.models, model)]
+            candidates = with_model or candidates # Model hiçbir sunucuda görünmüyorsa liste yanılıyor olabilir
+            if not candidates:
+                return None
+            count = len(self.nodes)
+            turn = self._turn
+            self._turn += 1
+            node = min(candidates, key=lambda node: (
+                node.outstanding[model], sum(node.outstanding.values()), (self.nodes.index(node) - turn) % count
+            ))
+            if node.state != "closed":
+                node.state = "half_open"
+                node.trial_in_flight = True
+            node.outstanding[model] += 1
+            node.requests += 1
+            return node
+
+    def _release(self, node, model):
+        with self._lock:
+            node.outstanding[model] -= 1
+            if node.state != "closed":
+                node.trial_in_flight = False
+
+    def _record(self, node, ok):
+        """
+        İsteğin sonucunu devre kesiciye bildirir.
+        """
+        with self._lock:
+            if ok:
+                node.consecutive_failures = 0
+                node.state = "closed"
+                return
+            node.failures += 1
+            node.consecutive_failures += 1
+            if node.state == "half_open" or (node.state == "closed" and node.consecutive_failures >= self.breaker_failures):
+                node.state = "open"
+                node.opened_at = time.monotonic()
+                node.trips += 1
+
+    def _record_first_chunk(self, model, seconds):
+        with self._lock:
+            samples = self._first_chunk_seconds.get(model)
+            if samples is None:
+                samples = self._first_chunk_seconds[model] = deque(maxlen=_FIRST_CHUNK_SAMPLES)
+            samples.append(seconds)
+
+    def _unavailable(self, model, error=None):
+        with self._lock:
+            states = ", ".join(f"{node.url}: {'yanıt vermiyor' if not node.healthy else node.state}" for node in self.nodes)
+        reason = f" Son hata: {error}" if error is not None else ""
+        return LLMUnavailableError(
+            f"'{model}' modeli için kullanılabilir Ollama sunucusu yok ({states}).{reason} Lütfen biraz sonra tekrar deneyin."
+        )
+
+    def generate(self, params):
+        """
+        Ollama generate parametreleriyle (`_generate_params` çıktısı) isteği bir sunucuya gönderir ve yanıt
+        parçalarını üretir. Yanıt başlamadan sunucu hatası olursa istek diğer sunuculardan birinde yeniden denenir.
+        """
+        model = params["model"]
+        deadline_seconds = self.deadline_for(model)
+        deadline = time.monotonic() + deadline_seconds
+        events = queue.Queue()
+        attempts, tried = [], set()
+        winner, last_error = None, None
+
+        def launch(hedged=False):
+            node = self._pick(model, tried)
+            if node is None:
+                return False
+            tried.add(node)
+            attempt = _Attempt(self, node, params, events, hedged)
+            attempts.append(attempt)
+            attempt.start()
+            return True
+
+        if not launch():
+            raise self._unavailable(model)
+        can_hedge = self.hedge_enabled and len(self.nodes) > 1 and len(str(params.get("prompt") or "")) <= self.hedge_max_prompt_chars
+        hedge_at = time.monotonic() + self.hedge_delay(model) if can_hedge else None
+        try:
+            while True:
+                now = time.monotonic()
+                if winner is None and hedge_at is not None and now >= hedge_at:
+                    hedge_at = None
+                    if launch(hedged=True):
+                        with self._lock:
+                            self.hedges += 1
+                if now >= deadline:
+                    self._deadline_exceeded(attempts)
+                    raise LLMUnavailableError(
+                        f"'{model}' modelinden {deadline_seconds:g} sn içinde yanıt alınamadı. Lütfen biraz sonra tekrar deneyin."
+                    )
+                wait_until = min(deadline, hedge_at) if winner is None and hedge_at is not None else deadline
+                try:
+                    attempt, kind, value = events.get(timeout=max(0.0, wait_until - now))
+                except queue.Empty:
+                    continue
+                if winner is not None and attempt is not winner:
+                    continue
+                if kind == "error":
+                    attempt.finished = True
+                    if winner is not None or not _is_node_failure(value):
+                        raise value
+                    last_error = value
+                    if any(not other.finished for other in attempts) or launch():
+                        continue
+                    raise self._unavailable(model, last_error)
+                if winner is None:
+                    winner = attempt
+                    for other in attempts:
+                        if other is not winner:
+                            other.cancel()
+                    if winner.hedged:
+                        with self._lock:
+                            self.hedge_wins += 1
+                    annotate(ollama_host=winner.node.url, ollama_attempts=len(attempts), hedged=winner.hedged)
+                if kind == "done":
+                    return
+                yield value
+        finally:
+            for attempt in attempts:
+                attempt.cancel()
+
+    def _deadline_exceeded(self, attempts):
+        # Hiç yanıt vermeyen sunucular hata saydırılır; yanıt akıtmakta olan sunucu yalnızca uzun sürmüştür
+        with self._lock:
+            self.deadline_exceeded += 1
+        for attempt in attempts:
+            if not attempt.finished and not attempt.received:
+                self._record(attempt.node, ok=False)
+
+    def check_health(self):
+        """
+        Her sunucunun /api/tags uç noktasını yoklar; yanıt vermeyenleri seçilmez işaretler.
+        """
+        for node in self.nodes:
+            try:
+                models = {model.model for model in node.health_client.list().models}
+                healthy = True
+            except Exception:
+                models, healthy = None, False
+            with self._lock:
+                node.healthy = healthy
+                if healthy:
+                    node.models = models or None # Boş liste (model bilgisi yok) tüm modellere izin verir
+
+    def start_health_checks(self, interval_seconds=OLLAMA_HEALTH_CHECK_SECONDS):
+        """
+        Sağlık kontrolünü arka planda `interval_seconds` aralıkla çalıştırır (tek sunucuda gerekmez).
+        """
+        if self._health_thread is not None or len(self.nodes) < 2:
+            return
+
+        def loop():
+            while True:
+                self.check_health()
+                time.sleep(interval_seconds)
+
+        self._health_thread = threading.Thread(target=loop, name="ollama-health", daemon=True)
+        self._health_thread.start()
+
+    def warm_up(self, model, keep_alive):
+        """
+        Modeli tüm sunucularda belleğe yükler (boş istem yanıt üretmez).
+        """
+        for node in self.nodes:
+            try:
+                node.client.generate(model=model, prompt="", keep_alive=keep_alive)
+            except Exception as e:
+                print(f"'{model}' modeli {node.url} üzerinde önceden yüklenemedi: {e}")
+
+    def stats(self):
+        """
+        Sunucu başına durum ve sayaçlar.
+        """
+        with self._lock:
+            return {
+                "hedges": self.hedges,
+                "hedge_wins": self.hedge_wins,
+                "deadline_exceeded": self.deadline_exceeded,
+                "nodes": [
+                    {
+                        "url": node.url,
+                        "healthy": node.healthy,
+                        "state": node.state,
+                        "outstanding": sum(node.outstanding.values()),
+                        "requests": node.requests,
+                        "failures": node.failures,
+                        "trips": node.trips,
+                    }
+                    for node in self.nodes
+                ],
+            }
+
+
+@st.cache_resource(show_spinner=False)
+def get_ollama_pool():
+    """
+    Süreç genelinde paylaşılan Ollama sunucu havuzunu döndürür ve sağlık kontrolünü başlatır.
+    """
+    pool = OllamaPool(configured_hosts())
+    pool.start_health_checks()
+    return pool
@@ -0,0 +1,23 @@
+# utils/sqlite_transaction.py
+# SQLite depolarının (geçmiş, ürün kataloğu) ortak işlem yardımcısı.
+# Depolar bağlantıyı isolation_level=None ile açar ve her işlemi bu bağlam yöneticisiyle başlatır.
+
+
+class Transaction:
+    """
+    SQLite işlemi bağlam yöneticisi. Yazma işlemleri kilidi işlemin başında alır (BEGIN IMMEDIATE);
+    eşzamanlı yazıcılar kilidi beklerken kısmi kayıt görmez. Salt okunur işlemler ertelenmiş (BEGIN)
+    başlar: WAL kipinde yazma kilidini almaz, yalnızca tutarlı bir anlık görüntüden okur.
+    """
+
+    def __init__(self, conn, write=True):
+        self.conn = conn
+        self.write = write
+
+    def __enter__(self):
+        self.conn.execute("BEGIN IMMEDIATE" if self.write else "BEGIN")
+        return self.conn
+
+    def __exit__(self, exc_type, exc, tb):
+        self.conn.execute("ROLLBACK" if exc_type else "COMMIT")
+        return False
@@ -0,0 +1,161 @@
+# utils/structured_data.py
+# Ürün sayfalarının yayımladığı yapılandırılmış veriden (JSON-LD Product, microdata Product ve
+# OpenGraph/meta etiketleri) ürün adı, açıklaması ve anahtar kelimeleri çıkarır.
+# Toplayıcı, sayfayı zaten dolaşan ayrıştırıcılar (akış halindeki IncrementalPageExtractor ve
+# BeautifulSoup yolu) tarafından beslenir; ayrıca bir ayrıştırma turu yapılmaz. Bulunan alanlar
+# analyze_website_with_llm'e verilir ve LLM yalnızca eksik alanlar için çağrılır.
+import html
+import json
+import re
+
+# analyze_website_with_llm'in döndürdüğü alanlar (sırasıyla)
+ANALYSIS_FIELDS = ("product_name", "product_description", "keywords")
+
+# Microdata'da toplanan itemprop adları -> alan
+MICRODATA_PROPERTIES = {"name": "product_name", "description": "product_description", "keywords": "keywords"}
+
+# Ürün sayfası sayılan og:type değerleri
+_PRODUCT_OG_TYPES = {"product", "og:product", "product.item", "product.group"}
+# Toplanan meta etiketleri (property veya name)
+_META_KEYS = {"og:title", "og:description", "og:type", "description", "keywords", "article:tag", "product:tag"}
+_MAX_KEYWORDS = 7
+_TAG_PATTERN = re.compile(r"<[^>]+>")
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def _clean(value):
+    if isinstance(value, list):
+        value = value[0] if value else ""
+    if not isinstance(value, str):
+        return ""
+    return _WHITESPACE_PATTERN.sub(" ", _TAG_PATTERN.sub(" ", html.unescape(value))).strip()
+
+
+def _keyword_list(value):
+    if isinstance(value, str):
+        value = value.split(",")
+    if not isinstance(value, list):
+        return []
+    return [_clean(item) for item in value if _clean(item)]
+
+
+def is_product_type(value):
+    """
+    JSON-LD @type veya microdata itemtype değeri schema.org Product ise True döndürür.
+    """
+    types = value if isinstance(value, list) else [value]
+    return any(isinstance(t, str) and t.rsplit("/", 1)[-1] == "Product" for t in types)
+
+
+class StructuredDataCollector:
+    """
+    Ayrıştırıcıların bulduğu JSON-LD bloklarını, meta etiketlerini ve microdata değerlerini toplar;
+    fields() ürün sayfası için bulunabilen alanları döndürür.
+    """
+
+    def __init__(self):
+        self.json_ld_products = []
+        self.meta = {}
+        self.microdata = {}
+        self.microdata_product = False
+
+    def add_json_ld(self, text):
+        try:
+            data = json.loads(text)
+        except ValueError:
+            return # Bozuk JSON-LD sayfayı ayrıştırmayı engellememeli
+        pending = [data]
+        while pending:
+            node = pending.pop()
+            if isinstance(node, list):
+                pending.extend(node)
+            elif isinstance(node, dict):
+                if is_product_type(node.get("@type")):
+                    self.json_ld_products.append(node)
+                if "@graph" in node:
+                    pending.append(node["@graph"])
+
+    def add_meta(self, attributes):
+        key = (attributes.get("property") or attributes.get("name") or "").lower()
+        content = attributes.get("content")
+        if key not in _META_KEYS or not content:
+            return
+        if key in ("article:tag", "product:tag"):
+            self.meta.setdefault("tags", []).append(content) # Etiketler tekrar eden meta olarak yayımlanır
+        else:
+            self.meta.setdefault(key, content)
+
+    def add_microdata(self, prop, value):
+        field = MICRODATA_PROPERTIES.get(prop)
+        value = _clean(value)
+        if field and value:
+            self.microdata.setdefault(field, value) # Aynı özellik birden çok kez yayımlanmışsa ilki kullanılır
+
+    def start_product_scope(self):
+        self.microdata_product = True
+
+    @property
+    def is_product_page(self):
+        return bool(self.json_ld_products) or self.microdata_product or \
+            (self.meta.get("og:type") or "").lower() in _PRODUCT_OG_TYPES
+
+    def fields(self):
+        """
+        Bulunan alanları {alan: değer} olarak, kaynaklarıyla birlikte ("sources" anahtarı) döndürür.
+        Sayfada ürün olduğuna dair bir işaret yoksa boş sözlük döner; genel sayfaların başlıkları ürün adı sayılmaz.
+        """
+        if not self.is_product_page:
+            return {}
+        product = self.json_ld_products[0] if self.json_ld_products else {}
+        candidates = {
+            "product_name": [
+                ("json-ld", _clean(product.get("name"))),
+                ("microdata", self.microdata.get("product_name")),
+                ("opengraph", _clean(self.meta.get("og:title"))),
+            ],
+            "product_description": [
+                ("json-ld", _clean(product.get("description"))),
+                ("microdata", self.microdata.get("product_description")),
+                ("opengraph", _clean(self.meta.get("og:description"))),
+                ("meta", _clean(self.meta.get("description"))),
+            ],
+            "keywords": [
+                ("json-ld", ", ".join(_keyword_list(product.get("keywords")))),
+                ("microdata", ", ".join(_keyword_list(self.microdata.get("keywords")))),
+                ("meta", ", ".join(_keyword_list(self.meta.get("keywords")))),
+                ("opengraph", ", ".join(_keyword_list(self.meta.get("tags")))),
+            ],
+        }
+        fields, sources = {}, {}
+        for field, values in candidates.items():
+            for source, value in values:
+                if value:
+                    if field == "keywords":
+                        value = ", ".join(list(dict.fromkeys(value.split(", ")))[:_MAX_KEYWORDS])
+                    fields[field], sources[field] = value, source
+                    break
+        if fields:
+            fields["sources"] = sources
+        return fields
+
+
+def collect_from_soup(soup):
+    """
+    BeautifulSoup ağacından yapılandırılmış veriyi toplar (betikler çıkarılmadan önce çağrılmalıdır).
+    """
+    collector = StructuredDataCollector()
+    for script in soup.find_all("script", attrs={"type": "application/ld+json"}):
+        collector.add_json_ld(script.string or script.get_text())
+    for meta in soup.find_all("meta"):
+        collector.add_meta({key: value for key, value in meta.attrs.items() if isinstance(value, str)})
+    for scope in soup.find_all(attrs={"itemtype": True}):
+        if not is_product_type(scope.get("itemtype")):
+            continue
+        collector.start_product_scope()
+        for element in scope.find_all(attrs={"itemprop": list(MICRODATA_PROPERTIES)}):
+            # İç içe öğelerin (ör. Brand, Offer) özellikleri ürünün alanı değildir
+            if element.has_attr("itemscope") or element.find_parent(attrs={"itemscope": True}) is not scope:
+                continue
+            collector.add_microdata(element["itemprop"], element.get("content") or element.get_text(" "))
+        break
+    return collector.fields()
@@ -0,0 +1,12 @@
+# utils/token_estimate.py
+# Metin uzunluğundan kaba token tahmini. Limit düzeltmesinin tasarruf hesabı (utils/ad_repair.py) ve içerik
+# özetleyicinin token bütçesi (utils/content_condenser.py) aynı oranı kullanır. Ağır bağımlılığı yoktur.
+
+CHARS_PER_TOKEN = 3.5 # Türkçe metinlerde ortalama karakter/token oranı
+
+
+def estimate_tokens(text):
+    """
+    Metnin yaklaşık token sayısını döndürür; yalnızca karşılaştırma ve bütçe hesabı için kaba bir tahmindir.
+    """
+    return max(1, round(len(text) / CHARS_PER_TOKEN)) if text else 0
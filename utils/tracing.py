@@ -0,0 +1,295 @@
+# utils/tracing.py
+# Aşama bazlı gecikme ve token verimi ölçümü.
+# Her aşama (sayfa çekme, analiz, üretim, ayrıştırma, çeviri, görsel) bir "span" ile sarılır: süre,
+# hata, önbellek isabeti ve Ollama yanıt meta verisinden gelen token sayıları/token hızı kaydedilir.
+# Biten span'ler JSONL dosyasına yazılır, bellekteki son span'ler kenar çubuğu panelinde gösterilir ve
+# toplamlar Prometheus metin biçiminde bir HTTP uç noktasından sunulur.
+#
+# Metrikler (uygulama çalışırken):
+#   curl http://127.0.0.1:9464/metrics
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import streamlit as st
+
+from config import TRACE_JSONL_PATH, TRACE_JSONL_MAX_BYTES, TRACE_RECENT_SPANS, METRICS_PORT
+
+# Süre histogramı kova sınırları (saniye)
+_DURATION_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """
+    Tek bir ölçülen aşama. `attributes` JSON'a yazılabilir değerler içerir.
+    """
+
+    def __init__(self, name, parent=None, **attributes):
+        self.name = name
+        self.span_id = uuid.uuid4().hex[:16]
+        self.trace_id = parent.trace_id if parent else uuid.uuid4().hex
+        self.parent_id = parent.span_id if parent else None
+        self.attributes = dict(attributes)
+        self.started_at = time.time()
+        self._started = time.perf_counter()
+        self.duration_seconds = None
+        self.error = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def callbacks(self):
+        """
+        LangChain çağrısına verilecek callback listesi; Ollama token meta verisini bu span'e yazar.
+        """
+        return [ollama_token_callback_class()(self)]
+
+    def to_dict(self):
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "started_at": self.started_at,
+            "duration_seconds": round(self.duration_seconds, 6) if self.duration_seconds is not None else None,
+            "error": self.error,
+            "attributes": self.attributes,
+        }
+
+
+@functools.cache
+def ollama_token_callback_class():
+    """
+    OllamaTokenCallback sınıfını döndürür. Sınıf, langchain_core (içe aktarımı ağır) ilk LLM
+    çağrısında yüklensin diye bu fonksiyonun içinde tanımlanır.
+    """
+    from langchain_core.callbacks import BaseCallbackHandler
+
+    class OllamaTokenCallback(BaseCallbackHandler):
+        """
+        on_llm_end'de Ollama'nın son yanıtındaki (generation_info) sayaçlardan istem/üretim token
+        sayılarını ve token/sn değerlerini; ilk token geldiğinde de ilk token süresini span'e ekler.
+        """
+
+        def __init__(self, span):
+            self.span = span
+            self._first_token_seen = False
+
+        def on_llm_new_token(self, token, **kwargs):
+            if not self._first_token_seen:
+                self._first_token_seen = True
+                self.span.set(time_to_first_token_seconds=round(time.perf_counter() - self.span._started, 4))
+
+        def on_llm_end(self, response, **kwargs):
+            info = {}
+            for generations in response.generations:
+                for generation in generations:
+                    info.update(generation.generation_info or {})
+            if "eval_count" not in info:
+                return
+            prompt_tokens = info.get("prompt_eval_count") or 0
+            eval_tokens = info.get("eval_count") or 0
+            eval_seconds = (info.get("eval_duration") or 0) / 1e9
+            prompt_seconds = (info.get("prompt_eval_duration") or 0) / 1e9
+            self.span.set(
+                model=info.get("model"),
+                prompt_tokens=self.span.attributes.get("prompt_tokens", 0) + prompt_tokens,
+                eval_tokens=self.span.attributes.get("eval_tokens", 0) + eval_tokens,
+                eval_seconds=round(self.span.attributes.get("eval_seconds", 0) + eval_seconds, 4),
+                prompt_tokens_per_second=round(prompt_tokens / prompt_seconds, 1) if prompt_seconds else None,
+                tokens_per_second=round(eval_tokens / eval_seconds, 1) if eval_seconds else None,
+                load_seconds=round((info.get("load_duration") or 0) / 1e9, 4),
+            )
+
+    return OllamaTokenCallback
+
+
+class Tracer:
+    """
+    Biten span'leri toplayan, JSONL'e yazan ve Prometheus metinlerini üreten süreç geneli kayıt.
+    """
+
+    def __init__(self, path=TRACE_JSONL_PATH, max_bytes=TRACE_JSONL_MAX_BYTES, recent=TRACE_RECENT_SPANS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.recent = deque(maxlen=recent)
+        self._lock = threading.Lock()
+        self._stages = {}
+        if path:
+            folder = os.path.dirname(path)
+            if folder:
+                os.makedirs(folder, exist_ok=True)
+
+    def finish(self, span):
+        record = span.to_dict()
+        with self._lock:
+            self.recent.append(record)
+            self._update_metrics(span)
+            if self.path:
+                self._write(record)
+
+    def _update_metrics(self, span):
+        stage = self._stages.setdefault(span.name, {
+            "count": 0, "errors": 0, "duration_sum": 0.0, "buckets": [0] * len(_DURATION_BUCKETS),
+            "cache_hits": 0, "cache_misses": 0, "prompt_tokens": 0, "eval_tokens": 0, "eval_seconds": 0.0,
+            "llm_skipped": 0,
+        })
+        stage["count"] += 1
+        stage["duration_sum"] += span.duration_seconds
+        for index, bound in enumerate(_DURATION_BUCKETS):
+            if span.duration_seconds <= bound:
+                stage["buckets"][index] += 1
+        if span.error:
+            stage["errors"] += 1
+        cache_hit = span.attributes.get("cache_hit")
+        if cache_hit is not None:
+            stage["cache_hits" if cache_hit else "cache_misses"] += 1
+        if span.attributes.get("llm_skipped"):
+            stage["llm_skipped"] += 1 # Ör. analiz, sayfanın yapılandırılmış verisiyle tamamlandı
+        stage["prompt_tokens"] += span.attributes.get("prompt_tokens") or 0
+        stage["eval_tokens"] += span.attributes.get("eval_tokens") or 0
+        stage["eval_seconds"] += span.attributes.get("eval_seconds") or 0.0
+
+    def _write(self, record):
+        try:
+            if self.max_bytes and os.path.exists(self.path) and os.path.getsize(self.path) > self.max_bytes:
+                os.replace(self.path, f"{self.path}.1") # Tek bir önceki dosya saklanır
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except OSError:
+            pass # İzleme hiçbir zaman asıl isteği bozmamalıdır
+
+    def stage_summary(self):
+        """
+        Aşama başına sayı, hata, ortalama süre, p50/p95 (son span'lerden) ve token hızını döndürür.
+        """
+        with self._lock:
+            stages = {name: dict(values) for name, values in self._stages.items()}
+            recent = list(self.recent)
+        summary = []
+        for name, stage in sorted(stages.items()):
+            durations = sorted(r["duration_seconds"] for r in recent if r["name"] == name)
+            percentile = lambda q: round(durations[min(len(durations) - 1, int(q * len(durations)))], 3) if durations else None
+            summary.append({
+                "aşama": name,
+                "sayı": stage["count"],
+                "hata": stage["errors"],
+                "ort. sn": round(stage["duration_sum"] / stage["count"], 3),
+                "p50 sn": percentile(0.5),
+                "p95 sn": percentile(0.95),
+                "önbellek isabeti": stage["cache_hits"],
+                "LLM atlandı": f"%{stage['llm_skipped'] / stage['count'] * 100:.0f}" if stage["llm_skipped"] else None,
+                "token/sn": round(stage["eval_tokens"] / stage["eval_seconds"], 1) if stage["eval_seconds"] else None,
+            })
+        return summary
+
+    def prometheus_text(self):
+        """
+        Toplanan metrikleri Prometheus metin biçiminde döndürür.
+        """
+        with self._lock:
+            stages = {name: dict(values, buckets=list(values["buckets"])) for name, values in self._stages.items()}
+        lines = [
+            "# HELP reklam_stage_duration_seconds Aşama süresi.",
+            "# TYPE reklam_stage_duration_seconds histogram",
+        ]
+        for name, stage in sorted(stages.items()):
+            for bound, count in zip(_DURATION_BUCKETS, stage["buckets"]):
+                lines.append(f'reklam_stage_duration_seconds_bucket{{stage="{name}",le="{bound}"}} {count}')
+            lines.append(f'reklam_stage_duration_seconds_bucket{{stage="{name}",le="+Inf"}} {stage["count"]}')
+            lines.append(f'reklam_stage_duration_seconds_sum{{stage="{name}"}} {stage["duration_sum"]:.6f}')
+            lines.append(f'reklam_stage_duration_seconds_count{{stage="{name}"}} {stage["count"]}')
+        counters = [
+            ("reklam_stage_errors_total", "errors", "Hatayla biten span sayısı."),
+            ("reklam_stage_cache_hits_total", "cache_hits", "Önbellekten yanıtlanan span sayısı."),
+            ("reklam_stage_cache_misses_total", "cache_misses", "Önbellekte bulunamayan span sayısı."),
+            ("reklam_stage_llm_skipped_total", "llm_skipped", "LLM çağrılmadan tamamlanan span sayısı."),
+            ("reklam_llm_prompt_tokens_total", "prompt_tokens", "Ollama'nın işlediği istem token'ları."),
+            ("reklam_llm_eval_tokens_total", "eval_tokens", "Ollama'nın ürettiği token'lar."),
+            ("reklam_llm_eval_seconds_total", "eval_seconds", "Token üretimine harcanan süre."),
+        ]
+        for metric, key, description in counters:
+            lines.append(f"# HELP {metric} {description}")
+            lines.append(f"# TYPE {metric} counter")
+            for name, stage in sorted(stages.items()):
+                lines.append(f'{metric}{{stage="{name}"}} {stage[key]}')
+        return "\n".join(lines) + "\n"
+
+
+@st.cache_resource(show_spinner=False)
+def get_tracer():
+    """
+    Süreç genelinde paylaşılan izleyiciyi döndürür.
+    """
+    return Tracer()
+
+
+@contextmanager
+def span(name, **attributes):
+    """
+    Bloğu bir span ile ölçer. İç içe span'ler aynı trace_id'yi paylaşır; hata yükseltilirse
+    span hatayla kaydedilir ve hata yeniden yükseltilir.
+    """
+    current = Span(name, parent=_current_span.get(), **attributes)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.error = f"{e.__class__.__name__}: {e}"
+        raise
+    finally:
+        _current_span.reset(token)
+        current.duration_seconds = time.perf_counter() - current._started
+        get_tracer().finish(current)
+
+
+def annotate(**attributes):
+    """
+    Etkin span'e öznitelik ekler (etkin span yoksa hiçbir şey yapmaz).
+    """
+    current = _current_span.get()
+    if current is not None:
+        current.set(**attributes)
+
+
+@st.cache_resource(show_spinner=False)
+def start_metrics_server(port=METRICS_PORT):
+    """
+    /metrics yolunda Prometheus metinlerini sunan HTTP sunucusunu süreç başına bir kez başlatır.
+    Port kullanımdaysa (ör. ikinci bir Streamlit süreci) None döner.
+    """
+    if not port:
+        return None
+    tracer = get_tracer()
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = tracer.prometheus_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    try:
+        server = ThreadingHTTPServer(("127.0.0.1", port), MetricsHandler)
+    except OSError:
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True, name="metrics-server").start()
+    return server
@@ -1,60 +1,183 @@
 # utils/web_scraper.py
 import streamlit as st
-import requests #' HTTP isteklerini yapmak ve yanıtlarını işlemek
-from bs4 import BeautifulSoup # type: ignore   #HTML ve XML belgelerini ayrıştırmak için tasarlanmış bir Python kütüphanesidir
 import json
-from langchain_ollama import OllamaLLM # type: ignore # Ollama'ya gönderilen istekleri göndermek ve yanıtları almak
-from langchain_core.prompts import PromptTemplate
+import hashlib
+# requests, BeautifulSoup ve PromptTemplate yalnızca sayfa çekme/analiz ilk kullanıldığında içe aktarılır
 
 # config.py'den sabitleri import edin
-from config import MAX_TEXT_LENGTH_FOR_ANALYSIS, LLAMA3_MODEL_NAME
+from config import (
+    SCRAPER_MAX_TEXT_CHARS, CACHE_DB_PATH, WEB_CACHE_MAX_ENTRIES, WEB_CACHE_TTL_SECONDS,
+    HTTP_TIMEOUT_SECONDS, HTTP_POOL_CONNECTIONS, HTTP_POOL_MAXSIZE,
+    SCRAPER_STREAMING, SCRAPER_MAX_DOWNLOAD_BYTES, SCRAPER_CHUNK_BYTES
+)
+from utils.llm_helpers import get_llama3_llm
+from utils.llm_gateway import LLMOverloadedError
+from utils.notify import show_error, show_warning, show_code
+from utils.disk_cache import SQLiteCache
+from utils.html_extractor import extract_from_chunks, preferred_bs4_parser, soup_text_blocks
+from utils.structured_data import ANALYSIS_FIELDS, StructuredDataCollector, collect_from_soup
+from utils.tracing import span, annotate
+
+HTTP_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+@st.cache_resource(show_spinner=False)
+def get_http_session():
+    """
+    Bağlantıları (keep-alive) yeniden kullanan, süreç genelinde paylaşılan requests oturumunu döndürür.
+    """
+    import requests # HTTP isteklerini yapmak ve yanıtlarını işlemek
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=HTTP_POOL_CONNECTIONS, pool_maxsize=HTTP_POOL_MAXSIZE)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update(HTTP_HEADERS)
+    return session
+
+@st.cache_resource(show_spinner=False)
+def get_web_caches():
+    """
+    (yanıt doğrulayıcıları önbelleği, ayrıştırılmış sayfa önbelleği) ikilisini döndürür.
+    İlki URL -> ETag/Last-Modified/içerik özeti, ikincisi URL + içerik özeti -> (başlık, açıklama, metin, yapılandırılmış veri) tutar.
+    """
+    responses = SQLiteCache(CACHE_DB_PATH, "http_responses", max_entries=WEB_CACHE_MAX_ENTRIES, ttl_seconds=WEB_CACHE_TTL_SECONDS)
+    extracts = SQLiteCache(CACHE_DB_PATH, "page_extracts", max_entries=WEB_CACHE_MAX_ENTRIES, ttl_seconds=WEB_CACHE_TTL_SECONDS)
+    return responses, extracts
+
+def extract_page_content(html):
+    """
+    HTML içeriğinden başlık, meta açıklama, görünür metni ve yapılandırılmış ürün verisini çıkarır.
+    """
+    from bs4 import BeautifulSoup # type: ignore   #HTML ve XML belgelerini ayrıştırmak için tasarlanmış bir Python kütüphanesidir
+    soup = BeautifulSoup(html, preferred_bs4_parser())
+
+    title = soup.find('title').get_text() if soup.find('title') else ""
+    meta_description = soup.find('meta', attrs={'name': 'description'})
+    description = meta_description['content'] if meta_description and 'content' in meta_description.attrs else ""
+    structured = collect_from_soup(soup) # JSON-LD betikleri aşağıda çıkarılmadan önce okunur
+
+    for script_or_style in soup(['script', 'style']):
+        script_or_style.extract()
+
+    text = soup_text_blocks(soup)
+    if len(text) > SCRAPER_MAX_TEXT_CHARS:
+        text = text[:SCRAPER_MAX_TEXT_CHARS] + "..."
+
+    return title, description, text, structured
+
+def _stream_extract(response):
+    """
+    Yanıt gövdesini parça parça indirip artımlı olarak ayrıştırır; yeterli metin toplandığında veya
+    bayt sınırına ulaşıldığında bağlantıyı kapatır. ((başlık, açıklama, metin, yapılandırılmış veri), içerik_özeti) döndürür.
+    """
+    hasher = hashlib.sha256()
+    collector = StructuredDataCollector()
+
+    def hashed_chunks():
+        for chunk in response.iter_content(SCRAPER_CHUNK_BYTES):
+            hasher.update(chunk)
+            yield chunk
+
+    try:
+        title, description, text, _ = extract_from_chunks(
+            hashed_chunks(), SCRAPER_MAX_TEXT_CHARS, SCRAPER_MAX_DOWNLOAD_BYTES,
+            encoding=response.encoding if "charset" in response.headers.get("Content-Type", "").lower() else "utf-8",
+            structured=collector
+        )
+    finally:
+        response.close()
+    return (title, description, text, collector.fields()), hasher.hexdigest()
+
+def _cached_extract(extract_cache, key):
+    cached = extract_cache.get(key)
+    # Yapılandırılmış veri eklenmeden önce yazılmış (3 öğeli) kayıtlar yok sayılır
+    return tuple(cached) if cached is not None and len(cached) == 4 else None
+
+def _fetch_page(url, streaming=SCRAPER_STREAMING, headers=None):
+    """
+    Sayfayı koşullu istekle çeker ve (başlık, açıklama, metin, yapılandırılmış veri) döndürür.
+    Sunucu 304 döndürürse ya da içerik özeti değişmemişse ayrıştırma atlanır.
+    """
+    session = get_http_session()
+    response_cache, extract_cache = get_web_caches()
+
+    validators = response_cache.get(url)
+    conditional_headers = dict(headers or {})
+    if validators:
+        if validators.get("etag"):
+            conditional_headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            conditional_headers["If-Modified-Since"] = validators["last_modified"]
+
+    response = session.get(url, headers=conditional_headers, timeout=HTTP_TIMEOUT_SECONDS, stream=streaming)
+    if response.status_code == 304:
+        response.close()
+        cached = _cached_extract(extract_cache, f"{url}:{validators['content_hash']}")
+        if cached is not None:
+            annotate(cache_hit=True, http_status=304, structured_fields=len(cached[3].get("sources", {})))
+            return cached
+        # Ayrıştırılmış içerik önbellekten düşmüş; sayfa koşulsuz olarak yeniden indirilir
+        response = session.get(url, headers=headers, timeout=HTTP_TIMEOUT_SECONDS, stream=streaming)
+    response.raise_for_status() # HTTP hataları için hata yükselt
+
+    if streaming:
+        # Akış modunda ayrıştırma indirmeyle birlikte yapılır; özet yalnızca okunan baytları kapsar
+        extracted, content_hash = _stream_extract(response)
+        cached = None
+    else:
+        content_hash = hashlib.sha256(response.content).hexdigest()
+        cached = _cached_extract(extract_cache, f"{url}:{content_hash}")
+        extracted = cached if cached is not None else extract_page_content(response.text)
+
+    annotate(cache_hit=cached is not None, http_status=response.status_code, structured_fields=len(extracted[3].get("sources", {})))
+    response_cache.set(url, {
+        "etag": response.headers.get("ETag"),
+        "last_modified": response.headers.get("Last-Modified"),
+        "content_hash": content_hash,
+    })
+    if cached is None:
+        extract_cache.set(f"{url}:{content_hash}", list(extracted))
+    return extracted
+
+def fetch_page_content(url, headers=None):
+    """
+    Sayfayı çeker ve (başlık, açıklama, metin, yapılandırılmış veri) döndürür. Hataları arayüze yazmak
+    yerine yükseltir; arayüz dışındaki çağıranlar (ör. katalog taraması) için. `headers` oturumun
+    varsayılan başlıklarını (ör. User-Agent) bu istek için değiştirir.
+    """
+    with span("scrape", url=url):
+        return _fetch_page(url, headers=headers)
 
 def get_website_content(url):
     """
     Belirtilen URL'deki web sitesinin metin içeriğini çeker ve ayrıştırır.
+    (başlık, açıklama, metin, yapılandırılmış veri) döndürür; son öğe sayfanın JSON-LD/OpenGraph/microdata
+    verisinden bulunan ürün alanlarıdır (bkz. utils/structured_data.py).
     """
+    import requests
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status() # HTTP hataları için hata yükselt
-        soup = BeautifulSoup(response.text, 'html.parser')
-
-        title = soup.find('title').get_text() if soup.find('title') else ""
-        meta_description = soup.find('meta', attrs={'name': 'description'})
-        description = meta_description['content'] if meta_description and 'content' in meta_description.attrs else ""
-
-        for script_or_style in soup(['script', 'style']):
-            script_or_style.extract()
-
-        text = soup.get_text()
-        lines = (line.strip() for line in text.splitlines())
-        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-        text = '\n'.join(chunk for chunk in chunks if chunk)
-
-        if len(text) > MAX_TEXT_LENGTH_FOR_ANALYSIS:
-            text = text[:MAX_TEXT_LENGTH_FOR_ANALYSIS] + "..."
-
-        return title, description, text
-
-    except requests.exceptions.ConnectionError:
-        st.error(f"Web sitesine bağlantı kurulamadı. URL'yi kontrol edin, internet bağlantınızı doğrulayın ve web sitesinin erişilebilir olduğundan emin olun.")
-        return None, None, None
-    except requests.exceptions.Timeout:
-        st.error(f"Web sitesinden yanıt alınamadı (zaman aşımı). Web sitesinin yüklenmesi uzun sürüyor veya erişilemiyor olabilir.")
-        return None, None, None
+        return fetch_page_content(url)
+
+    except requests.exceptions.ConnectionError as e:
+        show_error(f"Web sitesine bağlantı kurulamadı. URL'yi kontrol edin, internet bağlantınızı doğrulayın ve web sitesinin erişilebilir olduğundan emin olun.", e)
+        return None, None, None, None
+    except requests.exceptions.Timeout as e:
+        show_error(f"Web sitesinden yanıt alınamadı (zaman aşımı). Web sitesinin yüklenmesi uzun sürüyor veya erişilemiyor olabilir.", e)
+        return None, None, None, None
     except requests.exceptions.RequestException as e:
-        st.error(f"Web sitesine erişim sırasında bir hata oluştu: {e}. URL'yi kontrol edin.")
-        return None, None, None
+        show_error(f"Web sitesine erişim sırasında bir hata oluştu: {e}. URL'yi kontrol edin.", e)
+        return None, None, None, None
     except Exception as e:
-        st.error(f"Web sitesi içeriği işlenirken beklenmedik bir hata oluştu: {e}. Web sitesi yapısı beklenenden farklı olabilir.")
-        return None, None, None
+        show_error(f"Web sitesi içeriği işlenirken beklenmedik bir hata oluştu: {e}. Web sitesi yapısı beklenenden farklı olabilir.", e)
+        return None, None, None, None
 
-def analyze_website_with_llm(website_content_text):
+@st.cache_resource(show_spinner=False)
+def get_website_analysis_chain():
     """
-    Çekilen web sitesi içeriğini LLM ile analiz eder ve JSON formatında ürün/hizmet bilgileri döndürür.
+    Web sitesi içeriğini analiz eden LLM zincirini döndürür.
     """
+    from langchain_core.prompts import PromptTemplate
     prompt = PromptTemplate(
         input_variables=["website_content"],
         template="""
@@ -74,11 +197,63 @@ def analyze_website_with_llm(website_content_text):
         }}
         """
     )
-    llm_analyzer = OllamaLLM(model=LLAMA3_MODEL_NAME) # config'den model adı kullanıldı
-    chain = prompt | llm_analyzer
+    return prompt | get_llama3_llm()
+
+@st.cache_resource(show_spinner=False)
+def get_missing_fields_analysis_chain():
+    """
+    Yapılandırılmış veride bulunamayan alanları, bulunanları bağlam olarak vererek isteyen LLM zincirini döndürür.
+    """
+    from langchain_core.prompts import PromptTemplate
+    prompt = PromptTemplate(
+        input_variables=["website_content", "known_fields", "missing_fields", "output_format"],
+        template="""
+        Aşağıdaki web sitesi içeriğini analiz et ve yalnızca şu alanları JSON formatında döndür: {missing_fields}.
+        Sadece JSON çıktısı ver, başka hiçbir açıklama veya ek metin içerme.
+        Anahtar kelimeler istenirse 5-7 adet olmalı ve virgülle ayrılmış olmalıdır.
+
+        Sayfanın yapılandırılmış verisinden bilinen alanlar (bunlarla tutarlı ol):
+        {known_fields}
+
+        Web Sitesi İçeriği:
+        {website_content}
+
+        JSON Çıktısı Formatı:
+        {output_format}
+        """
+    )
+    return prompt | get_llama3_llm()
+
+_OUTPUT_FORMAT_EXAMPLES = {
+    "product_name": "...",
+    "product_description": "...",
+    "keywords": "anahtar1, anahtar2, ...",
+}
+
+def analyze_website_with_llm(website_content_text, structured=None):
+    """
+    Çekilen web sitesi içeriğini LLM ile analiz eder ve JSON formatında ürün/hizmet bilgileri döndürür.
+    `structured` (get_website_content'in döndürdüğü yapılandırılmış veri) tüm alanları içeriyorsa LLM
+    çağrılmaz; bir kısmını içeriyorsa LLM'den yalnızca eksik alanlar istenir.
+    """
+    known = {field: structured[field] for field in ANALYSIS_FIELDS if structured and structured.get(field)}
+    missing = [field for field in ANALYSIS_FIELDS if field not in known]
+    if not missing:
+        with span("analyze", input_chars=len(website_content_text), structured_fields=len(known), llm_skipped=True):
+            return tuple(known[field] for field in ANALYSIS_FIELDS)
 
+    response = ""
     try:
-        response = chain.invoke({"website_content": website_content_text})
+        with span("analyze", input_chars=len(website_content_text), structured_fields=len(known), llm_skipped=False) as analyze_span:
+            if known:
+                response = get_missing_fields_analysis_chain().invoke({
+                    "website_content": website_content_text,
+                    "known_fields": json.dumps(known, ensure_ascii=False, indent=2),
+                    "missing_fields": ", ".join(missing),
+                    "output_format": json.dumps({field: _OUTPUT_FORMAT_EXAMPLES[field] for field in missing}, ensure_ascii=False, indent=2),
+                }, config={"callbacks": analyze_span.callbacks()})
+            else:
+                response = get_website_analysis_chain().invoke({"website_content": website_content_text}, config={"callbacks": analyze_span.callbacks()})
         response = response.strip()
         if response.startswith("```json"):
             response = response[len("```json"):].strip()
@@ -86,11 +261,14 @@ def analyze_website_with_llm(website_content_text):
             response = response[:-len("```")].strip()
 
         data = json.loads(response)
-        return data.get("product_name", ""), data.get("product_description", ""), data.get("keywords", "")
+        return tuple(known.get(field) or data.get(field, "") for field in ANALYSIS_FIELDS)
     except json.JSONDecodeError as e:
-        st.error(f"LLM çıktısı JSON olarak ayrıştırılamadı. Modelin doğru formatı döndürdüğünden emin olun. Hata: {e}")
-        st.code(response, language="json")
-        return "", "", ""
+        show_error(f"LLM çıktısı JSON olarak ayrıştırılamadı. Modelin doğru formatı döndürdüğünden emin olun. Hata: {e}", e)
+        show_code(response, language="json")
+        return tuple(known.get(field, "") for field in ANALYSIS_FIELDS)
+    except LLMOverloadedError as e:
+        show_warning(str(e), e)
+        return tuple(known.get(field, "") for field in ANALYSIS_FIELDS)
     except Exception as e:
-        st.error(f"Web sitesi analizinde beklenmedik bir hata oluştu: {e}")
-        return "", "", ""
\ No newline at end of file
+        show_error(f"Web sitesi analizinde beklenmedik bir hata oluştu: {e}", e)
+        return tuple(known.get(field, "") for field in ANALYSIS_FIELDS)
\ No newline at end of file